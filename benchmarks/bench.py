@@ -0,0 +1,310 @@
+"""
+Banc d'essai des performances de la Fourmi de Langton.
+
+Mesure, sur des scénarios reproductibles (graine fixe) de plusieurs tailles de
+grille et nombres de fourmis :
+
+- les étapes par seconde de ``Fourmi.etape`` et du moteur par lots ;
+- le temps d'une image de ``afficher_grille`` et du rendu incrémental
+  (pilote vidéo factice de SDL) ;
+- le coût de ``sauvegarder_etat`` et ``reprendre_etat`` ;
+- la latence et le débit des routes ``/state`` et ``/update`` du serveur ;
+- le temps d'importation des modules (``python -X importtime`` dans un nouvel
+  interpréteur, sans ``SECRET_KEY``), comparé à un budget : les processus de
+  balayage sont nombreux et courts.
+
+Les résultats sont écrits en JSON pour comparer deux versions ::
+
+    python benchmarks/bench.py --sortie bench.json
+    python benchmarks/bench.py --sortie nouveau.json --comparer bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SECRET_KEY", "banc-d-essai")
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+RACINE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, RACINE)
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+# pylint: disable=wrong-import-position
+from fourmi.grille import Grille
+from fourmi.fourmi import Fourmi
+from fourmi.moteur import Moteur
+
+GRAINE = 20240601
+TAILLES = (64, 256, 1024)
+NOMBRES_DE_FOURMIS = (1, 5, 100)
+# Budget de temps d'importation de chaque module, en ms (cumul de -X importtime)
+BUDGETS_IMPORTATION = {
+    "fourmi.grille": 150,
+    "fourmi.moteur": 200,
+    "fourmi.run": 200,
+    "fourmi.balayage": 200,
+    "client": 300,
+    "server": 1000,
+}
+# Dépendances que le cœur de la simulation ne doit importer qu'à la demande
+DEPENDANCES_LOURDES = ("numba", "pygame", "httpx", "yaml")
+
+
+def scenario(taille, nombre_de_fourmis, graine=GRAINE):
+    """Crée une grille vide et des fourmis placées au hasard (graine fixe).
+
+    Args:
+        taille (int): Le côté de la grille.
+        nombre_de_fourmis (int): Le nombre de fourmis.
+        graine (int): La graine du générateur aléatoire.
+
+    Returns:
+        tuple: La grille et la liste des fourmis.
+    """
+    generateur = random.Random(graine + taille * 1000 + nombre_de_fourmis)
+    fourmis = [Fourmi(generateur.randrange(taille), generateur.randrange(taille), ant_id=i)
+               for i in range(nombre_de_fourmis)]
+    return Grille(taille, taille), fourmis
+
+
+def chronometrer(fonction, repetitions):
+    """Exécute ``fonction`` plusieurs fois et retourne les durées en secondes."""
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    return durees
+
+
+def resume(durees):
+    """Résume une série de durées (médiane, minimum, 95e centile), en millisecondes."""
+    triees = sorted(durees)
+    return {
+        "mediane_ms": statistics.median(triees) * 1000,
+        "min_ms": triees[0] * 1000,
+        "p95_ms": triees[min(len(triees) - 1, int(0.95 * len(triees)))] * 1000,
+        "repetitions": len(triees),
+    }
+
+
+def bench_etapes(rapide):
+    """Étapes par seconde de ``Fourmi.etape`` et du moteur par lots."""
+    resultats = []
+    budget = 20000 if rapide else 200000  # Étapes-fourmis par mesure
+    moteurs = {"moteur_python": Moteur(jit=False, autoroute=False)}
+    try:
+        moteurs["moteur_jit"] = Moteur(jit=True, autoroute=False)
+    except ValueError:
+        pass
+    for taille in TAILLES:
+        for nombre in NOMBRES_DE_FOURMIS:
+            n_etapes = max(1, budget // nombre)
+            grille, fourmis = scenario(taille, nombre)
+            debut = time.perf_counter()
+            for _ in range(n_etapes):
+                for fourmi in fourmis:
+                    fourmi.etape(grille)
+            duree = time.perf_counter() - debut
+            resultats.append({"nom": "fourmi_etape", "taille": taille, "fourmis": nombre,
+                              "etapes_par_seconde": n_etapes / duree})
+            for nom, moteur in moteurs.items():
+                grille, fourmis = scenario(taille, nombre)
+                moteur.simuler(grille, fourmis, 1)  # Compilation éventuelle hors mesure
+                n = n_etapes * (50 if nom == "moteur_jit" else 1)
+                debut = time.perf_counter()
+                moteur.simuler(grille, fourmis, n)
+                duree = time.perf_counter() - debut
+                resultats.append({"nom": nom, "taille": taille, "fourmis": nombre,
+                                  "etapes_par_seconde": n / duree})
+    return resultats
+
+
+def bench_affichage(rapide):
+    """Temps d'une image : dessin global et rendu incrémental."""
+    import pygame  # pylint: disable=import-outside-toplevel
+    from fourmi.affichage import afficher_grille, RenduIncremental  # pylint: disable=import-outside-toplevel
+
+    resultats = []
+    repetitions = 5 if rapide else 30
+    taille_cellule = 2
+    pygame.display.init()
+    try:
+        for taille in TAILLES:
+            fenetre = pygame.display.set_mode((taille * taille_cellule, taille * taille_cellule))
+            grille, fourmis = scenario(taille, 5)
+            Moteur(jit=False).simuler(grille, fourmis, 5000)
+            durees = chronometrer(lambda: afficher_grille(fenetre, grille, taille_cellule, fourmis), repetitions)
+            resultats.append(dict(nom="afficher_grille", taille=taille, fourmis=5, **resume(durees)))
+
+            rendu = RenduIncremental(taille_cellule)
+            rendu.afficher(fenetre, grille, fourmis)
+            moteur = Moteur(jit=False)
+
+            def image():
+                cases = [(f.x, f.y) for f in fourmis]
+                moteur.simuler(grille, fourmis, 1)
+                pygame.display.update(rendu.afficher(fenetre, grille, fourmis, cases))
+            durees = chronometrer(image, repetitions * 10)
+            resultats.append(dict(nom="rendu_incremental", taille=taille, fourmis=5, **resume(durees)))
+    finally:
+        pygame.display.quit()
+    return resultats
+
+
+def bench_persistance(rapide):
+    """Coût de ``sauvegarder_etat`` et ``reprendre_etat``."""
+    import client  # pylint: disable=import-outside-toplevel
+
+    resultats = []
+    repetitions = 3 if rapide else 20
+    dossier_initial = os.getcwd()
+    with tempfile.TemporaryDirectory() as dossier:
+        os.chdir(dossier)
+        try:
+            for taille in TAILLES:
+                grille, fourmis = scenario(taille, 5)
+                durees = chronometrer(lambda: client.sauvegarder_etat(grille, fourmis), repetitions)
+                resultats.append(dict(nom="sauvegarder_etat", taille=taille,
+                                      octets=os.path.getsize(client.FICHIER_SAUVEGARDE), **resume(durees)))
+                durees = chronometrer(client.reprendre_etat, repetitions)
+                resultats.append(dict(nom="reprendre_etat", taille=taille, **resume(durees)))
+        finally:
+            os.chdir(dossier_initial)
+    return resultats
+
+
+def bench_serveur(rapide):
+    """Latence et débit des routes ``/state`` et ``/update``."""
+    from fastapi.testclient import TestClient  # pylint: disable=import-outside-toplevel
+    import server  # pylint: disable=import-outside-toplevel
+
+    resultats = []
+    requetes = 50 if rapide else 500
+    entetes = {"Authorization": f"Bearer {os.environ['SECRET_KEY']}"}
+    client_http = TestClient(server.app)
+    durees = chronometrer(lambda: client_http.get("/state", headers=entetes), requetes)
+    resultats.append(dict(nom="serveur_state", requetes_par_seconde=len(durees) / sum(durees), **resume(durees)))
+    for taille in TAILLES[:2]:
+        grille, fourmis = scenario(taille, 5)
+        etat = {"grille": grille.grille,
+                "fourmis": [{"x": f.x, "y": f.y, "direction": "N", "id": f.ant_id} for f in fourmis]}
+        durees = chronometrer(lambda: client_http.post("/update", json=etat, headers=entetes), max(5, requetes // 10))
+        resultats.append(dict(nom="serveur_update", taille=taille,
+                              requetes_par_seconde=len(durees) / sum(durees), **resume(durees)))
+    return resultats
+
+
+def temps_importation(module):
+    """Importe ``module`` dans un nouvel interpréteur avec ``python -X importtime``.
+
+    Args:
+        module (str): Le module à importer.
+
+    Returns:
+        tuple: La durée cumulée de l'importation en secondes, et la liste des
+        dépendances lourdes importées avec lui.
+    """
+    environnement = dict(os.environ)
+    environnement.pop("SECRET_KEY", None)  # L'importation ne doit demander aucun secret
+    sortie = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=RACINE,
+                            env=environnement, capture_output=True, text=True, check=True).stderr
+    cumuls = {}
+    for ligne in sortie.splitlines():
+        if ligne.startswith("import time:"):
+            _, cumul, nom = ligne.split("|")
+            if cumul.strip().isdigit():  # Pas la ligne d'en-tête
+                cumuls[nom.strip()] = int(cumul)
+    return cumuls[module] / 1e6, [nom for nom in DEPENDANCES_LOURDES if nom in cumuls]
+
+
+def bench_demarrage(rapide):
+    """Temps d'importation des modules, comparé à ``BUDGETS_IMPORTATION``."""
+    resultats = []
+    repetitions = 3 if rapide else 10
+    for module, budget in BUDGETS_IMPORTATION.items():
+        durees, lourdes = [], []
+        for _ in range(repetitions):
+            duree, lourdes = temps_importation(module)
+            durees.append(duree)
+        mesure = resume(durees)
+        resultats.append(dict(nom="importation", module=module, budget_ms=budget,
+                              dans_le_budget=mesure["mediane_ms"] <= budget, dependances_lourdes=lourdes, **mesure))
+    return resultats
+
+
+BANCS = {
+    "demarrage": bench_demarrage,
+    "etapes": bench_etapes,
+    "affichage": bench_affichage,
+    "persistance": bench_persistance,
+    "serveur": bench_serveur,
+}
+
+
+def version_du_code():
+    """Retourne le commit courant, ou None hors d'un dépôt git."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RACINE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparer(nouveaux, anciens):
+    """Affiche, pour chaque mesure commune, le rapport entre deux exécutions du banc."""
+    def cles(resultat):
+        return tuple((k, resultat[k]) for k in ("banc", "nom", "module", "taille", "fourmis") if k in resultat)
+    precedents = {cles(r): r for r in anciens["resultats"]}
+    for resultat in nouveaux["resultats"]:
+        ancien = precedents.get(cles(resultat))
+        if ancien is None:
+            continue
+        for mesure in ("etapes_par_seconde", "requetes_par_seconde", "mediane_ms"):
+            if mesure in resultat and ancien.get(mesure):
+                rapport = resultat[mesure] / ancien[mesure]
+                print(f"{resultat['nom']:<20} {dict(cles(resultat))} {mesure}: x{rapport:.2f}")
+
+
+def main(argv=None):
+    """Point d'entrée du banc d'essai."""
+    analyseur = argparse.ArgumentParser(description="Banc d'essai des performances.")
+    analyseur.add_argument("--sortie", default="bench.json", help="Fichier JSON des résultats.")
+    analyseur.add_argument("--bancs", nargs="*", choices=sorted(BANCS), default=sorted(BANCS),
+                           help="Bancs à exécuter (tous par défaut).")
+    analyseur.add_argument("--rapide", action="store_true", help="Moins de répétitions.")
+    analyseur.add_argument("--comparer", help="Résultats précédents à comparer.")
+    arguments = analyseur.parse_args(argv)
+
+    resultats = []
+    for nom in arguments.bancs:
+        print(f"Banc « {nom} »...", file=sys.stderr)
+        resultats.extend(dict(r, banc=nom) for r in BANCS[nom](arguments.rapide))
+    rapport = {
+        "commit": version_du_code(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "graine": GRAINE,
+        "resultats": resultats,
+    }
+    with open(arguments.sortie, 'w', encoding='utf-8') as fichier:
+        json.dump(rapport, fichier, indent=2)
+    print(f"Résultats écrits dans {arguments.sortie}.", file=sys.stderr)
+    if arguments.comparer:
+        with open(arguments.comparer, encoding='utf-8') as fichier:
+            comparer(rapport, json.load(fichier))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,67 +1,133 @@
-import httpx
 import asyncio
-import pygame
-import json
-import os
+import contextlib
+import random
+import time
 import logging
-from fourmi.grille import Grille
+from fourmi.grille import TOPOLOGIES, creer_grille
 from fourmi.fourmi import Fourmi
-from fourmi.affichage import afficher_grille
-from fourmi.config import lire_configuration
+from fourmi.moteur import Moteur
+from fourmi.ordonnanceur import Ordonnanceur, SimulationEnFond, avancer
+from fourmi.camera import Camera
+from fourmi.config import lire_cle_secrete, lire_configuration
+from fourmi.encodage import JSON, compresser, encoder_corps
+from fourmi.instantane import ecrire_instantane, lire_sauvegarde, vers_dict
+from fourmi.journal import Journal
+from fourmi.mesures import Chronometres, profiler
+from fourmi.regles import LANGTON, Regle
+from fourmi.statistiques import Statistiques, ouvrir_serie
+from fourmi.synchro import Synchronisation
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+FICHIER_SAUVEGARDE = "sauvegarde.fourmi"  # Instantané binaire (voir fourmi.instantane)
+ANCIENNE_SAUVEGARDE = "sauvegarde.json"  # Ancien format, toujours lisible
+TAILLE_MIN_COMPRESSION = 1024  # Octets à partir desquels un envoi est compressé
+
 # Sauvegarder l'état de la simulation
-def sauvegarder_etat(state):
-    """Sauvegarde l'état de la simulation dans un fichier JSON.
+def sauvegarder_etat(grille, fourmis, etape=0, compression='zlib'):
+    """Sauvegarde l'état de la simulation dans un instantané binaire compressé.
+
+    L'écriture est atomique : une sauvegarde interrompue laisse la précédente intacte.
 
     Args:
-        state (dict): L'état de la simulation à sauvegarder.
+        grille (Grille): La grille de la simulation.
+        fourmis (list): La liste des fourmis.
+        etape (int): Le numéro de l'étape courante.
+        compression (str): 'aucune', 'zlib' ou 'lz4'.
     """
-    with open("sauvegarde.json", 'w', encoding='utf-8') as fichier:
-        json.dump(state, fichier)
-    logging.info("État de la simulation sauvegardé.")
+    taille = ecrire_instantane(FICHIER_SAUVEGARDE, grille, fourmis, etape, compression)
+    logging.info(f"État de la simulation sauvegardé ({taille} octets).")
 
 # Reprendre l'état de la simulation
-def reprendre_etat():
-    """Reprend l'état de la simulation à partir d'un fichier JSON.
+def reprendre_etat(stockage='octets'):
+    """Reprend l'état de la simulation à partir de la sauvegarde.
+
+    L'instantané binaire est lu en priorité, puis l'ancien fichier sauvegarde.json.
+
+    Args:
+        stockage (str): Le stockage de la grille recréée ('octets' ou 'bits').
 
     Returns:
-        dict: L'état de la simulation si le fichier existe, None sinon.
+        tuple: La grille, la liste des fourmis et le numéro d'étape si une sauvegarde existe, None sinon.
     """
-    try:
-        with open("sauvegarde.json", 'r', encoding='utf-8') as fichier:
-            logging.info("État de la simulation repris depuis la sauvegarde.")
-            return json.load(fichier)
-    except FileNotFoundError:
-        logging.warning("Aucune sauvegarde trouvée. Démarrage d'une nouvelle simulation.")
-        return None
-
-def nouvelle_partie(largeur, hauteur, nombre_de_fourmis):
+    for chemin in (FICHIER_SAUVEGARDE, ANCIENNE_SAUVEGARDE):
+        try:
+            sauvegarde = lire_sauvegarde(chemin, stockage)
+        except FileNotFoundError:
+            continue
+        except (ValueError, KeyError) as erreur:
+            logging.warning(f"Sauvegarde {chemin} illisible : {erreur}")
+            continue
+        logging.info(f"État de la simulation repris depuis {chemin}.")
+        return sauvegarde
+    logging.warning("Aucune sauvegarde trouvée. Démarrage d'une nouvelle simulation.")
+    return None
+
+def nouvelle_partie(largeur, hauteur, nombre_de_fourmis, stockage='octets', journal=None, topologie='borne'):
     """Initialise une nouvelle partie avec une grille vide et les fourmis au centre.
 
     Args:
         largeur (int): La largeur de la grille.
         hauteur (int): La hauteur de la grille.
         nombre_de_fourmis (int): Le nombre de fourmis à initialiser.
+        stockage (str): Le stockage de la grille ('octets' ou 'bits').
+        journal (Journal, optional): Le journal des modifications, vidé pour la nouvelle partie.
+        topologie (str): La topologie de la grille ('borne', 'tore' ou 'extensible').
 
     Returns:
         tuple: Une grille, une liste de fourmis, et l'état initial de la simulation.
     """
-    grille = Grille(largeur, hauteur)
+    grille = creer_grille(largeur, hauteur, stockage, topologie=topologie)
     fourmis = [Fourmi(largeur // 2, hauteur // 2, ant_id=i) for i in range(nombre_de_fourmis)]
-    etat = {
-        "grille": grille.grille,
-        "fourmis": [{"x": f.x, "y": f.y, "direction": Fourmi.DIRECTIONS[f.direction], "id": f.ant_id} for f in fourmis]
-    }
+    if journal is not None:
+        journal.vider()
+        journal.point_de_reprise(grille, fourmis, 0)
     logging.info("Nouvelle partie initialisée.")
-    return grille, fourmis, etat
+    return grille, fourmis, vers_dict(grille, fourmis)
+
+def charger_partie(largeur, hauteur, nombre_de_fourmis, stockage='octets', journal=None, regle=LANGTON,
+                   topologie='borne'):
+    """Reprend la partie sauvegardée, ou en commence une nouvelle si elle est absente ou incompatible.
+
+    Le journal des modifications, s'il n'est pas vide, est prioritaire : il contient
+    toutes les étapes écrites avant un éventuel arrêt brutal.
 
-# Charger la clé secrète depuis les variables d'environnement
-SECRET_KEY = os.getenv('SECRET_KEY')
-if not SECRET_KEY:
-    raise ValueError("La clé secrète n'est pas définie ! Assurez-vous qu'elle est dans les variables d'environnement.")
+    Args:
+        largeur (int): La largeur de la grille.
+        hauteur (int): La hauteur de la grille.
+        nombre_de_fourmis (int): Le nombre de fourmis d'une nouvelle partie.
+        stockage (str): Le stockage de la grille ('octets' ou 'bits').
+        journal (Journal, optional): Le journal des modifications.
+        regle (Regle): La règle des fourmis, dont la sauvegarde doit utiliser les couleurs.
+        topologie (str): La topologie de la grille. Une grille extensible sauvegardée
+            peut être plus grande que ``largeur`` × ``hauteur``.
+
+    Returns:
+        tuple: Une grille, une liste de fourmis, et l'état de la simulation (avec l'étape reprise).
+    """
+    sauvegarde = journal.dernier_etat(stockage) if journal is not None else None
+    if sauvegarde:
+        logging.info(f"État de la simulation repris depuis le journal {journal.chemin}.")
+    else:
+        sauvegarde = reprendre_etat(stockage)
+    if sauvegarde:
+        grille, fourmis, etape = sauvegarde
+        if not regle.compatible(grille, fourmis):
+            logging.warning(f"La partie sauvegardée n'a pas été jouée avec la règle {regle.nom}. Réinitialisation de la grille.")
+        elif (grille.largeur, grille.hauteur) == (largeur, hauteur) or (
+                topologie == 'extensible' and grille.largeur >= largeur and grille.hauteur >= hauteur):
+            logging.info("Reprise de la partie sauvegardée.")
+            grille.topologie = topologie
+            if journal is not None and journal.etape != etape:
+                journal.vider()  # Partie reprise d'un instantané : nouvel historique
+                journal.point_de_reprise(grille, fourmis, etape)
+            etat = vers_dict(grille, fourmis)
+            etat["etape"] = etape
+            return grille, fourmis, etat
+        else:
+            logging.warning("Les dimensions de la grille sauvegardée ne correspondent pas aux dimensions spécifiées. Réinitialisation de la grille.")
+    return nouvelle_partie(largeur, hauteur, nombre_de_fourmis, stockage, journal, topologie)
 
 def afficher_menu(fenetre, police):
     """Affiche le menu de démarrage avec les options de l'utilisateur.
@@ -70,6 +136,8 @@ def afficher_menu(fenetre, police):
         fenetre (pygame.Surface): La surface de la fenêtre Pygame.
         police (pygame.font.Font): La police utilisée pour afficher le texte.
     """
+    import pygame  # pylint: disable=import-outside-toplevel
+
     fenetre.fill((255, 255, 255))  # Fond blanc
     titre = police.render("Simulation de la Fourmi de Langton", True, (0, 0, 0))
     option1 = police.render("1. Continuer la dernière partie", True, (0, 0, 0))
@@ -92,6 +160,8 @@ def menu_demarrage(fenetre):
     Returns:
         str: Le choix de l'utilisateur ("continuer" ou "nouvelle").
     """
+    import pygame  # pylint: disable=import-outside-toplevel
+
     police = pygame.font.SysFont('Arial', 24)
     afficher_menu(fenetre, police)
 
@@ -114,39 +184,306 @@ def menu_demarrage(fenetre):
     logging.info(f"Choix de l'utilisateur: {choix}")
     return choix
 
-async def envoyer_etat(client, etat):
-    """Envoie l'état de la simulation au serveur de manière asynchrone.
+class Televerseur:
+    """Envoie les requêtes au serveur depuis une file bornée, avec reprises et métriques.
+
+    Les requêtes passent par un ``httpx.AsyncClient`` partagé (pool de connexions
+    borné, HTTP/2 en option). Une requête qui échoue sur une erreur réseau ou une
+    réponse 429/502/503/504 est relancée après une attente exponentielle avec
+    gigue, jusqu'à ``tentatives_max`` fois. Quand la file est pleine, la requête
+    est refusée au lieu de s'accumuler.
+
+    Attributs:
+        url (str): L'adresse du serveur.
+        en_cours (int): Le nombre de requêtes envoyées qui attendent leur réponse.
+        envoyes (int): Le nombre de requêtes qui ont reçu une réponse.
+        reprises (int): Le nombre de nouvelles tentatives.
+        abandons (int): Le nombre de requêtes abandonnées après ``tentatives_max`` échecs.
+        refus (int): Le nombre de requêtes refusées, file pleine.
+        latence (float): La latence moyenne des requêtes (moyenne glissante), en secondes.
+        latence_max (float): La plus grande latence observée, en secondes.
+    """
+
+    STATUTS_A_REPRENDRE = {429, 502, 503, 504}
+
+    def __init__(self, url="https://localhost:8000", verifier_tls=True, http2=False, connexions_max=4,
+                 delai=10.0, file_max=8, tentatives_max=5, attente_base=0.2, attente_max=10.0, transport=None):
+        """Initialise le téléverseur ; le client HTTP est créé à l'entrée du bloc ``async with``.
+
+        Args:
+            url (str): L'adresse du serveur.
+            verifier_tls (bool | str): Vérifier le certificat du serveur, ou le chemin d'un certificat d'autorité.
+            http2 (bool): Utiliser HTTP/2 (paquet h2 requis ; sinon HTTP/1.1).
+            connexions_max (int): Le nombre maximal de connexions, et de requêtes simultanées.
+            delai (float): Le délai maximal d'une requête, en secondes.
+            file_max (int): Le nombre maximal de requêtes en attente d'envoi.
+            tentatives_max (int): Le nombre maximal de tentatives par requête.
+            attente_base (float): L'attente avant la première reprise, en secondes.
+            attente_max (float): L'attente maximale entre deux tentatives, en secondes.
+            transport (httpx.AsyncBaseTransport, optional): Le transport httpx (tests, proxy...).
+        """
+        self.url = url
+        self.verifier_tls = verifier_tls
+        self.http2 = http2
+        self.connexions_max = connexions_max
+        self.delai = delai
+        self.tentatives_max = tentatives_max
+        self.attente_base = attente_base
+        self.attente_max = attente_max
+        self.transport = transport
+        self.en_cours = 0
+        self.envoyes = 0
+        self.reprises = 0
+        self.abandons = 0
+        self.refus = 0
+        self.latence = 0.0
+        self.latence_max = 0.0
+        self._file = asyncio.Queue(maxsize=file_max)
+        self._client = None
+        self._travailleurs = []
+
+    async def __aenter__(self):
+        import httpx  # pylint: disable=import-outside-toplevel
+
+        options = {
+            "base_url": self.url,
+            "verify": self.verifier_tls,
+            "limits": httpx.Limits(max_connections=self.connexions_max, max_keepalive_connections=self.connexions_max),
+            "timeout": self.delai,
+            "transport": self.transport,
+        }
+        try:
+            self._client = httpx.AsyncClient(http2=self.http2, **options)
+        except ImportError:
+            logging.warning("HTTP/2 demande le paquet h2 : utilisation de HTTP/1.1.")
+            self._client = httpx.AsyncClient(**options)
+        self._travailleurs = [asyncio.create_task(self._travailler()) for _ in range(self.connexions_max)]
+        return self
+
+    async def __aexit__(self, *exc):
+        for travailleur in self._travailleurs:
+            travailleur.cancel()
+        await asyncio.gather(*self._travailleurs, return_exceptions=True)
+        await self._client.aclose()
+        logging.info(f"Envois au serveur : {self.metriques()}")
+
+    def attente(self, tentative):
+        """Retourne l'attente avant une nouvelle tentative (exponentielle, gigue complète).
+
+        Args:
+            tentative (int): Le numéro de la tentative qui a échoué (0 pour la première).
+
+        Returns:
+            float: L'attente, en secondes.
+        """
+        return random.uniform(0, min(self.attente_max, self.attente_base * 2 ** tentative))
+
+    def metriques(self):
+        """Retourne les métriques des envois.
+
+        Returns:
+            dict: Les requêtes en cours, en file, envoyées, reprises, abandonnées et
+            refusées, et les latences moyenne et maximale en millisecondes.
+        """
+        return {
+            "en_cours": self.en_cours,
+            "en_file": self._file.qsize(),
+            "envoyes": self.envoyes,
+            "reprises": self.reprises,
+            "abandons": self.abandons,
+            "refus": self.refus,
+            "latence_ms": round(self.latence * 1000, 1),
+            "latence_max_ms": round(self.latence_max * 1000, 1),
+        }
+
+    def soumettre(self, chemin, rappel, **requete):
+        """Ajoute une requête POST à la file d'envoi.
+
+        Args:
+            chemin (str): Le chemin de la route, relatif à ``url``.
+            rappel (callable): Appelé avec la réponse, ou None si la requête est abandonnée.
+            **requete: Les arguments de ``httpx.AsyncClient.post`` (``content``, ``headers``, ``params``...).
+
+        Returns:
+            bool: Faux si la file est pleine (la requête n'est pas envoyée).
+        """
+        try:
+            self._file.put_nowait((chemin, rappel, requete))
+        except asyncio.QueueFull:
+            self.refus += 1
+            return False
+        return True
+
+    async def _travailler(self):
+        """Envoie les requêtes de la file, une à la fois."""
+        while True:
+            chemin, rappel, requete = await self._file.get()
+            try:
+                response = await self._poster(chemin, requete)
+            except Exception:
+                logging.exception("Erreur inattendue lors d'un envoi au serveur.")
+                response = None
+            try:
+                rappel(response)  # Toujours appelé : l'appelant ne reste pas en attente
+            except Exception:
+                logging.exception("Erreur lors du traitement d'une réponse du serveur.")
+            finally:
+                self._file.task_done()
+
+    async def _poster(self, chemin, requete):
+        """Envoie une requête, avec reprises ; retourne la réponse, ou None après ``tentatives_max`` échecs."""
+        import httpx  # pylint: disable=import-outside-toplevel
+
+        for tentative in range(self.tentatives_max):
+            if tentative:
+                self.reprises += 1
+            debut = time.monotonic()
+            self.en_cours += 1
+            try:
+                response = await self._client.post(chemin, **requete)
+            except httpx.TransportError as e:
+                logging.warning(f"Erreur de connexion au serveur: {e!r}")
+                response = None
+            finally:
+                self.en_cours -= 1
+            duree = time.monotonic() - debut
+            self.latence = duree if not self.envoyes else 0.9 * self.latence + 0.1 * duree
+            self.latence_max = max(self.latence_max, duree)
+            if response is not None:
+                self.envoyes += 1
+                if response.status_code not in self.STATUTS_A_REPRENDRE:
+                    return response
+            if tentative + 1 < self.tentatives_max:
+                await asyncio.sleep(self.attente(tentative))
+        self.abandons += 1
+        return None
+
+def envoyer_etat(televerseur, synchro, corps, cle_secrete, session="client"):
+    """Envoie l'état de la simulation (complet ou différences) au serveur de manière asynchrone.
 
     Args:
-        client (httpx.AsyncClient): Le client HTTP asynchrone.
-        etat (dict): L'état de la simulation à envoyer.
+        televerseur (Televerseur): Le téléverseur, qui envoie la requête.
+        synchro (Synchronisation): La synchronisation, mise à jour selon la réponse.
+        corps (dict): L'envoi préparé par ``synchro.preparer``.
+        cle_secrete (str): La clé secrète partagée avec le serveur.
+        session (str): Le nom de la session pilotée sur le serveur.
     """
-    try:
-        response = await client.post(
-            "https://localhost:8000/update",
-            json=etat,
-            headers={"Authorization": f"Bearer {SECRET_KEY}"},
-            verify=False  # Ignorer la vérification SSL pour le développement
-        )
-        if response.status_code != 200:
+    format_ = synchro.formats[0]
+    contenu = encoder_corps(format_, corps)
+    entetes = {"Authorization": f"Bearer {cle_secrete}", "Content-Type": format_, "Accept": JSON}
+    if len(contenu) >= TAILLE_MIN_COMPRESSION:
+        contenu = compresser(contenu, "gzip")
+        entetes["Content-Encoding"] = "gzip"
+
+    def recevoir(response):
+        if response is None:
+            logging.error("Serveur injoignable : envoi abandonné.")
+        elif response.status_code == 200:
+            synchro.acquitter()
+        elif response.status_code == 409:
+            logging.warning("Version divergente sur le serveur : renvoi de l'état complet.")
+            synchro.echouer(resynchroniser=True)
+        elif response.status_code == 415 and len(synchro.formats) > 1:
+            logging.warning(f"Format {format_} refusé par le serveur : passage à {synchro.formats[1]}.")
+            synchro.formats.pop(0)
+        else:
             logging.error(f"Erreur lors de l'envoi de l'état: {response.status_code}")
-    except httpx.RequestError as e:
-        logging.error(f"Erreur de connexion au serveur: {e}")
+        if synchro.en_vol:
+            synchro.echouer()  # Les différences seront renvoyées au prochain envoi
+
+    if not televerseur.soumettre("/sync", recevoir, params={"session": session}, content=contenu, headers=entetes):
+        synchro.echouer()
+
+def lancer_simulation_en_fond(precedente, grille, fourmis, vitesse_simulation, moteur, journal=None):
+    """Arrête la simulation en fond précédente et en démarre une nouvelle.
+
+    Args:
+        precedente (SimulationEnFond): La simulation à arrêter, ou None.
+        grille (Grille): La grille de la nouvelle simulation.
+        fourmis (list): Les fourmis de la nouvelle simulation.
+        vitesse_simulation (float): La vitesse en étapes par seconde.
+        moteur (Moteur): Le moteur de simulation.
+        journal (Journal, optional): Le journal des modifications.
+
+    Returns:
+        SimulationEnFond: La simulation démarrée.
+    """
+    if precedente is not None:
+        precedente.arreter()
+    fond = SimulationEnFond(grille, fourmis, vitesse_simulation, moteur, journal=journal)
+    fond.demarrer()
+    return fond
 
 async def principal():
-    """Point d'entrée principal pour la simulation avec Pygame."""
+    """Point d'entrée principal pour la simulation avec Pygame.
+
+    pygame et le rendu ne sont importés qu'ici, et la clé secrète n'est lue qu'au
+    lancement : importer ce module (pour le téléverseur ou la persistance) reste
+    rapide et ne demande aucun secret.
+
+    Raises:
+        ValueError: Si la clé secrète n'est pas définie.
+    """
+    import pygame  # pylint: disable=import-outside-toplevel
+    from fourmi.affichage import RenduCamera, RenduIncremental, creer_palette  # pylint: disable=import-outside-toplevel
+
+    cle_secrete = lire_cle_secrete()
     config = lire_configuration()
     largeur, hauteur = config['largeur'], config['hauteur']
     taille_cellule = config['taille_cellule']
     etapes = config['etapes']
     nombre_de_fourmis = config.get('nombre_de_fourmis', 1)  # Par défaut, 1 fourmi
+    stockage = config.get('stockage', 'octets')  # 'octets' ou 'bits' (1 bit par case)
+    vitesse_simulation = config.get('vitesse_simulation', 10)  # Étapes par seconde
+    images_par_seconde = config.get('images_par_seconde', 60)  # Fréquence d'affichage maximale
+    en_fond = config.get('simulation_en_fond', False)  # Simuler dans un fil d'exécution séparé
+    intervalle_sauvegarde = config.get('intervalle_sauvegarde', 5)  # Secondes entre deux sauvegardes
+    compression = config.get('compression_sauvegarde', 'zlib')  # 'aucune', 'zlib' ou 'lz4'
+    chemin_journal = config.get('journal')  # Journal des modifications (None pour le désactiver)
+    pas_historique = config.get('pas_historique', 100)  # Étapes parcourues par r / Maj+r
+    session_serveur = config.get('session_serveur', 'client')  # Session pilotée sur le serveur
+    synchro = Synchronisation(config.get('intervalle_synchro', 0.2))  # Secondes entre deux envois
+    chronometres = config.get('chronometres', False)  # Mesurer la durée de chaque phase de la boucle
+    hud = config.get('hud', False)  # Afficher ces durées à l'écran (touche h)
+    chemin_statistiques = config.get('statistiques')  # Série des statistiques suivies (None pour la désactiver)
+    intervalle_statistiques = config.get('intervalle_statistiques', 1000)  # Étapes entre deux lignes de la série
+    chronos = Chronometres(actif=chronometres or hud)
+    regle = Regle.depuis_config(config.get('regle'))  # 'RL' (Langton), 'LLRR'... ou table de turmite
+    if stockage == 'bits' and regle.n_couleurs > 2:
+        logging.warning(f"La règle {regle.nom} a {regle.n_couleurs} couleurs : stockage 'octets' utilisé.")
+        stockage = 'octets'
+    topologie = config.get('topologie', 'borne')  # 'borne', 'tore' ou 'extensible'
+    if topologie not in TOPOLOGIES:
+        logging.warning(f"Topologie inconnue : {topologie!r}. Grille bornée utilisée.")
+        topologie = 'borne'
+
+    journal = None
+    if chemin_journal:
+        try:
+            journal = Journal(chemin_journal, config.get('intervalle_points', 10000), compression, regle)
+        except ValueError as erreur:
+            logging.warning(f"Journal désactivé : {erreur}")
+    serie = None
+    if chemin_statistiques and en_fond:
+        logging.warning("Statistiques désactivées : elles ne suivent pas la simulation en fond.")
+    elif chemin_statistiques:
+        try:
+            serie = ouvrir_serie(chemin_statistiques)
+        except ValueError as erreur:
+            logging.warning(f"Statistiques désactivées : {erreur}")
 
     # Initialiser Pygame
     pygame.init()
-    fenetre = pygame.display.set_mode((largeur * taille_cellule, hauteur * taille_cellule))
+    # La fenêtre est bornée : une grille plus grande se parcourt avec la caméra
+    largeur_fenetre = config.get('largeur_fenetre', 1200)
+    hauteur_fenetre = config.get('hauteur_fenetre', 800)
+    if topologie != 'extensible':  # Une grille extensible finit par remplir la fenêtre
+        largeur_fenetre = min(largeur * taille_cellule, largeur_fenetre)
+        hauteur_fenetre = min(hauteur * taille_cellule, hauteur_fenetre)
+    fenetre = pygame.display.set_mode((largeur_fenetre, hauteur_fenetre))
     pygame.display.set_caption("Fourmi de Langton - Client")
 
-    horloge = pygame.time.Clock()
+    prochaine_image = time.monotonic()
     en_cours = True
     simulation_active = True
 
@@ -155,99 +492,210 @@ async def principal():
 
     if choix == 'continuer':
         # Charger l'état initial ou reprendre la sauvegarde
-        etat = reprendre_etat()
-        if etat:
-            logging.info("Reprise de la partie sauvegardée.")
-            grille = Grille(largeur, hauteur)
-            if len(etat["grille"]) == hauteur and all(len(ligne) == largeur for ligne in etat["grille"]):
-                for y in range(hauteur):
-                    for x in range(largeur):
-                        grille.grille[y][x] = etat["grille"][y][x]
-            else:
-                logging.warning("Les dimensions de la grille sauvegardée ne correspondent pas aux dimensions spécifiées. Réinitialisation de la grille.")
-                grille, fourmis, etat = nouvelle_partie(largeur, hauteur, nombre_de_fourmis)
-            
-            # Réinitialiser la liste de fourmis avant de charger celles de l'état sauvegardé
-            fourmis = []
-            for f in etat["fourmis"]:
-                fourmi = Fourmi(f["x"], f["y"], f["id"])  # Utilisation de "id" pour l'initialisation
-                fourmi.direction = Fourmi.DIRECTIONS.index(f["direction"])  # Convertir la direction texte en index
-                fourmis.append(fourmi)
-        else:
-            logging.info("Aucune partie sauvegardée trouvée. Démarrage d'une nouvelle partie.")
-            grille, fourmis, etat = nouvelle_partie(largeur, hauteur, nombre_de_fourmis)
+        grille, fourmis, etat = charger_partie(largeur, hauteur, nombre_de_fourmis, stockage, journal, regle,
+                                               topologie)
     elif choix == 'nouvelle':
         logging.info("Démarrage d'une nouvelle partie.")
-        grille, fourmis, etat = nouvelle_partie(largeur, hauteur, nombre_de_fourmis)
-
-    vitesse_simulation = 10  # Vitesse de simulation initiale
+        grille, fourmis, etat = nouvelle_partie(largeur, hauteur, nombre_de_fourmis, stockage, journal, topologie)
+
+    moteur = Moteur(regle=regle)
+    ordonnanceur = Ordonnanceur(vitesse_simulation)
+    fond = lancer_simulation_en_fond(None, grille, fourmis, vitesse_simulation, moteur, journal) if en_fond else None
+    etapes_affichees = 0
+    historique = None  # Étape affichée pendant un retour en arrière dans le journal
+    redessiner = False
+    etape = etat.get("etape", 0)  # Étape de la partie, enregistrée dans les sauvegardes
+    statistiques = Statistiques(grille, fourmis, regle, etape, serie, intervalle_statistiques) if serie else None
+    derniere_sauvegarde = time.monotonic()
+    a_sauvegarder = False  # Des étapes ont été simulées depuis la dernière sauvegarde
+    palette = creer_palette(regle.n_couleurs)
+    rendu = RenduIncremental(taille_cellule, palette=palette)
+    camera = Camera(largeur_fenetre, hauteur_fenetre, largeur, hauteur, taille_cellule)
+    camera.suivre = config.get('suivre_fourmis', False)
+    rendu_camera = RenduCamera(palette, regle.n_couleurs)
+    vue_camera = False  # Vrai quand l'image vient de la caméra plutôt que du rendu incrémental
     police = pygame.font.SysFont('Arial', 18)
-
-    async with httpx.AsyncClient() as client:
+    zone_texte = pygame.Rect(10, 10, fenetre.get_width() - 20, 70)  # Zone des textes d'information
+
+    televerseur = Televerseur(
+        config.get('url_serveur', 'https://localhost:8000'),
+        config.get('verifier_tls', True),
+        config.get('http2', False),
+        config.get('connexions_max', 4),
+        config.get('delai_requetes', 10),
+        config.get('file_envois_max', 8),
+        config.get('tentatives_max', 5),
+    )
+    async with televerseur:
         while en_cours:
+            chronos.demarrer()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     en_cours = False
+                elif event.type == pygame.MOUSEWHEEL:
+                    camera.zoomer(1.25 ** event.y, *pygame.mouse.get_pos())  # Zoom autour du pointeur
+                    redessiner = True
+                elif event.type == pygame.MOUSEMOTION and event.buttons[0]:
+                    camera.deplacer(*event.rel)  # Glisser pour déplacer la vue
+                    redessiner = True
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
                         simulation_active = not simulation_active  # Pause/reprise de la simulation
+                        ordonnanceur.reinitialiser()
+                        if simulation_active and historique is not None:
+                            # Reprendre depuis l'étape affichée : nouvelle branche de l'historique
+                            journal.point_de_reprise(grille, fourmis, historique)
+                            etape, etapes_affichees, historique = historique, 0, None
+                            synchro.reinitialiser()  # Les versions suivantes sont celles de la nouvelle branche
+                            if serie is not None:
+                                statistiques = Statistiques(grille, fourmis, regle, etape, serie, intervalle_statistiques)
+                            if fond is not None:
+                                fond = lancer_simulation_en_fond(fond, grille, fourmis, vitesse_simulation, moteur, journal)
+                        elif fond is not None:
+                            fond.active = simulation_active
                         logging.info("Simulation mise en pause" if not simulation_active else "Simulation reprise")
                     elif event.key == pygame.K_PLUS or event.key == pygame.K_KP_PLUS:
-                        vitesse_simulation += 1  # Augmenter la vitesse
+                        vitesse_simulation *= 2  # Doubler la vitesse (étapes par seconde)
                         logging.info(f"Vitesse de simulation augmentée à {vitesse_simulation}")
                     elif event.key == pygame.K_MINUS or event.key == pygame.K_KP_MINUS:
-                        vitesse_simulation = max(1, vitesse_simulation - 1)  # Diminuer la vitesse
+                        vitesse_simulation = max(1, vitesse_simulation // 2)  # Diviser la vitesse par deux
                         logging.info(f"Vitesse de simulation réduite à {vitesse_simulation}")
+                    elif event.key == pygame.K_r and journal is not None:
+                        # Remonter (r) ou redescendre (Maj+r) l'historique du journal, simulation en pause
+                        if fond is not None:
+                            fond.arreter()  # Le journal n'est plus écrit par le fil de simulation
+                        simulation_active = False
+                        depart = etape if historique is None else historique
+                        sens = 1 if event.mod & pygame.KMOD_SHIFT else -1
+                        historique = min(journal.etape, max(journal.etape_min, depart + sens * pas_historique))
+                        grille, fourmis = journal.etat_a(historique, stockage)
+                        grille.topologie = topologie
+                        synchro.reinitialiser()  # Grille remplacée : envoi complet de l'étape affichée
+                        redessiner = True
+                        logging.info(f"Historique : étape {historique} (espace pour reprendre d'ici)")
                     elif event.key == pygame.K_r:
                         # Reprendre la partie sauvegardée
                         logging.info("Reprise de la partie sauvegardée.")
-                        etat = reprendre_etat()
-                        if etat:
-                            # Réinitialiser la grille et les fourmis
-                            grille = Grille(largeur, hauteur)
-                            fourmis = []
-                            if len(etat["grille"]) == hauteur and all(len(ligne) == largeur for ligne in etat["grille"]):
-                                for y in range(hauteur):
-                                    for x in range(largeur):
-                                        grille.grille[y][x] = etat["grille"][y][x]
-                            else:
-                                logging.warning("Les dimensions de la grille sauvegardée ne correspondent pas aux dimensions spécifiées. Réinitialisation de la grille.")
-                                grille, fourmis, etat = nouvelle_partie(largeur, hauteur, nombre_de_fourmis)
-                            
-                            # Charger les fourmis de l'état sauvegardé
-                            for f in etat["fourmis"]:
-                                fourmi = Fourmi(f["x"], f["y"], f["id"])  # Utilisation de "id" pour l'initialisation
-                                fourmi.direction = Fourmi.DIRECTIONS.index(f["direction"])  # Convertir la direction texte en index
-                                fourmis.append(fourmi)
+                        grille, fourmis, etat = charger_partie(largeur, hauteur, nombre_de_fourmis, stockage,
+                                                               regle=regle, topologie=topologie)
+                        etape, etapes_affichees, a_sauvegarder = etat.get("etape", 0), 0, False
+                        synchro.reinitialiser()
+                        if serie is not None:
+                            statistiques = Statistiques(grille, fourmis, regle, etape, serie, intervalle_statistiques)
+                        if fond is not None:
+                            fond = lancer_simulation_en_fond(fond, grille, fourmis, vitesse_simulation, moteur)
+                    elif event.key == pygame.K_f:
+                        camera.suivre = not camera.suivre
+                        logging.info("Suivi des fourmis activé" if camera.suivre else "Suivi des fourmis désactivé")
+                    elif event.key == pygame.K_h:
+                        hud = not hud
+                        chronos.actif = chronometres or hud
+                        redessiner = True
+                    elif event.key in (pygame.K_0, pygame.K_KP0, pygame.K_HOME):
+                        camera.reinitialiser()
+                        redessiner = True
                     elif event.key == pygame.K_n:
                         # Nouvelle partie
                         logging.info("Démarrage d'une nouvelle partie.")
-                        grille, fourmis, etat = nouvelle_partie(largeur, hauteur, nombre_de_fourmis)
-
-            if simulation_active:
-                for fourmi in fourmis:
-                    fourmi.etape(grille)
-
-                etat["fourmis"] = [{"x": f.x, "y": f.y, "direction": Fourmi.DIRECTIONS[f.direction], "id": f.ant_id} for f in fourmis]  # Changement de "id" en "ant_id"
-                etat["grille"] = grille.grille
-
-                afficher_grille(fenetre, grille, taille_cellule, fourmis)
-
-                sauvegarder_etat(etat)
-
-                # Envoi asynchrone de l'état au serveur
-                asyncio.create_task(envoyer_etat(client, etat))
-
-                texte_vitesse = police.render(f'Vitesse: {vitesse_simulation}', True, (0, 0, 0))
+                        if fond is not None:
+                            fond.arreter()  # Avant de vider le journal qu'il écrit
+                        grille, fourmis, etat = nouvelle_partie(largeur, hauteur, nombre_de_fourmis, stockage, journal,
+                                                                topologie)
+                        etape, etapes_affichees, a_sauvegarder, historique = 0, 0, False, None
+                        synchro.reinitialiser()
+                        if serie is not None:
+                            statistiques = Statistiques(grille, fourmis, regle, etape, serie, intervalle_statistiques)
+                        if fond is not None:
+                            fond = lancer_simulation_en_fond(fond, grille, fourmis, vitesse_simulation, moteur, journal)
+                    ordonnanceur.etapes_par_seconde = vitesse_simulation
+                    if fond is not None:
+                        fond.ordonnanceur.etapes_par_seconde = vitesse_simulation
+            chronos.noter('evenements')
+
+            if simulation_active or redessiner:
+                # Avancer la simulation du nombre d'étapes correspondant au temps écoulé
+                if not simulation_active:
+                    nouvelles_etapes, cases_modifiees, redessiner = 0, None, False
+                    grille_affichee, fourmis_affichees = grille, fourmis
+                elif fond is not None:
+                    grille_affichee, fourmis_affichees, etapes, cases_modifiees = fond.instantane()
+                    nouvelles_etapes = etapes - etapes_affichees
+                    etapes_affichees = etapes
+                    synchro.noter(grille_affichee, cases_modifiees)
+                else:
+                    nouvelles_etapes = ordonnanceur.etapes_a_faire()
+                    if journal is not None:
+                        cases_modifiees = journal.avancer(moteur, grille, fourmis, nouvelles_etapes,
+                                                          statistiques=statistiques)
+                    elif statistiques is not None:
+                        cases_modifiees = statistiques.avancer(moteur, grille, fourmis, nouvelles_etapes)
+                    else:
+                        cases_modifiees = avancer(moteur, grille, fourmis, nouvelles_etapes)
+                    grille_affichee, fourmis_affichees = grille, fourmis
+                    synchro.noter(grille, cases_modifiees)
+                chronos.noter('simulation')
+
+                camera.adapter(grille_affichee)  # Grille extensible agrandie
+                camera.suivre_fourmis(fourmis_affichees)
+                if camera.initiale():
+                    if vue_camera:
+                        rendu.invalider()
+                    rects = rendu.afficher(fenetre, grille_affichee, fourmis_affichees, cases_modifiees)
+                else:
+                    if not vue_camera:
+                        rendu_camera.invalider()  # La pyramide n'a pas suivi les images du rendu incrémental
+                    rects = rendu_camera.afficher(fenetre, grille_affichee, fourmis_affichees, camera, cases_modifiees)
+                vue_camera = not camera.initiale()
+                chronos.noter('rendu')
+
+                if nouvelles_etapes:
+                    etape += nouvelles_etapes
+                    a_sauvegarder = True
+                    maintenant = time.monotonic()
+                    if journal is None and maintenant - derniere_sauvegarde >= intervalle_sauvegarde:
+                        sauvegarder_etat(grille_affichee, fourmis_affichees, etape, compression)
+                        derniere_sauvegarde, a_sauvegarder = maintenant, False
+                chronos.noter('sauvegarde')
+
+                # Envoi asynchrone des modifications au serveur, regroupées et une requête à la fois
+                corps = synchro.preparer(grille_affichee, fourmis_affichees, etape if historique is None else historique)
+                if corps is not None:
+                    envoyer_etat(televerseur, synchro, corps, cle_secrete, session_serveur)
+                chronos.noter('envoi')
+
+                if not vue_camera:
+                    rects.append(rendu.restaurer(fenetre, zone_texte))
+                texte_vitesse = police.render(f'Vitesse: {vitesse_simulation} Étape: {etape if historique is None else historique}', True, (0, 0, 0))
                 fenetre.blit(texte_vitesse, (10, 10))
+                if hud:
+                    fenetre.blit(police.render(chronos.texte(), True, (0, 0, 0)), (10, 30))
 
-                if fourmis:
-                    texte_info = police.render(f'Pos: ({fourmis[0].x}, {fourmis[0].y}) Dir: {Fourmi.DIRECTIONS[fourmis[0].direction]}', True, (0, 0, 0))
+                if fourmis_affichees:
+                    texte_info = police.render(f'Pos: ({fourmis_affichees[0].x}, {fourmis_affichees[0].y}) Dir: {Fourmi.DIRECTIONS[fourmis_affichees[0].direction]}', True, (0, 0, 0))
                     fenetre.blit(texte_info, (10, 50))
 
-            horloge.tick(vitesse_simulation)
-
+                pygame.display.update(rects)
+                chronos.noter('affichage')
+
+            # Attente de la prochaine image dans la boucle d'événements : les envois au serveur avancent pendant ce temps
+            prochaine_image = max(prochaine_image + 1 / images_par_seconde, time.monotonic())
+            await asyncio.sleep(prochaine_image - time.monotonic())
+
+    if fond is not None:
+        fond.arreter()
+    if a_sauvegarder:
+        sauvegarder_etat(grille_affichee, fourmis_affichees, etape, compression)  # Dernier état affiché
+    if journal is not None:
+        journal.fermer()
+    if serie is not None:
+        serie.fermer()
+    if chronos.phases:
+        logging.info(f"Durées par phase de la boucle : {chronos.resume()}")
     pygame.quit()
 
 if __name__ == "__main__":
-    asyncio.run(principal())
+    # Profil de toute la session si config.yaml le demande (clés profil et profileur)
+    configuration = lire_configuration()
+    chemin_profil = configuration.get('profil')
+    with profiler(chemin_profil, configuration.get('profileur', 'cprofile')) if chemin_profil else contextlib.nullcontext():
+        asyncio.run(principal())
@@ -1,10 +1,75 @@
 """
 Module pour l'affichage de la grille de la Fourmi de Langton en utilisant Pygame.
+
+Trois chemins de dessin sont disponibles :
+
+- le chemin global, qui convertit toute la grille en surface avec
+  ``pygame.surfarray`` puis l'agrandit à la taille des cellules ;
+- le rendu incrémental (``RenduIncremental``), qui garde une surface
+  persistante et ne redessine que les cases modifiées et les fourmis ;
+- le rendu par caméra (``RenduCamera``), pour les grilles plus grandes que la
+  fenêtre : seule la région visible est dessinée, au zoom de la caméra.
 """
 
+import colorsys
+import math
+
+import numpy as np
 import pygame
 
-def afficher_grille(fenetre, grille, taille_cellule, fourmis, marge=0):
+from fourmi.camera import PyramideDensite
+from fourmi.ordonnanceur import Zone
+
+BLANC = (255, 255, 255)
+NOIR = (0, 0, 0)
+ROUGE = (255, 0, 0)
+
+
+def creer_palette(n_couleurs=2):
+    """Crée la couleur d'affichage de chaque couleur de case, pour une règle à ``n_couleurs`` couleurs.
+
+    La couleur 0 est blanche et la couleur 1 noire ; les suivantes sont des
+    teintes réparties sur le cercle chromatique, loin du rouge des fourmis.
+
+    Args:
+        n_couleurs (int): Le nombre de couleurs de la règle (voir ``fourmi.regles``).
+
+    Returns:
+        numpy.ndarray: Un tableau (256, 3) d'octets RVB, indexé par la couleur de case.
+    """
+    palette = np.zeros((256, 3), dtype=np.uint8)
+    palette[0], palette[1] = BLANC, NOIR
+    for couleur in range(2, 256):
+        teinte = (couleur - 2) / max(1, n_couleurs - 2)
+        palette[couleur] = [round(255 * v) for v in colorsys.hsv_to_rgb(0.1 + 0.8 * (teinte % 1), 0.75, 0.9)]
+    return palette
+
+
+# Couleur d'affichage de chaque couleur de case (0 pour blanc, 1 pour noir)
+PALETTE = creer_palette()
+
+
+def surface_grille(grille, taille_cellule, palette=None):
+    """Convertit toute la grille en surface Pygame, une cellule valant ``taille_cellule`` pixels.
+
+    Args:
+        grille (Grille): La grille de la simulation.
+        taille_cellule (int): La taille de chaque cellule en pixels.
+        palette (numpy.ndarray, optional): La palette de ``creer_palette`` (par défaut, ``PALETTE``).
+
+    Returns:
+        pygame.Surface: La surface de la grille, sans les fourmis.
+    """
+    palette = PALETTE if palette is None else palette
+    pixels = palette[grille.vers_tableau().T]  # surfarray attend des tableaux (x, y)
+    surface = pygame.surfarray.make_surface(pixels)
+    if taille_cellule != 1:
+        surface = pygame.transform.scale(
+            surface, (grille.largeur * taille_cellule, grille.hauteur * taille_cellule))
+    return surface
+
+
+def afficher_grille(fenetre, grille, taille_cellule, fourmis, marge=0, palette=None):
     """Affiche la grille et les fourmis dans la fenêtre Pygame.
 
     Args:
@@ -13,18 +78,207 @@ def afficher_grille(fenetre, grille, taille_cellule, fourmis, marge=0):
         taille_cellule (int): La taille de chaque cellule en pixels.
         fourmis (list): La liste des fourmis à afficher.
         marge (int): La marge autour de la grille.
+        palette (numpy.ndarray, optional): La palette de ``creer_palette`` (par défaut, ``PALETTE``).
     """
-    fenetre.fill((255, 255, 255))  # Fond blanc
-
-    for y in range(grille.hauteur):
-        for x in range(grille.largeur):
-            couleur = (0, 0, 0) if grille.obtenir_couleur_case(x, y) == 1 else (255, 255, 255)
-            rect = pygame.Rect(x * taille_cellule + marge, y * taille_cellule + marge, taille_cellule, taille_cellule)
-            pygame.draw.rect(fenetre, couleur, rect)
+    fenetre.fill(BLANC)  # Fond blanc
+    fenetre.blit(surface_grille(grille, taille_cellule, palette), (marge, marge))
 
     # Dessiner les fourmis
     for fourmi in fourmis:
         ant_rect = pygame.Rect(fourmi.x * taille_cellule + marge, fourmi.y * taille_cellule + marge, taille_cellule, taille_cellule)
-        pygame.draw.rect(fenetre, (255, 0, 0), ant_rect)
+        pygame.draw.rect(fenetre, ROUGE, ant_rect)
 
     pygame.display.flip()
+
+
+class RenduIncremental:
+    """Rendu qui ne redessine que les cases modifiées et les fourmis.
+
+    La grille est gardée dans une surface persistante. À chaque image, seules
+    les cases modifiées y sont repeintes, puis recopiées dans la fenêtre avec
+    les cases où se trouvaient les fourmis à l'image précédente. Les rectangles
+    touchés sont renvoyés pour ``pygame.display.update``.
+
+    Attributs:
+        taille_cellule (int): La taille de chaque cellule en pixels.
+        marge (int): La marge autour de la grille.
+        palette (numpy.ndarray): La couleur d'affichage de chaque couleur de case.
+        surface (pygame.Surface): La surface persistante de la grille, sans les fourmis.
+    """
+
+    def __init__(self, taille_cellule, marge=0, palette=None):
+        """Initialise le rendu.
+
+        Args:
+            taille_cellule (int): La taille de chaque cellule en pixels.
+            marge (int): La marge autour de la grille.
+            palette (numpy.ndarray, optional): La palette de ``creer_palette`` (par défaut, ``PALETTE``).
+        """
+        self.taille_cellule = taille_cellule
+        self.marge = marge
+        self.palette = PALETTE if palette is None else palette
+        self.surface = None
+        self._grille = None
+        self._fourmis_precedentes = []
+
+    def invalider(self):
+        """Force un redessin complet à la prochaine image (nouvelle grille, fenêtre effacée...)."""
+        self._grille = None
+
+    def rect_case(self, x, y):
+        """Retourne le rectangle de la case (x, y) dans la fenêtre.
+
+        Args:
+            x (int): La position en x de la case.
+            y (int): La position en y de la case.
+
+        Returns:
+            pygame.Rect: Le rectangle de la case.
+        """
+        taille = self.taille_cellule
+        return pygame.Rect(x * taille + self.marge, y * taille + self.marge, taille, taille)
+
+    def restaurer(self, fenetre, rect):
+        """Recopie dans la fenêtre la grille située sous un rectangle (texte affiché par-dessus...).
+
+        Args:
+            fenetre (pygame.Surface): La surface de la fenêtre Pygame.
+            rect (pygame.Rect): Le rectangle à restaurer, en coordonnées de la fenêtre.
+
+        Returns:
+            pygame.Rect: Le rectangle restauré.
+        """
+        rect = pygame.Rect(rect)
+        fenetre.fill(BLANC, rect)
+        if self.surface is not None:
+            fenetre.blit(self.surface, rect, rect.move(-self.marge, -self.marge))
+        return rect
+
+    def afficher(self, fenetre, grille, fourmis, cases=None):
+        """Dessine la grille et les fourmis et retourne les rectangles modifiés.
+
+        Args:
+            fenetre (pygame.Surface): La surface de la fenêtre Pygame.
+            grille (Grille): La grille de la simulation.
+            fourmis (list): La liste des fourmis à afficher.
+            cases (iterable, optional): Les cases (x, y) modifiées depuis l'image précédente,
+                ou la ``Zone`` qui les contient. Si None, toute la grille est redessinée.
+
+        Returns:
+            list: Les rectangles de la fenêtre à passer à ``pygame.display.update``.
+        """
+        if cases is None or grille is not self._grille:
+            self.surface = surface_grille(grille, self.taille_cellule, self.palette)
+            self._grille = grille
+            fenetre.fill(BLANC)
+            fenetre.blit(self.surface, (self.marge, self.marge))
+            rects = [fenetre.get_rect()]
+        elif isinstance(cases, Zone):
+            x0, y0, x1, y1 = cases.x0 & ~7, cases.y0, cases.x1, cases.y1  # Sur une limite d'octet (grille compactée)
+            pixels = self.palette[grille.lire_region(x0, y0, x1, y1).T]
+            region = pygame.surfarray.make_surface(pixels)
+            taille = self.taille_cellule
+            if taille != 1:
+                region = pygame.transform.scale(region, ((x1 - x0) * taille, (y1 - y0) * taille))
+            self.surface.blit(region, (x0 * taille, y0 * taille))
+            zone = self.rect_case(x0, y0).union(self.rect_case(x1 - 1, y1 - 1))
+            rects = [self.restaurer(fenetre, zone)]
+            rects += [self.restaurer(fenetre, self.rect_case(x, y)) for x, y in self._fourmis_precedentes]
+        else:
+            cases = set(cases)
+            for x, y in cases:
+                rect = self.rect_case(x, y).move(-self.marge, -self.marge)
+                self.surface.fill(self.palette[grille.obtenir_couleur_case(x, y)], rect)
+            rects = [self.restaurer(fenetre, self.rect_case(x, y))
+                     for x, y in cases.union(self._fourmis_precedentes)]
+
+        # Dessiner les fourmis
+        for fourmi in fourmis:
+            ant_rect = self.rect_case(fourmi.x, fourmi.y)
+            fenetre.fill(ROUGE, ant_rect)
+            rects.append(ant_rect)
+        self._fourmis_precedentes = [(f.x, f.y) for f in fourmis]
+        return rects
+
+
+class RenduCamera:
+    """Rendu de la région de la grille visible par une caméra (zoom, déplacement).
+
+    Seuls les blocs visibles sont lus, dans la pyramide de densités au niveau
+    adapté au zoom : un bloc de plusieurs cases prend une couleur intermédiaire
+    entre le blanc et le noir selon sa proportion de cases colorées. Quand une
+    case fait au moins un pixel, une grille à plus de deux couleurs est lue
+    directement, avec sa palette. La fenêtre est redessinée entièrement à chaque
+    image, pour un coût qui dépend de sa taille.
+
+    Attributs:
+        pyramide (PyramideDensite): La pyramide de la grille affichée.
+        palette (numpy.ndarray): La couleur d'affichage de chaque couleur de case.
+        n_couleurs (int): Le nombre de couleurs de la règle affichée.
+    """
+
+    def __init__(self, palette=None, n_couleurs=2):
+        """Initialise le rendu ; la pyramide est construite à la première image.
+
+        Args:
+            palette (numpy.ndarray, optional): La palette de ``creer_palette`` (par défaut, ``PALETTE``).
+            n_couleurs (int): Le nombre de couleurs de la règle affichée.
+        """
+        self.pyramide = None
+        self.palette = PALETTE if palette is None else palette
+        self.n_couleurs = n_couleurs
+        self._grille = None
+
+    def invalider(self):
+        """Force la reconstruction de la pyramide à la prochaine image."""
+        self._grille = None
+
+    def afficher(self, fenetre, grille, fourmis, camera, cases=None):
+        """Dessine la région visible de la grille et les fourmis.
+
+        Args:
+            fenetre (pygame.Surface): La surface de la fenêtre Pygame.
+            grille (Grille): La grille de la simulation.
+            fourmis (list): La liste des fourmis à afficher.
+            camera (Camera): La caméra.
+            cases (iterable, optional): Les cases (x, y) modifiées depuis l'image précédente,
+                ou la ``Zone`` qui les contient, seule marquée périmée dans la pyramide. Si None,
+                toute la grille est marquée périmée ; la pyramide n'en compare à la grille que
+                les blocs lus.
+
+        Returns:
+            list: Les rectangles de la fenêtre à passer à ``pygame.display.update``.
+        """
+        if self.pyramide is None or self._grille is None:
+            self.pyramide = PyramideDensite(grille)
+        else:
+            # Autre grille (instantané du fil de simulation, nouvelle partie...) : toute la grille est périmée
+            cases = cases if grille is self._grille else None
+            if isinstance(cases, Zone):
+                self.pyramide.mettre_a_jour(grille, region=cases)
+            else:
+                self.pyramide.mettre_a_jour(grille, cases)
+        self._grille = grille
+
+        fenetre.fill(BLANC)
+        x0, y0, x1, y1 = camera.region()
+        if x1 > x0 and y1 > y0:
+            niveau = min(camera.niveau(), len(self.pyramide.niveaux) - 1)
+            if niveau == 0 and self.n_couleurs > 2:
+                pixels = self.palette[grille.vers_tableau()[y0:y1, x0:x1].T]
+            else:
+                densite = self.pyramide.densite(niveau, x0, y0, x1, y1)
+                pixels = PALETTE[0] + densite.T[..., None] * (PALETTE[1].astype(np.float32) - PALETTE[0])
+            surface = pygame.surfarray.make_surface(pixels.astype(np.uint8))
+            # Les blocs lus débordent de la région : les placer d'après leurs propres bords
+            gauche, haut = camera.vers_ecran((x0 >> niveau) << niveau, (y0 >> niveau) << niveau)
+            fin_x, fin_y = (((x1 - 1) >> niveau) + 1) << niveau, (((y1 - 1) >> niveau) + 1) << niveau
+            droite, bas = camera.vers_ecran(fin_x, fin_y)
+            fenetre.blit(pygame.transform.scale(surface, (max(1, droite - gauche), max(1, bas - haut))), (gauche, haut))
+
+        # Dessiner les fourmis visibles, d'au moins un pixel
+        taille = max(1, math.ceil(camera.zoom))
+        for fourmi in fourmis:
+            if x0 <= fourmi.x < x1 and y0 <= fourmi.y < y1:
+                fenetre.fill(ROUGE, pygame.Rect(*camera.vers_ecran(fourmi.x, fourmi.y), taille, taille))
+        return [fenetre.get_rect()]
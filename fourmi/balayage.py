@@ -0,0 +1,192 @@
+"""
+Balayage de paramètres sur un ensemble de processus : ``python -m fourmi.balayage``.
+
+Un fichier YAML décrit le balayage : une configuration de base et, pour
+chaque paramètre balayé, la liste de ses valeurs. Toutes les combinaisons sont
+exécutées sans affichage (``fourmi.run``) sur un ``ProcessPoolExecutor`` et
+chaque résultat est ajouté, dès qu'il est prêt, à un fichier JSON Lines. Un
+balayage interrompu reprend là où il s'était arrêté : les combinaisons déjà
+présentes dans le fichier de sortie ne sont pas relancées. Une combinaison qui
+échoue est enregistrée avec son erreur (clé ``erreur``) et compte comme faite ;
+si c'est l'ensemble de processus qui casse (processus de travail tué, par
+exemple), le balayage s'arrête et les combinaisons en attente seront relancées
+à la reprise.
+
+Exemple de fichier de balayage ::
+
+    base: config.yaml          # Optionnel, relatif au fichier de balayage
+    parametres:
+      largeur: [256, 1024]
+      nombre_de_fourmis: [1, 5]
+      positions: [[[10, 10]], [[128, 128]]]
+      etapes: [100000, 1000000]
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from fourmi.config import CHEMIN_CONFIGURATION, lire_configuration
+from fourmi.run import executer
+
+
+def combinaisons(parametres):
+    """Retourne toutes les combinaisons de valeurs des paramètres balayés.
+
+    Args:
+        parametres (dict): Pour chaque paramètre, la liste de ses valeurs.
+
+    Returns:
+        list: Les dictionnaires de surcharges, dans un ordre stable.
+    """
+    noms = sorted(parametres)
+    return [dict(zip(noms, valeurs)) for valeurs in itertools.product(*(parametres[nom] for nom in noms))]
+
+
+def cle(surcharges):
+    """Retourne l'identifiant stable d'une combinaison de surcharges.
+
+    Args:
+        surcharges (dict): Les surcharges de la configuration.
+
+    Returns:
+        str: L'identifiant (JSON aux clés triées).
+    """
+    return json.dumps(surcharges, sort_keys=True)
+
+
+def deja_faites(chemin):
+    """Retourne les identifiants des combinaisons déjà présentes dans le fichier de résultats.
+
+    Une dernière ligne tronquée (balayage interrompu en pleine écriture) est ignorée.
+
+    Args:
+        chemin (str): Le fichier de résultats JSON Lines.
+
+    Returns:
+        set: Les identifiants déjà faits.
+    """
+    faites = set()
+    if not os.path.exists(chemin):
+        return faites
+    with open(chemin, 'r', encoding='utf-8') as fichier:
+        for ligne in fichier:
+            try:
+                faites.add(json.loads(ligne)["cle"])
+            except (ValueError, KeyError):
+                logging.warning("Ligne de résultat illisible ignorée.")
+    return faites
+
+
+def executer_point(config, surcharges, jit=None):
+    """Exécute une combinaison du balayage (dans un processus de travail).
+
+    Args:
+        config (dict): La configuration de base.
+        surcharges (dict): Les valeurs des paramètres balayés.
+        jit (bool, optional): Utiliser numba (par défaut, s'il est installé).
+
+    Returns:
+        dict: Le résultat : identifiant, surcharges, statistiques et processus, ou
+        l'erreur (clé ``erreur``) à la place des statistiques si l'exécution a échoué.
+    """
+    resultat = {"cle": cle(surcharges), "parametres": surcharges, "pid": os.getpid()}
+    try:
+        _, _, resultat["statistiques"] = executer(dict(config, **surcharges), jit=jit)
+    except Exception as erreur:  # pylint: disable=broad-exception-caught
+        resultat["erreur"] = f"{type(erreur).__name__}: {erreur}"
+    return resultat
+
+
+def balayer(config, parametres, sortie, travailleurs=None, jit=None):
+    """Exécute toutes les combinaisons non encore faites et ajoute leurs résultats à ``sortie``.
+
+    Args:
+        config (dict): La configuration de base.
+        parametres (dict): Pour chaque paramètre balayé, la liste de ses valeurs.
+        sortie (str): Le fichier de résultats JSON Lines (complété, jamais écrasé).
+        travailleurs (int, optional): Le nombre de processus (par défaut, un par cœur).
+        jit (bool, optional): Utiliser numba (par défaut, s'il est installé).
+
+    Returns:
+        int: Le nombre de combinaisons exécutées, y compris celles qui ont échoué.
+
+    Raises:
+        BrokenProcessPool: Si un processus de travail s'est arrêté brutalement ; les
+            résultats déjà reçus sont enregistrés, les autres combinaisons seront relancées.
+    """
+    faites = deja_faites(sortie)
+    a_faire = [s for s in combinaisons(parametres) if cle(s) not in faites]
+    logging.info("%d combinaisons à exécuter (%d déjà faites).", len(a_faire), len(faites))
+    if not a_faire:
+        return 0
+    with ProcessPoolExecutor(max_workers=travailleurs) as executeur, \
+            open(sortie, 'a+', encoding='utf-8') as fichier:
+        if fichier.tell() > 0:
+            fichier.seek(fichier.tell() - 1)
+            if fichier.read(1) != "\n":
+                fichier.write("\n")  # Terminer une ligne tronquée par une interruption
+        futurs = [executeur.submit(executer_point, config, surcharges, jit) for surcharges in a_faire]
+        for numero, futur in enumerate(as_completed(futurs), start=1):
+            resultat = futur.result()
+            if "erreur" in resultat:
+                logging.warning("[%d/%d] %s : échec (%s).", numero, len(a_faire), resultat["cle"], resultat["erreur"])
+            else:
+                logging.info("[%d/%d] %s : %.0f étapes/s.", numero, len(a_faire), resultat["cle"],
+                             resultat["statistiques"]["etapes_par_seconde"] or 0)
+            fichier.write(json.dumps(resultat) + "\n")
+            fichier.flush()
+    return len(a_faire)
+
+
+def lire_balayage(chemin):
+    """Lit un fichier de balayage et la configuration de base qu'il désigne.
+
+    Args:
+        chemin (str): Le fichier YAML du balayage.
+
+    Returns:
+        tuple: La configuration de base et les paramètres balayés.
+    """
+    import yaml  # pylint: disable=import-outside-toplevel
+
+    with open(chemin, 'r', encoding='utf-8') as fichier:
+        description = yaml.safe_load(fichier)
+    base = description.get('base')
+    if base is None:
+        config = lire_configuration(CHEMIN_CONFIGURATION)
+    else:
+        config = lire_configuration(os.path.join(os.path.dirname(os.path.abspath(chemin)), base))
+    return config, description.get('parametres', {})
+
+
+def main(argv=None):
+    """Point d'entrée du balayage de paramètres.
+
+    Args:
+        argv (list, optional): Les arguments de la ligne de commande.
+
+    Returns:
+        int: Le code de retour du processus.
+    """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    analyseur = argparse.ArgumentParser(prog="python -m fourmi.balayage",
+                                        description="Balayage de paramètres sur un ensemble de processus.")
+    analyseur.add_argument("balayage", help="Fichier YAML du balayage.")
+    analyseur.add_argument("--sortie", default="balayage.jsonl", help="Fichier de résultats JSON Lines (repris s'il existe).")
+    analyseur.add_argument("--travailleurs", type=int, help="Nombre de processus (par défaut, un par cœur).")
+    analyseur.add_argument("--sans-jit", action="store_true", help="Ne pas utiliser numba.")
+    arguments = analyseur.parse_args(argv)
+
+    config, parametres = lire_balayage(arguments.balayage)
+    balayer(config, parametres, arguments.sortie, arguments.travailleurs,
+            jit=False if arguments.sans_jit else None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+"""
+Module de la caméra, qui montre une région de la grille dans la fenêtre.
+
+La caméra garde le zoom (en pixels par case, inférieur à 1 quand plusieurs
+cases tiennent dans un pixel) et la case affichée dans le coin supérieur
+gauche de la fenêtre. Le rendu ne parcourt que la région visible ; quand le
+zoom est inférieur à 1, il lit une pyramide de densités (``PyramideDensite``) où
+chaque niveau compte les cases colorées par blocs de 2^k × 2^k cases. Le coût
+d'une image dépend ainsi de la taille de la fenêtre, pas de celle de la grille.
+"""
+
+import math
+
+import numpy as np
+
+
+class Camera:
+    """Vue de la grille dans la fenêtre : zoom, déplacement et suivi des fourmis.
+
+    Attributs:
+        largeur_fenetre (int): La largeur de la fenêtre en pixels.
+        hauteur_fenetre (int): La hauteur de la fenêtre en pixels.
+        largeur (int): La largeur de la grille.
+        hauteur (int): La hauteur de la grille.
+        zoom (float): Le nombre de pixels par case.
+        x (float): L'abscisse (en cases) du coin supérieur gauche de la fenêtre.
+        y (float): L'ordonnée (en cases) du coin supérieur gauche de la fenêtre.
+        suivre (bool): Vrai pour recentrer la vue sur les fourmis qui s'en éloignent.
+    """
+
+    def __init__(self, largeur_fenetre, hauteur_fenetre, largeur, hauteur, zoom=1.0, zoom_max=64):
+        """Initialise la caméra sur le coin supérieur gauche de la grille.
+
+        Args:
+            largeur_fenetre (int): La largeur de la fenêtre en pixels.
+            hauteur_fenetre (int): La hauteur de la fenêtre en pixels.
+            largeur (int): La largeur de la grille.
+            hauteur (int): La hauteur de la grille.
+            zoom (float): Le nombre initial de pixels par case.
+            zoom_max (float): Le nombre maximal de pixels par case.
+        """
+        self.largeur_fenetre = largeur_fenetre
+        self.hauteur_fenetre = hauteur_fenetre
+        self.largeur = largeur
+        self.hauteur = hauteur
+        self.zoom_max = zoom_max
+        self.zoom_initial = zoom
+        self.suivre = False
+        self._origine = None  # Origine de la grille suivie par ``adapter``
+        self.reinitialiser()
+
+    @property
+    def zoom_min(self):
+        """Le zoom où toute la grille tient dans la fenêtre (au plus 1 pixel par case)."""
+        return min(1.0, self.largeur_fenetre / max(1, self.largeur), self.hauteur_fenetre / max(1, self.hauteur))
+
+    def reinitialiser(self):
+        """Revient à la vue initiale : zoom initial, coin supérieur gauche de la grille."""
+        self.zoom = min(self.zoom_max, max(self.zoom_min, self.zoom_initial))
+        self.x = 0.0
+        self.y = 0.0
+        self._borner()
+
+    def initiale(self):
+        """Retourne vrai si la caméra montre toute la grille, à la vue initiale, sans zoom partiel.
+
+        Returns:
+            bool: Vrai si la grille peut être dessinée case à case, sans caméra.
+        """
+        return (self.zoom == self.zoom_initial and self.x == 0 and self.y == 0
+                and self.largeur * self.zoom <= self.largeur_fenetre
+                and self.hauteur * self.zoom <= self.hauteur_fenetre)
+
+    def vers_ecran(self, x, y):
+        """Convertit une position en cases en position dans la fenêtre.
+
+        Args:
+            x (float): L'abscisse en cases.
+            y (float): L'ordonnée en cases.
+
+        Returns:
+            tuple: La position (px, py) en pixels.
+        """
+        return math.floor((x - self.x) * self.zoom), math.floor((y - self.y) * self.zoom)
+
+    def vers_case(self, px, py):
+        """Convertit une position dans la fenêtre en position en cases.
+
+        Args:
+            px (float): L'abscisse en pixels.
+            py (float): L'ordonnée en pixels.
+
+        Returns:
+            tuple: La position (x, y) en cases (non entière).
+        """
+        return self.x + px / self.zoom, self.y + py / self.zoom
+
+    def region(self):
+        """Retourne la région visible de la grille.
+
+        Returns:
+            tuple: (x0, y0, x1, y1), les cases visibles étant x0 <= x < x1 et y0 <= y < y1.
+        """
+        x1, y1 = self.vers_case(self.largeur_fenetre, self.hauteur_fenetre)
+        return (max(0, math.floor(self.x)), max(0, math.floor(self.y)),
+                min(self.largeur, math.ceil(x1)), min(self.hauteur, math.ceil(y1)))
+
+    def niveau(self):
+        """Retourne le niveau de la pyramide à lire : 2^niveau cases par pixel au plus.
+
+        Returns:
+            int: Le niveau (0 quand une case fait au moins un pixel).
+        """
+        return max(0, math.floor(math.log2(1 / self.zoom) + 1e-9)) if self.zoom < 1 else 0
+
+    def zoomer(self, facteur, px=None, py=None):
+        """Multiplie le zoom, en gardant immobile la case sous le point (px, py).
+
+        Args:
+            facteur (float): Le facteur de zoom (plus grand que 1 pour agrandir).
+            px (float, optional): L'abscisse du point fixe (centre de la fenêtre par défaut).
+            py (float, optional): L'ordonnée du point fixe (centre de la fenêtre par défaut).
+        """
+        px = self.largeur_fenetre / 2 if px is None else px
+        py = self.hauteur_fenetre / 2 if py is None else py
+        x, y = self.vers_case(px, py)
+        self.zoom = min(self.zoom_max, max(self.zoom_min, self.zoom * facteur))
+        self.x, self.y = x - px / self.zoom, y - py / self.zoom
+        self._borner()
+
+    def deplacer(self, dx, dy):
+        """Fait glisser la grille de (dx, dy) pixels, comme lors d'un glisser à la souris.
+
+        Args:
+            dx (float): Le déplacement horizontal en pixels.
+            dy (float): Le déplacement vertical en pixels.
+        """
+        self.x -= dx / self.zoom
+        self.y -= dy / self.zoom
+        self._borner()
+
+    def centrer(self, x, y):
+        """Centre la vue sur une position en cases.
+
+        Args:
+            x (float): L'abscisse en cases.
+            y (float): L'ordonnée en cases.
+        """
+        self.x = x - self.largeur_fenetre / (2 * self.zoom)
+        self.y = y - self.hauteur_fenetre / (2 * self.zoom)
+        self._borner()
+
+    def suivre_fourmis(self, fourmis):
+        """Recentre la vue sur les fourmis si le suivi est actif et qu'elles sortent du centre de la vue.
+
+        Args:
+            fourmis (list): La liste des fourmis.
+
+        Returns:
+            bool: Vrai si la vue a bougé.
+        """
+        if not self.suivre or not fourmis:
+            return False
+        x = sum(f.x for f in fourmis) / len(fourmis) + 0.5
+        y = sum(f.y for f in fourmis) / len(fourmis) + 0.5
+        px, py = self.vers_ecran(x, y)
+        if (self.largeur_fenetre / 4 <= px <= 3 * self.largeur_fenetre / 4
+                and self.hauteur_fenetre / 4 <= py <= 3 * self.hauteur_fenetre / 4):
+            return False  # Encore dans la moitié centrale de la vue
+        avant = (self.x, self.y)
+        self.centrer(x, y)
+        return (self.x, self.y) != avant
+
+    def adapter(self, grille):
+        """Suit les dimensions de la grille, qui changent quand une grille extensible s'agrandit.
+
+        La vue reste sur les mêmes cases : un agrandissement vers la gauche ou vers
+        le haut décale d'autant la position de la caméra.
+
+        Args:
+            grille (Grille): La grille affichée.
+
+        Returns:
+            bool: Vrai si les dimensions ou l'origine de la grille ont changé.
+        """
+        origine = (getattr(grille, 'origine_x', 0), getattr(grille, 'origine_y', 0))
+        if (grille.largeur, grille.hauteur) == (self.largeur, self.hauteur) and origine == self._origine:
+            return False
+        if self._origine is not None:
+            self.x += self._origine[0] - origine[0]
+            self.y += self._origine[1] - origine[1]
+        self.largeur, self.hauteur = grille.largeur, grille.hauteur
+        self._origine = origine
+        self.zoom = min(self.zoom_max, max(self.zoom_min, self.zoom))
+        self._borner()
+        return True
+
+    def _borner(self):
+        """Garde au moins la moitié de la vue sur la grille."""
+        largeur_vue = self.largeur_fenetre / self.zoom
+        hauteur_vue = self.hauteur_fenetre / self.zoom
+        self.x = min(max(self.x, -largeur_vue / 2), max(0.0, self.largeur - largeur_vue / 2))
+        self.y = min(max(self.y, -hauteur_vue / 2), max(0.0, self.hauteur - hauteur_vue / 2))
+
+
+def _type_niveau(k):
+    """Retourne le plus petit type entier qui compte les 4^k cases d'un bloc du niveau k."""
+    return np.uint8 if 4 ** k <= 0xFF else np.uint16 if 4 ** k <= 0xFFFF else np.uint32
+
+
+def _reduire(niveau, type_):
+    """Additionne les blocs 2 × 2 d'un niveau (le bord impair est complété par des zéros)."""
+    hauteur, largeur = niveau.shape
+    complete = np.zeros((hauteur + hauteur % 2, largeur + largeur % 2), dtype=type_)
+    complete[:hauteur, :largeur] = niveau
+    return complete[0::2, 0::2] + complete[1::2, 0::2] + complete[0::2, 1::2] + complete[1::2, 1::2]
+
+
+def _cotes_blocs(debut, fin, k, bord):
+    """Retourne le côté, en cases, des blocs du niveau k de ``debut >> k`` à ``(fin - 1) >> k`` (coupés au bord)."""
+    blocs = np.arange(debut >> k, ((fin - 1) >> k) + 1)
+    return np.minimum((blocs + 1) << k, bord) - (blocs << k)
+
+
+class PyramideDensite:
+    """Pyramide des cases colorées par blocs de 2^k × 2^k cases, mise à jour case par case.
+
+    Le niveau 0 tient un octet par case (0 ou 1) et sert de référence pour
+    repérer les cases modifiées ; chaque niveau suivant compte dans le plus petit
+    type entier qui suffit. Quand les cases modifiées ne sont pas connues, la
+    région concernée est seulement marquée périmée : elle n'est comparée à la
+    grille que pour les blocs lus par ``densite``.
+
+    Attributs:
+        largeur (int): La largeur de la grille.
+        hauteur (int): La hauteur de la grille.
+        niveaux (list): Pour chaque niveau k, le nombre de cases colorées de chaque bloc.
+    """
+
+    def __init__(self, grille):
+        """Construit la pyramide d'une grille.
+
+        Args:
+            grille (Grille): La grille de la simulation.
+        """
+        self.reconstruire(grille)
+
+    def reconstruire(self, grille):
+        """Recalcule toute la pyramide à partir de la grille.
+
+        Args:
+            grille (Grille): La grille de la simulation.
+        """
+        self.largeur, self.hauteur = grille.largeur, grille.hauteur
+        self._grille = grille
+        self._perime = None  # Rectangle (x0, y0, x1, y1) pas encore comparé à la grille
+        self.niveaux = [np.minimum(grille.vers_tableau(), 1, dtype=np.uint8)]
+        while max(self.niveaux[-1].shape) > 1:
+            self.niveaux.append(_reduire(self.niveaux[-1], _type_niveau(len(self.niveaux))))
+
+    def mettre_a_jour(self, grille, cases=None, region=None):
+        """Met à jour la pyramide après des modifications de la grille.
+
+        Args:
+            grille (Grille): La grille de la simulation.
+            cases (iterable, optional): Les cases (x, y) modifiées.
+            region (tuple, optional): Le rectangle (x0, y0, x1, y1) hors duquel aucune case n'a
+                changé, quand les cases ne sont pas connues. Si ``cases`` et ``region`` sont None,
+                toute la grille est marquée périmée.
+        """
+        if (grille.largeur, grille.hauteur) != (self.largeur, self.hauteur):
+            self.reconstruire(grille)
+            return
+        self._grille = grille
+        if cases is None:
+            x0, y0, x1, y1 = region if region is not None else (0, 0, self.largeur, self.hauteur)
+            if self._perime is not None:
+                px0, py0, px1, py1 = self._perime
+                x0, y0, x1, y1 = min(x0, px0), min(y0, py0), max(x1, px1), max(y1, py1)
+            if x1 > x0 and y1 > y0:
+                self._perime = (max(0, x0), max(0, y0), min(self.largeur, x1), min(self.hauteur, y1))
+            return
+        indices = np.unique(np.array([y * self.largeur + x for x, y in cases], dtype=np.int64))
+        if not len(indices):
+            return
+        modifiees = (grille.lire_cases(indices) != 0) != self.niveaux[0].reshape(-1)[indices]
+        ys, xs = np.divmod(indices[modifiees], self.largeur)
+        self._inverser(xs, ys)
+
+    def _inverser(self, xs, ys):
+        """Inverse les cases (xs, ys), toutes distinctes, au niveau 0 et reporte l'écart aux autres niveaux."""
+        if not len(xs):
+            return
+        ecarts = 1 - 2 * self.niveaux[0][ys, xs].astype(np.int64)  # +1 pour une case colorée, -1 sinon
+        for k, niveau in enumerate(self.niveaux):
+            # Les écarts négatifs reviennent modulo 2^n dans les types non signés
+            np.add.at(niveau, (ys >> k, xs >> k), ecarts.astype(niveau.dtype))
+
+    def _actualiser(self, x0, y0, x1, y1):
+        """Compare à la grille la partie périmée du rectangle [x0, x1) × [y0, y1)."""
+        if self._perime is None:
+            return
+        px0, py0, px1, py1 = self._perime
+        cx0, cy0, cx1, cy1 = max(x0, px0) & ~7, max(y0, py0), min(x1, px1), min(y1, py1)
+        if cx1 <= cx0 or cy1 <= cy0:
+            return
+        grille, base = self._grille, self.niveaux[0]
+        if grille.stockage == 'bits':
+            # Comparaison octet par octet des bits, puis décompactage des seuls octets qui diffèrent
+            cx1 = min(self.largeur, (cx1 + 7) & ~7)
+            octets = grille.bits[cy0:cy1, cx0 >> 3:(cx1 + 7) >> 3]
+            ecarts = octets ^ np.packbits(base[cy0:cy1, cx0:cx1], axis=1)
+            positions = np.flatnonzero(ecarts)
+            lignes, colonnes = np.divmod(positions, ecarts.shape[1])
+            bits, decalages = np.nonzero(np.unpackbits(ecarts.reshape(-1)[positions][:, None], axis=1))
+            ys, xs = lignes[bits], (colonnes[bits] << 3) + decalages
+        else:
+            ys, xs = np.divmod(np.flatnonzero((grille.lire_region(cx0, cy0, cx1, cy1) != 0)
+                                              != base[cy0:cy1, cx0:cx1]), cx1 - cx0)
+        self._inverser(xs + cx0, ys + cy0)
+        if (cx0, cy0, cx1, cy1) == (px0 & ~7, py0, px1, py1):
+            self._perime = None
+
+    def densite(self, niveau, x0, y0, x1, y1):
+        """Retourne la proportion de cases colorées des blocs qui couvrent une région.
+
+        Args:
+            niveau (int): Le niveau k (blocs de 2^k × 2^k cases).
+            x0 (int): La première colonne de la région.
+            y0 (int): La première ligne de la région.
+            x1 (int): La colonne qui suit la région.
+            y1 (int): La ligne qui suit la région.
+
+        Returns:
+            numpy.ndarray: Les densités (entre 0 et 1), tableau (lignes, colonnes) de blocs,
+            du bloc ``(x0 >> k, y0 >> k)`` au bloc ``((x1 - 1) >> k, (y1 - 1) >> k)``.
+        """
+        niveau = min(niveau, len(self.niveaux) - 1)
+        bx0, by0 = x0 >> niveau, y0 >> niveau
+        bx1, by1 = ((x1 - 1) >> niveau) + 1, ((y1 - 1) >> niveau) + 1
+        self._actualiser(bx0 << niveau, by0 << niveau, bx1 << niveau, by1 << niveau)
+        aires = np.outer(_cotes_blocs(y0, y1, niveau, self.hauteur), _cotes_blocs(x0, x1, niveau, self.largeur))
+        return self.niveaux[niveau][by0:by1, bx0:bx1] / aires.astype(np.float32)
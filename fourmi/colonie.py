@@ -0,0 +1,180 @@
+"""
+Module de la colonie de fourmis, stockée en tableaux et avancée de façon vectorisée.
+
+Règle pour les fourmis qui partagent une case : à chaque étape, les fourmis
+jouent dans l'ordre croissant de ``ant_id``, comme la boucle
+``for fourmi in fourmis: fourmi.etape(grille)`` du client. La k-ième fourmi
+(k = 0, 1, ...) d'une case lit donc la couleur initiale de la case inversée k
+fois, et la case est inversée autant de fois qu'elle porte de fourmis. Le
+résultat est identique à celui des appels successifs à ``Fourmi.etape``.
+
+Il en va de même pour une règle cyclique à k couleurs (``LLRR``...) : la k-ième
+fourmi lit la couleur initiale avancée de k, et la case avance d'autant de
+couleurs qu'elle porte de fourmis.
+
+Les fourmis sont bloquées aux bords, reviennent par le côté opposé ou sortent
+de la grille selon sa topologie (voir ``fourmi.grille``).
+"""
+
+import numpy as np
+
+from fourmi.fourmi import DX, DY, Fourmi
+
+_DX = np.array(DX, dtype=np.int64)
+_DY = np.array(DY, dtype=np.int64)
+
+
+class Colonie:
+    """Colonie de fourmis stockée en tableaux (une entrée par fourmi, triée par identifiant).
+
+    Attributs:
+        xs (numpy.ndarray): Les positions en x des fourmis.
+        ys (numpy.ndarray): Les positions en y des fourmis.
+        directions (numpy.ndarray): Les directions des fourmis (index dans Fourmi.DIRECTIONS).
+        ids (numpy.ndarray): Les identifiants des fourmis, en ordre croissant.
+    """
+
+    def __init__(self, xs, ys, directions=None, ids=None):
+        """Initialise la colonie.
+
+        Args:
+            xs (list): Les positions initiales en x.
+            ys (list): Les positions initiales en y.
+            directions (list, optional): Les directions initiales. Par défaut, toutes vers le Nord.
+            ids (list, optional): Les identifiants. Par défaut, 0, 1, 2...
+        """
+        n = len(xs)
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        directions = np.zeros(n, dtype=np.int64) if directions is None else np.asarray(directions, dtype=np.int64)
+        ids = np.arange(n, dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        ordre = np.argsort(ids, kind='stable')
+        self.xs = xs[ordre].copy()
+        self.ys = ys[ordre].copy()
+        self.directions = directions[ordre].copy()
+        self.ids = ids[ordre].copy()
+
+    def __len__(self):
+        """Retourne le nombre de fourmis de la colonie."""
+        return len(self.ids)
+
+    @classmethod
+    def depuis_fourmis(cls, fourmis):
+        """Crée une colonie à partir d'une liste de fourmis.
+
+        Args:
+            fourmis (list): La liste des fourmis.
+
+        Returns:
+            Colonie: La colonie correspondante.
+        """
+        return cls([f.x for f in fourmis], [f.y for f in fourmis],
+                   [f.direction for f in fourmis], [f.ant_id for f in fourmis])
+
+    def vers_fourmis(self):
+        """Retourne la colonie sous forme de liste de fourmis, triée par identifiant.
+
+        Returns:
+            list: La liste des fourmis.
+        """
+        fourmis = []
+        for x, y, d, ant_id in zip(self.xs.tolist(), self.ys.tolist(),
+                                   self.directions.tolist(), self.ids.tolist()):
+            fourmi = Fourmi(x, y, ant_id)
+            fourmi.direction = d
+            fourmis.append(fourmi)
+        return fourmis
+
+    def mettre_a_jour(self, fourmis):
+        """Recopie l'état de la colonie dans une liste de fourmis de mêmes identifiants.
+
+        Args:
+            fourmis (list): La liste des fourmis, mises à jour sur place.
+        """
+        par_id = {f.ant_id: f for f in fourmis}
+        for x, y, d, ant_id in zip(self.xs.tolist(), self.ys.tolist(),
+                                   self.directions.tolist(), self.ids.tolist()):
+            fourmi = par_id[ant_id]
+            fourmi.x, fourmi.y, fourmi.direction = x, y, d
+
+    def etape(self, cases, largeur, hauteur, regle=None, topologie='borne'):
+        """Fait avancer toutes les fourmis d'une étape, en une seule passe vectorisée.
+
+        Args:
+            cases (numpy.ndarray): Les cases de la grille, tableau plat modifiable.
+            largeur (int): La largeur de la grille.
+            hauteur (int): La hauteur de la grille.
+            regle (Regle, optional): Une règle cyclique (par défaut, la fourmi de Langton).
+            topologie (str): ``'borne'``, ``'tore'`` ou ``'extensible'`` (voir ``fourmi.grille``).
+
+        Returns:
+            bool: Vrai si une fourmi est sortie d'une grille extensible, qui doit être
+            agrandie avant l'étape suivante.
+        """
+        n = len(self.ids)
+        positions = self.ys * largeur + self.xs
+        ordre = np.argsort(positions, kind='stable')  # Par case, puis par identifiant
+        triees = positions[ordre]
+        debut = np.empty(n, dtype=bool)
+        debut[0] = True
+        np.not_equal(triees[1:], triees[:-1], out=debut[1:])
+        indices = np.arange(n)
+        rang = indices - np.maximum.accumulate(np.where(debut, indices, 0))
+
+        premiers = np.flatnonzero(debut)
+        effectifs = np.diff(np.append(premiers, n))
+        directions = self.directions[ordre]
+        if regle is None:
+            # Couleur lue par chaque fourmi : couleur initiale inversée par les fourmis précédentes
+            lues = cases[triees] ^ (rang & 1).astype(np.uint8)
+            directions = np.where(lues == 0, directions + 1, directions - 1) & 3
+
+            # Chaque case est inversée une fois par fourmi présente
+            a_inverser = triees[premiers[effectifs & 1 == 1]]
+            cases[a_inverser] ^= 1
+        else:
+            # Couleur lue : couleur initiale avancée d'une couleur par fourmi précédente
+            lues = (cases[triees] + rang) % regle.n_couleurs
+            directions = (directions + regle.virages[lues]) & 3
+            cases[triees[premiers]] = (cases[triees[premiers]] + effectifs) % regle.n_couleurs
+        self.directions[ordre] = directions
+
+        self.xs += _DX[self.directions]
+        self.ys += _DY[self.directions]
+        if topologie == 'tore':
+            np.mod(self.xs, largeur, out=self.xs)
+            np.mod(self.ys, hauteur, out=self.ys)
+        elif topologie == 'extensible':
+            return bool(self.xs.min() < 0 or self.ys.min() < 0
+                        or self.xs.max() >= largeur or self.ys.max() >= hauteur)
+        else:
+            np.clip(self.xs, 0, largeur - 1, out=self.xs)
+            np.clip(self.ys, 0, hauteur - 1, out=self.ys)
+        return False
+
+    def simuler(self, grille, n_etapes, regle=None):
+        """Fait avancer toutes les fourmis de ``n_etapes`` étapes.
+
+        Args:
+            grille (Grille): La grille sur laquelle les fourmis se déplacent.
+            n_etapes (int): Le nombre d'étapes à simuler.
+            regle (Regle, optional): Une règle cyclique (par défaut, la fourmi de Langton).
+
+        Returns:
+            int: Le nombre d'étapes simulées.
+        """
+        if n_etapes <= 0 or not len(self.ids):
+            return 0
+        tableau = grille.vers_tableau()
+        cases = tableau.reshape(-1)
+        for _ in range(n_etapes):
+            if self.etape(cases, grille.largeur, grille.hauteur, regle, grille.topologie):
+                grille.depuis_tableau(tableau)
+                fourmis = self.vers_fourmis()
+                dx, dy = grille.etendre(fourmis)
+                self.xs += dx
+                self.ys += dy
+                tableau = grille.vers_tableau()
+                cases = tableau.reshape(-1)
+        grille.depuis_tableau(tableau)
+        return n_etapes
@@ -1,17 +1,39 @@
 """
 Module pour la gestion de la configuration de la Fourmi de Langton à partir d'un fichier YAML.
+
+``yaml`` n'est importé qu'à la lecture d'un fichier, et la clé secrète n'est
+lue qu'à la demande : importer ce module ne coûte presque rien et ne demande
+aucun secret.
 """
 
 import os
-import yaml
 
-def lire_configuration():
+CHEMIN_CONFIGURATION = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config.yaml'))
+
+def lire_configuration(chemin=CHEMIN_CONFIGURATION):
     """Lit la configuration à partir du fichier config.yaml.
 
+    Args:
+        chemin (str, optional): Le chemin du fichier de configuration.
+
     Returns:
         dict: Le dictionnaire contenant les paramètres de configuration.
     """
-    chemin = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config.yaml'))
+    import yaml  # pylint: disable=import-outside-toplevel
+
     with open(chemin, 'r', encoding='utf-8') as fichier:
         return yaml.safe_load(fichier)
 
+def lire_cle_secrete():
+    """Lit la clé secrète partagée par le client et le serveur (variable ``SECRET_KEY``).
+
+    Returns:
+        str: La clé secrète.
+
+    Raises:
+        ValueError: Si la clé n'est pas définie.
+    """
+    cle = os.getenv('SECRET_KEY')
+    if not cle:
+        raise ValueError("La clé secrète n'est pas définie ! Assurez-vous qu'elle est dans les variables d'environnement.")
+    return cle
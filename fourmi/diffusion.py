@@ -0,0 +1,224 @@
+"""
+Module de la diffusion en continu de l'état d'une session à ses abonnés.
+
+Un abonné reçoit d'abord un instantané binaire complet (voir
+``fourmi.instantane``), puis des trames delta qui ne contiennent que les cases
+modifiées et la table des fourmis. Une trame delta est un en-tête
+(little-endian : signature ``FRMD``, compression, étape, nombre de cases,
+nombre de fourmis) suivi des données, éventuellement compressées avec zlib :
+les indices ``y * largeur + x`` des cases (int32), leurs nouvelles valeurs
+(uint8), puis la table des fourmis.
+
+Les modifications sont relevées une seule fois par lot d'étapes, quel que soit
+le nombre d'abonnés, à partir des cases tracées par le moteur (sans comparer
+toute la grille), et gardées dans un historique borné avec leurs valeurs. Chaque abonné envoie
+une trame à la fois, à son rythme : les lots publiés pendant un envoi sont
+regroupés dans la trame suivante, sans file d'attente. Un abonné trop lent
+pour l'historique, ou abonné quand la grille change de dimensions, reçoit un
+nouvel instantané.
+"""
+
+import asyncio
+import struct
+import zlib
+from collections import deque
+
+import numpy as np
+
+from fourmi.instantane import COMPRESSIONS, TYPE_FOURMI, fourmis_depuis_table, table_fourmis
+
+SIGNATURE = b'FRMD'
+EN_TETE = struct.Struct('<4sBQII')
+
+
+def encoder_delta(etape, indices, valeurs, table, compression='zlib'):
+    """Encode une trame delta.
+
+    Args:
+        etape (int): L'étape atteinte.
+        indices (numpy.ndarray): Les indices des cases modifiées.
+        valeurs (numpy.ndarray): La nouvelle valeur de chaque case.
+        table (numpy.ndarray): La table des fourmis (``TYPE_FOURMI``).
+        compression (str): ``'aucune'`` ou ``'zlib'``.
+
+    Returns:
+        bytes: La trame.
+    """
+    donnees = (np.ascontiguousarray(indices, dtype='<i4').tobytes()
+               + np.ascontiguousarray(valeurs, dtype=np.uint8).tobytes() + table.tobytes())
+    code = COMPRESSIONS['aucune' if compression == 'aucune' else 'zlib']  # Deltas : zlib ou rien
+    if code:
+        donnees = zlib.compress(donnees, 1)
+    return EN_TETE.pack(SIGNATURE, code, etape, len(indices), len(table)) + donnees
+
+
+def decoder_delta(tampon):
+    """Décode une trame delta.
+
+    Args:
+        tampon (bytes): La trame.
+
+    Returns:
+        tuple: L'étape, les indices des cases, leurs valeurs et la liste des fourmis.
+
+    Raises:
+        ValueError: Si le tampon n'est pas une trame delta.
+    """
+    if len(tampon) < EN_TETE.size:
+        raise ValueError("Trame tronquée.")
+    signature, code, etape, n_cases, n_fourmis = EN_TETE.unpack_from(tampon)
+    if signature != SIGNATURE:
+        raise ValueError("Ce n'est pas une trame delta.")
+    donnees = bytes(tampon[EN_TETE.size:])
+    if code:
+        try:
+            donnees = zlib.decompress(donnees)
+        except zlib.error as erreur:
+            raise ValueError(f"Trame delta mal compressée : {erreur}") from erreur
+    indices = np.frombuffer(donnees, dtype='<i4', count=n_cases)
+    valeurs = np.frombuffer(donnees, dtype=np.uint8, count=n_cases, offset=4 * n_cases)
+    table = np.frombuffer(donnees, dtype=TYPE_FOURMI, count=n_fourmis, offset=5 * n_cases)
+    return etape, indices, valeurs, fourmis_depuis_table(table)
+
+
+class Diffusion:
+    """Historique borné des modifications publiées, partagé par les abonnés d'une session.
+
+    Chaque publication reçoit un numéro croissant ; un abonné retient le numéro
+    de la dernière trame qu'il a envoyée.
+
+    Attributs:
+        capacite (int): Le nombre de publications gardées dans l'historique.
+        numero (int): Le numéro de la dernière publication.
+        etape (int): L'étape de la dernière publication.
+        abonnes (int): Le nombre d'abonnés.
+    """
+
+    def __init__(self, capacite=256):
+        """Initialise une diffusion sans abonné.
+
+        Args:
+            capacite (int): Le nombre de publications gardées dans l'historique.
+        """
+        self.capacite = capacite
+        self.numero = 0
+        self.etape = None
+        self.abonnes = 0
+        self._historique = deque(maxlen=capacite)  # (numéro, indices des cases modifiées, leurs valeurs)
+        self._dimensions = None  # Dimensions de la grille à la dernière publication (None : pas de suivi)
+        self._table = None
+        self._evenement = None
+
+    def abonner(self):
+        """Compte un nouvel abonné ; le suivi des modifications commence à son premier instantané."""
+        self.abonnes += 1
+
+    def desabonner(self):
+        """Retire un abonné ; sans abonné, le suivi des modifications s'arrête."""
+        self.abonnes -= 1
+        if self.abonnes <= 0:
+            self.abonnes = 0
+            self._historique.clear()
+            self._dimensions = None
+            self._table = None
+            self._evenement = None
+
+    def suivre(self, grille, fourmis, etape):
+        """Commence le suivi des modifications à partir de l'état donné, s'il n'a pas commencé.
+
+        À appeler pendant que l'état ne change pas (sous le verrou de la session).
+
+        Args:
+            grille (Grille): La grille de la simulation.
+            fourmis (list): La liste des fourmis.
+            etape (int): L'étape courante.
+        """
+        if self._dimensions is None:
+            self._dimensions = (grille.largeur, grille.hauteur)
+            self._table = table_fourmis(fourmis)
+            self._historique.clear()
+            self.numero += 1
+            self.etape = etape
+
+    @property
+    def suivie(self):
+        """bool: Vrai si les modifications sont suivies (au moins un abonné a reçu son instantané)."""
+        return self._dimensions is not None
+
+    def difference(self, grille, cellules):
+        """Relève la valeur des cases qui ont pu changer depuis la dernière publication.
+
+        Peut s'exécuter hors de la boucle d'événements (dans l'exécuteur).
+
+        Args:
+            grille (Grille): La grille de la simulation.
+            cellules (numpy.ndarray): Les indices ``y * largeur + x`` des cases qui ont pu
+                changer (par exemple tracées par ``Moteur.tracer``), ou None s'ils ne sont
+                pas connus.
+
+        Returns:
+            tuple: Les indices des cases et leurs valeurs, ou None si personne ne suit
+            les modifications ou si les abonnés ont besoin d'un instantané (cases
+            inconnues, ou grille de nouvelles dimensions).
+        """
+        if self._dimensions is None:
+            return None
+        if cellules is None or (grille.largeur, grille.hauteur) != self._dimensions:
+            self._dimensions = (grille.largeur, grille.hauteur)
+            return None
+        indices = np.unique(np.asarray(cellules, dtype=np.int64))
+        return indices.astype(np.int32), np.asarray(grille.lire_cases(indices), dtype=np.uint8)
+
+    def publier(self, changement, fourmis, etape):
+        """Publie un lot de modifications relevé par ``difference`` et réveille les abonnés.
+
+        Args:
+            changement (tuple): Le résultat de ``difference``.
+            fourmis (list): La liste des fourmis.
+            etape (int): L'étape atteinte.
+        """
+        if self._dimensions is None:
+            return
+        self.numero += 1
+        if changement is None:
+            self._historique.clear()  # Rupture : les abonnés recevront un instantané
+        else:
+            self._historique.append((self.numero, *changement))
+        self._table = table_fourmis(fourmis)
+        self.etape = etape
+        if self._evenement is not None:
+            self._evenement.set()
+            self._evenement = None
+
+    async def attendre(self, numero):
+        """Attend une publication plus récente que ``numero``.
+
+        Args:
+            numero (int): Le numéro de la dernière trame envoyée par l'abonné.
+        """
+        while self.numero == numero:
+            if self._evenement is None:
+                self._evenement = asyncio.Event()
+            await self._evenement.wait()
+
+    def delta(self, numero, compression='zlib'):
+        """Regroupe en une trame toutes les publications qui suivent ``numero``.
+
+        Args:
+            numero (int): Le numéro de la dernière trame envoyée par l'abonné.
+            compression (str): ``'aucune'`` ou ``'zlib'``.
+
+        Returns:
+            bytes: La trame delta, ou None si l'historique ne remonte pas jusque-là
+            (un instantané est alors nécessaire).
+        """
+        if self._dimensions is None or not self._historique or self._historique[0][0] > numero + 1:
+            return None
+        lots = [(indices, valeurs) for n, indices, valeurs in self._historique if n > numero]
+        if lots:
+            # Dernière valeur publiée de chaque case : première occurrence dans l'ordre inverse
+            indices, premieres = np.unique(np.concatenate([i for i, _ in lots])[::-1], return_index=True)
+            valeurs = np.concatenate([v for _, v in lots])[::-1][premieres]
+        else:
+            indices, valeurs = np.empty(0, dtype=np.int32), np.empty(0, dtype=np.uint8)
+        return encoder_delta(self.etape, indices, valeurs, self._table, compression)
@@ -0,0 +1,290 @@
+"""
+Module des formats d'échange de l'état entre le client et le serveur.
+
+Le format est choisi par négociation de contenu (en-têtes ``Accept`` et
+``Content-Type``) :
+
+- ``application/json`` : le format historique, la grille en liste de lignes
+  (environ 3 octets par case) ;
+- ``application/vnd.fourmi+json`` : du JSON dont la grille est compactée à un
+  bit par case, encodée en base64 ;
+- ``application/msgpack`` : la même chose en msgpack, sans base64 (si le paquet
+  msgpack est installé) ;
+- ``application/octet-stream`` : un instantané binaire (voir ``fourmi.instantane``),
+  pour les états complets.
+
+La grille compactée est un dictionnaire ``{"largeur", "hauteur",
+"bits_par_case", "donnees"}``. Les réponses sont compressées avec brotli (si le
+paquet brotli est installé) ou gzip, selon l'en-tête ``Accept-Encoding``.
+"""
+
+import base64
+import gzip
+import json
+import zlib
+
+import numpy as np
+
+from fourmi.grille import creer_grille
+from fourmi.instantane import decoder_instantane, decrire_fourmis, encoder_instantane, fourmis_depuis_dict
+
+try:
+    import msgpack
+except ImportError:  # msgpack est optionnel
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel
+    brotli = None
+
+# Erreurs des décompresseurs sur des données corrompues ou tronquées
+ERREURS_DECOMPRESSION = (zlib.error, EOFError, OSError) + ((brotli.error,) if brotli is not None else ())
+
+JSON = 'application/json'
+JSON_BITS = 'application/vnd.fourmi+json'
+MSGPACK = 'application/msgpack'
+BINAIRE = 'application/octet-stream'
+
+
+class FormatInconnu(ValueError):
+    """Format ou compression que ce côté ne sait pas lire."""
+
+
+def formats_disponibles():
+    """Retourne les formats utilisables ici, du plus compact au plus lisible.
+
+    Returns:
+        list: Les types de contenu.
+    """
+    return [BINAIRE] + ([MSGPACK] if msgpack is not None else []) + [JSON_BITS, JSON]
+
+
+def compressions_disponibles():
+    """Retourne les compressions utilisables ici, de la plus efficace à la moins efficace.
+
+    Returns:
+        list: Les valeurs de ``Content-Encoding``.
+    """
+    return (['br'] if brotli is not None else []) + ['gzip']
+
+
+def _preferences(entete):
+    """Découpe un en-tête ``Accept`` ou ``Accept-Encoding`` en (valeur, q), sans les valeurs refusées."""
+    preferences = []
+    for element in (entete or '').split(','):
+        valeur, *parametres = element.strip().split(';')
+        q = 1.0
+        for parametre in parametres:
+            nom, _, nombre = parametre.strip().partition('=')
+            if nom == 'q':
+                try:
+                    q = float(nombre)
+                except ValueError:
+                    q = 0.0
+        if valeur and q > 0:
+            preferences.append((valeur.strip().lower(), q))
+    return preferences
+
+
+def negocier_format(accept, formats=None):
+    """Choisit le format de réponse d'après l'en-tête ``Accept``.
+
+    À préférence égale, le format le plus compact l'emporte ; ``*/*`` (ou pas
+    d'en-tête) donne le JSON historique.
+
+    Args:
+        accept (str): L'en-tête ``Accept`` de la requête (ou None).
+        formats (list, optional): Les formats proposés (``formats_disponibles()`` par défaut).
+
+    Returns:
+        str: Le type de contenu choisi.
+    """
+    formats = formats or formats_disponibles()
+    choix, meilleure = JSON, 0.0
+    for valeur, q in _preferences(accept):
+        candidat = JSON if valeur in ('*/*', 'application/*') else valeur
+        if candidat not in formats:
+            continue
+        if q > meilleure or (q == meilleure and formats.index(candidat) < formats.index(choix)):
+            choix, meilleure = candidat, q
+    return choix
+
+
+def negocier_compression(accept_encoding):
+    """Choisit la compression de la réponse d'après l'en-tête ``Accept-Encoding``.
+
+    Args:
+        accept_encoding (str): L'en-tête ``Accept-Encoding`` de la requête (ou None).
+
+    Returns:
+        str: ``'br'``, ``'gzip'``, ou None pour ne pas compresser.
+    """
+    acceptees = dict(_preferences(accept_encoding))
+    candidates = [c for c in compressions_disponibles() if c in acceptees or '*' in acceptees]
+    return max(candidates, key=lambda c: acceptees.get(c, acceptees.get('*')), default=None)
+
+
+def compresser(donnees, compression):
+    """Compresse un corps de requête ou de réponse.
+
+    Args:
+        donnees (bytes): Le corps.
+        compression (str): ``'br'``, ``'gzip'`` ou None.
+
+    Returns:
+        bytes: Le corps compressé.
+    """
+    if compression == 'br':
+        return brotli.compress(donnees, quality=4)
+    if compression == 'gzip':
+        return gzip.compress(donnees, compresslevel=5)
+    return donnees
+
+
+def decompresser(donnees, compression):
+    """Décompresse un corps selon son en-tête ``Content-Encoding``.
+
+    Args:
+        donnees (bytes): Le corps reçu.
+        compression (str): La valeur de ``Content-Encoding`` (ou None).
+
+    Returns:
+        bytes: Le corps décompressé.
+
+    Raises:
+        FormatInconnu: Si la compression n'est pas prise en charge.
+        ValueError: Si les données compressées sont mal formées.
+    """
+    compression = (compression or 'identity').strip().lower()
+    if compression == 'identity':
+        return donnees
+    if compression not in compressions_disponibles():
+        raise FormatInconnu(f"Compression non prise en charge : {compression}")
+    try:
+        return brotli.decompress(donnees) if compression == 'br' else gzip.decompress(donnees)
+    except ERREURS_DECOMPRESSION as erreur:
+        raise ValueError(f"Corps compressé mal formé : {erreur}") from erreur
+
+
+def compacter_grille(tableau, texte=True):
+    """Compacte une grille à un bit par case (un octet si elle a plus de deux couleurs).
+
+    Args:
+        tableau (numpy.ndarray): Les cases, tableau (hauteur, largeur).
+        texte (bool): Vrai pour encoder les données en base64 (JSON), faux pour des octets bruts.
+
+    Returns:
+        dict: La grille compactée.
+    """
+    hauteur, largeur = tableau.shape
+    if tableau.size and tableau.max() > 1:
+        bits_par_case, donnees = 8, np.ascontiguousarray(tableau, dtype=np.uint8).tobytes()
+    else:
+        bits_par_case, donnees = 1, np.packbits(tableau, axis=1).tobytes()
+    if texte:
+        donnees = base64.b64encode(donnees).decode('ascii')
+    return {"largeur": largeur, "hauteur": hauteur, "bits_par_case": bits_par_case, "donnees": donnees}
+
+
+def deplier_grille(valeur):
+    """Retrouve le tableau des cases d'une grille en liste de lignes ou compactée.
+
+    Args:
+        valeur: La liste de lignes, ou le dictionnaire de ``compacter_grille``.
+
+    Returns:
+        numpy.ndarray: Les cases, tableau (hauteur, largeur) d'octets.
+
+    Raises:
+        ValueError: Si la grille est mal formée.
+    """
+    if isinstance(valeur, np.ndarray):
+        return valeur
+    if isinstance(valeur, list):
+        if not valeur:
+            return np.zeros((0, 0), dtype=np.uint8)
+        tableau = np.array(valeur)
+        if tableau.ndim != 2:
+            raise ValueError("La grille doit être une liste de lignes de même longueur.")
+        if tableau.dtype.kind not in "iub" or tableau.size and (tableau.min() < 0 or tableau.max() > 255):
+            raise ValueError("Les cases de la grille doivent être des entiers de 0 à 255.")
+        return tableau.astype(np.uint8)
+    try:
+        largeur, hauteur, bits_par_case, donnees = (valeur[cle] for cle in ("largeur", "hauteur", "bits_par_case", "donnees"))
+    except (KeyError, TypeError):
+        raise ValueError("Grille compactée mal formée.") from None
+    if isinstance(donnees, str):
+        donnees = base64.b64decode(donnees, validate=True)
+    if not all(isinstance(n, int) and n >= 0 for n in (largeur, hauteur)) or not isinstance(donnees, bytes):
+        raise ValueError("Grille compactée mal formée.")
+    octets_par_ligne = (largeur + 7) // 8 if bits_par_case == 1 else largeur
+    if bits_par_case not in (1, 8) or len(donnees) != hauteur * octets_par_ligne:
+        raise ValueError("Grille compactée mal formée.")
+    cases = np.frombuffer(donnees, dtype=np.uint8).reshape(hauteur, octets_par_ligne)
+    return np.unpackbits(cases, axis=1, count=largeur) if bits_par_case == 1 else cases.copy()
+
+
+def encoder_corps(format_, corps):
+    """Encode un corps (état, envoi de synchronisation...) dans un format.
+
+    La clé ``grille``, si elle est présente, peut être une liste de lignes, une
+    grille compactée ou un tableau numpy.
+
+    Args:
+        format_ (str): Le type de contenu.
+        corps (dict): Le corps à encoder.
+
+    Returns:
+        bytes: Le corps encodé.
+
+    Raises:
+        FormatInconnu: Si le format n'est pas pris en charge.
+    """
+    corps = dict(corps)
+    if format_ == BINAIRE:
+        tableau = deplier_grille(corps["grille"])
+        grille = creer_grille(tableau.shape[1], tableau.shape[0])
+        grille.depuis_tableau(tableau)
+        return encoder_instantane(grille, fourmis_depuis_dict(corps), corps.get("etape", 0), 'aucune')
+    if "grille" in corps:
+        grille = corps["grille"]
+        if format_ == JSON:
+            corps["grille"] = grille.tolist() if isinstance(grille, np.ndarray) else grille
+        elif format_ in (JSON_BITS, MSGPACK):
+            if not isinstance(grille, dict):
+                corps["grille"] = compacter_grille(deplier_grille(grille), texte=format_ == JSON_BITS)
+    if format_ in (JSON, JSON_BITS):
+        return json.dumps(corps, separators=(',', ':')).encode()
+    if format_ == MSGPACK and msgpack is not None:
+        return msgpack.packb(corps)
+    raise FormatInconnu(f"Format non pris en charge : {format_}")
+
+
+def decoder_corps(format_, donnees):
+    """Décode un corps reçu dans un format.
+
+    Args:
+        format_ (str): Le type de contenu (``Content-Type``, sans paramètres).
+        donnees (bytes): Le corps.
+
+    Returns:
+        dict: Le corps ; sa grille est laissée telle quelle (voir ``deplier_grille``),
+        sauf pour un instantané binaire où c'est un tableau numpy.
+
+    Raises:
+        FormatInconnu: Si le format n'est pas pris en charge.
+        ValueError: Si le corps est mal formé.
+    """
+    if format_ == BINAIRE:
+        grille, fourmis, etape = decoder_instantane(donnees)
+        return {"grille": grille.vers_tableau(), "fourmis": decrire_fourmis(fourmis), "etape": etape}
+    if format_ in (JSON, JSON_BITS):
+        corps = json.loads(donnees)
+    elif format_ == MSGPACK and msgpack is not None:
+        corps = msgpack.unpackb(donnees)
+    else:
+        raise FormatInconnu(f"Format non pris en charge : {format_}")
+    if not isinstance(corps, dict):
+        raise ValueError("Le corps doit être un objet.")
+    return corps
@@ -2,6 +2,10 @@
 Module représentant la Fourmi de Langton et ses comportements.
 """
 
+# Déplacements (dx, dy) pour chaque direction : Nord, Est, Sud, Ouest
+DX = (0, 1, 0, -1)
+DY = (-1, 0, 1, 0)
+
 class Fourmi:
     """Représente la fourmi de Langton.
 
@@ -11,6 +15,7 @@ class Fourmi:
         y (int): La position actuelle en y de la fourmi.
         direction (int): La direction actuelle de la fourmi (index dans DIRECTIONS).
         ant_id (int): L'identifiant unique de la fourmi.
+        etat (int): L'état de la fourmi, pour les turmites (0 sinon).
     """
 
     DIRECTIONS = ['N', 'E', 'S', 'O']  # Nord, Est, Sud, Ouest
@@ -27,6 +32,7 @@ class Fourmi:
         self.y = y
         self.direction = 0  # Commence en regardant vers le Nord
         self.ant_id = ant_id
+        self.etat = 0
 
     def tourner_a_droite(self):
         """Tourne la fourmi de 90 degrés vers la droite."""
@@ -36,12 +42,15 @@ class Fourmi:
         """Tourne la fourmi de 90 degrés vers la gauche."""
         self.direction = (self.direction - 1) % 4
 
-    def avancer(self, largeur, hauteur):
+    def avancer(self, largeur, hauteur, bornee=True, tore=False):
         """Déplace la fourmi d'une case dans la direction actuelle, en tenant compte des limites de la grille.
 
         Args:
             largeur (int): La largeur de la grille.
             hauteur (int): La hauteur de la grille.
+            bornee (bool): Si faux, la fourmi n'est pas bloquée aux limites (grille non bornée
+                ou extensible).
+            tore (bool): Si vrai, la fourmi qui sort d'un côté revient par le côté opposé.
         """
         if self.DIRECTIONS[self.direction] == 'N':
             self.y -= 1
@@ -52,20 +61,37 @@ class Fourmi:
         elif self.DIRECTIONS[self.direction] == 'O':
             self.x -= 1
 
+        if tore:
+            self.x %= largeur
+            self.y %= hauteur
+            return
+        if not bornee:
+            return
+
         # Assurer que la fourmi reste dans les limites de la grille
         self.x = max(0, min(self.x, largeur - 1))
         self.y = max(0, min(self.y, hauteur - 1))
 
-    def etape(self, grille):
-        """Exécute une étape de mouvement selon les règles de la fourmi de Langton.
+    def etape(self, grille, regle=None):
+        """Exécute une étape de mouvement selon les règles de la fourmi de Langton, ou selon ``regle``.
+
+        Sur une grille extensible, la fourmi peut en sortir : ``Grille.etendre``
+        doit être appelée avant son étape suivante.
 
         Args:
             grille (Grille): La grille sur laquelle la fourmi se déplace.
+            regle (Regle, optional): La table de transitions (par défaut, la fourmi de Langton).
         """
+        if regle is not None and not regle.langton:
+            couleur, virage, self.etat = regle.transition(grille.obtenir_couleur_case(self.x, self.y), self.etat)
+            self.direction = (self.direction + virage) % 4
+            grille.definir_couleur_case(self.x, self.y, couleur)
+            self.avancer(grille.largeur, grille.hauteur, grille.bornee, grille.tore)
+            return
         couleur_actuelle = grille.obtenir_couleur_case(self.x, self.y)
         if couleur_actuelle == 0:  # Case blanche
             self.tourner_a_droite()
         else:  # Case noire
             self.tourner_a_gauche()
         grille.changer_couleur_case(self.x, self.y)
-        self.avancer(grille.largeur, grille.hauteur)
+        self.avancer(grille.largeur, grille.hauteur, grille.bornee, grille.tore)
@@ -1,27 +1,98 @@
 """
 Module représentant la grille bidimensionnelle pour la simulation de la Fourmi de Langton.
+
+Deux stockages sont disponibles :
+
+- ``octets`` (par défaut) : un tableau ``numpy.uint8`` contigu, un octet par
+  case, jusqu'à 256 couleurs (voir ``fourmi.regles``) ;
+- ``bits`` : un tableau compacté à un bit par case, pour les très grandes
+  grilles à deux couleurs.
+
+Trois topologies sont disponibles :
+
+- ``borne`` (par défaut) : les fourmis sont bloquées aux bords ;
+- ``tore`` : une fourmi qui sort d'un côté revient par le côté opposé ;
+- ``extensible`` : la grille s'agrandit quand une fourmi en sort. Sa taille
+  double au moins à chaque agrandissement (coût amorti constant par étape) et
+  les cases déjà présentes sont décalées ; ``origine_x`` et ``origine_y``
+  gardent la position de la case (0, 0) par rapport à la grille de départ.
 """
 
+import numpy as np
+
+STOCKAGES = ('octets', 'bits')
+TOPOLOGIES = ('borne', 'tore', 'extensible')
+CASES_MAX = 2 ** 31 - 1  # Les cases sont repérées par des indices sur 32 bits (journal, instantanés)
+
+
 class Grille:
     """Représente une grille bidimensionnelle pour la simulation de la Fourmi de Langton.
 
+    Les cases sont stockées dans un tableau ``numpy.uint8`` contigu de forme
+    ``(hauteur, largeur)``. Les accès case par case passent par une vue mémoire
+    plate, ce qui évite la création d'objets numpy à chaque appel.
+
     Attributs:
         largeur (int): La largeur de la grille.
         hauteur (int): La hauteur de la grille.
-        grille (list): La représentation de la grille sous forme de liste de listes de zéros et de uns.
+        cases (numpy.ndarray): Le tableau des couleurs des cases (0 pour blanc, 1 pour noir...).
+        topologie (str): ``'borne'``, ``'tore'`` ou ``'extensible'``.
+        origine_x (int): La position en x de la case (0, 0) dans la grille de départ
+            (négative après un agrandissement vers la gauche).
+        origine_y (int): La position en y de la case (0, 0) dans la grille de départ.
     """
 
-    def __init__(self, largeur, hauteur):
+    stockage = 'octets'
+
+    def __init__(self, largeur, hauteur, topologie='borne'):
         """Initialise la grille avec les dimensions spécifiées.
 
         Args:
             largeur (int): La largeur de la grille.
             hauteur (int): La hauteur de la grille.
+            topologie (str): ``'borne'``, ``'tore'`` ou ``'extensible'``.
+
+        Raises:
+            ValueError: Si la topologie est inconnue.
         """
+        self.topologie = topologie
+        self.origine_x = 0
+        self.origine_y = 0
+        self._allouer(largeur, hauteur)
+
+    def _allouer(self, largeur, hauteur):
+        """Remplace les cases par un tableau vide de nouvelles dimensions."""
         self.largeur = largeur
         self.hauteur = hauteur
-        self.grille = [[0 for _ in range(largeur)] for _ in range(hauteur)]
-    
+        self.cases = np.zeros((hauteur, largeur), dtype=np.uint8)
+        self._vue = memoryview(self.cases).cast('B')
+
+    @property
+    def topologie(self):
+        """str: La topologie de la grille : ``'borne'``, ``'tore'`` ou ``'extensible'``."""
+        return self._topologie
+
+    @topologie.setter
+    def topologie(self, topologie):
+        if topologie not in TOPOLOGIES:
+            raise ValueError(f"Topologie inconnue : {topologie!r} (attendu : {', '.join(TOPOLOGIES)}).")
+        self._topologie = topologie
+
+    @property
+    def bornee(self):
+        """bool: Vrai si les fourmis sont bloquées aux bords."""
+        return self._topologie == 'borne'
+
+    @property
+    def tore(self):
+        """bool: Vrai si une fourmi qui sort d'un côté revient par le côté opposé."""
+        return self._topologie == 'tore'
+
+    @property
+    def grille(self):
+        """list: La grille sous forme de liste de listes de zéros et de uns (copie)."""
+        return self.vers_tableau().tolist()
+
     def changer_couleur_case(self, x, y):
         """Inverse la couleur de la case (x, y).
 
@@ -29,7 +100,17 @@ class Grille:
             x (int): La position en x de la case.
             y (int): La position en y de la case.
         """
-        self.grille[y][x] = 1 - self.grille[y][x]
+        self._vue[y * self.largeur + x] ^= 1
+
+    def definir_couleur_case(self, x, y, couleur):
+        """Donne la couleur ``couleur`` à la case (x, y).
+
+        Args:
+            x (int): La position en x de la case.
+            y (int): La position en y de la case.
+            couleur (int): La nouvelle couleur (0 à 255).
+        """
+        self._vue[y * self.largeur + x] = couleur
 
     def obtenir_couleur_case(self, x, y):
         """Retourne la couleur actuelle de la case (x, y).
@@ -41,4 +122,293 @@ class Grille:
         Returns:
             int: La couleur de la case (0 pour blanc, 1 pour noir).
         """
-        return self.grille[y][x]
+        return self._vue[y * self.largeur + x]
+
+    def vers_tableau(self):
+        """Retourne les cases sous forme de tableau ``uint8`` de forme (hauteur, largeur).
+
+        Returns:
+            numpy.ndarray: Le tableau des cases (une vue, sans copie).
+        """
+        return self.cases
+
+    def depuis_tableau(self, tableau):
+        """Remplace le contenu de la grille par celui d'un tableau de mêmes dimensions.
+
+        Args:
+            tableau (numpy.ndarray): Le tableau (hauteur, largeur) à recopier.
+        """
+        if tableau is not self.cases:
+            self.cases[...] = tableau
+
+    def lire_region(self, x0, y0, x1, y1):
+        """Retourne les cases du rectangle [x0, x1) × [y0, y1).
+
+        Args:
+            x0 (int): Le bord gauche.
+            y0 (int): Le bord haut.
+            x1 (int): Le bord droit (exclu).
+            y1 (int): Le bord bas (exclu).
+
+        Returns:
+            numpy.ndarray: Les cases (y1 - y0, x1 - x0), en ``uint8`` (une vue, sans copie).
+        """
+        return self.cases[y0:y1, x0:x1]
+
+    def ecrire_region(self, x0, y0, tableau):
+        """Recopie un tableau de cases dans le rectangle qui commence en (x0, y0).
+
+        Args:
+            x0 (int): Le bord gauche.
+            y0 (int): Le bord haut.
+            tableau (numpy.ndarray): Les cases.
+        """
+        self.cases[y0:y0 + tableau.shape[0], x0:x0 + tableau.shape[1]] = tableau
+
+    def lire_cases(self, indices):
+        """Retourne les cases d'indices plats ``y * largeur + x``.
+
+        Args:
+            indices (numpy.ndarray): Les indices, de forme quelconque.
+
+        Returns:
+            numpy.ndarray: Les couleurs, de la forme des indices.
+        """
+        return self.cases.reshape(-1)[indices]
+
+    def ecrire_cases(self, indices, couleurs):
+        """Donne leurs couleurs aux cases d'indices plats ``y * largeur + x``, toutes distinctes.
+
+        Args:
+            indices (numpy.ndarray): Les indices, de forme quelconque.
+            couleurs: Les couleurs, diffusées à la forme des indices.
+        """
+        self.cases.reshape(-1)[indices] = couleurs
+
+    def copier(self):
+        """Retourne une copie indépendante de la grille, avec le même stockage et la même topologie.
+
+        Returns:
+            Grille: La copie de la grille.
+        """
+        copie = type(self)(self.largeur, self.hauteur, self.topologie)
+        copie.origine_x, copie.origine_y = self.origine_x, self.origine_y
+        copie.depuis_tableau(self.vers_tableau())
+        return copie
+
+    def etendre(self, fourmis):
+        """Agrandit une grille extensible pour que toutes les fourmis y soient.
+
+        Chaque dimension à agrandir est au moins doublée, du côté où les fourmis
+        sont sorties. Les cases et les fourmis sont décalées d'autant.
+
+        Args:
+            fourmis (list): La liste des fourmis, décalées sur place.
+
+        Returns:
+            tuple: Le décalage (dx, dy) appliqué aux fourmis, ou None si la grille
+            n'a pas changé.
+
+        Raises:
+            ValueError: Si la grille agrandie dépasserait ``CASES_MAX`` cases.
+        """
+        if self._topologie != 'extensible' or not fourmis:
+            return None
+        x_min = min(f.x for f in fourmis)
+        x_max = max(f.x for f in fourmis)
+        y_min = min(f.y for f in fourmis)
+        y_max = max(f.y for f in fourmis)
+        if x_min >= 0 and y_min >= 0 and x_max < self.largeur and y_max < self.hauteur:
+            return None
+        gauche = max(self.largeur, -x_min) if x_min < 0 else 0
+        droite = max(self.largeur, x_max - self.largeur + 1) if x_max >= self.largeur else 0
+        haut = max(self.hauteur, -y_min) if y_min < 0 else 0
+        bas = max(self.hauteur, y_max - self.hauteur + 1) if y_max >= self.hauteur else 0
+        if (self.largeur + gauche + droite) * (self.hauteur + haut + bas) > CASES_MAX:
+            raise ValueError(f"La grille extensible dépasserait {CASES_MAX} cases "
+                             "(le moteur creux convient mieux aux fourmis qui s'éloignent).")
+        tableau = self.vers_tableau()
+        self._allouer(self.largeur + gauche + droite, self.hauteur + haut + bas)
+        agrandi = np.zeros((self.hauteur, self.largeur), dtype=np.uint8)
+        agrandi[haut:haut + tableau.shape[0], gauche:gauche + tableau.shape[1]] = tableau
+        self.depuis_tableau(agrandi)
+        self.origine_x -= gauche
+        self.origine_y -= haut
+        for fourmi in fourmis:
+            fourmi.x += gauche
+            fourmi.y += haut
+        return gauche, haut
+
+    def charger(self, lignes):
+        """Charge le contenu de la grille à partir d'une liste de listes.
+
+        Args:
+            lignes (list): La grille sauvegardée, ligne par ligne.
+
+        Raises:
+            ValueError: Si les dimensions ne correspondent pas à celles de la grille.
+        """
+        tableau = np.asarray(lignes, dtype=np.uint8)
+        if tableau.shape != (self.hauteur, self.largeur):
+            raise ValueError("Les dimensions de la grille chargée ne correspondent pas.")
+        self.depuis_tableau(tableau)
+
+
+class GrilleBits(Grille):
+    """Grille compactée à un bit par case, pour les très grandes grilles.
+
+    Chaque ligne est stockée dans ``(largeur + 7) // 8`` octets, dans l'ordre des
+    bits de ``numpy.packbits`` (bit de poids fort en premier).
+
+    Attributs:
+        bits (numpy.ndarray): Le tableau compacté de forme (hauteur, (largeur + 7) // 8).
+    """
+
+    stockage = 'bits'
+
+    def _allouer(self, largeur, hauteur):
+        """Remplace les cases par un tableau compacté vide de nouvelles dimensions."""
+        self.largeur = largeur
+        self.hauteur = hauteur
+        self._octets_par_ligne = (largeur + 7) // 8
+        self.bits = np.zeros((hauteur, self._octets_par_ligne), dtype=np.uint8)
+        self._vue = memoryview(self.bits).cast('B')
+
+    def changer_couleur_case(self, x, y):
+        """Inverse la couleur de la case (x, y).
+
+        Args:
+            x (int): La position en x de la case.
+            y (int): La position en y de la case.
+        """
+        self._vue[y * self._octets_par_ligne + (x >> 3)] ^= 0x80 >> (x & 7)
+
+    def definir_couleur_case(self, x, y, couleur):
+        """Donne la couleur ``couleur`` à la case (x, y).
+
+        Args:
+            x (int): La position en x de la case.
+            y (int): La position en y de la case.
+            couleur (int): La nouvelle couleur (0 ou 1).
+
+        Raises:
+            ValueError: Si la couleur ne tient pas sur un bit.
+        """
+        if couleur not in (0, 1):
+            raise ValueError("Une grille à un bit par case n'a que deux couleurs.")
+        if self.obtenir_couleur_case(x, y) != couleur:
+            self.changer_couleur_case(x, y)
+
+    def obtenir_couleur_case(self, x, y):
+        """Retourne la couleur actuelle de la case (x, y).
+
+        Args:
+            x (int): La position en x de la case.
+            y (int): La position en y de la case.
+
+        Returns:
+            int: La couleur de la case (0 pour blanc, 1 pour noir).
+        """
+        return (self._vue[y * self._octets_par_ligne + (x >> 3)] >> (7 - (x & 7))) & 1
+
+    def vers_tableau(self):
+        """Retourne les cases décompactées sous forme de tableau ``uint8``.
+
+        Returns:
+            numpy.ndarray: Une copie (hauteur, largeur) des cases.
+        """
+        return np.unpackbits(self.bits, axis=1, count=self.largeur)
+
+    def depuis_tableau(self, tableau):
+        """Remplace le contenu de la grille par celui d'un tableau de mêmes dimensions.
+
+        Args:
+            tableau (numpy.ndarray): Le tableau (hauteur, largeur) de zéros et de uns.
+        """
+        self.bits[...] = np.packbits(np.asarray(tableau, dtype=np.uint8) & 1, axis=1)
+
+    def lire_region(self, x0, y0, x1, y1):
+        """Retourne les cases décompactées du rectangle [x0, x1) × [y0, y1).
+
+        Args:
+            x0 (int): Le bord gauche, multiple de 8.
+            y0 (int): Le bord haut.
+            x1 (int): Le bord droit (exclu).
+            y1 (int): Le bord bas (exclu).
+
+        Returns:
+            numpy.ndarray: Une copie (y1 - y0, x1 - x0) des cases, en ``uint8``.
+        """
+        return np.ascontiguousarray(np.unpackbits(self.bits[y0:y1, x0 >> 3:(x1 + 7) >> 3], axis=1, count=x1 - x0))
+
+    def ecrire_region(self, x0, y0, tableau):
+        """Recopie un tableau de cases dans le rectangle qui commence en (x0, y0).
+
+        Args:
+            x0 (int): Le bord gauche, multiple de 8.
+            y0 (int): Le bord haut.
+            tableau (numpy.ndarray): Les cases, dont la largeur est un multiple de 8
+                ou va jusqu'au bord droit de la grille.
+        """
+        compacte = np.packbits(tableau & 1, axis=1)
+        self.bits[y0:y0 + compacte.shape[0], x0 >> 3:(x0 >> 3) + compacte.shape[1]] = compacte
+
+    def _adresses(self, indices):
+        """Retourne l'octet et le masque de chaque case d'indice plat ``y * largeur + x``."""
+        y, x = np.divmod(np.asarray(indices, dtype=np.int64), self.largeur)
+        return y * self._octets_par_ligne + (x >> 3), (0x80 >> (x & 7)).astype(np.uint8)
+
+    def lire_cases(self, indices):
+        """Retourne les cases d'indices plats ``y * largeur + x``, sans décompacter la grille.
+
+        Args:
+            indices (numpy.ndarray): Les indices, de forme quelconque.
+
+        Returns:
+            numpy.ndarray: Les couleurs (0 ou 1), de la forme des indices.
+        """
+        octets, masques = self._adresses(indices)
+        return ((self.bits.reshape(-1)[octets] & masques) != 0).astype(np.uint8)
+
+    def ecrire_cases(self, indices, couleurs):
+        """Donne leurs couleurs aux cases d'indices plats ``y * largeur + x``, toutes distinctes.
+
+        Args:
+            indices (numpy.ndarray): Les indices, de forme quelconque.
+            couleurs: Les couleurs (0 ou 1), diffusées à la forme des indices.
+        """
+        octets, masques = self._adresses(indices)
+        couleurs = np.broadcast_to(np.asarray(couleurs, dtype=np.uint8), octets.shape).reshape(-1)
+        uniques, inverses = np.unique(octets.reshape(-1), return_inverse=True)
+        masques = masques.reshape(-1).astype(np.int64)
+        # Cases distinctes : les masques d'un même octet s'additionnent sans retenue
+        poses = np.bincount(inverses, masques * (couleurs != 0), len(uniques)).astype(np.uint8)
+        effaces = np.bincount(inverses, masques * (couleurs == 0), len(uniques)).astype(np.uint8)
+        plats = self.bits.reshape(-1)
+        plats[uniques] = (plats[uniques] & ~effaces) | poses
+
+
+def creer_grille(largeur, hauteur, stockage='octets', n_couleurs=2, topologie='borne'):
+    """Crée une grille avec le stockage et la topologie demandés.
+
+    Args:
+        largeur (int): La largeur de la grille.
+        hauteur (int): La hauteur de la grille.
+        stockage (str): ``'octets'`` (un octet par case) ou ``'bits'`` (un bit par case).
+        n_couleurs (int): Le nombre de couleurs de la règle simulée.
+        topologie (str): ``'borne'``, ``'tore'`` ou ``'extensible'``.
+
+    Returns:
+        Grille: La grille créée.
+
+    Raises:
+        ValueError: Si le stockage ou la topologie demandés sont inconnus, ou si le
+            stockage ne peut pas garder ``n_couleurs`` couleurs.
+    """
+    if stockage == 'octets':
+        return Grille(largeur, hauteur, topologie)
+    if stockage == 'bits':
+        if n_couleurs > 2:
+            raise ValueError(f"Le stockage 'bits' ne garde que deux couleurs (la règle en a {n_couleurs}).")
+        return GrilleBits(largeur, hauteur, topologie)
+    raise ValueError(f"Stockage de grille inconnu : {stockage!r} (attendu : {', '.join(STOCKAGES)}).")
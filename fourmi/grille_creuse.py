@@ -0,0 +1,274 @@
+"""
+Module de la grille creuse et non bornée pour la simulation de la Fourmi de Langton.
+
+La grille est découpée en tuiles carrées allouées à la demande : la mémoire
+utilisée dépend de la surface visitée par les fourmis, pas du rectangle qui
+l'englobe. Les tuiles sont des ``bytes`` immuables et partagées (hachage
+consing) : deux tuiles de même contenu sont un seul objet, dont le hachage
+n'est calculé qu'une fois. Le moteur creux s'en sert pour mémoriser la
+traversée d'une tuile par une fourmi et la rejouer d'un coup.
+"""
+
+import numpy as np
+
+from fourmi.fourmi import DX, DY
+
+
+class GrilleCreuse:
+    """Grille non bornée découpée en tuiles allouées à la demande.
+
+    Attributs:
+        taille_tuile (int): Le côté d'une tuile, en cases.
+        tuiles (dict): Les tuiles non vides, indexées par (tx, ty).
+        largeur (None): Pas de largeur, la grille n'est pas bornée.
+        hauteur (None): Pas de hauteur, la grille n'est pas bornée.
+    """
+
+    bornee = False
+    tore = False
+    largeur = None
+    hauteur = None
+
+    def __init__(self, taille_tuile=16):
+        """Initialise une grille creuse vide.
+
+        Args:
+            taille_tuile (int): Le côté d'une tuile, en cases.
+        """
+        self.taille_tuile = taille_tuile
+        self.tuiles = {}
+        self.vide = bytes(taille_tuile * taille_tuile)
+        self._uniques = {self.vide: self.vide}
+
+    def canonique(self, contenu):
+        """Retourne l'unique objet ``bytes`` partagé de ce contenu de tuile.
+
+        Args:
+            contenu (bytes): Le contenu d'une tuile.
+
+        Returns:
+            bytes: L'objet partagé de même contenu.
+        """
+        return self._uniques.setdefault(contenu, contenu)
+
+    def oublier_uniques(self):
+        """Vide la table de partage, en ne gardant que les tuiles de la grille."""
+        self._uniques = {self.vide: self.vide}
+        for contenu in self.tuiles.values():
+            self._uniques.setdefault(contenu, contenu)
+
+    def obtenir_tuile(self, tx, ty):
+        """Retourne le contenu de la tuile (tx, ty), vide si elle n'est pas allouée.
+
+        Args:
+            tx (int): La position en x de la tuile.
+            ty (int): La position en y de la tuile.
+
+        Returns:
+            bytes: Le contenu de la tuile, ligne par ligne.
+        """
+        return self.tuiles.get((tx, ty), self.vide)
+
+    def definir_tuile(self, tx, ty, contenu):
+        """Remplace le contenu de la tuile (tx, ty). Une tuile vide est libérée.
+
+        Args:
+            tx (int): La position en x de la tuile.
+            ty (int): La position en y de la tuile.
+            contenu (bytes): Le nouveau contenu de la tuile.
+        """
+        contenu = self.canonique(bytes(contenu))
+        if contenu is self.vide:
+            self.tuiles.pop((tx, ty), None)
+        else:
+            self.tuiles[(tx, ty)] = contenu
+
+    def changer_couleur_case(self, x, y):
+        """Inverse la couleur de la case (x, y).
+
+        Args:
+            x (int): La position en x de la case.
+            y (int): La position en y de la case.
+        """
+        tx, lx = divmod(x, self.taille_tuile)
+        ty, ly = divmod(y, self.taille_tuile)
+        tuile = bytearray(self.obtenir_tuile(tx, ty))
+        tuile[ly * self.taille_tuile + lx] ^= 1
+        self.definir_tuile(tx, ty, tuile)
+
+    def definir_couleur_case(self, x, y, couleur):
+        """Donne la couleur ``couleur`` à la case (x, y).
+
+        Args:
+            x (int): La position en x de la case.
+            y (int): La position en y de la case.
+            couleur (int): La nouvelle couleur (0 à 255).
+        """
+        tx, lx = divmod(x, self.taille_tuile)
+        ty, ly = divmod(y, self.taille_tuile)
+        tuile = bytearray(self.obtenir_tuile(tx, ty))
+        tuile[ly * self.taille_tuile + lx] = couleur
+        self.definir_tuile(tx, ty, tuile)
+
+    def obtenir_couleur_case(self, x, y):
+        """Retourne la couleur actuelle de la case (x, y).
+
+        Args:
+            x (int): La position en x de la case.
+            y (int): La position en y de la case.
+
+        Returns:
+            int: La couleur de la case (0 pour blanc, 1 pour noir).
+        """
+        tx, lx = divmod(x, self.taille_tuile)
+        ty, ly = divmod(y, self.taille_tuile)
+        return self.obtenir_tuile(tx, ty)[ly * self.taille_tuile + lx]
+
+    def emprise(self):
+        """Retourne le rectangle couvrant les tuiles allouées.
+
+        Returns:
+            tuple: (x_min, y_min, x_max, y_max) inclus, ou None si la grille est vide.
+        """
+        if not self.tuiles:
+            return None
+        txs = [tx for tx, _ in self.tuiles]
+        tys = [ty for _, ty in self.tuiles]
+        taille = self.taille_tuile
+        return (min(txs) * taille, min(tys) * taille,
+                (max(txs) + 1) * taille - 1, (max(tys) + 1) * taille - 1)
+
+    def vers_tableau(self):
+        """Retourne les cases de l'emprise sous forme de tableau ``uint8``.
+
+        La case (0, 0) du tableau correspond au coin (x_min, y_min) de ``emprise()``.
+
+        Returns:
+            numpy.ndarray: Une copie (hauteur, largeur) des cases de l'emprise.
+        """
+        emprise = self.emprise()
+        if emprise is None:
+            return np.zeros((0, 0), dtype=np.uint8)
+        x_min, y_min, x_max, y_max = emprise
+        taille = self.taille_tuile
+        tableau = np.zeros((y_max - y_min + 1, x_max - x_min + 1), dtype=np.uint8)
+        for (tx, ty), contenu in self.tuiles.items():
+            x, y = tx * taille - x_min, ty * taille - y_min
+            tableau[y:y + taille, x:x + taille] = np.frombuffer(contenu, dtype=np.uint8).reshape(taille, taille)
+        return tableau
+
+
+def _traverser(tuile, taille, lx, ly, d, limite):
+    """Fait avancer une fourmi dans une tuile jusqu'à ce qu'elle en sorte.
+
+    Args:
+        tuile (bytearray): Le contenu de la tuile, modifié sur place.
+        taille (int): Le côté de la tuile.
+        lx (int): La position en x dans la tuile.
+        ly (int): La position en y dans la tuile.
+        d (int): La direction de la fourmi.
+        limite (int): Le nombre maximal d'étapes.
+
+    Returns:
+        tuple: (lx, ly, d, etapes, sortie) où (lx, ly) peut être hors de la tuile
+        si ``sortie`` est vrai.
+    """
+    n = 0
+    while n < limite:
+        p = ly * taille + lx
+        c = tuile[p]
+        if c == 0:
+            d = (d + 1) & 3
+        else:
+            d = (d - 1) & 3
+        tuile[p] = c ^ 1
+        n += 1
+        lx += DX[d]
+        ly += DY[d]
+        if lx < 0 or ly < 0 or lx >= taille or ly >= taille:
+            return lx, ly, d, n, True
+    return lx, ly, d, n, False
+
+
+class MoteurCreux:
+    """Moteur de simulation sur grille creuse, avec mémorisation des traversées de tuiles.
+
+    Pour une fourmi seule, la traversée d'une tuile ne dépend que du contenu de
+    la tuile et de l'état d'entrée de la fourmi : le résultat (nouveau contenu,
+    état de sortie, nombre d'étapes) est mémorisé et rejoué d'un coup lorsque la
+    même situation se représente. Avec plusieurs fourmis, les étapes sont
+    simulées une par une, dans l'ordre de la liste.
+
+    Attributs:
+        taille_memoire (int): Le nombre maximal de traversées mémorisées.
+        etapes_simulees (int): Le nombre d'étapes calculées une par une.
+        etapes_accelerees (int): Le nombre d'étapes rejouées depuis la mémoire.
+    """
+
+    def __init__(self, taille_memoire=1 << 20):
+        """Initialise le moteur creux.
+
+        Args:
+            taille_memoire (int): Le nombre maximal de traversées mémorisées.
+        """
+        self.taille_memoire = taille_memoire
+        self.memoire = {}
+        self.etapes_simulees = 0
+        self.etapes_accelerees = 0
+
+    def simuler(self, grille, fourmis, n_etapes):
+        """Fait avancer toutes les fourmis de ``n_etapes`` étapes sur une grille creuse.
+
+        Args:
+            grille (GrilleCreuse): La grille creuse.
+            fourmis (list): La liste des fourmis, mises à jour sur place.
+            n_etapes (int): Le nombre d'étapes à simuler.
+
+        Returns:
+            int: Le nombre d'étapes simulées.
+        """
+        if n_etapes <= 0 or not fourmis:
+            return 0
+        if len(fourmis) > 1:
+            for _ in range(n_etapes):
+                for fourmi in fourmis:
+                    fourmi.etape(grille)
+            self.etapes_simulees += n_etapes * len(fourmis)
+            return n_etapes
+        self._simuler_une_fourmi(grille, fourmis[0], n_etapes)
+        return n_etapes
+
+    def _simuler_une_fourmi(self, grille, fourmi, n_etapes):
+        """Simule une fourmi seule, tuile par tuile, en utilisant la mémoire."""
+        taille = grille.taille_tuile
+        memoire = self.memoire
+        tx, lx = divmod(fourmi.x, taille)
+        ty, ly = divmod(fourmi.y, taille)
+        d = fourmi.direction
+        restant = n_etapes
+        while restant > 0:
+            contenu = grille.obtenir_tuile(tx, ty)
+            cle = (contenu, lx, ly, d)
+            resultat = memoire.get(cle)
+            if resultat is not None and resultat[4] <= restant:
+                nouveau, lx, ly, d, etapes = resultat
+                self.etapes_accelerees += etapes
+            else:
+                tuile = bytearray(contenu)
+                lx, ly, d, etapes, sortie = _traverser(tuile, taille, lx, ly, d, restant)
+                nouveau = grille.canonique(bytes(tuile))
+                if sortie:
+                    if len(memoire) >= self.taille_memoire:
+                        memoire.clear()
+                        grille.oublier_uniques()
+                    memoire[cle] = (nouveau, lx, ly, d, etapes)
+                self.etapes_simulees += etapes
+            grille.definir_tuile(tx, ty, nouveau)
+            restant -= etapes
+            dtx, lx = divmod(lx, taille)
+            dty, ly = divmod(ly, taille)
+            tx += dtx
+            ty += dty
+        fourmi.x = tx * taille + lx
+        fourmi.y = ty * taille + ly
+        fourmi.direction = d
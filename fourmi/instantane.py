@@ -0,0 +1,284 @@
+"""
+Module des instantanés binaires de la simulation (sauvegarde et reprise).
+
+Un instantané est un en-tête de taille fixe suivi des données :
+
+- l'en-tête (little-endian) : signature ``FRMI``, version, bits par case,
+  compression, largeur, hauteur, étape, nombre de fourmis, taille des données ;
+- la grille, compactée à un bit par case ligne par ligne (comme
+  ``GrilleBits.bits``), ou à un octet par case si elle contient plus de deux
+  couleurs ;
+- la table des fourmis (x, y, direction, identifiant). L'état d'une turmite
+  est rangé dans les bits de poids fort de l'octet de direction
+  (``direction | etat << 2``), ce qui laisse les anciennes tables lisibles.
+
+Les données peuvent être compressées avec zlib (ou lz4 s'il est installé).
+Sans compression, la grille est lue par projection en mémoire (``numpy.memmap``).
+L'écriture est atomique : fichier temporaire dans le même dossier, puis
+renommage. Les anciennes sauvegardes JSON (``sauvegarde.json``) restent lisibles.
+"""
+
+import json
+import os
+import struct
+import tempfile
+import zlib
+
+import numpy as np
+
+from fourmi.fourmi import Fourmi
+from fourmi.grille import GrilleBits, creer_grille
+
+try:
+    import lz4.frame
+except ImportError:  # lz4 est optionnel
+    lz4 = None
+
+SIGNATURE = b'FRMI'
+VERSION = 1
+EN_TETE = struct.Struct('<4sHBBIIQII')
+COMPRESSIONS = {'aucune': 0, 'zlib': 1, 'lz4': 2}
+TYPE_FOURMI = np.dtype([('x', '<i4'), ('y', '<i4'), ('direction', 'u1'), ('id', '<i4')])
+
+
+def decrire_fourmis(fourmis):
+    """Décrit les fourmis dans le format JSON de ``sauvegarde.json``.
+
+    Args:
+        fourmis (list): La liste des fourmis.
+
+    Returns:
+        list: Un dictionnaire (``x``, ``y``, ``direction``, ``id``, et ``etat`` s'il
+        n'est pas nul) par fourmi.
+    """
+    descriptions = []
+    for f in fourmis:
+        description = {"x": f.x, "y": f.y, "direction": Fourmi.DIRECTIONS[f.direction], "id": f.ant_id}
+        if f.etat:
+            description["etat"] = f.etat
+        descriptions.append(description)
+    return descriptions
+
+
+def table_fourmis(fourmis):
+    """Range les fourmis dans une table binaire ``TYPE_FOURMI``.
+
+    Args:
+        fourmis (list): La liste des fourmis.
+
+    Returns:
+        numpy.ndarray: La table, l'état de chaque fourmi étant rangé avec sa direction.
+    """
+    return np.array([(f.x, f.y, f.direction | f.etat << 2, f.ant_id) for f in fourmis], dtype=TYPE_FOURMI)
+
+
+def fourmis_depuis_table(table):
+    """Recrée les fourmis d'une table binaire ``TYPE_FOURMI``.
+
+    Args:
+        table (numpy.ndarray): La table des fourmis.
+
+    Returns:
+        list: La liste des fourmis.
+    """
+    fourmis = []
+    for x, y, direction, ant_id in table.tolist():
+        fourmi = Fourmi(x, y, ant_id)
+        fourmi.direction = direction & 3
+        fourmi.etat = direction >> 2
+        fourmis.append(fourmi)
+    return fourmis
+
+
+def vers_dict(grille, fourmis):
+    """Décrit l'état de la simulation dans le format JSON de ``sauvegarde.json``.
+
+    Args:
+        grille (Grille): La grille de la simulation.
+        fourmis (list): La liste des fourmis.
+
+    Returns:
+        dict: L'état, avec les clés ``grille`` et ``fourmis``.
+    """
+    return {"grille": grille.vers_tableau().tolist(), "fourmis": decrire_fourmis(fourmis)}
+
+
+def fourmis_depuis_dict(etat):
+    """Recrée les fourmis décrites dans un état JSON.
+
+    Args:
+        etat (dict): L'état, avec la clé ``fourmis``.
+
+    Returns:
+        list: La liste des fourmis.
+    """
+    fourmis = []
+    for f in etat["fourmis"]:
+        fourmi = Fourmi(f["x"], f["y"], f["id"])
+        fourmi.direction = Fourmi.DIRECTIONS.index(f["direction"])  # Convertir la direction texte en index
+        fourmi.etat = f.get("etat", 0)
+        fourmis.append(fourmi)
+    return fourmis
+
+
+def _compresser(donnees, compression):
+    if compression == 'zlib':
+        return zlib.compress(donnees, 1)
+    if compression == 'lz4':
+        return lz4.frame.compress(donnees)
+    return donnees
+
+
+def _decompresser(donnees, code):
+    try:
+        if code == COMPRESSIONS['zlib']:
+            return zlib.decompress(donnees)
+        if code == COMPRESSIONS['lz4']:
+            if lz4 is None:
+                raise ValueError("Cet instantané est compressé avec lz4, qui n'est pas installé.")
+            return lz4.frame.decompress(donnees)
+    except (zlib.error, RuntimeError) as erreur:  # lz4 lève RuntimeError sur des données corrompues
+        raise ValueError(f"Données compressées mal formées : {erreur}") from erreur
+    return donnees
+
+
+def encoder_instantane(grille, fourmis, etape=0, compression='zlib'):
+    """Encode l'état de la simulation en instantané binaire.
+
+    Args:
+        grille (Grille): La grille de la simulation.
+        fourmis (list): La liste des fourmis.
+        etape (int): Le numéro de l'étape courante.
+        compression (str): ``'aucune'``, ``'zlib'`` ou ``'lz4'``.
+
+    Returns:
+        bytes: L'instantané.
+
+    Raises:
+        ValueError: Si la compression est inconnue ou indisponible.
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Compression inconnue : {compression!r} (attendu : {', '.join(COMPRESSIONS)}).")
+    if compression == 'lz4' and lz4 is None:
+        raise ValueError("La compression lz4 demande le paquet lz4.")
+    if isinstance(grille, GrilleBits):
+        bits_par_case, cases = 1, grille.bits
+    else:
+        tableau = grille.vers_tableau()
+        if tableau.size and tableau.max() > 1:
+            bits_par_case, cases = 8, tableau
+        else:
+            bits_par_case, cases = 1, np.packbits(tableau, axis=1)
+    table = table_fourmis(fourmis)
+    donnees = _compresser(np.ascontiguousarray(cases).tobytes() + table.tobytes(), compression)
+    en_tete = EN_TETE.pack(SIGNATURE, VERSION, bits_par_case, COMPRESSIONS[compression],
+                           grille.largeur, grille.hauteur, etape, len(fourmis), len(donnees))
+    return en_tete + donnees
+
+
+def decoder_instantane(tampon, stockage='octets'):
+    """Décode un instantané binaire.
+
+    Args:
+        tampon: L'instantané (``bytes``, ``memoryview`` ou ``numpy.memmap``).
+        stockage (str): Le stockage de la grille recréée ('octets' ou 'bits').
+
+    Returns:
+        tuple: La grille, la liste des fourmis et le numéro d'étape.
+
+    Raises:
+        ValueError: Si le tampon n'est pas un instantané valide.
+    """
+    tampon = memoryview(tampon).cast('B')
+    if len(tampon) < EN_TETE.size:
+        raise ValueError("Instantané tronqué.")
+    signature, version, bits_par_case, code, largeur, hauteur, etape, n_fourmis, taille = \
+        EN_TETE.unpack_from(tampon)
+    if signature != SIGNATURE or version != VERSION:
+        raise ValueError("Ce fichier n'est pas un instantané de la Fourmi de Langton.")
+    if len(tampon) < EN_TETE.size + taille:
+        raise ValueError("Instantané tronqué.")
+    donnees = _decompresser(tampon[EN_TETE.size:EN_TETE.size + taille], code)
+    octets_grille = hauteur * ((largeur + 7) // 8 if bits_par_case == 1 else largeur)
+    cases = np.frombuffer(donnees, dtype=np.uint8, count=octets_grille).reshape(hauteur, -1)
+    table = np.frombuffer(donnees, dtype=TYPE_FOURMI, count=n_fourmis, offset=octets_grille)
+
+    grille = creer_grille(largeur, hauteur, stockage)
+    if bits_par_case == 8:
+        grille.depuis_tableau(cases)
+    elif isinstance(grille, GrilleBits):
+        grille.bits[...] = cases
+    else:
+        grille.depuis_tableau(np.unpackbits(cases, axis=1, count=largeur))
+    return grille, fourmis_depuis_table(table), etape
+
+
+def ecrire_instantane(chemin, grille, fourmis, etape=0, compression='zlib'):
+    """Écrit un instantané de façon atomique (fichier temporaire puis renommage).
+
+    Args:
+        chemin (str): Le fichier de l'instantané.
+        grille (Grille): La grille de la simulation.
+        fourmis (list): La liste des fourmis.
+        etape (int): Le numéro de l'étape courante.
+        compression (str): ``'aucune'``, ``'zlib'`` ou ``'lz4'``.
+
+    Returns:
+        int: La taille de l'instantané, en octets.
+    """
+    donnees = encoder_instantane(grille, fourmis, etape, compression)
+    dossier = os.path.dirname(os.path.abspath(chemin))
+    descripteur, temporaire = tempfile.mkstemp(dir=dossier, prefix='.instantane-', suffix='.tmp')
+    try:
+        with os.fdopen(descripteur, 'wb') as fichier:
+            fichier.write(donnees)
+            fichier.flush()
+            os.fsync(fichier.fileno())
+        os.replace(temporaire, chemin)
+    except BaseException:
+        os.unlink(temporaire)
+        raise
+    return len(donnees)
+
+
+def lire_instantane(chemin, stockage='octets'):
+    """Lit un instantané binaire, par projection en mémoire.
+
+    Args:
+        chemin (str): Le fichier de l'instantané.
+        stockage (str): Le stockage de la grille recréée ('octets' ou 'bits').
+
+    Returns:
+        tuple: La grille, la liste des fourmis et le numéro d'étape.
+    """
+    projection = np.memmap(chemin, dtype=np.uint8, mode='r')
+    try:
+        return decoder_instantane(projection, stockage)
+    finally:
+        del projection
+
+
+def lire_sauvegarde(chemin, stockage='octets'):
+    """Lit une sauvegarde, binaire ou au format JSON historique.
+
+    Args:
+        chemin (str): Le fichier de la sauvegarde.
+        stockage (str): Le stockage de la grille recréée ('octets' ou 'bits').
+
+    Returns:
+        tuple: La grille, la liste des fourmis et le numéro d'étape (0 pour le JSON).
+
+    Raises:
+        FileNotFoundError: Si le fichier n'existe pas.
+        ValueError: Si le fichier n'est pas une sauvegarde lisible.
+    """
+    with open(chemin, 'rb') as fichier:
+        signature = fichier.read(len(SIGNATURE))
+    if signature == SIGNATURE:
+        return lire_instantane(chemin, stockage)
+    with open(chemin, 'r', encoding='utf-8') as fichier:
+        etat = json.load(fichier)
+    lignes = etat["grille"]
+    grille = creer_grille(len(lignes[0]) if lignes else 0, len(lignes), stockage)
+    grille.charger(lignes)
+    return grille, fourmis_depuis_dict(etat), etat.get("etape", 0)
@@ -0,0 +1,369 @@
+"""
+Module du journal des modifications de la simulation, en ajout seul.
+
+Le journal est une suite d'enregistrements ajoutés en fin de fichier :
+
+- les points de reprise, qui contiennent un instantané complet (voir
+  ``fourmi.instantane``) ;
+- les deltas, qui contiennent, pour chaque étape et chaque fourmi, la case
+  modifiée et la direction de la fourmi avant l'étape, puis la table des
+  fourmis à la fin du lot.
+
+Chaque enregistrement commence par un en-tête (type, compression, étape,
+nombre d'étapes, nombre de fourmis, taille, somme de contrôle CRC-32). Un enregistrement
+incomplet ou corrompu en fin de fichier (arrêt brutal pendant une écriture)
+est supprimé à l'ouverture : les étapes déjà écrites ne sont pas perdues.
+
+Le fichier commence par un en-tête qui donne la règle des fourmis (voir
+``fourmi.regles`` ; un journal de version 1 suit la fourmi de Langton) : les
+deltas ne gardent que les cases modifiées, et leurs nouvelles couleurs se
+déduisent de la règle.
+
+Retrouver l'état d'une étape N passée ne demande que le dernier point de
+reprise avant N et les deltas qui le suivent. Un point de reprise écrit à une
+étape déjà journalisée ouvre une nouvelle branche : l'historique qui le
+suivait est ignoré (retour en arrière puis reprise de la simulation).
+"""
+
+import bisect
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from fourmi.instantane import COMPRESSIONS, TYPE_FOURMI, decoder_instantane, encoder_instantane, \
+    fourmis_depuis_table, table_fourmis
+from fourmi.ordonnanceur import CASES_MAX, cases_modifiees
+from fourmi.regles import LANGTON, Regle
+
+SIGNATURE = b'FRMJ'
+VERSION = 2
+EN_TETE_FICHIER = struct.Struct('<4sH')
+LONGUEUR_REGLE = struct.Struct('<H')  # Version 2 : suivi de la règle, en UTF-8
+EN_TETE = struct.Struct('<cBQIIII')
+POINT = b'P'
+DELTA = b'D'
+
+
+class Journal:
+    """Journal des modifications, en ajout seul, avec points de reprise périodiques.
+
+    Attributs:
+        chemin (str): Le fichier du journal.
+        intervalle_points (int): Le nombre d'étapes entre deux points de reprise.
+        compression (str): La compression des points de reprise et des deltas.
+        regle (Regle): La règle des fourmis journalisées.
+        etape (int): L'étape atteinte par le journal (None s'il est vide).
+    """
+
+    def __init__(self, chemin, intervalle_points=10000, compression='zlib', regle=None):
+        """Ouvre (ou crée) le journal et relit son index.
+
+        Args:
+            chemin (str): Le fichier du journal.
+            intervalle_points (int): Le nombre d'étapes entre deux points de reprise.
+            compression (str): 'aucune' ou 'zlib' pour les deltas, et aussi 'lz4'
+                pour les points de reprise.
+            regle (optional): La règle des fourmis (par défaut, la fourmi de Langton).
+
+        Raises:
+            ValueError: Si le fichier existe mais n'est pas un journal, ou s'il
+                contient des étapes simulées avec une autre règle.
+        """
+        self.chemin = chemin
+        self.intervalle_points = intervalle_points
+        self.compression = compression
+        self.regle = Regle.depuis_config(regle)
+        self._taille_en_tete = EN_TETE_FICHIER.size
+        self._fichier = open(chemin, 'a+b')  # pylint: disable=consider-using-with
+        self._index = []  # [type, étape, fin, nombre de fourmis, compression, position, taille]
+        self._points = []  # Position dans l'index de chaque point de reprise
+        self.etape = None
+        self._relire()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def fermer(self):
+        """Ferme le fichier du journal."""
+        self._fichier.close()
+
+    @property
+    def etape_min(self):
+        """int: La plus ancienne étape que le journal peut restituer (None s'il est vide)."""
+        return self._index[0][1] if self._index else None
+
+    @property
+    def etapes_points(self):
+        """list: Les étapes des points de reprise de la branche courante."""
+        return [self._index[i][1] for i in self._points]
+
+    def _relire(self):
+        """Relit les en-têtes du fichier et supprime un éventuel enregistrement final incomplet."""
+        fichier = self._fichier
+        fichier.seek(0, os.SEEK_END)
+        fin = fichier.tell()
+        if fin == 0:
+            self._ecrire_en_tete()
+            return
+        regle = self._lire_en_tete(fin)
+        position = self._taille_en_tete
+        while position + EN_TETE.size <= fin:
+            fichier.seek(position)
+            type_, code, etape, n_etapes, n_fourmis, taille, somme = EN_TETE.unpack(fichier.read(EN_TETE.size))
+            donnees = fichier.read(taille)
+            if type_ not in (POINT, DELTA) or len(donnees) < taille or zlib.crc32(donnees) != somme:
+                break
+            if type_ == POINT:
+                self._indexer_point(etape, position + EN_TETE.size, taille)
+            elif self.etape == etape:
+                self._index.append([DELTA, etape, etape + n_etapes, n_fourmis, code, position + EN_TETE.size, taille])
+                self.etape = etape + n_etapes
+            else:
+                break
+            position += EN_TETE.size + taille
+        if position < fin:
+            fichier.truncate(position)
+        if regle != self.regle:
+            if self._index:
+                raise ValueError(f"{self.chemin} a été écrit avec la règle {regle.nom}, pas {self.regle.nom}.")
+            self._ecrire_en_tete()
+
+    def _lire_en_tete(self, fin):
+        """Lit l'en-tête du fichier et retourne la règle qu'il donne."""
+        fichier = self._fichier
+        fichier.seek(0)
+        signature, version = EN_TETE_FICHIER.unpack(fichier.read(EN_TETE_FICHIER.size)) \
+            if fin >= EN_TETE_FICHIER.size else (None, None)
+        if signature != SIGNATURE or version not in (1, VERSION):
+            raise ValueError(f"{self.chemin} n'est pas un journal de la Fourmi de Langton.")
+        if version == 1:
+            self._taille_en_tete = EN_TETE_FICHIER.size
+            return LANGTON
+        longueur, = LONGUEUR_REGLE.unpack(fichier.read(LONGUEUR_REGLE.size).ljust(LONGUEUR_REGLE.size, b'\0'))
+        nom = fichier.read(longueur)
+        if len(nom) < longueur:
+            raise ValueError(f"{self.chemin} n'est pas un journal de la Fourmi de Langton.")
+        self._taille_en_tete = EN_TETE_FICHIER.size + LONGUEUR_REGLE.size + longueur
+        return Regle.depuis_config(nom.decode('utf-8'))
+
+    def _ecrire_en_tete(self):
+        """Remplace le contenu du fichier par l'en-tête qui donne la règle du journal."""
+        nom = self.regle.nom.encode('utf-8')
+        self._fichier.truncate(0)
+        self._fichier.write(EN_TETE_FICHIER.pack(SIGNATURE, VERSION) + LONGUEUR_REGLE.pack(len(nom)) + nom)
+        self._fichier.flush()
+        self._taille_en_tete = EN_TETE_FICHIER.size + LONGUEUR_REGLE.size + len(nom)
+
+    def _indexer_point(self, etape, position, taille):
+        """Ajoute un point de reprise à l'index, en coupant l'historique qui le suivait."""
+        while self._index and self._index[-1][1] >= etape:
+            if self._index.pop()[0] == POINT:
+                self._points.pop()
+        if self._index and self._index[-1][0] == DELTA:
+            self._index[-1][2] = min(self._index[-1][2], etape)  # Fin du delta dans la nouvelle branche
+        self._points.append(len(self._index))
+        self._index.append([POINT, etape, etape, 0, 0, position, taille])
+        self.etape = etape
+
+    def _ajouter(self, type_, code, etape, n_etapes, n_fourmis, donnees):
+        """Écrit un enregistrement en fin de fichier et retourne la position de ses données."""
+        self._fichier.seek(0, os.SEEK_END)
+        position = self._fichier.tell() + EN_TETE.size
+        self._fichier.write(EN_TETE.pack(type_, code, etape, n_etapes, n_fourmis, len(donnees), zlib.crc32(donnees)))
+        self._fichier.write(donnees)
+        self._fichier.flush()
+        return position
+
+    def _lire(self, position, taille):
+        """Lit les données d'un enregistrement."""
+        self._fichier.seek(position)
+        return self._fichier.read(taille)
+
+    def vider(self):
+        """Efface tout l'historique (nouvelle partie)."""
+        self._fichier.truncate(self._taille_en_tete)
+        self._index, self._points = [], []
+        self.etape = None
+
+    def point_de_reprise(self, grille, fourmis, etape=None):
+        """Écrit un instantané complet, synchronisé sur le disque.
+
+        Une étape antérieure à ``etape`` ouvre une nouvelle branche de l'historique.
+
+        Args:
+            grille (Grille): La grille de la simulation.
+            fourmis (list): La liste des fourmis.
+            etape (int, optional): L'étape de l'instantané (par défaut, l'étape du journal).
+        """
+        etape = (self.etape or 0) if etape is None else etape
+        donnees = encoder_instantane(grille, fourmis, etape, self.compression)
+        position = self._ajouter(POINT, COMPRESSIONS[self.compression], etape, 0, 0, donnees)
+        os.fsync(self._fichier.fileno())
+        self._indexer_point(etape, position, len(donnees))
+
+    def enregistrer(self, cellules, directions, fourmis):
+        """Ajoute les modifications d'un lot d'étapes, à partir de l'étape du journal.
+
+        Args:
+            cellules (numpy.ndarray): L'indice de la case modifiée par chaque fourmi,
+                tableau (étapes, fourmis) renvoyé par ``Moteur.tracer``.
+            directions (numpy.ndarray): La direction (et l'état) de chaque fourmi avant chaque étape.
+            fourmis (list): Les fourmis à la fin du lot, dans l'ordre des colonnes.
+
+        Raises:
+            ValueError: Si le journal n'a pas encore de point de reprise.
+        """
+        if self.etape is None:
+            raise ValueError("Le journal doit commencer par un point de reprise.")
+        n_etapes, n_fourmis = cellules.shape
+        if not n_etapes:
+            return
+        table = table_fourmis(fourmis)
+        donnees = (np.ascontiguousarray(cellules, dtype='<i4').tobytes()
+                   + np.ascontiguousarray(directions, dtype=np.uint8).tobytes() + table.tobytes())
+        code = COMPRESSIONS['aucune' if self.compression == 'aucune' else 'zlib']  # Deltas : zlib ou rien
+        if code:
+            donnees = zlib.compress(donnees, 1)
+        position = self._ajouter(DELTA, code, self.etape, n_etapes, n_fourmis, donnees)
+        self._index.append([DELTA, self.etape, self.etape + n_etapes, n_fourmis, code, position, len(donnees)])
+        self.etape += n_etapes
+
+    def avancer(self, moteur, grille, fourmis, n_etapes, cases_max=CASES_MAX, statistiques=None):
+        """Simule ``n_etapes`` étapes en les journalisant, comme ``ordonnanceur.avancer``.
+
+        Un point de reprise est ajouté toutes les ``intervalle_points`` étapes, et
+        à chaque agrandissement d'une grille extensible : les indices des deltas
+        sont ceux des dimensions du point de reprise qui les précède. Les étapes
+        tracées mettent aussi à jour les statistiques, s'il y en a.
+
+        Args:
+            moteur (Moteur): Le moteur de simulation.
+            grille (Grille): La grille de la simulation.
+            fourmis (list): La liste des fourmis.
+            n_etapes (int): Le nombre d'étapes à simuler.
+            cases_max (int): Le nombre maximal de cases relevées une à une.
+            statistiques (Statistiques, optional): Les statistiques à tenir à jour.
+
+        Returns:
+            list | Zone: Les cases (x, y) modifiées s'il y en a au plus ``cases_max``, sinon
+            le rectangle qui les contient ; None si la grille a été agrandie.
+        """
+        if self.etape is None:
+            self.point_de_reprise(grille, fourmis, 0)
+        modifiees, agrandie = [], False
+        restant = n_etapes
+        while restant > 0:
+            if statistiques is None:
+                cellules, directions = moteur.tracer(grille, fourmis, restant)
+            else:
+                cellules, directions, couleurs = moteur.tracer(grille, fourmis, restant, couleurs=True)
+                statistiques.observer(grille, cellules, directions, couleurs, fourmis)
+            restant -= len(cellules)
+            if grille.topologie == 'extensible' and any(
+                    not (0 <= f.x < grille.largeur and 0 <= f.y < grille.hauteur) for f in fourmis):
+                # Une fourmi est sortie de la grille : la dernière étape est dans le
+                # point de reprise qui suit l'agrandissement
+                table = table_fourmis(fourmis)
+                table['x'], table['y'] = cellules[-1] % grille.largeur, cellules[-1] // grille.largeur
+                table['direction'] = directions[-1]
+                self.enregistrer(cellules[:-1], directions[:-1], fourmis_depuis_table(table))
+                grille.etendre(fourmis)
+                self.point_de_reprise(grille, fourmis, self.etape + 1)
+                agrandie = True
+                continue
+            self.enregistrer(cellules, directions, fourmis)
+            modifiees.append(cellules)
+        if self.etape - self.etapes_points[-1] >= self.intervalle_points:
+            self.point_de_reprise(grille, fourmis)
+        return None if agrandie else cases_modifiees(grille, modifiees, cases_max)
+
+    def _decoder_delta(self, entree):
+        """Retourne les cases, les directions et la table finale d'un delta."""
+        _, _, _, n_fourmis, code, position, taille = entree
+        donnees = self._lire(position, taille)
+        if code:
+            donnees = zlib.decompress(donnees)
+        n = (len(donnees) - n_fourmis * TYPE_FOURMI.itemsize) // 5  # 4 octets de case et 1 de direction
+        lignes = n // n_fourmis if n_fourmis else 0
+        cellules = np.frombuffer(donnees, dtype='<i4', count=n).reshape(lignes, n_fourmis)
+        directions = np.frombuffer(donnees, dtype=np.uint8, count=n, offset=4 * n).reshape(lignes, n_fourmis)
+        table = np.frombuffer(donnees, dtype=TYPE_FOURMI, count=n_fourmis, offset=5 * n)
+        return cellules, directions, table
+
+    def etat_a(self, etape, stockage='octets'):
+        """Reconstruit l'état de la simulation à une étape passée.
+
+        Args:
+            etape (int): L'étape voulue, entre ``etape_min`` et ``etape``.
+            stockage (str): Le stockage de la grille recréée ('octets' ou 'bits').
+
+        Returns:
+            tuple: La grille et la liste des fourmis à cette étape.
+
+        Raises:
+            ValueError: Si l'étape n'est pas dans le journal.
+        """
+        if self.etape is None or not self.etape_min <= etape <= self.etape:
+            raise ValueError(f"L'étape {etape} n'est pas dans le journal.")
+        debut = self._points[bisect.bisect_right(self.etapes_points, etape) - 1]
+        position, taille = self._index[debut][5:]
+        grille, fourmis, _ = decoder_instantane(self._lire(position, taille), stockage)
+
+        modifiees, avant = [], []
+        for entree in self._index[debut + 1:]:
+            if entree[0] != DELTA or entree[1] >= etape:
+                break
+            cellules, directions, table = self._decoder_delta(entree)
+            lignes = min(entree[2], etape) - entree[1]
+            modifiees.append(cellules[:lignes].ravel())
+            avant.append(directions[:lignes].ravel())
+            if lignes < len(cellules):
+                table = table.copy()
+                table['x'], table['y'] = cellules[lignes] % grille.largeur, cellules[lignes] // grille.largeur
+                table['direction'] = directions[lignes]
+            fourmis = fourmis_depuis_table(table)
+
+        if modifiees:
+            tableau = grille.vers_tableau()
+            self._rejouer(tableau, np.concatenate(modifiees), np.concatenate(avant))
+            grille.depuis_tableau(tableau)
+        return grille, fourmis
+
+    def _rejouer(self, tableau, cellules, directions):
+        """Applique aux cases les modifications des étapes journalisées, dans l'ordre.
+
+        Pour une règle cyclique, la couleur d'une case ne dépend que du nombre de
+        passages ; pour une turmite, chaque passage lit l'état de la fourmi
+        (rangé avec sa direction) et la couleur laissée par le précédent.
+        """
+        regle = self.regle
+        if regle.langton:
+            parite = np.bincount(cellules, minlength=tableau.size) & 1
+            tableau ^= parite.astype(np.uint8).reshape(tableau.shape)
+        elif regle.cyclique:
+            passages = np.bincount(cellules, minlength=tableau.size) % regle.n_couleurs
+            tableau[...] = (tableau + passages.reshape(tableau.shape)) % regle.n_couleurs
+        else:
+            plat = tableau.reshape(-1)
+            couleurs, n_couleurs = regle.couleurs.tolist(), regle.n_couleurs
+            for p, d in zip(cellules.tolist(), directions.tolist()):
+                plat[p] = couleurs[(d >> 2) * n_couleurs + plat[p]]
+
+    def dernier_etat(self, stockage='octets'):
+        """Reconstruit le dernier état journalisé (reprise après un arrêt).
+
+        Args:
+            stockage (str): Le stockage de la grille recréée ('octets' ou 'bits').
+
+        Returns:
+            tuple: La grille, la liste des fourmis et l'étape, ou None si le journal est vide.
+        """
+        if self.etape is None:
+            return None
+        grille, fourmis = self.etat_a(self.etape, stockage)
+        return grille, fourmis, self.etape
@@ -0,0 +1,312 @@
+"""
+Module des mesures de performance : chronomètres par phase, profilage et métriques Prometheus.
+
+- ``Chronometres`` mesure la durée de chaque phase d'une boucle (simulation,
+  rendu, sauvegarde, envoi...). Désactivé, il ne fait qu'un test par phase.
+- ``profiler`` enregistre le profil d'un bloc de code avec cProfile, ou avec
+  pyinstrument s'il est installé.
+- ``Registre`` tient des compteurs, des jauges et des histogrammes, et les écrit
+  dans le format texte de Prometheus (``GET /metrics`` du serveur).
+"""
+
+import bisect
+import contextlib
+import time
+
+PROFILEURS = ('cprofile', 'pyinstrument')
+
+
+class Chronometres:
+    """Durées des phases d'une boucle, mesurées à chaque passage.
+
+    Les phases se suivent : ``demarrer`` marque le début d'un tour de boucle, et
+    chaque ``noter`` attribue à une phase le temps écoulé depuis la marque
+    précédente. Une phase sautée pendant un tour (une sauvegarde qui n'était
+    pas due) compte pour une durée presque nulle : la moyenne est le coût par
+    tour, et le maximum les pics.
+
+    Attributs:
+        actif (bool): Faux pour ne rien mesurer.
+        phases (dict): Pour chaque phase, dans l'ordre de la première mesure :
+            [nombre de passages, durée totale, moyenne glissante, durée maximale], en secondes.
+    """
+
+    def __init__(self, actif=False):
+        """Initialise des chronomètres vides.
+
+        Args:
+            actif (bool): Mesurer les phases dès maintenant.
+        """
+        self.actif = actif
+        self.phases = {}
+        self._marque = time.perf_counter()
+
+    def demarrer(self):
+        """Marque le début d'un tour de boucle."""
+        if self.actif:
+            self._marque = time.perf_counter()
+
+    def noter(self, nom):
+        """Attribue à une phase le temps écoulé depuis la marque précédente.
+
+        Args:
+            nom (str): Le nom de la phase qui vient de se terminer.
+        """
+        if not self.actif:
+            return
+        maintenant = time.perf_counter()
+        self.ajouter(nom, maintenant - self._marque)
+        self._marque = maintenant
+
+    def ajouter(self, nom, duree):
+        """Ajoute une durée mesurée à une phase.
+
+        Args:
+            nom (str): Le nom de la phase.
+            duree (float): La durée en secondes.
+        """
+        phase = self.phases.get(nom)
+        if phase is None:
+            self.phases[nom] = [1, duree, duree, duree]
+            return
+        phase[0] += 1
+        phase[1] += duree
+        phase[2] = 0.9 * phase[2] + 0.1 * duree
+        phase[3] = max(phase[3], duree)
+
+    def reinitialiser(self):
+        """Oublie toutes les mesures."""
+        self.phases = {}
+
+    def resume(self):
+        """Résume les mesures de chaque phase.
+
+        Returns:
+            dict: Pour chaque phase, le nombre de passages, la durée totale (s),
+            la moyenne et le maximum (ms).
+        """
+        return {nom: {"nombre": n, "total_s": total, "moyenne_ms": total / n * 1000, "max_ms": maximum * 1000}
+                for nom, (n, total, _, maximum) in self.phases.items()}
+
+    def texte(self):
+        """Retourne une ligne courte des durées récentes, pour l'affichage à l'écran.
+
+        Returns:
+            str: La moyenne glissante de chaque phase, en ms.
+        """
+        return "  ".join(f"{nom} {moyenne * 1000:.1f} ms" for nom, (_, _, moyenne, _) in self.phases.items())
+
+
+@contextlib.contextmanager
+def profiler(chemin, outil='cprofile'):
+    """Profile le bloc ``with`` et écrit le profil dans un fichier à sa sortie.
+
+    cProfile écrit un fichier ``pstats`` (``python -m pstats chemin``), qui ne
+    couvre que le fil d'exécution principal ; pyinstrument écrit une page HTML.
+
+    Args:
+        chemin (str): Le fichier du profil.
+        outil (str): 'cprofile' ou 'pyinstrument'.
+
+    Yields:
+        Le profileur en cours.
+
+    Raises:
+        ValueError: Si l'outil est inconnu ou n'est pas installé.
+    """
+    if outil == 'cprofile':
+        import cProfile  # pylint: disable=import-outside-toplevel
+        profil = cProfile.Profile()
+        profil.enable()
+        try:
+            yield profil
+        finally:
+            profil.disable()
+            profil.dump_stats(chemin)
+    elif outil == 'pyinstrument':
+        try:
+            import pyinstrument  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            raise ValueError("Le profileur pyinstrument n'est pas installé.") from None
+        profil = pyinstrument.Profiler()
+        profil.start()
+        try:
+            yield profil
+        finally:
+            profil.stop()
+            with open(chemin, 'w', encoding='utf-8') as fichier:
+                fichier.write(profil.output_html())
+    else:
+        raise ValueError(f"Profileur inconnu : {outil!r} (attendus : {', '.join(PROFILEURS)}).")
+
+
+def _valeur(valeur):
+    """Écrit un nombre dans le format de Prometheus."""
+    if valeur == float('inf'):
+        return "+Inf"
+    return str(int(valeur)) if float(valeur).is_integer() else repr(float(valeur))
+
+
+def _etiquettes(noms, valeurs):
+    """Écrit les étiquettes d'une série dans le format de Prometheus."""
+    if not noms:
+        return ""
+    echappees = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for v in valeurs)
+    return "{" + ",".join(f'{nom}="{valeur}"' for nom, valeur in zip(noms, echappees)) + "}"
+
+
+class Metrique:
+    """Métrique à étiquettes : une série de valeurs par combinaison d'étiquettes.
+
+    Attributs:
+        nom (str): Le nom de la métrique.
+        aide (str): La description de la métrique.
+        etiquettes (tuple): Les noms des étiquettes.
+        series (dict): La valeur de chaque série, indexée par les valeurs des étiquettes.
+    """
+
+    TYPE = None
+
+    def __init__(self, nom, aide, etiquettes=()):
+        self.nom = nom
+        self.aide = aide
+        self.etiquettes = tuple(etiquettes)
+        self.series = {}
+
+    def _cle(self, etiquettes):
+        """Retourne la clé de la série décrite par les étiquettes."""
+        try:
+            return tuple(str(etiquettes[nom]) for nom in self.etiquettes)
+        except KeyError:
+            raise ValueError(f"La métrique {self.nom} demande les étiquettes {', '.join(self.etiquettes)}.") from None
+
+    def vider(self):
+        """Supprime toutes les séries (par exemple celles des sessions supprimées)."""
+        self.series = {}
+
+    def lignes(self):
+        """Retourne les lignes de la métrique dans le format de Prometheus."""
+        lignes = [f"# HELP {self.nom} {self.aide}", f"# TYPE {self.nom} {self.TYPE}"]
+        lignes.extend(f"{self.nom}{_etiquettes(self.etiquettes, cle)} {_valeur(valeur)}"
+                      for cle, valeur in self.series.items())
+        return lignes
+
+
+class Compteur(Metrique):
+    """Valeur qui ne fait que croître (nombre de requêtes, secondes de calcul...)."""
+
+    TYPE = 'counter'
+
+    def incrementer(self, valeur=1, **etiquettes):
+        """Ajoute ``valeur`` à la série décrite par les étiquettes.
+
+        Args:
+            valeur (float): La valeur ajoutée, positive.
+            **etiquettes: La valeur de chaque étiquette.
+        """
+        cle = self._cle(etiquettes)
+        self.series[cle] = self.series.get(cle, 0) + valeur
+
+
+class Jauge(Metrique):
+    """Valeur qui monte et descend (étape d'une session, vitesse...)."""
+
+    TYPE = 'gauge'
+
+    def definir(self, valeur, **etiquettes):
+        """Fixe la valeur de la série décrite par les étiquettes.
+
+        Args:
+            valeur (float): La nouvelle valeur.
+            **etiquettes: La valeur de chaque étiquette.
+        """
+        self.series[self._cle(etiquettes)] = valeur
+
+
+class Histogramme(Metrique):
+    """Répartition d'observations (durées, tailles) dans des intervalles cumulés.
+
+    Attributs:
+        bornes (tuple): Les bornes supérieures des intervalles, croissantes.
+    """
+
+    TYPE = 'histogram'
+
+    def __init__(self, nom, aide, etiquettes=(), bornes=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)):
+        super().__init__(nom, aide, etiquettes)
+        self.bornes = tuple(sorted(bornes))
+
+    def observer(self, valeur, **etiquettes):
+        """Ajoute une observation à la série décrite par les étiquettes.
+
+        Args:
+            valeur (float): L'observation.
+            **etiquettes: La valeur de chaque étiquette.
+        """
+        cle = self._cle(etiquettes)
+        serie = self.series.get(cle)
+        if serie is None:
+            serie = self.series[cle] = [[0] * (len(self.bornes) + 1), 0.0, 0]  # Intervalles, somme, nombre
+        serie[0][bisect.bisect_left(self.bornes, valeur)] += 1
+        serie[1] += valeur
+        serie[2] += 1
+
+    def lignes(self):
+        lignes = [f"# HELP {self.nom} {self.aide}", f"# TYPE {self.nom} {self.TYPE}"]
+        noms = self.etiquettes + ('le',)
+        for cle, (intervalles, somme, nombre) in self.series.items():
+            cumul = 0
+            for borne, n in zip(self.bornes + (float('inf'),), intervalles):
+                cumul += n
+                lignes.append(f"{self.nom}_bucket{_etiquettes(noms, cle + (_valeur(borne),))} {cumul}")
+            lignes.append(f"{self.nom}_sum{_etiquettes(self.etiquettes, cle)} {_valeur(somme)}")
+            lignes.append(f"{self.nom}_count{_etiquettes(self.etiquettes, cle)} {nombre}")
+        return lignes
+
+
+class Registre:
+    """Ensemble de métriques exposées ensemble."""
+
+    TYPE_CONTENU = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metriques = {}
+
+    def _ajouter(self, metrique):
+        """Enregistre une métrique, dont le nom doit être nouveau."""
+        if metrique.nom in self._metriques:
+            raise ValueError(f"La métrique {metrique.nom} existe déjà.")
+        self._metriques[metrique.nom] = metrique
+        return metrique
+
+    def compteur(self, nom, aide, etiquettes=()):
+        """Crée et enregistre un compteur.
+
+        Returns:
+            Compteur: Le compteur.
+        """
+        return self._ajouter(Compteur(nom, aide, etiquettes))
+
+    def jauge(self, nom, aide, etiquettes=()):
+        """Crée et enregistre une jauge.
+
+        Returns:
+            Jauge: La jauge.
+        """
+        return self._ajouter(Jauge(nom, aide, etiquettes))
+
+    def histogramme(self, nom, aide, etiquettes=(), **options):
+        """Crée et enregistre un histogramme (``bornes`` en option).
+
+        Returns:
+            Histogramme: L'histogramme.
+        """
+        return self._ajouter(Histogramme(nom, aide, etiquettes, **options))
+
+    def exposer(self):
+        """Écrit toutes les métriques dans le format texte de Prometheus.
+
+        Returns:
+            str: Le texte servi à Prometheus.
+        """
+        return "\n".join(ligne for metrique in self._metriques.values() for ligne in metrique.lignes()) + "\n"
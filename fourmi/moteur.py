@@ -0,0 +1,1290 @@
+"""
+Module du moteur de simulation par lots de la Fourmi de Langton.
+
+Le moteur fait avancer toutes les fourmis de plusieurs étapes d'un coup, sans
+appeler les méthodes de ``Fourmi`` à chaque étape : les directions sont des
+entiers, les déplacements sont lus dans des tables et la grille est parcourue
+comme un tableau plat. Le résultat est identique à celui de ``Fourmi.etape``
+appelée fourmi par fourmi, y compris au bord de la grille : blocage, retour par
+le côté opposé (tore) ou arrêt du noyau pour agrandir la grille (extensible).
+
+Les autres règles (fourmis à plusieurs couleurs, turmites, voir
+``fourmi.regles``) passent par des noyaux qui lisent la table de transitions à
+chaque étape ; la fourmi de Langton garde ses noyaux spécialisés.
+
+Une grille à un bit par case n'est jamais décompactée en entier : les noyaux
+travaillent sur une région décompactée autour des fourmis (``_Fenetre``), où
+ils s'arrêtent comme au bord d'une grille extensible, et le saut de périodes
+lit et écrit directement les bits.
+
+Si ``numba`` est installé, les noyaux de calcul sont compilés à la volée et
+relâchent le GIL, ce qui permet de simuler dans un fil d'exécution séparé.
+numba n'est importé qu'au premier appel d'un noyau compilé : importer ce
+module reste rapide, ce qui compte pour les processus de courte durée.
+"""
+
+import importlib.util
+
+import numpy as np
+
+from fourmi.colonie import Colonie
+from fourmi.fourmi import DX, DY
+from fourmi.regles import Regle
+
+# numba est optionnel, et n'est importé qu'à la première compilation (voir ``_jit``)
+JIT_DISPONIBLE = importlib.util.find_spec('numba') is not None
+
+# Topologies, sous la forme lue par les noyaux : le tore, ou un bit par côté de la grille
+# par lequel une fourmi sort (le noyau s'arrête alors) ; aux autres côtés, elle est bloquée
+_TORE = 1
+_SORTIE_HAUT, _SORTIE_DROITE, _SORTIE_BAS, _SORTIE_GAUCHE = 2, 4, 8, 16
+_EXTENSIBLE = _SORTIE_HAUT | _SORTIE_DROITE | _SORTIE_BAS | _SORTIE_GAUCHE
+TOPOLOGIES = {'borne': 0, 'tore': _TORE, 'extensible': _EXTENSIBLE}
+
+
+def _noyau_une_fourmi(cases, largeur, hauteur, topologie, x, y, d, n_etapes):
+    """Fait avancer une seule fourmi de ``n_etapes`` étapes.
+
+    Args:
+        cases: Les cases de la grille, sous forme de tableau plat modifiable.
+        largeur (int): La largeur de la grille.
+        hauteur (int): La hauteur de la grille.
+        topologie (int): La topologie (voir ``TOPOLOGIES`` ; un bit par côté où le noyau s'arrête).
+        x (int): La position initiale en x.
+        y (int): La position initiale en y.
+        d (int): La direction initiale (0 à 3).
+        n_etapes (int): Le nombre d'étapes à simuler.
+
+    Returns:
+        tuple: La position et la direction finales (x, y, d), puis le nombre d'étapes simulées.
+    """
+    x_max = largeur - 1
+    y_max = hauteur - 1
+    p = y * largeur + x
+    for i in range(n_etapes):
+        c = cases[p]
+        if c == 0:
+            d = (d + 1) & 3
+        else:
+            d = (d - 1) & 3
+        cases[p] = c ^ 1
+        if d == 0:
+            if y > 0:
+                y -= 1
+                p -= largeur
+            elif topologie == _TORE:
+                y = y_max
+                p += y_max * largeur
+            elif topologie & _SORTIE_HAUT:
+                return x, y - 1, d, i + 1
+        elif d == 1:
+            if x < x_max:
+                x += 1
+                p += 1
+            elif topologie == _TORE:
+                x = 0
+                p -= x_max
+            elif topologie & _SORTIE_DROITE:
+                return x + 1, y, d, i + 1
+        elif d == 2:
+            if y < y_max:
+                y += 1
+                p += largeur
+            elif topologie == _TORE:
+                y = 0
+                p -= y_max * largeur
+            elif topologie & _SORTIE_BAS:
+                return x, y + 1, d, i + 1
+        elif x > 0:
+            x -= 1
+            p -= 1
+        elif topologie == _TORE:
+            x = x_max
+            p += x_max
+        elif topologie & _SORTIE_GAUCHE:
+            return x - 1, y, d, i + 1
+    return x, y, d, n_etapes
+
+
+def _noyau_trace(cases, largeur, hauteur, topologie, x, y, d, n_etapes, xs, ys, ds, cs):
+    """Fait avancer une seule fourmi en enregistrant son état avant chaque étape.
+
+    Args:
+        cases: Les cases de la grille, sous forme de tableau plat modifiable.
+        largeur (int): La largeur de la grille.
+        hauteur (int): La hauteur de la grille.
+        topologie (int): La topologie (voir ``TOPOLOGIES`` ; un bit par côté où le noyau s'arrête).
+        x (int): La position initiale en x.
+        y (int): La position initiale en y.
+        d (int): La direction initiale (0 à 3).
+        n_etapes (int): Le nombre d'étapes à simuler.
+        xs: Reçoit la position en x avant chaque étape.
+        ys: Reçoit la position en y avant chaque étape.
+        ds: Reçoit la direction avant chaque étape.
+        cs: Reçoit la couleur lue à chaque étape.
+
+    Returns:
+        tuple: La position et la direction finales (x, y, d), puis le nombre d'étapes simulées.
+    """
+    x_max = largeur - 1
+    y_max = hauteur - 1
+    for i in range(n_etapes):
+        p = y * largeur + x
+        c = cases[p]
+        xs[i] = x
+        ys[i] = y
+        ds[i] = d
+        cs[i] = c
+        if c == 0:
+            d = (d + 1) & 3
+        else:
+            d = (d - 1) & 3
+        cases[p] = c ^ 1
+        if d == 0:
+            if y > 0:
+                y -= 1
+            elif topologie == _TORE:
+                y = y_max
+            elif topologie & _SORTIE_HAUT:
+                return x, y - 1, d, i + 1
+        elif d == 1:
+            if x < x_max:
+                x += 1
+            elif topologie == _TORE:
+                x = 0
+            elif topologie & _SORTIE_DROITE:
+                return x + 1, y, d, i + 1
+        elif d == 2:
+            if y < y_max:
+                y += 1
+            elif topologie == _TORE:
+                y = 0
+            elif topologie & _SORTIE_BAS:
+                return x, y + 1, d, i + 1
+        elif x > 0:
+            x -= 1
+        elif topologie == _TORE:
+            x = x_max
+        elif topologie & _SORTIE_GAUCHE:
+            return x - 1, y, d, i + 1
+    return x, y, d, n_etapes
+
+
+def _noyau_colonie(cases, largeur, hauteur, topologie, xs, ys, ds, n_etapes):
+    """Fait avancer plusieurs fourmis de ``n_etapes`` étapes, dans l'ordre de la liste.
+
+    Args:
+        cases: Les cases de la grille, sous forme de tableau plat modifiable.
+        largeur (int): La largeur de la grille.
+        hauteur (int): La hauteur de la grille.
+        topologie (int): La topologie (voir ``TOPOLOGIES`` ; un bit par côté où le noyau s'arrête).
+        xs: Les positions en x des fourmis (modifiées sur place).
+        ys: Les positions en y des fourmis (modifiées sur place).
+        ds: Les directions des fourmis (modifiées sur place).
+        n_etapes (int): Le nombre d'étapes à simuler.
+
+    Returns:
+        int: Le nombre d'étapes simulées (moins de ``n_etapes`` si une fourmi est sortie
+        d'une grille extensible).
+    """
+    x_max = largeur - 1
+    y_max = hauteur - 1
+    n_fourmis = len(xs)
+    for etape in range(n_etapes):
+        sortie = False
+        for i in range(n_fourmis):
+            x = xs[i]
+            y = ys[i]
+            p = y * largeur + x
+            c = cases[p]
+            if c == 0:
+                d = (ds[i] + 1) & 3
+            else:
+                d = (ds[i] - 1) & 3
+            cases[p] = c ^ 1
+            if d == 0:
+                if y > 0:
+                    y -= 1
+                elif topologie == _TORE:
+                    y = y_max
+                elif topologie & _SORTIE_HAUT:
+                    y -= 1
+                    sortie = True
+            elif d == 1:
+                if x < x_max:
+                    x += 1
+                elif topologie == _TORE:
+                    x = 0
+                elif topologie & _SORTIE_DROITE:
+                    x += 1
+                    sortie = True
+            elif d == 2:
+                if y < y_max:
+                    y += 1
+                elif topologie == _TORE:
+                    y = 0
+                elif topologie & _SORTIE_BAS:
+                    y += 1
+                    sortie = True
+            elif x > 0:
+                x -= 1
+            elif topologie == _TORE:
+                x = x_max
+            elif topologie & _SORTIE_GAUCHE:
+                x -= 1
+                sortie = True
+            xs[i] = x
+            ys[i] = y
+            ds[i] = d
+        if sortie:
+            return etape + 1
+    return n_etapes
+
+
+def _noyau_trace_colonie(cases, largeur, hauteur, topologie, xs, ys, ds, n_etapes, ps, dss, css):
+    """Fait avancer plusieurs fourmis en enregistrant leur case, leur direction et la couleur lue à chaque étape.
+
+    Args:
+        cases: Les cases de la grille, sous forme de tableau plat modifiable.
+        largeur (int): La largeur de la grille.
+        hauteur (int): La hauteur de la grille.
+        topologie (int): La topologie (voir ``TOPOLOGIES`` ; un bit par côté où le noyau s'arrête).
+        xs: Les positions en x des fourmis (modifiées sur place).
+        ys: Les positions en y des fourmis (modifiées sur place).
+        ds: Les directions des fourmis (modifiées sur place).
+        n_etapes (int): Le nombre d'étapes à simuler.
+        ps: Reçoit, pour chaque étape et chaque fourmi, l'indice de la case inversée.
+        dss: Reçoit, pour chaque étape et chaque fourmi, la direction avant l'étape.
+        css: Reçoit, pour chaque étape et chaque fourmi, la couleur lue.
+
+    Returns:
+        int: Le nombre d'étapes simulées (moins de ``n_etapes`` si une fourmi est sortie
+        d'une grille extensible).
+    """
+    x_max = largeur - 1
+    y_max = hauteur - 1
+    n_fourmis = len(xs)
+    for e in range(n_etapes):
+        sortie = False
+        for i in range(n_fourmis):
+            x = xs[i]
+            y = ys[i]
+            p = y * largeur + x
+            c = cases[p]
+            ps[e, i] = p
+            dss[e, i] = ds[i]
+            css[e, i] = c
+            if c == 0:
+                d = (ds[i] + 1) & 3
+            else:
+                d = (ds[i] - 1) & 3
+            cases[p] = c ^ 1
+            if d == 0:
+                if y > 0:
+                    y -= 1
+                elif topologie == _TORE:
+                    y = y_max
+                elif topologie & _SORTIE_HAUT:
+                    y -= 1
+                    sortie = True
+            elif d == 1:
+                if x < x_max:
+                    x += 1
+                elif topologie == _TORE:
+                    x = 0
+                elif topologie & _SORTIE_DROITE:
+                    x += 1
+                    sortie = True
+            elif d == 2:
+                if y < y_max:
+                    y += 1
+                elif topologie == _TORE:
+                    y = 0
+                elif topologie & _SORTIE_BAS:
+                    y += 1
+                    sortie = True
+            elif x > 0:
+                x -= 1
+            elif topologie == _TORE:
+                x = x_max
+            elif topologie & _SORTIE_GAUCHE:
+                x -= 1
+                sortie = True
+            xs[i] = x
+            ys[i] = y
+            ds[i] = d
+        if sortie:
+            return e + 1
+    return n_etapes
+
+
+def _noyau_couleurs(cases, largeur, hauteur, topologie, x, y, d, n_etapes, couleurs, virages):
+    """Fait avancer une seule fourmi d'une règle à un seul état (``LLRR``...) de ``n_etapes`` étapes.
+
+    Sans état à suivre, la transition ne dépend que de la couleur lue : c'est le
+    chemin le plus court après celui de la fourmi de Langton.
+
+    Args:
+        cases: Les cases de la grille, sous forme de tableau plat modifiable.
+        largeur (int): La largeur de la grille.
+        hauteur (int): La hauteur de la grille.
+        topologie (int): La topologie (voir ``TOPOLOGIES`` ; un bit par côté où le noyau s'arrête).
+        x (int): La position initiale en x.
+        y (int): La position initiale en y.
+        d (int): La direction initiale (0 à 3).
+        n_etapes (int): Le nombre d'étapes à simuler.
+        couleurs: La nouvelle couleur de chaque couleur.
+        virages: Le virage sur chaque couleur.
+
+    Returns:
+        tuple: La position et la direction finales (x, y, d), puis le nombre d'étapes simulées.
+    """
+    x_max = largeur - 1
+    y_max = hauteur - 1
+    p = y * largeur + x
+    for i in range(n_etapes):
+        c = cases[p]
+        cases[p] = couleurs[c]
+        d = (d + virages[c]) & 3
+        if d == 0:
+            if y > 0:
+                y -= 1
+                p -= largeur
+            elif topologie == _TORE:
+                y = y_max
+                p += y_max * largeur
+            elif topologie & _SORTIE_HAUT:
+                return x, y - 1, d, i + 1
+        elif d == 1:
+            if x < x_max:
+                x += 1
+                p += 1
+            elif topologie == _TORE:
+                x = 0
+                p -= x_max
+            elif topologie & _SORTIE_DROITE:
+                return x + 1, y, d, i + 1
+        elif d == 2:
+            if y < y_max:
+                y += 1
+                p += largeur
+            elif topologie == _TORE:
+                y = 0
+                p -= y_max * largeur
+            elif topologie & _SORTIE_BAS:
+                return x, y + 1, d, i + 1
+        elif x > 0:
+            x -= 1
+            p -= 1
+        elif topologie == _TORE:
+            x = x_max
+            p += x_max
+        elif topologie & _SORTIE_GAUCHE:
+            return x - 1, y, d, i + 1
+    return x, y, d, n_etapes
+
+
+def _noyau_table(cases, largeur, hauteur, topologie, x, y, d, e, n_etapes, couleurs, virages, etats, n_couleurs):
+    """Fait avancer une seule fourmi de ``n_etapes`` étapes selon une table de transitions.
+
+    Args:
+        cases: Les cases de la grille, sous forme de tableau plat modifiable.
+        largeur (int): La largeur de la grille.
+        hauteur (int): La hauteur de la grille.
+        topologie (int): La topologie (voir ``TOPOLOGIES`` ; un bit par côté où le noyau s'arrête).
+        x (int): La position initiale en x.
+        y (int): La position initiale en y.
+        d (int): La direction initiale (0 à 3).
+        e (int): L'état initial.
+        n_etapes (int): Le nombre d'étapes à simuler.
+        couleurs: La nouvelle couleur de chaque transition (voir ``Regle``).
+        virages: Le virage de chaque transition.
+        etats: Le nouvel état de chaque transition.
+        n_couleurs (int): Le nombre de couleurs de la règle.
+
+    Returns:
+        tuple: La position, la direction et l'état finaux (x, y, d, e), puis le nombre d'étapes simulées.
+    """
+    x_max = largeur - 1
+    y_max = hauteur - 1
+    p = y * largeur + x
+    for i in range(n_etapes):
+        t = e * n_couleurs + cases[p]
+        cases[p] = couleurs[t]
+        d = (d + virages[t]) & 3
+        e = etats[t]
+        if d == 0:
+            if y > 0:
+                y -= 1
+                p -= largeur
+            elif topologie == _TORE:
+                y = y_max
+                p += y_max * largeur
+            elif topologie & _SORTIE_HAUT:
+                return x, y - 1, d, e, i + 1
+        elif d == 1:
+            if x < x_max:
+                x += 1
+                p += 1
+            elif topologie == _TORE:
+                x = 0
+                p -= x_max
+            elif topologie & _SORTIE_DROITE:
+                return x + 1, y, d, e, i + 1
+        elif d == 2:
+            if y < y_max:
+                y += 1
+                p += largeur
+            elif topologie == _TORE:
+                y = 0
+                p -= y_max * largeur
+            elif topologie & _SORTIE_BAS:
+                return x, y + 1, d, e, i + 1
+        elif x > 0:
+            x -= 1
+            p -= 1
+        elif topologie == _TORE:
+            x = x_max
+            p += x_max
+        elif topologie & _SORTIE_GAUCHE:
+            return x - 1, y, d, e, i + 1
+    return x, y, d, e, n_etapes
+
+
+def _noyau_trace_table(cases, largeur, hauteur, topologie, x, y, d, e, n_etapes, couleurs, virages, etats,
+                       n_couleurs, xs, ys, ds, cs):
+    """Fait avancer une seule fourmi selon une table en enregistrant son état avant chaque étape.
+
+    Args:
+        cases: Les cases de la grille, sous forme de tableau plat modifiable.
+        largeur (int): La largeur de la grille.
+        hauteur (int): La hauteur de la grille.
+        topologie (int): La topologie (voir ``TOPOLOGIES`` ; un bit par côté où le noyau s'arrête).
+        x (int): La position initiale en x.
+        y (int): La position initiale en y.
+        d (int): La direction initiale (0 à 3).
+        e (int): L'état initial.
+        n_etapes (int): Le nombre d'étapes à simuler.
+        couleurs: La nouvelle couleur de chaque transition (voir ``Regle``).
+        virages: Le virage de chaque transition.
+        etats: Le nouvel état de chaque transition.
+        n_couleurs (int): Le nombre de couleurs de la règle.
+        xs: Reçoit la position en x avant chaque étape.
+        ys: Reçoit la position en y avant chaque étape.
+        ds: Reçoit la direction avant chaque étape.
+        cs: Reçoit la couleur lue à chaque étape.
+
+    Returns:
+        tuple: La position, la direction et l'état finaux (x, y, d, e), puis le nombre d'étapes simulées.
+    """
+    x_max = largeur - 1
+    y_max = hauteur - 1
+    for i in range(n_etapes):
+        p = y * largeur + x
+        c = cases[p]
+        xs[i] = x
+        ys[i] = y
+        ds[i] = d
+        cs[i] = c
+        t = e * n_couleurs + c
+        cases[p] = couleurs[t]
+        d = (d + virages[t]) & 3
+        e = etats[t]
+        if d == 0:
+            if y > 0:
+                y -= 1
+            elif topologie == _TORE:
+                y = y_max
+            elif topologie & _SORTIE_HAUT:
+                return x, y - 1, d, e, i + 1
+        elif d == 1:
+            if x < x_max:
+                x += 1
+            elif topologie == _TORE:
+                x = 0
+            elif topologie & _SORTIE_DROITE:
+                return x + 1, y, d, e, i + 1
+        elif d == 2:
+            if y < y_max:
+                y += 1
+            elif topologie == _TORE:
+                y = 0
+            elif topologie & _SORTIE_BAS:
+                return x, y + 1, d, e, i + 1
+        elif x > 0:
+            x -= 1
+        elif topologie == _TORE:
+            x = x_max
+        elif topologie & _SORTIE_GAUCHE:
+            return x - 1, y, d, e, i + 1
+    return x, y, d, e, n_etapes
+
+
+def _noyau_colonie_table(cases, largeur, hauteur, topologie, xs, ys, ds, es, n_etapes, couleurs, virages, etats,
+                         n_couleurs):
+    """Fait avancer plusieurs fourmis selon une table, dans l'ordre de la liste.
+
+    Args:
+        cases: Les cases de la grille, sous forme de tableau plat modifiable.
+        largeur (int): La largeur de la grille.
+        hauteur (int): La hauteur de la grille.
+        topologie (int): La topologie (voir ``TOPOLOGIES`` ; un bit par côté où le noyau s'arrête).
+        xs: Les positions en x des fourmis (modifiées sur place).
+        ys: Les positions en y des fourmis (modifiées sur place).
+        ds: Les directions des fourmis (modifiées sur place).
+        es: Les états des fourmis (modifiés sur place).
+        n_etapes (int): Le nombre d'étapes à simuler.
+        couleurs: La nouvelle couleur de chaque transition (voir ``Regle``).
+        virages: Le virage de chaque transition.
+        etats: Le nouvel état de chaque transition.
+        n_couleurs (int): Le nombre de couleurs de la règle.
+
+    Returns:
+        int: Le nombre d'étapes simulées (moins de ``n_etapes`` si une fourmi est sortie
+        d'une grille extensible).
+    """
+    x_max = largeur - 1
+    y_max = hauteur - 1
+    n_fourmis = len(xs)
+    for etape in range(n_etapes):
+        sortie = False
+        for i in range(n_fourmis):
+            x = xs[i]
+            y = ys[i]
+            p = y * largeur + x
+            t = es[i] * n_couleurs + cases[p]
+            cases[p] = couleurs[t]
+            d = (ds[i] + virages[t]) & 3
+            es[i] = etats[t]
+            if d == 0:
+                if y > 0:
+                    y -= 1
+                elif topologie == _TORE:
+                    y = y_max
+                elif topologie & _SORTIE_HAUT:
+                    y -= 1
+                    sortie = True
+            elif d == 1:
+                if x < x_max:
+                    x += 1
+                elif topologie == _TORE:
+                    x = 0
+                elif topologie & _SORTIE_DROITE:
+                    x += 1
+                    sortie = True
+            elif d == 2:
+                if y < y_max:
+                    y += 1
+                elif topologie == _TORE:
+                    y = 0
+                elif topologie & _SORTIE_BAS:
+                    y += 1
+                    sortie = True
+            elif x > 0:
+                x -= 1
+            elif topologie == _TORE:
+                x = x_max
+            elif topologie & _SORTIE_GAUCHE:
+                x -= 1
+                sortie = True
+            xs[i] = x
+            ys[i] = y
+            ds[i] = d
+        if sortie:
+            return etape + 1
+    return n_etapes
+
+
+def _noyau_trace_colonie_table(cases, largeur, hauteur, topologie, xs, ys, ds, es, n_etapes, couleurs, virages, etats,
+                               n_couleurs, ps, dss, css):
+    """Fait avancer plusieurs fourmis selon une table en enregistrant leur case, leur direction et la couleur lue.
+
+    La direction enregistrée porte aussi l'état de la fourmi : ``d | e << 2``.
+
+    Args:
+        cases: Les cases de la grille, sous forme de tableau plat modifiable.
+        largeur (int): La largeur de la grille.
+        hauteur (int): La hauteur de la grille.
+        topologie (int): La topologie (voir ``TOPOLOGIES`` ; un bit par côté où le noyau s'arrête).
+        xs: Les positions en x des fourmis (modifiées sur place).
+        ys: Les positions en y des fourmis (modifiées sur place).
+        ds: Les directions des fourmis (modifiées sur place).
+        es: Les états des fourmis (modifiés sur place).
+        n_etapes (int): Le nombre d'étapes à simuler.
+        couleurs: La nouvelle couleur de chaque transition (voir ``Regle``).
+        virages: Le virage de chaque transition.
+        etats: Le nouvel état de chaque transition.
+        n_couleurs (int): Le nombre de couleurs de la règle.
+        ps: Reçoit, pour chaque étape et chaque fourmi, l'indice de la case modifiée.
+        dss: Reçoit, pour chaque étape et chaque fourmi, la direction et l'état avant l'étape.
+        css: Reçoit, pour chaque étape et chaque fourmi, la couleur lue.
+
+    Returns:
+        int: Le nombre d'étapes simulées (moins de ``n_etapes`` si une fourmi est sortie
+        d'une grille extensible).
+    """
+    x_max = largeur - 1
+    y_max = hauteur - 1
+    n_fourmis = len(xs)
+    for e in range(n_etapes):
+        sortie = False
+        for i in range(n_fourmis):
+            x = xs[i]
+            y = ys[i]
+            p = y * largeur + x
+            c = cases[p]
+            ps[e, i] = p
+            dss[e, i] = ds[i] | (es[i] << 2)
+            css[e, i] = c
+            t = es[i] * n_couleurs + c
+            cases[p] = couleurs[t]
+            d = (ds[i] + virages[t]) & 3
+            es[i] = etats[t]
+            if d == 0:
+                if y > 0:
+                    y -= 1
+                elif topologie == _TORE:
+                    y = y_max
+                elif topologie & _SORTIE_HAUT:
+                    y -= 1
+                    sortie = True
+            elif d == 1:
+                if x < x_max:
+                    x += 1
+                elif topologie == _TORE:
+                    x = 0
+                elif topologie & _SORTIE_DROITE:
+                    x += 1
+                    sortie = True
+            elif d == 2:
+                if y < y_max:
+                    y += 1
+                elif topologie == _TORE:
+                    y = 0
+                elif topologie & _SORTIE_BAS:
+                    y += 1
+                    sortie = True
+            elif x > 0:
+                x -= 1
+            elif topologie == _TORE:
+                x = x_max
+            elif topologie & _SORTIE_GAUCHE:
+                x -= 1
+                sortie = True
+            xs[i] = x
+            ys[i] = y
+            ds[i] = d
+        if sortie:
+            return e + 1
+    return n_etapes
+
+
+_COMPILES = {}  # Noyaux déjà compilés par numba
+
+
+def _jit(noyau):
+    """Retourne la version compilée par numba d'un noyau.
+
+    numba est importé et le noyau compilé (ou relu du cache sur le disque) au
+    premier appel seulement : importer le moteur, ou simuler sans compilation,
+    ne charge pas numba.
+    """
+    compile_ = _COMPILES.get(noyau)
+    if compile_ is None:
+        import numba  # pylint: disable=import-outside-toplevel
+        compile_ = _COMPILES[noyau] = numba.njit(cache=True, nogil=True)(noyau)
+    return compile_
+
+
+def _detecter_periode(xs, ys, ds, cs, etat_final, periode_max, periodes=None):
+    """Cherche la plus petite période qui se répète sur les dernières étapes tracées.
+
+    Une période ``P`` est retenue si, sur les ``2 * P`` dernières étapes, la
+    couleur lue et la direction sont celles de ``P`` étapes plus tôt et si le
+    déplacement sur ``P`` étapes est constant et non nul.
+
+    Args:
+        xs (numpy.ndarray): Les positions en x avant chaque étape.
+        ys (numpy.ndarray): Les positions en y avant chaque étape.
+        ds (numpy.ndarray): Les directions avant chaque étape.
+        cs (numpy.ndarray): Les couleurs lues à chaque étape.
+        etat_final (tuple): La position et la direction (x, y, d) après la dernière étape.
+        periode_max (int): La plus grande période cherchée (la trace doit en couvrir trois).
+        periodes (iterable, optional): Les seules périodes essayées, croissantes et au plus ``periode_max``.
+
+    Returns:
+        int: La période trouvée, ou 0 si aucune.
+    """
+    n = len(xs)
+    x_fin, y_fin, d_fin = etat_final
+    for periode in range(1, periode_max + 1) if periodes is None else periodes:
+        debut = n - periode
+        if ds[debut] != d_fin:
+            continue
+        dx = x_fin - xs[debut]
+        dy = y_fin - ys[debut]
+        if dx == 0 and dy == 0:
+            continue
+        recent = slice(n - 2 * periode, n)
+        ancien = slice(n - 3 * periode, n - periode)
+        if (np.array_equal(cs[recent], cs[ancien]) and np.array_equal(ds[recent], ds[ancien])
+                and np.all(xs[recent] - xs[ancien] == dx) and np.all(ys[recent] - ys[ancien] == dy)):
+            return periode
+    return 0
+
+
+def _sauter_periodes(cases, largeur, hauteur, trace, etat_final, periode, n_periodes_max, virages=None):
+    """Applique d'un coup des périodes entières d'un cycle détecté, si c'est exact.
+
+    La dernière période tracée sert de motif : ensemble ``S`` des cases visitées
+    (relatives à la position de départ), couleurs ``G0`` trouvées à la première
+    visite et couleurs ``G1`` laissées. La période ``k`` se rejoue à l'identique
+    si, au moment où elle commence, les cases de ``S`` décalées de ``k``
+    déplacements valent ``G0``. Ces cases ont été écrites en dernier soit par une
+    période sautée (et valent alors ``G1`` à la position correspondante), soit
+    jamais par le saut (et on lit la grille). Le saut s'arrête à la première
+    période qui ne vérifie pas cette condition ou qui toucherait le bord.
+
+    Args:
+        cases (numpy.ndarray): Les cases de la grille, tableau plat modifiable.
+        largeur (int): La largeur de la grille.
+        hauteur (int): La hauteur de la grille.
+        trace (tuple): Les tableaux (xs, ys, ds, cs) de la trace.
+        etat_final (tuple): La position et la direction (x, y, d) après la trace.
+        periode (int): La période détectée.
+        n_periodes_max (int): Le nombre maximal de périodes à sauter.
+        virages (numpy.ndarray, optional): Le virage sur chaque couleur, pour une règle
+            à un seul état (par défaut, celui de la fourmi de Langton).
+
+    Returns:
+        int: Le nombre de périodes sautées (la fourmi est alors décalée d'autant).
+    """
+    # pylint: disable=too-many-locals
+    xs, ys, ds, cs = (t[-periode:] for t in trace)
+    x_fin, y_fin, _ = etat_final
+    x0, y0 = int(xs[0]), int(ys[0])
+    dx, dy = x_fin - x0, y_fin - y0
+
+    # Refuser un motif où la fourmi a été bloquée par un bord
+    if virages is None:
+        d_apres = np.where(cs == 0, ds + 1, ds - 1) & 3
+    else:
+        d_apres = (ds + np.take(virages.astype(np.int64), cs)) & 3
+    x_suivant = np.append(xs[1:], x_fin)
+    y_suivant = np.append(ys[1:], y_fin)
+    if (np.any(x_suivant - xs != np.take(DX, d_apres))
+            or np.any(y_suivant - ys != np.take(DY, d_apres))):
+        return 0
+
+    # Motif : cases visitées, couleur à la première visite et couleur actuelle
+    cles, premieres = np.unique((ys - y0) * (2 * periode + 1) + (xs - x0), return_index=True)
+    del cles
+    sx = (xs[premieres] - x0).astype(np.int64)
+    sy = (ys[premieres] - y0).astype(np.int64)
+    g0 = cs[premieres].astype(np.uint8)
+    bases = (y0 + sy) * largeur + (x0 + sx)
+    g1 = cases[bases]
+    pas = dy * largeur + dx
+
+    # Bords : toutes les périodes sautées et la position finale restent dans la grille
+    n_bord = n_periodes_max + 1
+    for bas, haut, delta, taille in ((x0 + sx.min(), x0 + sx.max(), dx, largeur),
+                                     (y0 + sy.min(), y0 + sy.max(), dy, hauteur)):
+        if delta > 0:
+            n_bord = min(n_bord, (taille - 1 - int(haut)) // delta)
+        elif delta < 0:
+            n_bord = min(n_bord, int(bas) // -delta)
+    n_periodes = min(n_periodes_max, n_bord - 1)
+
+    # Dernier écrivain de chaque case : j_avant (période k - j) et j_apres (période k + j)
+    motif = {(a, b): i for i, (a, b) in enumerate(zip(sx.tolist(), sy.tolist()))}
+    portee = (int(sx.max() - sx.min()) + int(sy.max() - sy.min())) // max(abs(dx), abs(dy)) + 1
+    j_avant = np.zeros(len(g0), dtype=np.int64)
+    j_apres = np.zeros(len(g0), dtype=np.int64)
+    for (a, b), i in motif.items():
+        for j in range(portee, 0, -1):
+            if (a + j * dx, b + j * dy) in motif:
+                j_avant[i] = j
+            if (a - j * dx, b - j * dy) in motif:
+                j_apres[i] = j
+    for i in np.nonzero(j_avant)[0]:
+        if g1[motif[(int(sx[i] + j_avant[i] * dx), int(sy[i] + j_avant[i] * dy))]] != g0[i]:
+            n_periodes = min(n_periodes, int(j_avant[i]))
+    if n_periodes <= 0:
+        return 0
+
+    # Les cases jamais écrites par le saut doivent déjà valoir G0 sur la grille
+    j_max = int(j_avant.max())
+    for k in range(1, min(n_periodes, j_max) + 1):
+        a_lire = (j_avant == 0) | (j_avant >= k)
+        if np.any(cases[bases[a_lire] + k * pas] != g0[a_lire]):
+            n_periodes = k - 1
+            break
+    else:
+        neuves = j_avant == 0
+        bases_neuves, g0_neuves = bases[neuves], g0[neuves]
+        bloc = max(1, (1 << 20) // max(1, len(g0_neuves)))
+        k = j_max + 1
+        while k <= n_periodes:
+            ks = np.arange(k, min(n_periodes, k + bloc - 1) + 1, dtype=np.int64)
+            faux = np.any(cases[bases_neuves[None, :] + ks[:, None] * pas] != g0_neuves, axis=1)
+            if faux.any():
+                n_periodes = int(ks[np.argmax(faux)]) - 1
+                break
+            k = int(ks[-1]) + 1
+    if n_periodes <= 0:
+        return 0
+
+    # Écriture : d'abord les dernières périodes en entier, dans l'ordre, puis les
+    # cases qu'aucune période ultérieure ne réécrit (indices tous distincts)
+    for k in range(max(1, n_periodes - int(j_apres.max()) + 1), n_periodes + 1):
+        cases[bases + k * pas] = g1
+    finales = j_apres == 0
+    bases_finales, g1_finales = bases[finales], g1[finales]
+    bloc = max(1, (1 << 20) // max(1, len(g1_finales)))
+    for k in range(1, n_periodes + 1, bloc):
+        ks = np.arange(k, min(n_periodes, k + bloc - 1) + 1, dtype=np.int64)
+        cases[bases_finales[None, :] + ks[:, None] * pas] = g1_finales
+    return n_periodes
+
+
+def _hors_grille(grille, fourmis):
+    """Retourne vrai si une fourmi est sortie de la grille (extensible, avant ``Grille.etendre``)."""
+    return any(not (0 <= f.x < grille.largeur and 0 <= f.y < grille.hauteur) for f in fourmis)
+
+
+def _code_topologie(grille):
+    """Retourne la topologie d'une grille ou d'une région (``_Fenetre``) sous la forme lue par les noyaux."""
+    return grille.code if isinstance(grille, _Fenetre) else TOPOLOGIES[grille.topologie]
+
+
+class _CasesCompactees:
+    """Cases d'une grille à un bit par case, indexées par tableaux d'indices comme ``vers_tableau().reshape(-1)``."""
+
+    def __init__(self, grille):
+        self._grille = grille
+
+    def __getitem__(self, indices):
+        return self._grille.lire_cases(indices)
+
+    def __setitem__(self, indices, couleurs):
+        self._grille.ecrire_cases(indices, couleurs)
+
+
+class _Fenetre:
+    """Région décompactée d'une grille à un bit par case, où les noyaux font avancer les fourmis.
+
+    La région couvre les fourmis et ``marge`` cases autour. Tant qu'elle est
+    ouverte, les fourmis sont dans ses coordonnées. Les noyaux s'arrêtent dès
+    qu'une fourmi sort par un côté intérieur à la grille ; un bord de grille bornée
+    reste bloquant. Sur un tore qu'elle ne couvre pas en entier, tous ses côtés
+    arrêtent les noyaux et ``ramener`` fait revenir la fourmi par le côté opposé.
+
+    Attributs:
+        largeur (int): La largeur de la région.
+        hauteur (int): La hauteur de la région.
+        code (int): La topologie lue par les noyaux (voir ``TOPOLOGIES``).
+        topologie (str): La topologie vue par ``Colonie`` : 'extensible' dès qu'un côté arrête les noyaux.
+        cases (numpy.ndarray): Les cases décompactées, tableau plat modifiable.
+    """
+
+    def __init__(self, grille, fourmis, marge):
+        self._grille = grille
+        x0 = max(0, min(f.x for f in fourmis) - marge) & ~7  # Sur une limite d'octet
+        y0 = max(0, min(f.y for f in fourmis) - marge)
+        x1 = min(grille.largeur, (max(f.x for f in fourmis) + marge + 8) & ~7)
+        y1 = min(grille.hauteur, max(f.y for f in fourmis) + marge + 1)
+        self._x0, self._y0 = x0, y0
+        self.largeur, self.hauteur = x1 - x0, y1 - y0
+        if grille.tore:
+            self.code = _TORE if (x0, y0, x1, y1) == (0, 0, grille.largeur, grille.hauteur) else _EXTENSIBLE
+        elif grille.bornee:
+            self.code = ((_SORTIE_HAUT if y0 > 0 else 0) | (_SORTIE_DROITE if x1 < grille.largeur else 0)
+                         | (_SORTIE_BAS if y1 < grille.hauteur else 0) | (_SORTIE_GAUCHE if x0 > 0 else 0))
+        else:
+            self.code = _EXTENSIBLE
+        self.topologie = {0: 'borne', _TORE: 'tore'}.get(self.code, 'extensible')
+        self.cases = grille.lire_region(x0, y0, x1, y1).reshape(-1)
+        self._ecrite = False
+        for fourmi in fourmis:
+            fourmi.x -= x0
+            fourmi.y -= y0
+
+    def ramener(self, fourmis):
+        """Applique le bord réel aux fourmis sorties de la grille.
+
+        Returns:
+            bool: Vrai si toutes les fourmis sont dans la région, qui reste utilisable.
+        """
+        grille = self._grille
+        dedans = not self._ecrite
+        for fourmi in fourmis:
+            x, y = fourmi.x + self._x0, fourmi.y + self._y0
+            if grille.bornee:
+                x, y = min(max(x, 0), grille.largeur - 1), min(max(y, 0), grille.hauteur - 1)
+            elif grille.tore:
+                x, y = x % grille.largeur, y % grille.hauteur
+            fourmi.x, fourmi.y = x - self._x0, y - self._y0
+            dedans = dedans and 0 <= fourmi.x < self.largeur and 0 <= fourmi.y < self.hauteur
+        return dedans
+
+    def indices_grille(self, indices):
+        """Convertit des indices plats de la région en indices plats de la grille."""
+        y, x = np.divmod(indices, self.largeur)
+        return (y + self._y0) * self._grille.largeur + x + self._x0
+
+    def sauter_periodes(self, trace, etat_final, periode, n_periodes_max, virages=None):
+        """Applique ``_sauter_periodes`` directement sur les bits de la grille.
+
+        La région est recopiée dans la grille d'abord ; elle n'est plus utilisable
+        ensuite si des périodes ont été sautées.
+        """
+        self._ecrire()
+        xs, ys, ds, cs = trace
+        x, y, d = etat_final
+        n_periodes = _sauter_periodes(_CasesCompactees(self._grille), self._grille.largeur, self._grille.hauteur,
+                                      (xs + self._x0, ys + self._y0, ds, cs), (x + self._x0, y + self._y0, d),
+                                      periode, n_periodes_max, virages)
+        if not n_periodes:
+            self._ecrite = False  # La grille n'a pas changé : la région reste à jour
+        return n_periodes
+
+    def _ecrire(self):
+        """Recopie la région dans la grille, une seule fois."""
+        if not self._ecrite:
+            self._grille.ecrire_region(self._x0, self._y0, self.cases.reshape(self.hauteur, self.largeur))
+            self._ecrite = True
+
+    def fermer(self, fourmis):
+        """Recopie la région dans la grille et ramène les fourmis dans les coordonnées de la grille."""
+        self._ecrire()
+        for fourmi in fourmis:
+            fourmi.x += self._x0
+            fourmi.y += self._y0
+
+
+class Moteur:
+    """Moteur de simulation par lots pour la Fourmi de Langton.
+
+    Pour une fourmi seule dont la règle n'a qu'un état, le moteur peut détecter
+    un cycle (l'« autoroute » de période 104 de la fourmi de Langton, par
+    exemple) et sauter des périodes entières tant que le résultat reste exact.
+
+    Attributs:
+        jit (bool): Vrai si les noyaux compilés par numba sont utilisés.
+        autoroute (bool): Vrai si la détection de cycle et le saut de périodes sont actifs.
+        regle (Regle): La règle de déplacement des fourmis.
+        etapes_simulees (int): Le nombre d'étapes calculées une par une.
+        etapes_accelerees (int): Le nombre d'étapes appliquées par saut de périodes.
+    """
+
+    PERIODE_MAX = 256  # Plus grande période de cycle recherchée
+    INTERVALLE_DETECTION = 8192  # Étapes simulées entre deux recherches de cycle
+    SEUIL_COLONIE = 256  # Nombre de fourmis à partir duquel la colonie vectorisée est utilisée
+    MARGE_FENETRE = 256  # Cases décompactées autour des fourmis d'une grille à un bit par case
+
+    def __init__(self, jit=None, autoroute=True, regle=None):
+        """Initialise le moteur.
+
+        Args:
+            jit (bool, optional): Utiliser numba. Par défaut, numba est utilisé s'il est installé.
+            autoroute (bool): Activer la détection de cycle pour une fourmi seule.
+            regle (optional): La règle (``Regle`` ou valeur de la clé ``regle`` de la
+                configuration). Par défaut, la fourmi de Langton.
+
+        Raises:
+            ValueError: Si la compilation est demandée alors que numba n'est pas installé,
+                ou si la règle est mal formée.
+        """
+        if jit is None:
+            jit = JIT_DISPONIBLE
+        elif jit and not JIT_DISPONIBLE:
+            raise ValueError("La compilation à la volée demande le paquet numba.")
+        self.jit = jit
+        self.autoroute = autoroute
+        self.regle = Regle.depuis_config(regle)
+        self._table = (self.regle.couleurs, self.regle.virages, self.regle.etats, self.regle.n_couleurs)
+        self._liste = tuple(t.tolist() for t in self._table[:3]) + (self.regle.n_couleurs,)  # Sans numba
+        self.etapes_simulees = 0
+        self.etapes_accelerees = 0
+
+    def simuler(self, grille, fourmis, n_etapes):
+        """Fait avancer toutes les fourmis de ``n_etapes`` étapes.
+
+        À chaque étape, les fourmis jouent dans l'ordre de la liste, comme avec
+        des appels successifs à ``Fourmi.etape``. Une grille extensible est
+        agrandie dès qu'une fourmi en sort, puis la simulation reprend.
+
+        Args:
+            grille (Grille): La grille sur laquelle les fourmis se déplacent.
+            fourmis (list): La liste des fourmis, mises à jour sur place.
+            n_etapes (int): Le nombre d'étapes à simuler.
+
+        Returns:
+            int: Le nombre d'étapes simulées.
+        """
+        if n_etapes <= 0 or not fourmis:
+            return 0
+        restant = n_etapes
+        while restant > 0:
+            if grille.stockage == 'bits':
+                faites = self._simuler_fenetres(grille, fourmis, restant)
+            else:
+                tableau = grille.vers_tableau()
+                faites = self._simuler_cases(tableau.reshape(-1), grille, fourmis, restant)
+                grille.depuis_tableau(tableau)
+            grille.etendre(fourmis)
+            restant -= faites
+        return n_etapes
+
+    def _simuler_cases(self, cases, grille, fourmis, n_etapes):
+        """Simule sur un tableau plat de cases, de la grille ou d'une région (``_Fenetre``).
+
+        Returns:
+            int: Le nombre d'étapes simulées (moins de ``n_etapes`` si une fourmi est sortie).
+        """
+        if len(fourmis) > 1:
+            return self._simuler_colonie(cases, grille, fourmis, n_etapes)
+        if self.autoroute and self.regle.n_etats == 1 and n_etapes > self.INTERVALLE_DETECTION:
+            return self._simuler_autoroute(cases, grille, fourmis[0], n_etapes)
+        return self._simuler_une_fourmi(cases, grille, fourmis[0], n_etapes)
+
+    def _simuler_fenetres(self, grille, fourmis, n_etapes):
+        """Simule sur une grille à un bit par case, région par région.
+
+        Returns:
+            int: Le nombre d'étapes simulées (moins de ``n_etapes`` si une fourmi est sortie
+            d'une grille extensible).
+        """
+        restant = n_etapes
+        while restant > 0:
+            fenetre = _Fenetre(grille, fourmis, min(restant, self.MARGE_FENETRE))
+            while restant > 0:
+                restant -= self._simuler_cases(fenetre.cases, fenetre, fourmis, restant)
+                if not fenetre.ramener(fourmis):
+                    break
+            fenetre.fermer(fourmis)
+            if grille.topologie == 'extensible' and _hors_grille(grille, fourmis):
+                break
+        return n_etapes - restant
+
+    def tracer(self, grille, fourmis, n_etapes, couleurs=False):
+        """Simule ``n_etapes`` étapes une par une en relevant chaque case inversée.
+
+        Aucun cycle n'est sauté : chaque étape de chaque fourmi est enregistrée,
+        pour le journal des modifications par exemple. Sur une grille extensible,
+        le tracé s'arrête après l'étape où une fourmi sort de la grille : la grille
+        n'est pas agrandie (voir ``Grille.etendre``), pour que les indices relevés
+        restent ceux de ses dimensions actuelles.
+
+        Args:
+            grille (Grille): La grille sur laquelle les fourmis se déplacent.
+            fourmis (list): La liste des fourmis, mises à jour sur place.
+            n_etapes (int): Le nombre d'étapes à simuler.
+            couleurs (bool): Retourner aussi la couleur lue à chaque étape.
+
+        Returns:
+            tuple: Deux tableaux (étapes simulées, nombre de fourmis) : l'indice ``y * largeur + x``
+            de la case de chaque fourmi avant chaque étape, et sa direction avant l'étape
+            (avec son état dans les bits de poids fort, ``d | etat << 2``). Avec ``couleurs``,
+            un troisième tableau donne la couleur de la case avant l'étape.
+        """
+        n_etapes = max(0, n_etapes)
+        ps = np.zeros((n_etapes, len(fourmis)), dtype=np.int32)
+        dss = np.zeros((n_etapes, len(fourmis)), dtype=np.uint8)
+        css = np.zeros((n_etapes, len(fourmis)), dtype=np.uint8)
+        if not n_etapes or not fourmis:
+            return (ps, dss, css) if couleurs else (ps, dss)
+        if grille.stockage == 'bits':
+            faites = 0
+            while faites < n_etapes:
+                fenetre = _Fenetre(grille, fourmis, min(n_etapes - faites, self.MARGE_FENETRE))
+                debut = faites
+                while faites < n_etapes:
+                    faites += self._tracer_cases(fenetre.cases, fenetre, fourmis, n_etapes - faites,
+                                                 ps[faites:], dss[faites:], css[faites:])
+                    if not fenetre.ramener(fourmis):
+                        break
+                ps[debut:faites] = fenetre.indices_grille(ps[debut:faites])
+                fenetre.fermer(fourmis)
+                if grille.topologie == 'extensible' and _hors_grille(grille, fourmis):
+                    break
+        else:
+            tableau = grille.vers_tableau()
+            faites = self._tracer_cases(tableau.reshape(-1), grille, fourmis, n_etapes, ps, dss, css)
+            grille.depuis_tableau(tableau)
+        if couleurs:
+            return ps[:faites], dss[:faites], css[:faites]
+        return ps[:faites], dss[:faites]
+
+    def _tracer_cases(self, cases, grille, fourmis, n_etapes, ps, dss, css):
+        """Trace sur un tableau plat de cases, de la grille ou d'une région (``_Fenetre``).
+
+        Returns:
+            int: Le nombre d'étapes simulées (moins de ``n_etapes`` si une fourmi est sortie).
+        """
+        topologie = _code_topologie(grille)
+        xs = np.array([f.x for f in fourmis], dtype=np.int64)
+        ys = np.array([f.y for f in fourmis], dtype=np.int64)
+        ds = np.array([f.direction for f in fourmis], dtype=np.int64)
+        es = np.array([f.etat for f in fourmis], dtype=np.int64)
+        if not self.regle.langton:
+            noyau = _jit(_noyau_trace_colonie_table) if self.jit else _noyau_trace_colonie_table
+            faites = noyau(cases if self.jit else memoryview(cases), grille.largeur,
+                           grille.hauteur, topologie, xs, ys, ds, es, n_etapes,
+                           *(self._table if self.jit else self._liste), ps, dss, css)
+        elif self.jit:
+            faites = _jit(_noyau_trace_colonie)(cases, grille.largeur, grille.hauteur, topologie,
+                                                xs, ys, ds, n_etapes, ps, dss, css)
+        else:
+            faites = _noyau_trace_colonie(memoryview(cases), grille.largeur, grille.hauteur, topologie,
+                                          xs, ys, ds, n_etapes, ps, dss, css)
+        for fourmi, x, y, d, e in zip(fourmis, xs.tolist(), ys.tolist(), ds.tolist(), es.tolist()):
+            fourmi.x, fourmi.y, fourmi.direction, fourmi.etat = x, y, d, e
+        self.etapes_simulees += faites * len(fourmis)
+        return int(faites)
+
+    def _simuler_une_fourmi(self, cases, grille, fourmi, n_etapes):
+        """Simule une fourmi seule, étape par étape, et retourne le nombre d'étapes simulées."""
+        if not self.jit:
+            cases = memoryview(cases)
+        topologie = _code_topologie(grille)
+        if not self.regle.langton and self.regle.n_etats == 1:
+            noyau = _jit(_noyau_couleurs) if self.jit else _noyau_couleurs
+            table = self._table if self.jit else self._liste
+            x, y, d, faites = noyau(cases, grille.largeur, grille.hauteur, topologie, fourmi.x, fourmi.y,
+                                    fourmi.direction, n_etapes, *table[:2])
+        elif not self.regle.langton:
+            noyau = _jit(_noyau_table) if self.jit else _noyau_table
+            x, y, d, e, faites = noyau(cases, grille.largeur, grille.hauteur, topologie, fourmi.x, fourmi.y,
+                                       fourmi.direction, fourmi.etat, n_etapes,
+                                       *(self._table if self.jit else self._liste))
+            fourmi.etat = int(e)
+        else:
+            noyau = _jit(_noyau_une_fourmi) if self.jit else _noyau_une_fourmi
+            x, y, d, faites = noyau(cases, grille.largeur, grille.hauteur, topologie,
+                                    fourmi.x, fourmi.y, fourmi.direction, n_etapes)
+        fourmi.x, fourmi.y, fourmi.direction = int(x), int(y), int(d)
+        self.etapes_simulees += int(faites)
+        return int(faites)
+
+    def _simuler_colonie(self, cases, grille, fourmis, n_etapes):
+        """Simule plusieurs fourmis, dans l'ordre de la liste à chaque étape.
+
+        Sans numba, une colonie nombreuse et triée par identifiant est avancée
+        de façon vectorisée par ``Colonie`` si la règle est cyclique.
+
+        Returns:
+            int: Le nombre d'étapes simulées.
+        """
+        ids = [f.ant_id for f in fourmis]
+        if (not self.jit and len(fourmis) >= self.SEUIL_COLONIE and ids == sorted(ids)
+                and self.regle.cyclique):
+            colonie = Colonie.depuis_fourmis(fourmis)
+            regle = None if self.regle.langton else self.regle
+            faites = 0
+            while faites < n_etapes:
+                faites += 1
+                if colonie.etape(cases, grille.largeur, grille.hauteur, regle, grille.topologie):
+                    break  # Une fourmi est sortie de la grille extensible
+            colonie.mettre_a_jour(fourmis)
+            self.etapes_simulees += faites * len(fourmis)
+            return faites
+        if not self.regle.langton:
+            return self._simuler_colonie_table(cases, grille, fourmis, n_etapes)
+        topologie = _code_topologie(grille)
+        if self.jit:
+            xs = np.array([f.x for f in fourmis], dtype=np.int64)
+            ys = np.array([f.y for f in fourmis], dtype=np.int64)
+            ds = np.array([f.direction for f in fourmis], dtype=np.int64)
+            faites = _jit(_noyau_colonie)(cases, grille.largeur, grille.hauteur, topologie, xs, ys, ds, n_etapes)
+            xs, ys, ds = xs.tolist(), ys.tolist(), ds.tolist()
+        else:
+            xs = [f.x for f in fourmis]
+            ys = [f.y for f in fourmis]
+            ds = [f.direction for f in fourmis]
+            faites = _noyau_colonie(memoryview(cases), grille.largeur, grille.hauteur, topologie,
+                                    xs, ys, ds, n_etapes)
+        for fourmi, x, y, d in zip(fourmis, xs, ys, ds):
+            fourmi.x, fourmi.y, fourmi.direction = x, y, d
+        self.etapes_simulees += faites * len(fourmis)
+        return int(faites)
+
+    def _simuler_colonie_table(self, cases, grille, fourmis, n_etapes):
+        """Simule plusieurs fourmis par la table de transitions, dans l'ordre de la liste."""
+        topologie = _code_topologie(grille)
+        if self.jit:
+            xs, ys, ds, es = (np.array(v, dtype=np.int64) for v in zip(*((f.x, f.y, f.direction, f.etat)
+                                                                           for f in fourmis)))
+            faites = _jit(_noyau_colonie_table)(cases, grille.largeur, grille.hauteur, topologie, xs, ys, ds, es,
+                                                n_etapes, *self._table)
+            xs, ys, ds, es = xs.tolist(), ys.tolist(), ds.tolist(), es.tolist()
+        else:
+            xs = [f.x for f in fourmis]
+            ys = [f.y for f in fourmis]
+            ds = [f.direction for f in fourmis]
+            es = [f.etat for f in fourmis]
+            faites = _noyau_colonie_table(memoryview(cases), grille.largeur, grille.hauteur, topologie,
+                                          xs, ys, ds, es, n_etapes, *self._liste)
+        for fourmi, x, y, d, e in zip(fourmis, xs, ys, ds, es):
+            fourmi.x, fourmi.y, fourmi.direction, fourmi.etat = x, y, d, e
+        self.etapes_simulees += faites * len(fourmis)
+        return int(faites)
+
+    def _simuler_autoroute(self, cases, grille, fourmi, n_etapes):
+        """Simule une fourmi seule en cherchant régulièrement un cycle à sauter.
+
+        Entre deux recherches, la fourmi avance normalement. Une recherche trace
+        ``3 * PERIODE_MAX`` étapes ; si un cycle y apparaît, les périodes entières
+        qui se rejouent à l'identique sont appliquées d'un coup. La simulation
+        s'arrête quand la fourmi sort d'une grille extensible.
+
+        Returns:
+            int: Le nombre d'étapes simulées.
+        """
+        fenetre = 3 * self.PERIODE_MAX
+        trace = tuple(np.zeros(fenetre, dtype=np.int64) for _ in range(4))
+        if self.regle.langton:
+            noyau_trace = _jit(_noyau_trace) if self.jit else _noyau_trace
+        else:
+            noyau_trace = _jit(_noyau_trace_table) if self.jit else _noyau_trace_table
+        vue = cases if self.jit else memoryview(cases)
+        topologie = _code_topologie(grille)
+        restant = n_etapes
+        while restant > 0:
+            lot = min(restant, self.INTERVALLE_DETECTION)
+            faites = self._simuler_une_fourmi(cases, grille, fourmi, lot)
+            restant -= faites
+            if faites < lot:
+                break
+            if restant < fenetre:
+                continue
+            if self.regle.langton:
+                *etat, faites = noyau_trace(vue, grille.largeur, grille.hauteur, topologie,
+                                            fourmi.x, fourmi.y, fourmi.direction, fenetre, *trace)
+            else:  # Règle à un seul état : l'état de la fourmi ne change pas
+                *etat, _, faites = noyau_trace(vue, grille.largeur, grille.hauteur, topologie, fourmi.x, fourmi.y,
+                                               fourmi.direction, fourmi.etat, fenetre,
+                                               *(self._table if self.jit else self._liste), *trace)
+            etat = tuple(int(v) for v in etat)
+            fourmi.x, fourmi.y, fourmi.direction = etat
+            self.etapes_simulees += int(faites)
+            restant -= int(faites)
+            if faites < fenetre:
+                break
+            periode = _detecter_periode(*trace, etat, self.PERIODE_MAX)
+            if periode:
+                virages = None if self.regle.langton else self.regle.virages
+                if isinstance(grille, _Fenetre):
+                    n_periodes = grille.sauter_periodes(trace, etat, periode, restant // periode, virages)
+                else:
+                    n_periodes = _sauter_periodes(cases, grille.largeur, grille.hauteur, trace,
+                                                  etat, periode, restant // periode, virages)
+                dx, dy = etat[0] - int(trace[0][-periode]), etat[1] - int(trace[1][-periode])
+                fourmi.x += n_periodes * dx
+                fourmi.y += n_periodes * dy
+                self.etapes_accelerees += n_periodes * periode
+                restant -= n_periodes * periode
+                if n_periodes and isinstance(grille, _Fenetre):
+                    break  # La région est dans la grille : la suite se fait dans une nouvelle région
+        return n_etapes - restant
@@ -0,0 +1,325 @@
+"""
+Module de l'ordonnancement de la simulation, découplée de l'affichage.
+
+La vitesse de simulation est exprimée en étapes par seconde. L'affichage tourne
+à sa propre fréquence et, entre deux images, la simulation avance d'autant
+d'étapes que le temps écoulé le demande. La simulation peut aussi tourner dans
+un fil d'exécution séparé (``SimulationEnFond``) qui publie des instantanés.
+
+Les fonctions qui avancent la simulation pour l'affichage (``avancer``,
+``Journal.avancer``, ``Statistiques.avancer``) disent ce qui a changé : la
+liste des cases modifiées quand elles sont peu nombreuses, sinon le rectangle
+(``Zone``) qui les contient, ou None si la grille a été agrandie. Ces
+descriptions se réunissent avec ``fusionner`` et servent à recopier d'une grille
+à l'autre les seules cases modifiées (``recopier``).
+"""
+
+import collections
+import threading
+import time
+
+import numpy as np
+
+from fourmi.fourmi import Fourmi
+from fourmi.moteur import Moteur
+
+CASES_MAX = 4096  # Cases modifiées relevées une à une, au plus
+TRACE_MAX = 1 << 20  # Étapes de fourmi tracées au plus ; au-delà, la zone modifiée est estimée
+
+# Rectangle [x0, x1) × [y0, y1) qui contient toutes les cases modifiées
+Zone = collections.namedtuple('Zone', 'x0 y0 x1 y1')
+
+
+class Ordonnanceur:
+    """Calcule le nombre d'étapes à simuler à chaque image pour tenir une vitesse donnée.
+
+    Attributs:
+        etapes_par_seconde (float): La vitesse de simulation visée.
+        retard_max (float): Le retard maximal rattrapé, en secondes (évite l'emballement
+            lorsque la simulation ne suit pas).
+    """
+
+    def __init__(self, etapes_par_seconde, retard_max=0.25):
+        """Initialise l'ordonnanceur.
+
+        Args:
+            etapes_par_seconde (float): La vitesse de simulation visée.
+            retard_max (float): Le retard maximal rattrapé, en secondes.
+        """
+        self.etapes_par_seconde = etapes_par_seconde
+        self.retard_max = retard_max
+        self._reste = 0.0
+        self._dernier = time.perf_counter()
+
+    def reinitialiser(self):
+        """Oublie le temps écoulé (après une pause, par exemple)."""
+        self._reste = 0.0
+        self._dernier = time.perf_counter()
+
+    def etapes_a_faire(self, maintenant=None):
+        """Retourne le nombre d'étapes à simuler depuis l'appel précédent.
+
+        Args:
+            maintenant (float, optional): L'instant courant (``time.perf_counter``).
+
+        Returns:
+            int: Le nombre d'étapes à simuler.
+        """
+        if maintenant is None:
+            maintenant = time.perf_counter()
+        ecoule = min(maintenant - self._dernier, self.retard_max)
+        self._dernier = maintenant
+        self._reste += ecoule * self.etapes_par_seconde
+        etapes = int(self._reste)
+        self._reste -= etapes
+        return etapes
+
+
+def tracer(moteur, grille, fourmis, n_etapes):
+    """Simule ``n_etapes`` étapes avec ``Moteur.tracer`` et retourne les cases inversées.
+
+    Args:
+        moteur (Moteur): Le moteur de simulation.
+        grille (Grille): La grille de la simulation.
+        fourmis (list): La liste des fourmis.
+        n_etapes (int): Le nombre d'étapes à simuler.
+
+    Returns:
+        numpy.ndarray: Les indices plats des cases où se trouvaient les fourmis, étape par
+        étape, ou None si la grille extensible a été agrandie.
+    """
+    modifiees, agrandie = [], False
+    restant = n_etapes
+    while restant > 0:
+        cellules, _ = moteur.tracer(grille, fourmis, restant)
+        restant -= len(cellules)
+        modifiees.append(cellules.ravel())
+        if grille.etendre(fourmis) is not None:
+            agrandie = True
+    if agrandie:
+        return None
+    return np.concatenate(modifiees) if modifiees else np.zeros(0, dtype=np.int64)
+
+
+def cases_modifiees(grille, cellules, cases_max=CASES_MAX):
+    """Décrit les cases tracées par ``Moteur.tracer`` : une à une si elles sont peu nombreuses.
+
+    Args:
+        grille (Grille): La grille de la simulation, dans les dimensions du tracé.
+        cellules (list): Les tableaux d'indices plats des cases tracées.
+        cases_max (int): Le nombre maximal de cases relevées une à une.
+
+    Returns:
+        list | Zone: Les cases (x, y) dans l'ordre du tracé, ou le rectangle qui les contient.
+    """
+    cellules = np.concatenate([c.ravel() for c in cellules]) if cellules else np.zeros(0, dtype=np.int64)
+    if cellules.size <= cases_max:
+        return [(p % grille.largeur, p // grille.largeur) for p in cellules.tolist()]
+    ys, xs = np.divmod(cellules, grille.largeur)
+    return Zone(int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
+
+
+def _englobante(changement):
+    """Retourne le rectangle qui contient une liste non vide de cases, ou la zone elle-même."""
+    if isinstance(changement, Zone):
+        return changement
+    xs, ys = zip(*changement)
+    return Zone(min(xs), min(ys), max(xs) + 1, max(ys) + 1)
+
+
+def fusionner(premier, second, cases_max=CASES_MAX):
+    """Réunit deux descriptions de cases modifiées (voir ``avancer``).
+
+    Args:
+        premier (list | Zone | None): Les cases modifiées d'abord.
+        second (list | Zone | None): Les cases modifiées ensuite.
+        cases_max (int): Le nombre maximal de cases relevées une à une.
+
+    Returns:
+        list | Zone: Les cases des deux descriptions s'il y en a au plus ``cases_max``, sinon
+        le rectangle qui les contient ; None si l'une des deux est None.
+    """
+    if premier is None or second is None:
+        return None
+    if not isinstance(premier, Zone) and not isinstance(second, Zone) and len(premier) + len(second) <= cases_max:
+        return premier + second
+    zones = [_englobante(changement) for changement in (premier, second) if changement]
+    return Zone(min(z.x0 for z in zones), min(z.y0 for z in zones),
+                max(z.x1 for z in zones), max(z.y1 for z in zones))
+
+
+def recopier(source, cible, changement):
+    """Recopie dans ``cible`` les cases de ``source`` décrites par ``changement``.
+
+    Args:
+        source (Grille): La grille à lire.
+        cible (Grille): La grille à mettre à jour, de mêmes dimensions et de même stockage.
+        changement (list | Zone): Les cases (x, y) ou le rectangle à recopier.
+    """
+    if isinstance(changement, Zone):
+        x0 = changement.x0 & ~7  # Un octet entier d'une grille compactée
+        x1 = min(source.largeur, (changement.x1 + 7) & ~7)
+        cible.ecrire_region(x0, changement.y0, source.lire_region(x0, changement.y0, x1, changement.y1))
+    elif changement:
+        cases = np.asarray(changement, dtype=np.int64)
+        indices = np.unique(cases[:, 1] * source.largeur + cases[:, 0])
+        cible.ecrire_cases(indices, source.lire_cases(indices))
+
+
+def _zone_atteignable(grille, fourmis, n_etapes):
+    """Retourne le rectangle des cases qu'atteignent les fourmis en ``n_etapes`` étapes au plus."""
+    zone = []
+    for positions, cote in (([f.x for f in fourmis], grille.largeur), ([f.y for f in fourmis], grille.hauteur)):
+        debut, fin = min(positions) - n_etapes, max(positions) + n_etapes + 1
+        if grille.tore and (debut < 0 or fin > cote):
+            debut, fin = 0, cote  # Revenue par le côté opposé
+        zone.append((max(0, debut), min(cote, fin)))
+    return Zone(zone[0][0], zone[1][0], zone[0][1], zone[1][1])
+
+
+def avancer(moteur, grille, fourmis, n_etapes, cases_max=CASES_MAX, trace_max=TRACE_MAX):
+    """Simule ``n_etapes`` étapes et retourne ce qui a changé sur la grille.
+
+    Jusqu'à ``trace_max`` étapes de fourmi, la simulation est tracée par
+    ``Moteur.tracer``, qui relève les cases inversées (celles où se trouvaient
+    les fourmis) ; au-delà, elle se fait en un seul lot et la zone modifiée est
+    celle que les fourmis peuvent atteindre.
+
+    Args:
+        moteur (Moteur): Le moteur de simulation.
+        grille (Grille): La grille de la simulation.
+        fourmis (list): La liste des fourmis.
+        n_etapes (int): Le nombre d'étapes à simuler.
+        cases_max (int): Le nombre maximal de cases relevées une à une.
+        trace_max (int): Le nombre maximal d'étapes de fourmi tracées.
+
+    Returns:
+        list | Zone: Les cases (x, y) modifiées s'il y en a au plus ``cases_max``, sinon
+        le rectangle qui les contient ; None si la grille extensible a été agrandie.
+    """
+    if not fourmis:
+        moteur.simuler(grille, fourmis, n_etapes)
+        return []
+    if n_etapes * len(fourmis) > trace_max:
+        zone = _zone_atteignable(grille, fourmis, n_etapes)
+        dimensions = (grille.largeur, grille.hauteur)
+        moteur.simuler(grille, fourmis, n_etapes)
+        return zone if (grille.largeur, grille.hauteur) == dimensions else None
+    cellules = tracer(moteur, grille, fourmis, n_etapes)
+    return None if cellules is None else cases_modifiees(grille, [cellules], cases_max)
+
+
+class SimulationEnFond:
+    """Fait tourner la simulation dans un fil d'exécution séparé et publie des instantanés.
+
+    Le fil possède la grille et les fourmis pendant qu'il tourne. Après chaque
+    lot d'étapes, il recopie les seules cases modifiées dans une grille publiée ;
+    l'affichage lit ses instantanés dans une troisième grille, qu'il est seul à
+    lire et que ``instantane`` met à jour de la même façon. Aucune publication
+    ne copie donc toute la grille, sauf après un agrandissement.
+
+    Attributs:
+        ordonnanceur (Ordonnanceur): Fixe la vitesse de simulation.
+        active (bool): Faux pendant une pause.
+        etapes (int): Le nombre d'étapes simulées depuis le démarrage.
+    """
+
+    def __init__(self, grille, fourmis, etapes_par_seconde, moteur=None, publications_par_seconde=60,
+                 journal=None):
+        """Initialise la simulation en fond (sans la démarrer).
+
+        Args:
+            grille (Grille): La grille de la simulation.
+            fourmis (list): La liste des fourmis.
+            etapes_par_seconde (float): La vitesse de simulation visée.
+            moteur (Moteur, optional): Le moteur de simulation.
+            publications_par_seconde (float): La fréquence maximale des instantanés.
+            journal (Journal, optional): Le journal où enregistrer les étapes, utilisé
+                par le seul fil de simulation tant qu'il tourne.
+        """
+        self.grille = grille
+        self.fourmis = fourmis
+        self.moteur = moteur or Moteur()
+        self.journal = journal
+        self.ordonnanceur = Ordonnanceur(etapes_par_seconde)
+        self.active = True
+        self.etapes = 0
+        self._periode = 1 / publications_par_seconde
+        self._verrou = threading.Lock()
+        self._publiee = grille.copier()
+        self._fourmis = self._copier_fourmis()
+        self._etapes = 0
+        self._affichee = None
+        self._a_afficher = None  # Cases publiées depuis le dernier instantané (None : toute la grille)
+        self._arret = threading.Event()
+        self._fil = threading.Thread(target=self._boucle, name="simulation", daemon=True)
+
+    def _copier_fourmis(self):
+        """Copie les fourmis de la simulation."""
+        fourmis = []
+        for f in self.fourmis:
+            fourmi = Fourmi(f.x, f.y, f.ant_id)
+            fourmi.direction = f.direction
+            fourmi.etat = f.etat
+            fourmis.append(fourmi)
+        return fourmis
+
+    def _publier(self, changement):
+        """Recopie les cases modifiées par un lot dans la grille publiée, avec les fourmis."""
+        fourmis = self._copier_fourmis()
+        with self._verrou:
+            if changement is None:
+                self._publiee = self.grille.copier()  # Grille agrandie
+            else:
+                recopier(self.grille, self._publiee, changement)
+            self._a_afficher = fusionner(self._a_afficher, changement)
+            self._fourmis, self._etapes = fourmis, self.etapes
+
+    def _boucle(self):
+        """Boucle du fil de simulation."""
+        while not self._arret.is_set():
+            if not self.active:
+                self.ordonnanceur.reinitialiser()
+                self._arret.wait(self._periode)
+                continue
+            debut = time.perf_counter()
+            n_etapes = self.ordonnanceur.etapes_a_faire(debut)
+            if n_etapes:
+                if self.journal is not None:
+                    changement = self.journal.avancer(self.moteur, self.grille, self.fourmis, n_etapes)
+                else:
+                    changement = avancer(self.moteur, self.grille, self.fourmis, n_etapes)
+                self.etapes += n_etapes
+                self._publier(changement)
+            self._arret.wait(max(0.0, self._periode - (time.perf_counter() - debut)))
+
+    def demarrer(self):
+        """Démarre le fil de simulation."""
+        self.ordonnanceur.reinitialiser()
+        self._fil.start()
+
+    def arreter(self):
+        """Arrête le fil de simulation et attend sa fin."""
+        self._arret.set()
+        if self._fil.is_alive():
+            self._fil.join()
+
+    def instantane(self):
+        """Retourne le dernier instantané publié.
+
+        La grille retournée est toujours la même, mise à jour à chaque appel : elle
+        ne change pas entre deux appels. C'est une nouvelle grille au premier appel
+        et après un agrandissement.
+
+        Returns:
+            tuple: La grille de l'instantané, une copie des fourmis, le nombre d'étapes
+            simulées et les cases modifiées depuis l'instantané précédent (liste de cases
+            (x, y), ``Zone``, ou None si toute la grille est nouvelle).
+        """
+        with self._verrou:
+            if self._a_afficher is None:
+                self._affichee = self._publiee.copier()
+            else:
+                recopier(self._publiee, self._affichee, self._a_afficher)
+            modifiees, self._a_afficher = self._a_afficher, []
+            return self._affichee, self._fourmis, self._etapes, modifiees
@@ -0,0 +1,177 @@
+"""
+Module des règles de déplacement : fourmi de Langton, fourmis à plusieurs couleurs et turmites.
+
+Une règle est une table de transitions (couleur, état) → (nouvelle couleur,
+virage, nouvel état), calculée une fois pour toutes et lue par le moteur à
+chaque étape. Elle s'écrit dans ``config.yaml`` (clé ``regle``) :
+
+- soit comme une chaîne d'une lettre par couleur : ``R`` (droite), ``L``
+  (gauche), ``N`` (tout droit) ou ``U`` (demi-tour). Sur une case de couleur
+  ``c``, la fourmi tourne selon la lettre ``c`` et la case passe à la couleur
+  ``(c + 1) % k``. ``RL`` est la fourmi de Langton, ``LLRR`` ou ``RLR`` des
+  fourmis à plusieurs couleurs ;
+- soit comme une table de turmite : pour chaque état, pour chaque couleur, un
+  triplet ``[nouvelle couleur, virage, nouvel état]``, le virage étant l'une des
+  lettres ci-dessus.
+
+L'état d'une fourmi est rangé avec sa direction dans un octet des sauvegardes
+binaires (voir ``fourmi.instantane``) : une turmite a au plus ``ETATS_MAX`` états.
+"""
+
+import json
+
+import numpy as np
+
+# Virage de chaque lettre, en quarts de tour vers la droite
+VIRAGES = {'N': 0, 'R': 1, 'U': 2, 'L': 3}
+COULEURS_MAX = 256
+ETATS_MAX = 64
+
+
+class Regle:
+    """Table de transitions d'une fourmi à plusieurs couleurs ou d'une turmite.
+
+    Les tables sont plates : la transition de l'état ``e`` sur la couleur ``c``
+    est à l'indice ``e * n_couleurs + c``.
+
+    Attributs:
+        nom (str): La règle telle qu'elle s'écrit dans la configuration (chaîne
+            de lettres, ou table de turmite en JSON).
+        n_couleurs (int): Le nombre de couleurs de case.
+        n_etats (int): Le nombre d'états de la fourmi.
+        couleurs (numpy.ndarray): La nouvelle couleur de la case.
+        virages (numpy.ndarray): Le virage, en quarts de tour vers la droite (0 à 3).
+        etats (numpy.ndarray): Le nouvel état de la fourmi.
+    """
+
+    def __init__(self, transitions, nom=None):
+        """Construit la règle à partir de sa table de transitions.
+
+        Args:
+            transitions (list): Pour chaque état, pour chaque couleur, le triplet
+                (nouvelle couleur, virage en lettre, nouvel état).
+            nom (str, optional): La règle telle qu'elle s'écrit (par défaut, la table en JSON).
+
+        Raises:
+            ValueError: Si la table est mal formée.
+        """
+        if not isinstance(transitions, (list, tuple)) or not 1 <= len(transitions) <= ETATS_MAX:
+            raise ValueError(f"Une règle doit avoir entre 1 et {ETATS_MAX} états.")
+        n_couleurs = len(transitions[0]) if isinstance(transitions[0], (list, tuple)) else 0
+        if not 2 <= n_couleurs <= COULEURS_MAX:
+            raise ValueError(f"Une règle doit avoir entre 2 et {COULEURS_MAX} couleurs.")
+        table = []
+        for ligne in transitions:
+            if not isinstance(ligne, (list, tuple)) or len(ligne) != n_couleurs:
+                raise ValueError("Chaque état doit donner une transition par couleur.")
+            for transition in ligne:
+                try:
+                    couleur, virage, etat = transition
+                    virage = VIRAGES[str(virage).upper()]
+                except (TypeError, ValueError, KeyError):
+                    raise ValueError(f"Transition invalide : {transition!r} "
+                                     "(attendu : [nouvelle couleur, virage R/L/N/U, nouvel état]).") from None
+                if not (isinstance(couleur, int) and 0 <= couleur < n_couleurs
+                        and isinstance(etat, int) and 0 <= etat < len(transitions)):
+                    raise ValueError(f"Transition hors de la règle : {transition!r}.")
+                table.append((couleur, virage, etat))
+        self.n_etats = len(transitions)
+        self.n_couleurs = n_couleurs
+        self.couleurs, self.virages, self.etats = (np.array(colonne, dtype=np.uint8) for colonne in zip(*table))
+        lettres = {v: k for k, v in VIRAGES.items()}
+        self.nom = nom or json.dumps([[[c, lettres[v], e] for c, v, e in table[i:i + n_couleurs]]
+                                      for i in range(0, len(table), n_couleurs)], separators=(',', ':'))
+
+    @classmethod
+    def depuis_chaine(cls, chaine):
+        """Construit la règle d'une fourmi à plusieurs couleurs (``RL``, ``LLRR``...).
+
+        Args:
+            chaine (str): Une lettre R, L, N ou U par couleur.
+
+        Returns:
+            Regle: La règle à un seul état.
+
+        Raises:
+            ValueError: Si la chaîne contient une autre lettre ou moins de deux couleurs.
+        """
+        chaine = chaine.strip().upper()
+        if any(lettre not in VIRAGES for lettre in chaine):
+            raise ValueError(f"Règle invalide : {chaine!r} (lettres attendues : {', '.join(VIRAGES)}).")
+        return cls([[((c + 1) % len(chaine), lettre, 0) for c, lettre in enumerate(chaine)]], nom=chaine)
+
+    @classmethod
+    def depuis_config(cls, valeur):
+        """Construit la règle décrite par la clé ``regle`` de la configuration.
+
+        Args:
+            valeur: Une chaîne de lettres, une table de turmite (liste ou JSON), ou None pour ``RL``.
+
+        Returns:
+            Regle: La règle.
+
+        Raises:
+            ValueError: Si la règle est mal formée.
+        """
+        if valeur is None:
+            return LANGTON
+        if isinstance(valeur, Regle):
+            return valeur
+        if isinstance(valeur, str) and valeur.lstrip().startswith('['):
+            try:
+                valeur = json.loads(valeur)
+            except json.JSONDecodeError as erreur:
+                raise ValueError(f"Table de turmite illisible : {erreur}") from None
+        if isinstance(valeur, str):
+            return cls.depuis_chaine(valeur)
+        return cls(valeur)
+
+    @property
+    def langton(self):
+        """bool: Vrai pour la fourmi de Langton (``RL``), qui a ses propres noyaux de calcul."""
+        return self.n_etats == 1 and self.couleurs.tolist() == [1, 0] and self.virages.tolist() == [1, 3]
+
+    @property
+    def cyclique(self):
+        """bool: Vrai si la règle n'a qu'un état et fait passer chaque case à la couleur suivante."""
+        return self.n_etats == 1 and self.couleurs.tolist() == [(c + 1) % self.n_couleurs
+                                                                 for c in range(self.n_couleurs)]
+
+    def transition(self, couleur, etat=0):
+        """Retourne la transition d'une fourmi dans l'état ``etat`` sur une case de couleur ``couleur``.
+
+        Args:
+            couleur (int): La couleur de la case.
+            etat (int): L'état de la fourmi.
+
+        Returns:
+            tuple: La nouvelle couleur, le virage (quarts de tour vers la droite) et le nouvel état.
+        """
+        i = etat * self.n_couleurs + couleur
+        return int(self.couleurs[i]), int(self.virages[i]), int(self.etats[i])
+
+    def compatible(self, grille, fourmis):
+        """Retourne vrai si un état (une sauvegarde par exemple) peut être simulé avec cette règle.
+
+        Args:
+            grille (Grille): La grille, dont les couleurs doivent être celles de la règle.
+            fourmis (list): Les fourmis, dont les états doivent être ceux de la règle.
+
+        Returns:
+            bool: Vrai si toutes les couleurs et tous les états sont connus de la règle.
+        """
+        tableau = grille.vers_tableau()
+        return ((not tableau.size or int(tableau.max()) < self.n_couleurs)
+                and all(f.etat < self.n_etats for f in fourmis))
+
+    def __eq__(self, autre):
+        return isinstance(autre, Regle) and self.nom == autre.nom
+
+    def __hash__(self):
+        return hash(self.nom)
+
+    def __repr__(self):
+        return f"Regle({self.nom!r})"
+
+
+LANGTON = Regle.depuis_chaine('RL')
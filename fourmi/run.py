@@ -0,0 +1,263 @@
+"""
+Exécution de la simulation sans affichage : ``python -m fourmi.run``.
+
+Lit ``config.yaml`` (``largeur``, ``hauteur``, ``nombre_de_fourmis``,
+``etapes``, ``stockage``, ``regle``, ``topologie``), fait tourner la simulation jusqu'au bout sans
+importer pygame ni httpx, puis écrit l'état final et les statistiques
+d'exécution (étapes par seconde, durée, mémoire maximale).
+
+Avec la clé ``statistiques`` (un fichier ``.csv`` ou ``.parquet``), la population,
+l'emprise, le chemin et la période de chaque fourmi sont tenus à jour pendant
+l'exécution et écrits toutes les ``intervalle_statistiques`` étapes (voir
+``fourmi.statistiques``).
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import sys
+import time
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Indisponible sous Windows
+    resource = None
+
+from fourmi.config import CHEMIN_CONFIGURATION, lire_configuration
+from fourmi.fourmi import Fourmi
+from fourmi.grille import creer_grille
+from fourmi.grille_creuse import GrilleCreuse, MoteurCreux
+from fourmi.instantane import decrire_fourmis, vers_dict
+from fourmi.mesures import PROFILEURS, profiler
+from fourmi.moteur import Moteur
+from fourmi.regles import Regle
+from fourmi.statistiques import Statistiques, ouvrir_serie
+
+CASES_PAR_LOT = 1 << 22  # Cases tracées à la fois quand les statistiques sont suivies
+
+
+def preparer(config, jit=None, autoroute=True):
+    """Crée la grille, les fourmis et le moteur décrits par la configuration.
+
+    Les fourmis partent des ``positions`` de la configuration (liste de [x, y])
+    si elle en donne, du centre de la grille sinon. Avec ``stockage: creuse``,
+    la grille est creuse et non bornée (fourmi de Langton seulement). La clé
+    ``regle`` donne la règle des fourmis (voir ``fourmi.regles``) et la clé
+    ``topologie`` celle de la grille (voir ``fourmi.grille``).
+
+    Args:
+        config (dict): La configuration de la simulation.
+        jit (bool, optional): Utiliser numba (par défaut, s'il est installé).
+        autoroute (bool): Activer le saut de périodes pour une fourmi seule.
+
+    Returns:
+        tuple: La grille, la liste des fourmis et le moteur.
+
+    Raises:
+        ValueError: Si la règle ou la topologie sont mal formées ou ne conviennent pas au stockage.
+    """
+    largeur, hauteur = config['largeur'], config['hauteur']
+    stockage = config.get('stockage', 'octets')
+    regle = Regle.depuis_config(config.get('regle'))
+    if stockage == 'creuse':
+        if not regle.langton:
+            raise ValueError("La grille creuse ne simule que la fourmi de Langton (regle: RL).")
+        grille = GrilleCreuse()
+        moteur = MoteurCreux()
+    else:
+        grille = creer_grille(largeur, hauteur, stockage, regle.n_couleurs, config.get('topologie', 'borne'))
+        moteur = Moteur(jit=jit, autoroute=autoroute, regle=regle)
+    positions = config.get('positions') or [(largeur // 2, hauteur // 2)]
+    fourmis = [Fourmi(*positions[i % len(positions)], ant_id=i) for i in range(config.get('nombre_de_fourmis', 1))]
+    return grille, fourmis, moteur
+
+
+def memoire_max_ko():
+    """Retourne la mémoire résidente maximale du processus, en kio (None si inconnue).
+
+    Returns:
+        int: La mémoire maximale en kio.
+    """
+    if resource is None:
+        return None
+    maximum = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximum // 1024 if sys.platform == 'darwin' else maximum
+
+
+def compter_cases_noires(grille):
+    """Compte les cases non blanches de la grille.
+
+    Une grille creuse est comptée tuile par tuile, sans construire le tableau de son emprise.
+
+    Args:
+        grille (Grille): La grille de la simulation.
+
+    Returns:
+        int: Le nombre de cases non blanches.
+    """
+    if isinstance(grille, GrilleCreuse):
+        return sum(len(contenu) - contenu.count(0) for contenu in grille.tuiles.values())
+    return int(np.count_nonzero(grille.vers_tableau()))
+
+
+def suivre(config, grille, fourmis, moteur, etapes):
+    """Simule ``etapes`` étapes en écrivant la série des statistiques de la configuration.
+
+    Chaque étape est tracée (aucune période n'est sautée), par lots d'au plus
+    ``CASES_PAR_LOT`` cases.
+
+    Args:
+        config (dict): La configuration (``statistiques`` et ``intervalle_statistiques``).
+        grille (Grille): La grille de la simulation.
+        fourmis (list): La liste des fourmis.
+        moteur (Moteur): Le moteur de simulation.
+        etapes (int): Le nombre d'étapes à simuler.
+
+    Returns:
+        dict: Le résumé des statistiques à la fin de l'exécution.
+
+    Raises:
+        ValueError: Si la grille est creuse, ou si le format du fichier n'est pas pris en charge.
+    """
+    if isinstance(grille, GrilleCreuse):
+        raise ValueError("Les statistiques demandent une grille dense (stockage: octets ou bits).")
+    lot = max(1, CASES_PAR_LOT // max(1, len(fourmis)))
+    with ouvrir_serie(config['statistiques']) as serie:
+        statistiques = Statistiques(grille, fourmis, moteur.regle, serie=serie,
+                                    intervalle=config.get('intervalle_statistiques', 1000))
+        for fait in range(0, etapes, lot):
+            statistiques.avancer(moteur, grille, fourmis, min(lot, etapes - fait), cases_max=0)
+    return statistiques.resume()
+
+
+def executer(config, jit=None, autoroute=True):
+    """Fait tourner la simulation décrite par la configuration jusqu'à ``etapes``.
+
+    Args:
+        config (dict): La configuration de la simulation.
+        jit (bool, optional): Utiliser numba (par défaut, s'il est installé).
+        autoroute (bool): Activer le saut de périodes pour une fourmi seule.
+
+    Returns:
+        tuple: La grille, la liste des fourmis et le dictionnaire des statistiques.
+    """
+    grille, fourmis, moteur = preparer(config, jit, autoroute)
+    etapes = config['etapes']
+    debut = time.perf_counter()
+    suivies = None
+    if config.get('statistiques'):
+        suivies = suivre(config, grille, fourmis, moteur, etapes)
+    else:
+        moteur.simuler(grille, fourmis, etapes)
+    duree = time.perf_counter() - debut
+    statistiques = {
+        "etapes": etapes,
+        "nombre_de_fourmis": len(fourmis),
+        "duree_s": duree,
+        "etapes_par_seconde": etapes / duree if duree > 0 else None,
+        "etapes_simulees": moteur.etapes_simulees,
+        "etapes_accelerees": moteur.etapes_accelerees,
+        "cases_noires": compter_cases_noires(grille),
+        "memoire_max_ko": memoire_max_ko(),
+    }
+    if suivies is not None:
+        statistiques["analyse"] = suivies
+    return grille, fourmis, statistiques
+
+
+def etat_final(grille, fourmis):
+    """Décrit l'état de la simulation dans le format de ``sauvegarde.json``.
+
+    Pour une grille extensible, la clé ``origine`` donne la position de la case
+    (0, 0) de ``grille``. Une grille creuse n'est pas écrite en entier : la clé
+    ``tuiles`` liste ses tuiles non vides, ``[tx, ty, contenu]`` avec le contenu
+    en hexadécimal ligne par ligne, de côté ``taille_tuile`` ; ``origine`` est
+    alors le coin de son emprise.
+
+    Args:
+        grille (Grille): La grille de la simulation.
+        fourmis (list): La liste des fourmis.
+
+    Returns:
+        dict: L'état de la simulation.
+    """
+    if isinstance(grille, GrilleCreuse):
+        emprise = grille.emprise()
+        return {"origine": list(emprise[:2]) if emprise else [0, 0], "taille_tuile": grille.taille_tuile,
+                "tuiles": [[tx, ty, contenu.hex()] for (tx, ty), contenu in sorted(grille.tuiles.items())],
+                "fourmis": decrire_fourmis(fourmis)}
+    etat = vers_dict(grille, fourmis)
+    if grille.topologie == 'extensible':
+        etat["origine"] = [grille.origine_x, grille.origine_y]
+    return etat
+
+
+def analyser_arguments(argv=None):
+    """Analyse les arguments de la ligne de commande.
+
+    Args:
+        argv (list, optional): Les arguments (par défaut, ceux du processus).
+
+    Returns:
+        argparse.Namespace: Les arguments analysés.
+    """
+    analyseur = argparse.ArgumentParser(prog="python -m fourmi.run", description=__doc__.strip().splitlines()[0])
+    analyseur.add_argument("--config", default=CHEMIN_CONFIGURATION, help="Fichier de configuration YAML.")
+    analyseur.add_argument("--etapes", type=int, help="Nombre d'étapes (remplace 'etapes' de la configuration).")
+    analyseur.add_argument("--sortie", default="etat_final.json", help="Fichier de l'état final ('-' pour ne pas l'écrire).")
+    analyseur.add_argument("--stats", default="-", help="Fichier JSON des statistiques ('-' pour la sortie standard).")
+    analyseur.add_argument("--sans-jit", action="store_true", help="Ne pas utiliser numba.")
+    analyseur.add_argument("--sans-autoroute", action="store_true", help="Ne pas sauter les périodes de l'autoroute.")
+    analyseur.add_argument("--statistiques",
+                           help="Fichier .csv ou .parquet de la série des statistiques (remplace 'statistiques').")
+    analyseur.add_argument("--intervalle-statistiques", type=int,
+                           help="Étapes entre deux lignes de la série (remplace 'intervalle_statistiques').")
+    analyseur.add_argument("--profil", help="Fichier où écrire le profil de la simulation.")
+    analyseur.add_argument("--profileur", choices=PROFILEURS, default="cprofile", help="Outil de profilage.")
+    return analyseur.parse_args(argv)
+
+
+def main(argv=None):
+    """Point d'entrée de l'exécution sans affichage.
+
+    Args:
+        argv (list, optional): Les arguments de la ligne de commande.
+
+    Returns:
+        int: Le code de retour du processus.
+    """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    arguments = analyser_arguments(argv)
+    config = lire_configuration(arguments.config)
+    if arguments.etapes is not None:
+        config['etapes'] = arguments.etapes
+    if arguments.statistiques is not None:
+        config['statistiques'] = arguments.statistiques
+    if arguments.intervalle_statistiques is not None:
+        config['intervalle_statistiques'] = arguments.intervalle_statistiques
+
+    with profiler(arguments.profil, arguments.profileur) if arguments.profil else contextlib.nullcontext():
+        grille, fourmis, statistiques = executer(
+            config, jit=False if arguments.sans_jit else None, autoroute=not arguments.sans_autoroute)
+    if arguments.profil:
+        logging.info("Profil écrit dans %s.", arguments.profil)
+    logging.info("%d étapes en %.3f s (%.0f étapes/s), mémoire max : %s kio.", statistiques["etapes"],
+                 statistiques["duree_s"], statistiques["etapes_par_seconde"] or 0, statistiques["memoire_max_ko"])
+
+    if arguments.sortie != '-':
+        with open(arguments.sortie, 'w', encoding='utf-8') as fichier:
+            json.dump(etat_final(grille, fourmis), fichier)
+        logging.info("État final écrit dans %s.", arguments.sortie)
+    if arguments.stats == '-':
+        print(json.dumps(statistiques, indent=2))
+    else:
+        with open(arguments.stats, 'w', encoding='utf-8') as fichier:
+            json.dump(statistiques, fichier, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+"""
+Module des sessions de simulation hébergées par le serveur.
+
+Une session possède sa grille, ses fourmis et son moteur, et les fait avancer
+dans une tâche asyncio de fond. Le calcul de chaque lot d'étapes se fait dans
+un exécuteur (un fil d'exécution) : la boucle d'événements du serveur n'est
+jamais bloquée, et tous les clients qui observent la session lisent le même
+état, calculé une seule fois.
+
+Une session pilotée n'est pas simulée par le serveur : elle reçoit l'état d'un
+client par le protocole de synchronisation (voir ``fourmi.synchro``).
+
+Les modifications de chaque lot sont publiées aux abonnés du flux continu
+(voir ``fourmi.diffusion``).
+"""
+
+import asyncio
+import time
+
+import numpy as np
+
+from fourmi.diffusion import Diffusion
+from fourmi.fourmi import Fourmi
+from fourmi.grille import creer_grille
+from fourmi.encodage import BINAIRE, JSON, compresser, deplier_grille, encoder_corps
+from fourmi.instantane import decrire_fourmis, encoder_instantane, fourmis_depuis_dict
+from fourmi.moteur import Moteur
+from fourmi.ordonnanceur import TRACE_MAX, Ordonnanceur, tracer
+
+
+class ConflitDeVersion(ValueError):
+    """Différence reçue pour une autre version que celle de la session.
+
+    Attributs:
+        version (int): La version actuelle de la session.
+    """
+
+    def __init__(self, version):
+        super().__init__(f"La session est à la version {version}.")
+        self.version = version
+
+
+def _verifier_fourmis(grille, fourmis):
+    """Vérifie que les fourmis reçues d'un client sont sur la grille.
+
+    Quelle que soit la topologie, une fourmi est entre deux étapes sur une case
+    de la grille : une grille extensible a déjà été agrandie et un tore a déjà
+    ramené la fourmi de l'autre côté.
+
+    Raises:
+        ValueError: Si une fourmi est hors de la grille.
+    """
+    for f in fourmis:
+        if not (0 <= f.x < grille.largeur and 0 <= f.y < grille.hauteur):
+            raise ValueError(f"Fourmi {f.ant_id} hors de la grille : ({f.x}, {f.y}).")
+
+
+class Session:
+    """Simulation nommée, avancée en fond par le serveur.
+
+    Attributs:
+        nom (str): Le nom de la session.
+        grille (Grille): La grille de la simulation.
+        fourmis (list): La liste des fourmis.
+        moteur (Moteur): Le moteur de simulation.
+        ordonnanceur (Ordonnanceur): Fixe la vitesse, en étapes par seconde.
+        active (bool): Faux pendant une pause.
+        etape (int): Le nombre d'étapes simulées depuis la création (la version de l'état).
+        pilotee (bool): Vrai si l'état vient d'un client et n'est pas simulé par le serveur.
+        diffusion (Diffusion): Les modifications publiées aux abonnés du flux continu.
+        duree_calcul (float): Les secondes passées à simuler les lots d'étapes.
+    """
+
+    PERIODE = 1 / 30  # Secondes entre deux lots d'étapes
+
+    def __init__(self, nom, largeur, hauteur, nombre_de_fourmis=1, etapes_par_seconde=10,
+                 stockage='octets', moteur=None, pilotee=False, regle=None, topologie='borne'):
+        """Initialise la session, avec les fourmis au centre d'une grille vide.
+
+        Args:
+            nom (str): Le nom de la session.
+            largeur (int): La largeur de la grille.
+            hauteur (int): La hauteur de la grille.
+            nombre_de_fourmis (int): Le nombre de fourmis.
+            etapes_par_seconde (float): La vitesse de simulation.
+            stockage (str): Le stockage de la grille ('octets' ou 'bits').
+            moteur (Moteur, optional): Le moteur de simulation.
+            pilotee (bool): Vrai si l'état est envoyé par un client (pas de tâche de fond).
+            regle (optional): La règle des fourmis, si ``moteur`` n'est pas donné (voir ``fourmi.regles``).
+            topologie (str): La topologie de la grille ('borne', 'tore' ou 'extensible').
+
+        Raises:
+            ValueError: Si la règle est mal formée ou a trop de couleurs pour le stockage,
+                ou si la topologie est inconnue.
+        """
+        self.nom = nom
+        self.pilotee = pilotee
+        self.moteur = moteur or Moteur(regle=regle)
+        self.grille = creer_grille(largeur, hauteur, stockage, self.moteur.regle.n_couleurs, topologie)
+        self.fourmis = [Fourmi(largeur // 2, hauteur // 2, ant_id=i) for i in range(nombre_de_fourmis)]
+        self.ordonnanceur = Ordonnanceur(etapes_par_seconde)
+        self.active = True
+        self.etape = 0
+        self._verrou = asyncio.Lock()
+        self._tache = None
+        self._representations = {}  # État encodé de l'étape courante, par format et compression
+        self._etape_representee = None
+        self.diffusion = Diffusion()
+        self.duree_calcul = 0.0
+
+    def demarrer(self):
+        """Démarre la tâche de fond dans la boucle d'événements courante, si elle n'y tourne pas déjà."""
+        boucle = asyncio.get_running_loop()
+        if self.pilotee:
+            return
+        if self._tache is None or self._tache.done() or self._tache.get_loop() is not boucle:
+            self._verrou = asyncio.Lock()  # Un verrou est lié à sa boucle d'événements
+            self.ordonnanceur.reinitialiser()
+            self._tache = boucle.create_task(self._boucle(), name=f"session-{self.nom}")
+
+    async def arreter(self):
+        """Arrête la tâche de fond et attend sa fin."""
+        if self._tache is not None and self._tache.get_loop() is asyncio.get_running_loop():
+            self._tache.cancel()
+            try:
+                await self._tache
+            except asyncio.CancelledError:
+                pass
+        self._tache = None
+
+    async def _boucle(self):
+        """Boucle de la tâche de fond : un lot d'étapes par période, calculé dans l'exécuteur."""
+        boucle = asyncio.get_running_loop()
+        while True:
+            n_etapes = self.ordonnanceur.etapes_a_faire() if self.active else 0
+            if n_etapes:
+                async with self._verrou:
+                    changement = await boucle.run_in_executor(None, self._avancer, n_etapes)
+                    self.etape += n_etapes
+                    self.diffusion.publier(changement, self.fourmis, self.etape)
+            elif not self.active:
+                self.ordonnanceur.reinitialiser()
+            await asyncio.sleep(self.PERIODE)
+
+    def _avancer(self, n_etapes):
+        """Simule un lot d'étapes (dans l'exécuteur) et relève les cases modifiées pour les abonnés.
+
+        Les étapes sont tracées tant que les modifications sont suivies ; sinon, ou si
+        le lot est trop long pour être tracé, elles sont simulées d'un bloc.
+        """
+        debut = time.perf_counter()
+        if self.diffusion.suivie and n_etapes * len(self.fourmis) <= TRACE_MAX:
+            cellules = tracer(self.moteur, self.grille, self.fourmis, n_etapes)
+        else:
+            self.moteur.simuler(self.grille, self.fourmis, n_etapes)
+            cellules = None  # Les abonnés éventuels recevront un instantané
+        self.duree_calcul += time.perf_counter() - debut
+        return self.diffusion.difference(self.grille, cellules)
+
+    def _encoder(self, format_, compression):
+        """Encode l'état courant (dans l'exécuteur, sous le verrou)."""
+        if format_ == BINAIRE:
+            donnees = encoder_instantane(self.grille, self.fourmis, self.etape, 'aucune')
+        else:
+            etat = {"grille": self.grille.vers_tableau(), "fourmis": decrire_fourmis(self.fourmis),
+                    "etape": self.etape, "session": self.nom}
+            donnees = encoder_corps(format_, etat)
+        return compresser(donnees, compression)
+
+    async def representation(self, format_=JSON, compression=None):
+        """Retourne l'état courant encodé, une seule fois par étape, format et compression.
+
+        Args:
+            format_ (str): Le type de contenu (voir ``fourmi.encodage``).
+            compression (str, optional): ``'br'``, ``'gzip'`` ou None.
+
+        Returns:
+            bytes: L'état (``grille``, ``fourmis``, ``etape``, ``session``) encodé.
+        """
+        boucle = asyncio.get_running_loop()
+        async with self._verrou:
+            if self._etape_representee != self.etape:
+                self._representations = {}
+                self._etape_representee = self.etape
+            cle = (format_, compression)
+            if cle not in self._representations:
+                self._representations[cle] = await boucle.run_in_executor(None, self._encoder, format_, compression)
+            return self._representations[cle]
+
+    async def synchroniser(self, version, fourmis, base=None, cellules=(), grille=None, valeurs=None):
+        """Applique un envoi du client : grille complète, ou différences depuis ``base``.
+
+        Args:
+            version (int): La nouvelle version de l'état.
+            fourmis (list): Les fourmis, au format JSON de ``sauvegarde.json``.
+            base (int, optional): La version sur laquelle s'appuient les différences.
+            cellules (list): Les indices ``y * largeur + x`` des cases qui ont changé depuis ``base``.
+                Une case répétée prend sa dernière valeur.
+            grille (optional): La grille complète (liste de lignes ou grille compactée),
+                qui remplace l'actuelle.
+            valeurs (list, optional): Les nouvelles couleurs des ``cellules`` (par défaut,
+                elles sont inversées).
+
+        Raises:
+            ConflitDeVersion: Si la session n'est pas à la version ``base``.
+            ValueError: Si une case ou une fourmi est hors de la grille, ou si les valeurs
+                ne correspondent pas aux cases.
+        """
+        boucle = asyncio.get_running_loop()
+        async with self._verrou:
+            if grille is None and base != self.etape:
+                raise ConflitDeVersion(self.etape)
+            changement = await boucle.run_in_executor(None, self._appliquer, fourmis, cellules, grille, valeurs)
+            self.etape = version
+            self._representations = {}
+            self.diffusion.publier(changement, self.fourmis, self.etape)
+
+    def _appliquer(self, fourmis, cellules, grille, valeurs):
+        """Applique un envoi du client (dans l'exécuteur, sous le verrou) et relève les cases modifiées.
+
+        Rien n'est modifié si l'envoi est refusé.
+        """
+        fourmis = fourmis_depuis_dict({"fourmis": fourmis})
+        if grille is not None:
+            tableau = deplier_grille(grille)
+            nouvelle = creer_grille(tableau.shape[1], tableau.shape[0], self.grille.stockage,
+                                    topologie=self.grille.topologie)
+            nouvelle.depuis_tableau(tableau)
+            _verifier_fourmis(nouvelle, fourmis)
+            self.grille, self.fourmis = nouvelle, fourmis
+            return self.diffusion.difference(self.grille, None)  # Grille remplacée : instantané pour les abonnés
+        _verifier_fourmis(self.grille, fourmis)
+        indices = np.asarray(cellules, dtype=np.int64)
+        if len(indices) and (indices.min() < 0 or indices.max() >= self.grille.largeur * self.grille.hauteur):
+            raise ValueError("Case hors de la grille.")
+        if valeurs is not None and len(valeurs) != len(indices):
+            raise ValueError("Il faut une valeur par case modifiée.")
+        # Une case envoyée deux fois prend sa dernière valeur ; sans valeurs, elle n'est inversée qu'une fois
+        indices, dernieres = np.unique(indices[::-1], return_index=True)
+        if valeurs is None:
+            couleurs = self.grille.lire_cases(indices) ^ 1
+        else:
+            couleurs = np.asarray(valeurs, dtype=np.uint8)[::-1][dernieres]
+        if len(indices):
+            self.grille.ecrire_cases(indices, couleurs)
+        self.fourmis = fourmis
+        return self.diffusion.difference(self.grille, indices)
+
+    async def instantane(self, compression='zlib'):
+        """Retourne un instantané binaire de l'état courant, point de départ d'un abonné au flux.
+
+        Args:
+            compression (str): ``'aucune'``, ``'zlib'`` ou ``'lz4'``.
+
+        Returns:
+            tuple: Le numéro de publication de l'instantané et l'instantané.
+        """
+        boucle = asyncio.get_running_loop()
+        async with self._verrou:
+            self.diffusion.suivre(self.grille, self.fourmis, self.etape)
+            trame = await boucle.run_in_executor(
+                None, encoder_instantane, self.grille, self.fourmis, self.etape, compression)
+            return self.diffusion.numero, trame
+
+    def decrire(self):
+        """Retourne un résumé de la session, sans la grille.
+
+        Returns:
+            dict: Le nom, les dimensions, la topologie, le nombre de fourmis, la règle, l'étape et la vitesse.
+        """
+        return {
+            "session": self.nom,
+            "largeur": self.grille.largeur,
+            "hauteur": self.grille.hauteur,
+            "topologie": self.grille.topologie,
+            "nombre_de_fourmis": len(self.fourmis),
+            "regle": self.moteur.regle.nom,
+            "etape": self.etape,
+            "etapes_par_seconde": self.ordonnanceur.etapes_par_seconde,
+            "active": self.active,
+            "pilotee": self.pilotee,
+        }
+
+
+class Sessions:
+    """Registre des sessions du serveur, indexées par nom."""
+
+    def __init__(self):
+        """Initialise un registre vide."""
+        self._sessions = {}
+
+    def __contains__(self, nom):
+        return nom in self._sessions
+
+    def __iter__(self):
+        return iter(list(self._sessions.values()))
+
+    def creer(self, nom, *args, **kwargs):
+        """Crée une session et démarre sa tâche de fond.
+
+        Args:
+            nom (str): Le nom de la session.
+            *args: Les arguments de ``Session``.
+            **kwargs: Les arguments nommés de ``Session``.
+
+        Returns:
+            Session: La session créée.
+
+        Raises:
+            ValueError: Si une session porte déjà ce nom.
+        """
+        if nom in self._sessions:
+            raise ValueError(f"La session {nom!r} existe déjà.")
+        session = Session(nom, *args, **kwargs)
+        self._sessions[nom] = session
+        session.demarrer()
+        return session
+
+    def obtenir(self, nom):
+        """Retourne une session en relançant sa tâche de fond si besoin.
+
+        Args:
+            nom (str): Le nom de la session.
+
+        Returns:
+            Session: La session.
+
+        Raises:
+            KeyError: Si la session n'existe pas.
+        """
+        session = self._sessions[nom]
+        session.demarrer()
+        return session
+
+    async def supprimer(self, nom):
+        """Arrête et supprime une session.
+
+        Args:
+            nom (str): Le nom de la session.
+
+        Raises:
+            KeyError: Si la session n'existe pas.
+        """
+        await self._sessions.pop(nom).arreter()
+
+    async def arreter(self):
+        """Arrête les tâches de fond de toutes les sessions."""
+        for session in self:
+            await session.arreter()
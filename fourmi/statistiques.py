@@ -0,0 +1,361 @@
+"""
+Module des statistiques de la simulation, tenues à jour pendant l'exécution.
+
+Les statistiques se déduisent des étapes tracées par le moteur (``Moteur.tracer``) :
+la case, la direction et la couleur lue avant chaque étape de chaque fourmi. Leur
+coût est proportionnel au nombre d'étapes simulées, et non à la taille de la
+grille : seule la population de départ demande de parcourir la grille une fois.
+
+- la population (nombre de cases non blanches) ;
+- l'emprise des cases visitées (rectangle englobant, en coordonnées absolues) ;
+- pour chaque fourmi, sa position dépliée (sans les retours d'un tore), son
+  déplacement depuis le départ, la longueur de son chemin et la période de son
+  mouvement, avec l'étape où ce mouvement périodique a commencé (l'autoroute de
+  la fourmi de Langton, de période 104).
+
+Toutes les ``intervalle`` étapes, une ligne par fourmi est ajoutée à une série
+chronologique, écrite par blocs dans un fichier CSV ou Parquet (``pyarrow``,
+facultatif).
+"""
+
+import csv
+import os
+
+import numpy as np
+
+from fourmi.fourmi import DX, DY
+from fourmi.moteur import Moteur, _detecter_periode
+from fourmi.ordonnanceur import CASES_MAX, cases_modifiees
+from fourmi.regles import LANGTON
+
+COLONNES = ('etape', 'fourmi', 'population', 'x_min', 'y_min', 'x_max', 'y_max', 'x', 'y',
+            'deplacement_x', 'deplacement_y', 'longueur', 'periode', 'debut_periode')
+FORMATS = ('csv', 'parquet')
+LIGNES_TRIEES = 16  # Dernières étapes comparées pour écarter vite les périodes impossibles
+_DX = np.array(DX, dtype=np.int64)
+_DY = np.array(DY, dtype=np.int64)
+
+
+class SerieCSV:
+    """Série chronologique écrite dans un fichier CSV, par blocs de lignes.
+
+    Attributs:
+        chemin (str): Le chemin du fichier.
+        lignes_par_bloc (int): Le nombre de lignes gardées en mémoire avant chaque écriture.
+    """
+
+    def __init__(self, chemin, lignes_par_bloc=1000):
+        self.chemin = chemin
+        self.lignes_par_bloc = max(1, lignes_par_bloc)
+        self._fichier = open(chemin, 'w', encoding='utf-8', newline='')  # pylint: disable=consider-using-with
+        self._ecrivain = csv.writer(self._fichier)
+        self._ecrivain.writerow(COLONNES)
+        self._lignes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def ajouter(self, lignes):
+        """Ajoute des lignes à la série, et écrit un bloc s'il est complet.
+
+        Args:
+            lignes (list): Les lignes, des tuples dans l'ordre de ``COLONNES``.
+        """
+        self._lignes.extend(lignes)
+        if len(self._lignes) >= self.lignes_par_bloc:
+            self.vider()
+
+    def vider(self):
+        """Écrit les lignes en attente."""
+        if self._lignes:
+            self._ecrivain.writerows(('' if v is None else v for v in ligne) for ligne in self._lignes)
+            self._fichier.flush()
+            self._lignes = []
+
+    def fermer(self):
+        """Écrit les lignes en attente et ferme le fichier."""
+        if not self._fichier.closed:
+            self.vider()
+            self._fichier.close()
+
+
+class SerieParquet(SerieCSV):
+    """Série chronologique écrite dans un fichier Parquet, un groupe de lignes par bloc.
+
+    Demande ``pyarrow``, importé à la création de la série.
+    """
+
+    def __init__(self, chemin, lignes_par_bloc=1000):  # pylint: disable=super-init-not-called
+        try:
+            import pyarrow  # pylint: disable=import-outside-toplevel
+            import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            raise ValueError("L'écriture au format Parquet demande pyarrow, qui n'est pas installé.") from None
+        self.chemin = chemin
+        self.lignes_par_bloc = max(1, lignes_par_bloc)
+        self._pyarrow = pyarrow
+        self._schema = pyarrow.schema([(nom, pyarrow.int64()) for nom in COLONNES])
+        self._fichier = pyarrow.parquet.ParquetWriter(chemin, self._schema)
+        self._ouvert = True
+        self._lignes = []
+
+    def vider(self):
+        if self._lignes:
+            colonnes = zip(*self._lignes)
+            self._fichier.write_table(self._pyarrow.Table.from_arrays(
+                [self._pyarrow.array(c, type=self._pyarrow.int64()) for c in colonnes], schema=self._schema))
+            self._lignes = []
+
+    def fermer(self):
+        if self._ouvert:
+            self.vider()
+            self._fichier.close()
+            self._ouvert = False
+
+
+def ouvrir_serie(chemin, lignes_par_bloc=1000):
+    """Ouvre une série chronologique dont le format suit l'extension du fichier.
+
+    Args:
+        chemin (str): Le chemin du fichier, en ``.csv`` ou ``.parquet``.
+        lignes_par_bloc (int): Le nombre de lignes écrites à la fois.
+
+    Returns:
+        SerieCSV: La série ouverte (``SerieParquet`` pour un fichier ``.parquet``).
+
+    Raises:
+        ValueError: Si l'extension est inconnue, ou si pyarrow manque pour un fichier Parquet.
+    """
+    extension = os.path.splitext(chemin)[1].lower().lstrip('.')
+    if extension == 'csv':
+        return SerieCSV(chemin, lignes_par_bloc)
+    if extension == 'parquet':
+        return SerieParquet(chemin, lignes_par_bloc)
+    raise ValueError(f"Format de statistiques inconnu : {chemin!r} (attendus : {', '.join(FORMATS)}).")
+
+
+class Statistiques:
+    """Statistiques d'une simulation, mises à jour à partir des étapes tracées.
+
+    Attributs:
+        etape (int): Le nombre d'étapes observées.
+        population (int): Le nombre de cases non blanches.
+        emprise (tuple): Le rectangle (x_min, y_min, x_max, y_max) des cases visitées, ou None.
+        identifiants (list): L'identifiant de chaque fourmi.
+        x, y (numpy.ndarray): La position dépliée de chaque fourmi, en coordonnées absolues.
+        longueurs (numpy.ndarray): Le nombre de cases parcourues par chaque fourmi.
+        periodes (numpy.ndarray): La période du mouvement de chaque fourmi, ou 0.
+        debuts_periodes (numpy.ndarray): L'étape où ce mouvement périodique a commencé, ou -1.
+        serie (SerieCSV): La série chronologique écrite, ou None.
+        intervalle (int): Le nombre d'étapes entre deux lignes de la série.
+    """
+
+    def __init__(self, grille, fourmis, regle=LANGTON, etape=0, serie=None, intervalle=1000,
+                 periode_max=Moteur.PERIODE_MAX):
+        """Initialise les statistiques à partir de l'état courant.
+
+        Args:
+            grille (Grille): La grille de la simulation (un seul parcours, pour la population).
+            fourmis (list): La liste des fourmis.
+            regle (Regle): La règle des fourmis.
+            etape (int): L'étape courante de la simulation.
+            serie (SerieCSV, optional): La série où écrire une ligne par fourmi toutes les ``intervalle`` étapes.
+            intervalle (int): Le nombre d'étapes entre deux lignes de la série.
+            periode_max (int): La plus grande période cherchée.
+        """
+        self.etape = etape
+        self.population = int(np.count_nonzero(grille.vers_tableau()))
+        self.emprise = None
+        self.identifiants = [f.ant_id for f in fourmis]
+        self.x = np.array([f.x + grille.origine_x for f in fourmis], dtype=np.int64)
+        self.y = np.array([f.y + grille.origine_y for f in fourmis], dtype=np.int64)
+        self._depart = (self.x.copy(), self.y.copy())
+        self.longueurs = np.zeros(len(fourmis), dtype=np.int64)
+        self.periodes = np.zeros(len(fourmis), dtype=np.int64)
+        self.debuts_periodes = np.full(len(fourmis), -1, dtype=np.int64)
+        self.serie = serie
+        self.intervalle = max(1, intervalle)
+        self.periode_max = periode_max
+        self._couleurs = np.asarray(regle.couleurs, dtype=np.int64)
+        self._n_couleurs = regle.n_couleurs
+        # Les dernières étapes de chaque fourmi (position dépliée, direction et état, couleur), pour les périodes
+        positions = np.zeros((0, len(fourmis)), dtype=np.int64)
+        octets = np.zeros((0, len(fourmis)), dtype=np.uint8)
+        self._historique = (positions, positions, octets, octets)
+        self._debut_historique = etape
+
+    def avancer(self, moteur, grille, fourmis, n_etapes, cases_max=CASES_MAX):
+        """Simule ``n_etapes`` étapes en tenant les statistiques à jour, comme ``ordonnanceur.avancer``.
+
+        Args:
+            moteur (Moteur): Le moteur de simulation.
+            grille (Grille): La grille de la simulation (stockage dense).
+            fourmis (list): La liste des fourmis.
+            n_etapes (int): Le nombre d'étapes à simuler.
+            cases_max (int): Le nombre maximal de cases relevées une à une.
+
+        Returns:
+            list | Zone: Les cases (x, y) modifiées s'il y en a au plus ``cases_max``, sinon
+            le rectangle qui les contient ; None si la grille a été agrandie.
+        """
+        modifiees, agrandie = [], False
+        restant = n_etapes
+        while restant > 0:
+            cellules, directions, couleurs = moteur.tracer(grille, fourmis, restant, couleurs=True)
+            restant -= len(cellules)
+            self.observer(grille, cellules, directions, couleurs, fourmis)
+            if grille.etendre(fourmis) is not None:
+                agrandie = True
+                continue
+            modifiees.append(cellules)
+        return None if agrandie else cases_modifiees(grille, modifiees, cases_max)
+
+    def observer(self, grille, cellules, directions, couleurs, fourmis):
+        """Met les statistiques à jour avec des étapes tracées par ``Moteur.tracer``.
+
+        À appeler juste après le tracé, avant d'agrandir la grille : les cases
+        relevées sont des indices dans ses dimensions actuelles.
+
+        Args:
+            grille (Grille): La grille de la simulation.
+            cellules (numpy.ndarray): L'indice de la case de chaque fourmi avant chaque étape.
+            directions (numpy.ndarray): La direction et l'état de chaque fourmi avant chaque étape.
+            couleurs (numpy.ndarray): La couleur lue par chaque fourmi à chaque étape.
+            fourmis (list): Les fourmis, après la dernière étape.
+        """
+        n = len(cellules)
+        if not n or not fourmis:
+            self.etape += n  # Sans fourmi, la série n'a aucune ligne à écrire
+            return
+        largeur = grille.largeur
+        cx, cy = cellules % largeur, cellules // largeur
+        # Direction et état après chaque étape : ceux d'avant l'étape suivante
+        apres = np.vstack([directions[1:], [f.direction | f.etat << 2 for f in fourmis]]).astype(np.int64)
+        fin_x = np.vstack([cx[1:], [f.x for f in fourmis]])
+        fin_y = np.vstack([cy[1:], [f.y for f in fourmis]])
+        # Le pas se déduit de la direction prise : il reste juste quand un tore ramène la fourmi de l'autre côté
+        bouge = (fin_x != cx) | (fin_y != cy)
+        pas_x = np.where(bouge, _DX[apres & 3], 0).cumsum(axis=0)
+        pas_y = np.where(bouge, _DY[apres & 3], 0).cumsum(axis=0)
+        nouvelles = self._couleurs[(directions >> 2).astype(np.intp) * self._n_couleurs + couleurs]
+        variations = np.count_nonzero(nouvelles, axis=1) - np.count_nonzero(couleurs, axis=1)
+        depart_x, depart_y = self.x.copy(), self.y.copy()
+        debut = 0
+        while debut < n:
+            fin = min(n, debut + self.intervalle - self.etape % self.intervalle) if self.serie else n
+            self.population += int(variations[debut:fin].sum())
+            self._agrandir_emprise(cx[debut:fin] + grille.origine_x, cy[debut:fin] + grille.origine_y)
+            self.longueurs += np.count_nonzero(bouge[debut:fin], axis=0)
+            # Positions dépliées avant chaque étape de la tranche, puis après la dernière
+            xs = depart_x + np.vstack([pas_x[debut - 1] if debut else np.zeros_like(depart_x), pas_x[debut:fin - 1]])
+            ys = depart_y + np.vstack([pas_y[debut - 1] if debut else np.zeros_like(depart_y), pas_y[debut:fin - 1]])
+            self.x, self.y = depart_x + pas_x[fin - 1], depart_y + pas_y[fin - 1]
+            self._chercher_periodes(xs, ys, directions[debut:fin], couleurs[debut:fin], apres[fin - 1])
+            self.etape += fin - debut
+            if self.serie is not None and self.etape % self.intervalle == 0:
+                self.serie.ajouter(self.lignes())
+            debut = fin
+
+    def _agrandir_emprise(self, xs, ys):
+        """Agrandit l'emprise des cases visitées."""
+        emprise = (int(xs.min()), int(ys.min()), int(xs.max()), int(ys.max()))
+        if self.emprise is not None:
+            emprise = (min(emprise[0], self.emprise[0]), min(emprise[1], self.emprise[1]),
+                       max(emprise[2], self.emprise[2]), max(emprise[3], self.emprise[3]))
+        self.emprise = emprise
+
+    def _chercher_periodes(self, xs, ys, ds, cs, apres):
+        """Vérifie les périodes connues et cherche celles des autres fourmis.
+
+        Seules les ``3 * periode_max`` dernières étapes sont gardées : une période
+        trouvée demande trois répétitions, et le début du mouvement périodique est
+        cherché dans les étapes gardées et celles de la tranche.
+        """
+        anciens = len(self._historique[0])
+        hx, hy, hd, hc = (np.concatenate([h, t]) for h, t in zip(self._historique, (xs, ys, ds, cs)))
+        n = len(hx)
+        periodiques = np.flatnonzero(self.periodes)
+        if len(periodiques):
+            # Le mouvement continue-t-il de se répéter sur les nouvelles étapes ?
+            periodes = self.periodes[periodiques]
+            lignes = np.arange(anciens, n)[:, None]
+            avant = np.maximum(lignes - periodes, 0)
+            dx = self.x[periodiques] - hx[n - periodes, periodiques]
+            dy = self.y[periodiques] - hy[n - periodes, periodiques]
+            repete = ((lignes < periodes) | ((hd[lignes, periodiques] == hd[avant, periodiques])
+                                             & (hc[lignes, periodiques] == hc[avant, periodiques])
+                                             & (hx[lignes, periodiques] - hx[avant, periodiques] == dx)
+                                             & (hy[lignes, periodiques] - hy[avant, periodiques] == dy)))
+            rompues = periodiques[~repete.all(axis=0)]
+            self.periodes[rompues], self.debuts_periodes[rompues] = 0, -1
+        autres = np.flatnonzero(self.periodes == 0)
+        periode_max = min(self.periode_max, n // 3)
+        if len(autres) and periode_max:
+            # Tri rapide des couples (période, fourmi) sur les dernières étapes, avant la vérification complète
+            periodes = np.arange(1, periode_max + 1)[:, None]
+            possibles = ((hd[n - periodes, autres] == apres[autres])
+                         & ((self.x[autres] != hx[n - periodes, autres]) | (self.y[autres] != hy[n - periodes, autres])))
+            periodes, fourmis = np.nonzero(possibles)
+            periodes, fourmis = periodes + 1, autres[fourmis]
+            dx, dy = self.x[fourmis] - hx[n - periodes, fourmis], self.y[fourmis] - hy[n - periodes, fourmis]
+            for ligne in range(n - 1, max(n - 1 - LIGNES_TRIEES, periode_max - 1), -1):
+                avant = ligne - periodes
+                garder = ((hd[ligne, fourmis] == hd[avant, fourmis]) & (hc[ligne, fourmis] == hc[avant, fourmis])
+                          & (hx[ligne, fourmis] - hx[avant, fourmis] == dx)
+                          & (hy[ligne, fourmis] - hy[avant, fourmis] == dy))
+                periodes, fourmis, dx, dy = periodes[garder], fourmis[garder], dx[garder], dy[garder]
+            for i in np.unique(fourmis).tolist():
+                periode = _detecter_periode(hx[:, i], hy[:, i], hd[:, i], hc[:, i], (self.x[i], self.y[i], apres[i]),
+                                            periode_max, sorted(periodes[fourmis == i].tolist()))
+                if periode:
+                    self.periodes[i] = periode
+                    self.debuts_periodes[i] = self._debut_historique + self._debut_repetition(
+                        hx[:, i], hy[:, i], hd[:, i], hc[:, i], periode, self.x[i] - hx[n - periode, i],
+                        self.y[i] - hy[n - periode, i])
+        garde = 3 * self.periode_max
+        self._historique = (hx[-garde:], hy[-garde:], hd[-garde:], hc[-garde:])
+        self._debut_historique += n - len(self._historique[0])
+
+    @staticmethod
+    def _debut_repetition(xs, ys, ds, cs, periode, dx, dy):
+        """Retourne l'indice de la première étape d'où le mouvement se répète jusqu'à la fin."""
+        identiques = ((ds[periode:] == ds[:-periode]) & (cs[periode:] == cs[:-periode])
+                      & (xs[periode:] - xs[:-periode] == dx) & (ys[periode:] - ys[:-periode] == dy))
+        differences = np.flatnonzero(~identiques)
+        return int(differences[-1]) + 1 if len(differences) else 0
+
+    def lignes(self):
+        """Retourne les lignes de l'étape courante, une par fourmi, dans l'ordre de ``COLONNES``.
+
+        Returns:
+            list: Les lignes (tuples), avec None pour une emprise encore vide ou une période absente.
+        """
+        emprise = self.emprise or (None,) * 4
+        depart_x, depart_y = self._depart
+        return [(self.etape, identifiant, self.population, *emprise, x, y, x - x0, y - y0, longueur,
+                 periode, debut if periode else None)
+                for identifiant, x, y, x0, y0, longueur, periode, debut in zip(
+                    self.identifiants, self.x.tolist(), self.y.tolist(), depart_x.tolist(), depart_y.tolist(),
+                    self.longueurs.tolist(), self.periodes.tolist(), self.debuts_periodes.tolist())]
+
+    def resume(self):
+        """Résume les statistiques courantes.
+
+        Returns:
+            dict: L'étape, la population, l'emprise et, pour chaque fourmi, le déplacement,
+            la longueur du chemin et la période (0 si aucune) avec l'étape de son début.
+        """
+        depart_x, depart_y = self._depart
+        return {
+            "etape": self.etape,
+            "population": self.population,
+            "emprise": list(self.emprise) if self.emprise else None,
+            "fourmis": [{"id": identifiant, "deplacement": [dx, dy], "longueur": longueur, "periode": periode,
+                         "debut_periode": debut if periode else None}
+                        for identifiant, dx, dy, longueur, periode, debut in zip(
+                            self.identifiants, (self.x - depart_x).tolist(), (self.y - depart_y).tolist(),
+                            self.longueurs.tolist(), self.periodes.tolist(), self.debuts_periodes.tolist())],
+        }
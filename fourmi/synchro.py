@@ -0,0 +1,149 @@
+"""
+Module du protocole de synchronisation par différences entre le client et le serveur.
+
+Chaque envoi porte un numéro de version (l'étape de la partie). Le client note
+les cases modifiées par la simulation (``noter``, avec ce que retourne
+``ordonnanceur.avancer``) ; un envoi ne contient que ces cases (indices
+``y * largeur + x``) et leurs couleurs actuelles, la table des fourmis, la
+version acquittée sur laquelle il s'appuie (``base``) et la nouvelle version.
+Son coût suit l'activité de la simulation, pas la taille de la grille. Si le
+serveur n'est pas à la version ``base`` (redémarrage, autre client...), il
+répond 409 et le client renvoie la grille complète, comme lorsque les cases
+modifiées ne sont pas connues (grille agrandie ou remplacée).
+
+Les envois sont espacés d'au moins ``intervalle`` secondes, ce qui regroupe
+plusieurs étapes, et il n'y en a jamais plus d'un en cours. Ils sont encodés
+dans le format le plus compact que le serveur accepte (voir ``fourmi.encodage``).
+"""
+
+import time
+
+import numpy as np
+
+from fourmi.encodage import BINAIRE, formats_disponibles
+from fourmi.instantane import decrire_fourmis, vers_dict
+from fourmi.ordonnanceur import Zone
+
+
+class Synchronisation:
+    """État du client dans le protocole de synchronisation.
+
+    Attributs:
+        intervalle (float): Le délai minimal entre deux envois, en secondes.
+        base (int): La dernière version acquittée par le serveur (None : envoi complet à faire).
+        en_vol (bool): Vrai si un envoi attend sa réponse.
+        formats (list): Les formats d'envoi, du préféré au plus répandu ; un format
+            refusé par le serveur (réponse 415) est retiré.
+    """
+
+    def __init__(self, intervalle=0.2):
+        """Initialise la synchronisation ; le premier envoi sera complet.
+
+        Args:
+            intervalle (float): Le délai minimal entre deux envois, en secondes.
+        """
+        self.intervalle = intervalle
+        self.base = None
+        self.en_vol = False
+        self._modifiees = None  # Indices et zones des cases modifiées depuis le dernier envoi (None : inconnues)
+        self._n_modifiees = 0
+        self._dimensions = None  # Dimensions de la grille du dernier envoi
+        self._envoi = None  # (version, indices envoyés, ou None pour la grille complète) de l'envoi en cours
+        self._dernier_envoi = None
+        self.formats = [f for f in formats_disponibles() if f != BINAIRE]  # Un instantané n'a pas de ``base``
+
+    def reinitialiser(self):
+        """Force un envoi complet au prochain appel de ``preparer``."""
+        self.base = None
+        self._modifiees = None
+
+    def noter(self, grille, changement):
+        """Note les cases modifiées par la simulation, à envoyer au prochain appel de ``preparer``.
+
+        Args:
+            grille (Grille): La grille du client, après les modifications.
+            changement (list | Zone | None): Ce que retourne ``ordonnanceur.avancer`` : les cases (x, y)
+                modifiées, le rectangle qui les contient, ou None si elles ne sont pas connues.
+        """
+        if self._modifiees is None:
+            return
+        if changement is None:
+            self._modifiees = None
+            return
+        if isinstance(changement, Zone):
+            self._ajouter(grille, changement, (changement.x1 - changement.x0) * (changement.y1 - changement.y0))
+        elif changement:
+            cases = np.asarray(changement, dtype=np.int64)
+            self._ajouter(grille, cases[:, 1] * grille.largeur + cases[:, 0], len(cases))
+
+    def _ajouter(self, grille, modifiees, n_modifiees):
+        """Ajoute des cases à envoyer ; au-delà de la moitié de la grille, elle sera renvoyée complète."""
+        self._n_modifiees += n_modifiees
+        if self._n_modifiees > grille.largeur * grille.hauteur // 2:
+            self._modifiees = None
+        else:
+            self._modifiees.append(modifiees)
+
+    def _indices(self, grille):
+        """Retourne les indices, triés et sans doublon, des cases notées depuis le dernier envoi."""
+        indices = []
+        for modifiees in self._modifiees:
+            if isinstance(modifiees, Zone):
+                xs, ys = np.arange(modifiees.x0, modifiees.x1), np.arange(modifiees.y0, modifiees.y1)
+                modifiees = (ys[:, None] * grille.largeur + xs).ravel()
+            indices.append(modifiees)
+        return np.unique(np.concatenate(indices)) if indices else np.zeros(0, dtype=np.int64)
+
+    def preparer(self, grille, fourmis, version, maintenant=None):
+        """Prépare le prochain envoi, s'il y a lieu.
+
+        Args:
+            grille (Grille): La grille du client.
+            fourmis (list): La liste des fourmis.
+            version (int): La version de l'état (l'étape de la partie).
+            maintenant (float, optional): L'instant présent (``time.monotonic()`` par défaut).
+
+        Returns:
+            dict: Le corps de la requête ``/sync``, ou None s'il n'y a rien à envoyer
+            maintenant (envoi en cours, délai non écoulé ou version déjà acquittée).
+        """
+        maintenant = time.monotonic() if maintenant is None else maintenant
+        if self.en_vol or version == self.base:
+            return None
+        if self._dernier_envoi is not None and maintenant - self._dernier_envoi < self.intervalle:
+            return None
+        dimensions = (grille.largeur, grille.hauteur)
+        if self.base is None or self._modifiees is None or self._dimensions != dimensions:
+            corps, indices = vers_dict(grille, fourmis), None
+        else:
+            indices = self._indices(grille)
+            corps = {"base": self.base, "cellules": indices.tolist(),
+                     "valeurs": np.asarray(grille.lire_cases(indices)).tolist(), "fourmis": decrire_fourmis(fourmis)}
+        corps["version"] = version
+        self._envoi = (version, indices)
+        self._modifiees, self._n_modifiees, self._dimensions = [], 0, dimensions
+        self._dernier_envoi = maintenant
+        self.en_vol = True
+        return corps
+
+    def acquitter(self):
+        """Enregistre l'acquittement de l'envoi en cours : il devient la nouvelle base."""
+        self.base = self._envoi[0]
+        self._envoi = None
+        self.en_vol = False
+
+    def echouer(self, resynchroniser=False):
+        """Abandonne l'envoi en cours ; ses cases seront renvoyées au prochain envoi.
+
+        Args:
+            resynchroniser (bool): Vrai si le serveur a refusé la version ``base``
+                (réponse 409) : le prochain envoi sera complet.
+        """
+        indices = self._envoi[1] if self._envoi is not None else None
+        self._envoi = None
+        self.en_vol = False
+        if resynchroniser or indices is None:
+            self.reinitialiser()
+        elif self._modifiees is not None:
+            self._n_modifiees += len(indices)
+            self._modifiees.append(indices)
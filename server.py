@@ -1,20 +1,113 @@
-from fastapi import FastAPI, HTTPException, Header
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Annotated, Literal
+from fastapi import FastAPI, HTTPException, Header, Query, Request, Response, WebSocket, WebSocketDisconnect, status
+from pydantic import BaseModel, Field, ValidationError
 import hmac
 import os
 import logging
+import time
+from fourmi.config import lire_cle_secrete, lire_configuration
+from fourmi.fourmi import Fourmi
+from fourmi.encodage import ERREURS_DECOMPRESSION, FormatInconnu, JSON, decoder_corps, decompresser, deplier_grille, \
+    encoder_corps, compresser, negocier_compression, negocier_format
+from fourmi.grille import STOCKAGES, TOPOLOGIES
+from fourmi.instantane import COMPRESSIONS
+from fourmi.mesures import Registre
+from fourmi.regles import ETATS_MAX, Regle
+from fourmi.session import ConflitDeVersion, Sessions
 
 # Configuration du logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-app = FastAPI()
+SESSION_PAR_DEFAUT = "defaut"
+SESSION_CLIENT = "client"  # Session pilotée par défaut de /sync
+sessions = Sessions()
 
+
+# Lue à l'importation, mais vérifiée seulement au démarrage du serveur (voir ``cycle_de_vie``)
 SECRET_KEY = os.getenv("SECRET_KEY")
-if not SECRET_KEY:
-    raise ValueError(
-        "La clé secrète n'est pas définie ! Assurez-vous qu'elle est dans les variables d'environnement."
-    )
+
+# Métriques exposées par GET /metrics
+metriques = Registre()
+DUREE_REQUETES = metriques.histogramme(
+    "fourmi_requete_duree_secondes", "Durée de traitement des requêtes HTTP.", ("route",))
+TAILLE_REQUETES = metriques.histogramme(
+    "fourmi_requete_octets", "Taille du corps des requêtes HTTP.", ("route",),
+    bornes=(100, 1000, 10000, 100000, 1000000, 10000000))
+TAILLE_REPONSES = metriques.histogramme(
+    "fourmi_reponse_octets", "Taille du corps des réponses HTTP.", ("route",),
+    bornes=(100, 1000, 10000, 100000, 1000000, 10000000))
+REQUETES = metriques.compteur("fourmi_requetes_total", "Requêtes HTTP traitées.", ("route", "statut"))
+ETAPE_SESSION = metriques.jauge("fourmi_session_etape", "Étape courante de chaque session.", ("session",))
+VITESSE_SESSION = metriques.jauge(
+    "fourmi_session_etapes_par_seconde", "Vitesse demandée de chaque session.", ("session",))
+CALCUL_SESSION = metriques.compteur(
+    "fourmi_session_calcul_secondes_total", "Temps passé à simuler chaque session.", ("session",))
+
+
+class MesureRequetes:
+    """Middleware ASGI qui mesure la durée et la taille des requêtes et des réponses HTTP.
+
+    La route est le nom de la fonction qui a traité la requête, ce qui garde un
+    nombre de séries borné. Désactivé (``metriques_serveur: false`` dans
+    config.yaml), il passe chaque requête sans rien mesurer.
+    """
+
+    actif = True
+
+    def __init__(self, app):  # pylint: disable=redefined-outer-name
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.actif:
+            await self.app(scope, receive, send)
+            return
+        debut = time.perf_counter()
+        recus, envoyes, statut = 0, 0, 500
+
+        async def recevoir():
+            nonlocal recus
+            message = await receive()
+            recus += len(message.get("body", b""))
+            return message
+
+        async def envoyer(message):
+            nonlocal envoyes, statut
+            if message["type"] == "http.response.start":
+                statut = message["status"]
+            else:
+                envoyes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, recevoir, envoyer)
+        finally:
+            route = getattr(scope.get("endpoint"), "__name__", "inconnue")
+            DUREE_REQUETES.observer(time.perf_counter() - debut, route=route)
+            TAILLE_REQUETES.observer(recus, route=route)
+            TAILLE_REPONSES.observer(envoyes, route=route)
+            REQUETES.incrementer(route=route, statut=statut)
+
+
+@asynccontextmanager
+async def cycle_de_vie(_app):
+    """Vérifie la clé secrète au démarrage et arrête les tâches de fond des sessions à l'arrêt du serveur.
+
+    Raises:
+        ValueError: Si la clé secrète n'est pas définie.
+    """
+    global SECRET_KEY  # pylint: disable=global-statement
+    SECRET_KEY = lire_cle_secrete()
+    MesureRequetes.actif = lire_configuration().get("metriques_serveur", True)
+    yield
+    await sessions.arreter()
+
+
+app = FastAPI(lifespan=cycle_de_vie)
+app.add_middleware(MesureRequetes)
 
 
 def verify_token(token: str):
@@ -26,51 +119,439 @@ def verify_token(token: str):
     Raises:
         HTTPException: Si le jeton n'est pas valide.
     """
-    if not hmac.compare_digest(token, SECRET_KEY):
+    if not SECRET_KEY or not hmac.compare_digest(token, SECRET_KEY):
         raise HTTPException(status_code=401, detail="Invalid token")
     return token
 
 
+class NouvelleSession(BaseModel):
+    """Paramètres d'une nouvelle session de simulation."""
+
+    nom: str = Field(min_length=1, max_length=64)
+    largeur: int = Field(gt=0, le=16384)
+    hauteur: int = Field(gt=0, le=16384)
+    nombre_de_fourmis: int = Field(default=1, ge=0, le=100000)
+    etapes_par_seconde: float = Field(default=10, ge=0)
+    stockage: str = "octets"
+    regle: str = "RL"  # Lettres R/L/N/U, ou table de turmite en JSON
+    topologie: str = "borne"  # borne, tore ou extensible
+
+
+class ModificationSession(BaseModel):
+    """Modifications d'une session en cours (pause, vitesse)."""
+
+    active: bool | None = None
+    etapes_par_seconde: float | None = Field(default=None, ge=0)
+
+
+class FourmiSynchro(BaseModel):
+    """Fourmi d'un envoi de synchronisation, au format JSON de ``sauvegarde.json``.
+
+    La position est vérifiée par la session, qui connaît les dimensions de sa grille.
+    """
+
+    x: int
+    y: int
+    id: int = Field(ge=-2 ** 31, lt=2 ** 31)
+    direction: Literal[tuple(Fourmi.DIRECTIONS)]
+    etat: int = Field(default=0, ge=0, lt=ETATS_MAX)
+
+
+class Synchro(BaseModel):
+    """Envoi du protocole de synchronisation : grille complète, ou cases modifiées depuis ``base``."""
+
+    version: int = Field(ge=0)
+    fourmis: list[FourmiSynchro]
+    base: int | None = None
+    cellules: list[int] = []
+    valeurs: list[Annotated[int, Field(ge=0, le=255)]] | None = None  # Couleurs des cellules (sinon inversées)
+    grille: list[list[int]] | dict | None = None  # Liste de lignes ou grille compactée
+
+
+def lire_synchro(corps: dict):
+    """Valide un envoi de synchronisation et déplie sa grille (dans l'exécuteur : proportionnel à la grille).
+
+    Args:
+        corps (dict): Le corps décodé de la requête.
+
+    Returns:
+        tuple: L'envoi ``Synchro`` et sa grille dépliée, ou None s'il n'en contient pas.
+
+    Raises:
+        ValidationError: Si l'envoi est mal formé.
+        ValueError: Si la grille est mal formée.
+    """
+    synchro = Synchro.model_validate(corps)
+    return synchro, None if synchro.grille is None else deplier_grille(synchro.grille)
+
+
+def get_session(nom: str):
+    """Retourne la session demandée et relance sa tâche de fond si besoin.
+
+    La session par défaut est créée à la première demande, avec les paramètres
+    de config.yaml.
+
+    Args:
+        nom (str): Le nom de la session.
+
+    Raises:
+        HTTPException: Si la session n'existe pas.
+    """
+    if nom == SESSION_PAR_DEFAUT and nom not in sessions:
+        config = lire_configuration()
+        stockage = config.get("stockage", "octets")
+        topologie = config.get("topologie", "borne")
+        sessions.creer(
+            nom,
+            config["largeur"],
+            config["hauteur"],
+            config.get("nombre_de_fourmis", 1),
+            config.get("vitesse_simulation", 10),
+            stockage if stockage in STOCKAGES else "octets",
+            regle=config.get("regle"),
+            topologie=topologie if topologie in TOPOLOGIES else "borne",
+        )
+        logging.info("Session par défaut créée.")
+    try:
+        return sessions.obtenir(nom)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown session: {nom}") from None
+
+
+async def lire_corps(request: Request):
+    """Lit le corps d'une requête selon ses en-têtes ``Content-Type`` et ``Content-Encoding``.
+
+    Args:
+        request (Request): La requête.
+
+    Returns:
+        dict: Le corps décodé (voir ``fourmi.encodage.decoder_corps``).
+
+    Raises:
+        HTTPException: Si le format n'est pas pris en charge, ou le corps mal formé.
+    """
+    format_ = request.headers.get("content-type", JSON).split(";")[0].strip().lower()
+    try:
+        donnees = decompresser(await request.body(), request.headers.get("content-encoding"))
+        return decoder_corps(format_, donnees)
+    except FormatInconnu as erreur:
+        raise HTTPException(status_code=415, detail=str(erreur)) from None
+    except (ValueError, *ERREURS_DECOMPRESSION) as erreur:
+        raise HTTPException(status_code=400, detail=f"Malformed body: {erreur}") from None
+
+
+def reponse_negociee(format_: str, compression: str | None, contenu: bytes):
+    """Construit la réponse encodée dans le format et la compression négociés.
+
+    Args:
+        format_ (str): Le type de contenu de la réponse.
+        compression (str | None): La compression de la réponse.
+        contenu (bytes): Le corps, déjà compressé.
+
+    Returns:
+        Response: La réponse.
+    """
+    entetes = {"Vary": "Accept, Accept-Encoding"}
+    if compression:
+        entetes["Content-Encoding"] = compression
+    return Response(content=contenu, media_type=format_, headers=entetes)
+
+
 @app.get("/state")
-async def get_state(authorization: str = Header(None)):
-    """Renvoie l'état actuel de la simulation.
+async def get_state(request: Request, session: str = SESSION_PAR_DEFAUT, authorization: str = Header(None)):
+    """Renvoie l'état actuel d'une session de simulation.
+
+    Le format (JSON, grille compactée en JSON ou msgpack, instantané binaire) et la
+    compression de la réponse sont négociés avec les en-têtes ``Accept`` et
+    ``Accept-Encoding``.
+
+    Args:
+        request (Request): La requête.
+        session (str, optional): Le nom de la session. Defaults to SESSION_PAR_DEFAUT.
+        authorization (str, optional): Le jeton d'autorisation. Defaults to Header(None).
+
+    Returns:
+        Response: L'état de la simulation contenant la grille, les fourmis et l'étape.
+    """
+    token = authorization.split("Bearer ")[-1] if authorization else ""
+    verify_token(token)
+    format_ = negocier_format(request.headers.get("accept"))
+    compression = negocier_compression(request.headers.get("accept-encoding"))
+    contenu = await get_session(session).representation(format_, compression)
+    logging.debug("État de la simulation renvoyé.")
+    return reponse_negociee(format_, compression, contenu)
+
+
+@app.get("/sessions")
+async def list_sessions(authorization: str = Header(None)):
+    """Renvoie la liste des sessions de simulation.
+
+    Args:
+        authorization (str, optional): Le jeton d'autorisation. Defaults to Header(None).
+
+    Returns:
+        list: Le résumé de chaque session.
+    """
+    token = authorization.split("Bearer ")[-1] if authorization else ""
+    verify_token(token)
+    return [session.decrire() for session in sessions]
+
+
+@app.post("/sessions", status_code=201)
+async def create_session(parametres: NouvelleSession, authorization: str = Header(None)):
+    """Crée une session de simulation et démarre sa tâche de fond.
+
+    Args:
+        parametres (NouvelleSession): Les paramètres de la session.
+        authorization (str, optional): Le jeton d'autorisation. Defaults to Header(None).
+
+    Returns:
+        dict: Le résumé de la session créée.
+    """
+    token = authorization.split("Bearer ")[-1] if authorization else ""
+    verify_token(token)
+    if parametres.stockage not in STOCKAGES:
+        raise HTTPException(status_code=422, detail=f"Unknown storage: {parametres.stockage}")
+    if parametres.topologie not in TOPOLOGIES:
+        raise HTTPException(status_code=422, detail=f"Unknown topology: {parametres.topologie}")
+    try:
+        regle = Regle.depuis_config(parametres.regle)
+        if parametres.stockage == "bits" and regle.n_couleurs > 2:
+            raise ValueError(f"Storage 'bits' only holds two colours, rule {regle.nom} has {regle.n_couleurs}")
+    except ValueError as erreur:
+        raise HTTPException(status_code=422, detail=str(erreur)) from None
+    try:
+        session = sessions.creer(
+            parametres.nom,
+            parametres.largeur,
+            parametres.hauteur,
+            parametres.nombre_de_fourmis,
+            parametres.etapes_par_seconde,
+            parametres.stockage,
+            regle=regle,
+            topologie=parametres.topologie,
+        )
+    except ValueError as erreur:
+        raise HTTPException(status_code=409, detail=str(erreur)) from None
+    logging.info("Session %s créée.", parametres.nom)
+    return session.decrire()
+
+
+@app.patch("/sessions/{nom}")
+async def modify_session(nom: str, modification: ModificationSession, authorization: str = Header(None)):
+    """Met en pause, reprend ou change la vitesse d'une session.
 
     Args:
+        nom (str): Le nom de la session.
+        modification (ModificationSession): Les modifications à appliquer.
         authorization (str, optional): Le jeton d'autorisation. Defaults to Header(None).
 
     Returns:
-        dict: L'état de la simulation contenant la grille et les fourmis.
+        dict: Le résumé de la session modifiée.
     """
     token = authorization.split("Bearer ")[-1] if authorization else ""
     verify_token(token)
-    state = {
-        "grille": [[0, 1, 0], [1, 0, 1], [0, 1, 0]],
-        "fourmis": [{"x": 1, "y": 1, "direction": "N"}],
-    }
-    logging.info("État de la simulation renvoyé.")
-    return state
+    session = get_session(nom)
+    if modification.active is not None:
+        session.active = modification.active
+    if modification.etapes_par_seconde is not None:
+        session.ordonnanceur.etapes_par_seconde = modification.etapes_par_seconde
+    return session.decrire()
+
+
+@app.delete("/sessions/{nom}", status_code=204)
+async def delete_session(nom: str, authorization: str = Header(None)):
+    """Arrête et supprime une session.
+
+    Args:
+        nom (str): Le nom de la session.
+        authorization (str, optional): Le jeton d'autorisation. Defaults to Header(None).
+    """
+    token = authorization.split("Bearer ")[-1] if authorization else ""
+    verify_token(token)
+    try:
+        await sessions.supprimer(nom)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown session: {nom}") from None
+    logging.info("Session %s supprimée.", nom)
+
+
+@app.post("/sync")
+async def sync_state(request: Request, session: str = SESSION_CLIENT, authorization: str = Header(None)):
+    """Applique l'état envoyé par un client à une session pilotée.
+
+    Le client envoie la grille complète, ou seulement les cases modifiées depuis
+    la version ``base`` que le serveur lui a acquittée. Si la session n'est pas à
+    cette version, la réponse 409 donne sa version et le client doit renvoyer la
+    grille complète. Le corps est en JSON, éventuellement avec la grille compactée,
+    ou en msgpack (voir ``fourmi.encodage``), et peut être compressé.
+
+    Args:
+        request (Request): La requête, dont le corps est un envoi ``Synchro``.
+        session (str, optional): Le nom de la session pilotée. Defaults to SESSION_CLIENT.
+        authorization (str, optional): Le jeton d'autorisation. Defaults to Header(None).
+
+    Returns:
+        dict: La version acquittée.
+    """
+    token = authorization.split("Bearer ")[-1] if authorization else ""
+    verify_token(token)
+    corps = await lire_corps(request)
+    try:
+        synchro, grille = await asyncio.get_running_loop().run_in_executor(None, lire_synchro, corps)
+    except (ValidationError, ValueError) as erreur:
+        raise HTTPException(status_code=422, detail=str(erreur)) from None
+    if session not in sessions:
+        if grille is None:
+            raise HTTPException(status_code=409, detail={"version": None})
+        sessions.creer(session, grille.shape[1], grille.shape[0], pilotee=True)
+        logging.info("Session pilotée %s créée.", session)
+    cible = get_session(session)
+    if not cible.pilotee:
+        raise HTTPException(status_code=409, detail=f"Session {session} is simulated by the server")
+    try:
+        await cible.synchroniser(synchro.version, [f.model_dump() for f in synchro.fourmis], synchro.base,
+                                 synchro.cellules, grille, synchro.valeurs)
+    except ConflitDeVersion as conflit:
+        raise HTTPException(status_code=409, detail={"version": conflit.version}) from None
+    except (ValueError, KeyError) as erreur:
+        raise HTTPException(status_code=422, detail=str(erreur)) from None
+    logging.debug("Session %s synchronisée à la version %d.", session, synchro.version)
+    return {"version": cible.etape}
+
+
+async def attendre_deconnexion(websocket: WebSocket):
+    """Lit (et ignore) les messages d'un abonné jusqu'à sa déconnexion.
+
+    Args:
+        websocket (WebSocket): La connexion de l'abonné.
+    """
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@app.websocket("/stream")
+async def stream_state(
+    websocket: WebSocket,
+    session: str = SESSION_PAR_DEFAUT,
+    intervalle: float = Query(0.1, ge=0, le=60),
+    compression: str = "zlib",
+    token: str = "",
+):
+    """Diffuse en continu l'état d'une session : un instantané, puis des trames delta.
+
+    Chaque trame delta regroupe les modifications publiées depuis la trame
+    précédente ; un abonné lent reçoit donc moins de trames, jamais un retard
+    croissant. Le jeton est lu dans l'en-tête ``Authorization`` ou, pour les
+    navigateurs, dans le paramètre ``token``.
+
+    Args:
+        websocket (WebSocket): La connexion de l'abonné.
+        session (str, optional): Le nom de la session. Defaults to SESSION_PAR_DEFAUT.
+        intervalle (float, optional): Le délai minimal entre deux trames, en secondes. Defaults to 0.1.
+        compression (str, optional): La compression des trames. Defaults to "zlib".
+        token (str, optional): Le jeton, si l'en-tête ``Authorization`` est absent. Defaults to "".
+    """
+    authorization = websocket.headers.get("authorization")
+    token = authorization.split("Bearer ")[-1] if authorization else token
+    try:
+        verify_token(token)
+        if compression not in COMPRESSIONS:
+            raise HTTPException(status_code=422, detail=f"Unknown compression: {compression}")
+        cible = get_session(session)
+    except HTTPException as erreur:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(erreur.detail))
+        return
+    await websocket.accept()
+    cible.diffusion.abonner()
+    lecteur = asyncio.create_task(attendre_deconnexion(websocket))
+    logging.info("Abonné au flux de la session %s.", session)
+    try:
+        numero, trame = await cible.instantane(compression)
+        while True:
+            await websocket.send_bytes(trame)
+            await asyncio.sleep(intervalle)
+            attente = asyncio.ensure_future(cible.diffusion.attendre(numero))
+            await asyncio.wait({attente, lecteur}, return_when=asyncio.FIRST_COMPLETED)
+            if lecteur.done():
+                attente.cancel()
+                break
+            trame = cible.diffusion.delta(numero, "aucune" if compression == "aucune" else "zlib")
+            if trame is None:
+                numero, trame = await cible.instantane(compression)
+            else:
+                numero = cible.diffusion.numero
+    except WebSocketDisconnect:
+        pass
+    finally:
+        lecteur.cancel()
+        cible.diffusion.desabonner()
+        logging.info("Abonné au flux de la session %s parti.", session)
+
+
+@app.get("/metrics")
+async def get_metrics(authorization: str = Header(None)):
+    """Renvoie les métriques du serveur dans le format texte de Prometheus.
+
+    Les requêtes HTTP sont mesurées au fil de l'eau ; l'étape, la vitesse et le
+    temps de calcul des sessions sont relevés à chaque lecture. La vitesse réelle
+    d'une session est le taux de ``fourmi_session_etape``.
+
+    Args:
+        authorization (str, optional): Le jeton d'autorisation. Defaults to Header(None).
+
+    Returns:
+        Response: Les métriques.
+
+    Raises:
+        HTTPException: Si les métriques sont désactivées.
+    """
+    token = authorization.split("Bearer ")[-1] if authorization else ""
+    verify_token(token)
+    if not MesureRequetes.actif:
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    for metrique in (ETAPE_SESSION, VITESSE_SESSION, CALCUL_SESSION):
+        metrique.vider()  # Oublier les sessions supprimées
+    for session in sessions:
+        ETAPE_SESSION.definir(session.etape, session=session.nom)
+        VITESSE_SESSION.definir(session.ordonnanceur.etapes_par_seconde, session=session.nom)
+        CALCUL_SESSION.incrementer(session.duree_calcul, session=session.nom)
+    return Response(content=metriques.exposer(), media_type=Registre.TYPE_CONTENU)
 
 
 @app.post("/update")
-async def update_state(state: dict, authorization: str = Header(None)):
+async def update_state(request: Request, authorization: str = Header(None)):
     """Met à jour l'état de la simulation.
 
+    Le corps et la réponse peuvent être dans n'importe quel format de
+    ``fourmi.encodage`` : le format de la réponse est négocié séparément.
+
     Args:
-        state (dict): L'état de la simulation à mettre à jour.
+        request (Request): La requête, dont le corps est l'état de la simulation.
         authorization (str, optional): Le jeton d'autorisation. Defaults to Header(None).
 
     Returns:
-        dict: L'état mis à jour de la simulation.
+        Response: L'état mis à jour de la simulation.
     """
     token = authorization.split("Bearer ")[-1] if authorization else ""
     verify_token(token)
-    logging.info("État de la simulation mis à jour.")
-    return state
+    state = await lire_corps(request)
+    format_ = negocier_format(request.headers.get("accept"))
+    compression = negocier_compression(request.headers.get("accept-encoding"))
+    try:
+        if "grille" in state:
+            state["grille"] = deplier_grille(state["grille"])
+        contenu = compresser(encoder_corps(format_, state), compression)
+    except (KeyError, ValueError) as erreur:
+        raise HTTPException(status_code=422, detail=str(erreur)) from None
+    logging.debug("État de la simulation mis à jour.")
+    return reponse_negociee(format_, compression, contenu)
 
 
 if __name__ == "__main__":
     import uvicorn
 
+    lire_cle_secrete()  # Échouer tout de suite plutôt qu'à la première requête
     logging.info("Démarrage du serveur FastAPI avec SSL")
     uvicorn.run(
         app, host="0.0.0.0", port=8000, ssl_keyfile="key.pem", ssl_certfile="cert.pem"
@@ -0,0 +1,78 @@
+"""
+Tests unitaires pour l'affichage Pygame, avec le pilote vidéo factice de SDL.
+"""
+
+import unittest
+import sys
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+import pygame
+from fourmi.grille import Grille, GrilleBits
+from fourmi.fourmi import Fourmi
+from fourmi.moteur import Moteur
+from fourmi.affichage import afficher_grille, RenduIncremental
+from fourmi.ordonnanceur import avancer
+
+
+class TestAffichage(unittest.TestCase):
+    """Tests pour le dessin global et le rendu incrémental."""
+
+    TAILLE = 4
+
+    def setUp(self):
+        pygame.display.init()
+        self.fenetre = pygame.display.set_mode((12 * self.TAILLE, 10 * self.TAILLE))
+
+    def tearDown(self):
+        pygame.display.quit()
+
+    def pixels(self):
+        """Retourne le contenu de la fenêtre."""
+        return pygame.image.tobytes(self.fenetre, "RGB")
+
+    def test_afficher_grille(self):
+        """Le dessin global colore les cases noires, blanches et les fourmis."""
+        grille = Grille(12, 10)
+        grille.changer_couleur_case(3, 2)
+        afficher_grille(self.fenetre, grille, self.TAILLE, [Fourmi(5, 5, 0)])
+        self.assertEqual(self.fenetre.get_at((3 * self.TAILLE + 1, 2 * self.TAILLE + 1))[:3], (0, 0, 0))
+        self.assertEqual(self.fenetre.get_at((4 * self.TAILLE + 1, 2 * self.TAILLE + 1))[:3], (255, 255, 255))
+        self.assertEqual(self.fenetre.get_at((5 * self.TAILLE, 5 * self.TAILLE))[:3], (255, 0, 0))
+
+    def test_rendu_incremental(self):
+        """Le rendu incrémental donne la même image que le dessin global."""
+        grille = Grille(12, 10)
+        fourmis = [Fourmi(6, 5, 0), Fourmi(3, 3, 1)]
+        moteur = Moteur(jit=False)
+        rendu = RenduIncremental(self.TAILLE)
+        rendu.afficher(self.fenetre, grille, fourmis)
+        for _ in range(200):
+            cases = [(f.x, f.y) for f in fourmis]
+            moteur.simuler(grille, fourmis, 1)
+            rects = rendu.afficher(self.fenetre, grille, fourmis, cases)
+            self.assertLessEqual(len(rects), 3 * len(fourmis))
+        incremental = self.pixels()
+        afficher_grille(self.fenetre, grille, self.TAILLE, fourmis)
+        self.assertEqual(incremental, self.pixels())
+
+    def test_rendu_par_zone(self):
+        """Les cases relevées une à une ou par zone donnent la même image que le dessin global."""
+        for classe in (Grille, GrilleBits):
+            with self.subTest(classe=classe.__name__):
+                grille, fourmis, moteur = classe(12, 10), [Fourmi(6, 5, 0), Fourmi(3, 3, 1)], Moteur(jit=False)
+                rendu = RenduIncremental(self.TAILLE)
+                rendu.afficher(self.fenetre, grille, fourmis)
+                for n_etapes in (1, 30, 2, 400):
+                    rendu.afficher(self.fenetre, grille, fourmis, avancer(moteur, grille, fourmis, n_etapes, 8))
+                incremental = self.pixels()
+                afficher_grille(self.fenetre, grille, self.TAILLE, fourmis)
+                self.assertEqual(incremental, self.pixels())
+
+if __name__ == '__main__':
+    unittest.main()
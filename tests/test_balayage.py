@@ -0,0 +1,75 @@
+"""
+Tests unitaires pour le balayage de paramètres.
+"""
+
+import unittest
+import json
+import sys
+import os
+import tempfile
+import multiprocessing
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+from fourmi.balayage import balayer, combinaisons, cle, deja_faites
+
+
+class TestBalayage(unittest.TestCase):
+    """Tests pour le balayage de paramètres et sa reprise."""
+
+    CONFIG = {"largeur": 30, "hauteur": 30, "nombre_de_fourmis": 1, "etapes": 200}
+
+    def test_combinaisons(self):
+        """Toutes les combinaisons sont produites, dans un ordre stable."""
+        self.assertEqual(combinaisons({"b": [1, 2], "a": ["x"]}), [{"a": "x", "b": 1}, {"a": "x", "b": 2}])
+        self.assertEqual(cle({"b": 1, "a": 2}), cle({"a": 2, "b": 1}))
+
+    def test_balayage_et_reprise(self):
+        """Un balayage interrompu ne relance que les combinaisons manquantes."""
+        parametres = {"nombre_de_fourmis": [1, 2], "positions": [[[3, 3]], [[20, 10]]]}
+        with tempfile.TemporaryDirectory() as dossier:
+            sortie = os.path.join(dossier, "resultats.jsonl")
+            premier = combinaisons(parametres)[0]
+            with open(sortie, 'w', encoding='utf-8') as fichier:
+                fichier.write(json.dumps({"cle": cle(premier)}) + "\n")
+                fichier.write('{"cle": "tronqu')  # Interruption en pleine écriture
+            self.assertEqual(balayer(self.CONFIG, parametres, sortie, travailleurs=2, jit=False), 3)
+            self.assertEqual(balayer(self.CONFIG, parametres, sortie, travailleurs=2, jit=False), 0)
+            with open(sortie, encoding='utf-8') as fichier:
+                lignes = fichier.read().splitlines()
+            resultats = [json.loads(ligne) for ligne in lignes[2:]]
+        self.assertEqual(len(resultats), 3)
+        for resultat in resultats:
+            self.assertEqual(resultat["statistiques"]["etapes"], 200)
+            self.assertEqual(resultat["statistiques"]["nombre_de_fourmis"], resultat["parametres"]["nombre_de_fourmis"])
+
+    def test_point_en_erreur(self):
+        """Une combinaison qui échoue est enregistrée avec son erreur, sans arrêter le balayage ni être relancée."""
+        parametres = {"regle": ["RL", "RX", "LLRR"]}
+        with tempfile.TemporaryDirectory() as dossier:
+            sortie = os.path.join(dossier, "resultats.jsonl")
+            self.assertEqual(balayer(self.CONFIG, parametres, sortie, travailleurs=2, jit=False), 3)
+            self.assertEqual(balayer(self.CONFIG, parametres, sortie, travailleurs=2, jit=False), 0)
+            with open(sortie, encoding='utf-8') as fichier:
+                resultats = {r["parametres"]["regle"]: r for r in map(json.loads, fichier)}
+        self.assertEqual(sorted(resultats), ["LLRR", "RL", "RX"])
+        self.assertTrue(resultats["RX"]["erreur"].startswith("ValueError"))
+        self.assertNotIn("statistiques", resultats["RX"])
+        self.assertEqual(resultats["LLRR"]["statistiques"]["etapes"], 200)
+
+    @unittest.skipIf(multiprocessing.get_start_method() != "fork", "le faux moteur n'atteint que des processus forkés")
+    def test_processus_perdu(self):
+        """Un processus de travail tué arrête le balayage sans marquer les combinaisons comme faites."""
+        with tempfile.TemporaryDirectory() as dossier, \
+                mock.patch("fourmi.balayage.executer", side_effect=lambda *_, **__: os._exit(1)):
+            sortie = os.path.join(dossier, "resultats.jsonl")
+            with self.assertRaises(BrokenProcessPool):
+                balayer(self.CONFIG, {"etapes": [10, 20, 30]}, sortie, travailleurs=2, jit=False)
+            self.assertEqual(deja_faites(sortie), set())
+
+if __name__ == '__main__':
+    unittest.main()
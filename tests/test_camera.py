@@ -0,0 +1,107 @@
+"""
+Tests unitaires pour la caméra, la pyramide de densités et le rendu par caméra.
+"""
+
+import unittest
+import sys
+import os
+
+import numpy as np
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+import pygame
+from fourmi.affichage import RenduCamera, afficher_grille
+from fourmi.camera import Camera, PyramideDensite
+from fourmi.grille import Grille, GrilleBits
+from fourmi.fourmi import Fourmi
+from fourmi.moteur import Moteur
+
+
+class TestCamera(unittest.TestCase):
+    """Tests pour ``Camera``, ``PyramideDensite`` et ``RenduCamera``."""
+
+    def test_zoom_et_deplacement(self):
+        """Le zoom garde la case sous le pointeur immobile ; la région visible suit la vue."""
+        camera = Camera(200, 100, 1000, 1000, zoom=4)
+        self.assertEqual(camera.region(), (0, 0, 50, 25))
+        self.assertFalse(camera.initiale())  # Grille plus grande que la fenêtre
+        camera.zoomer(0.5, 80, 40)
+        self.assertEqual(camera.vers_case(80, 40), (20, 10))
+        camera.deplacer(-100, -50)
+        self.assertEqual((camera.x, camera.y), (30, 15))
+        camera.zoomer(1e-6)
+        self.assertEqual(camera.zoom, 0.1)  # Zoom minimal : toute la grille dans la fenêtre
+        self.assertEqual(camera.niveau(), 3)
+
+        camera.reinitialiser()
+        camera.suivre = True
+        self.assertTrue(camera.suivre_fourmis([Fourmi(500, 500, 0)]))
+        self.assertEqual(camera.vers_ecran(500.5, 500.5), (100, 50))
+        self.assertFalse(camera.suivre_fourmis([Fourmi(505, 502, 0)]))  # Encore au centre de la vue
+
+    def test_pyramide(self):
+        """La mise à jour par cases donne la même pyramide qu'une reconstruction."""
+        for classe in (Grille, GrilleBits):
+            with self.subTest(classe=classe.__name__):
+                grille, fourmis, moteur = classe(37, 21), [Fourmi(18, 10, 0), Fourmi(5, 5, 1)], Moteur(jit=False)
+                pyramide = PyramideDensite(grille)
+                for _ in range(300):
+                    cases = [(f.x, f.y) for f in fourmis]
+                    moteur.simuler(grille, fourmis, 1)
+                    pyramide.mettre_a_jour(grille, cases)
+                moteur.simuler(grille, fourmis, 50)
+                pyramide.mettre_a_jour(grille)
+                pyramide.densite(0, 0, 0, 37, 21)  # Compare la grille périmée aux blocs lus
+                reference = PyramideDensite(grille)
+                for niveau, attendu in zip(pyramide.niveaux, reference.niveaux):
+                    np.testing.assert_array_equal(niveau, attendu)
+                self.assertEqual(pyramide.niveaux[-1].tolist(), [[int(grille.vers_tableau().sum())]])
+
+    def test_pyramide_paresseuse(self):
+        """Sans les cases modifiées, seule la région périmée des blocs lus est comparée à la grille."""
+        self.assertEqual([niveau.dtype for niveau in PyramideDensite(GrilleBits(64, 64)).niveaux],
+                         [np.uint8] * 4 + [np.uint16] * 3)
+        grille = Grille(1024, 512)
+        pyramide = PyramideDensite(grille)
+        fourmis = [Fourmi(100, 100, 0), Fourmi(900, 400, 1)]
+        Moteur(jit=False).simuler(grille, fourmis, 2000)
+        lues = []
+        lire_region = grille.lire_region
+        grille.lire_region = lambda *rectangle: lues.append(rectangle) or lire_region(*rectangle)
+        pyramide.mettre_a_jour(grille, region=(50, 50, 960, 460))
+        np.testing.assert_allclose(pyramide.densite(2, 0, 0, 200, 200),
+                                   PyramideDensite(grille).densite(2, 0, 0, 200, 200))
+        self.assertEqual(lues, [(48, 50, 200, 200)])
+        pyramide.densite(10, 0, 0, 1024, 512)
+        self.assertEqual(lues[1:], [(48, 50, 960, 460)])
+        self.assertEqual(pyramide.densite(10, 0, 0, 1024, 512).tolist(),
+                         [[int(grille.vers_tableau().sum()) / (1024 * 512)]])
+
+    def test_rendu(self):
+        """Au zoom entier, le rendu par caméra donne l'image du dessin global ; dézoomé, des gris."""
+        pygame.display.init()
+        try:
+            fenetre = pygame.display.set_mode((48, 40))
+            grille, fourmis = Grille(12, 10), [Fourmi(6, 5, 0)]
+            Moteur(jit=False).simuler(grille, fourmis, 60)
+            afficher_grille(fenetre, grille, 4, fourmis)
+            attendu = pygame.image.tobytes(fenetre, "RGB")
+            RenduCamera().afficher(fenetre, grille, fourmis, Camera(48, 40, 12, 10, zoom=4))
+            self.assertEqual(pygame.image.tobytes(fenetre, "RGB"), attendu)
+
+            grille = Grille(96, 80)
+            grille.depuis_tableau(np.indices((80, 96)).sum(axis=0).astype(np.uint8) % 2)  # Damier
+            camera = Camera(48, 40, 96, 80, zoom=0.5)
+            RenduCamera().afficher(fenetre, grille, [], camera)
+            self.assertEqual(fenetre.get_at((10, 10))[:3], (127, 127, 127))
+        finally:
+            pygame.display.quit()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Tests unitaires pour le téléverseur du client.
+"""
+
+import asyncio
+import unittest
+import sys
+import os
+
+import httpx
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+from client import Televerseur
+
+
+class TestTeleverseur(unittest.TestCase):
+    """Tests pour ``Televerseur``."""
+
+    def test_reprises(self):
+        """Reprise après des erreurs passagères, abandon après ``tentatives_max`` échecs, file bornée."""
+        reponses = iter([503, httpx.ConnectError("coupure"), 200, 503, 503, 503])
+
+        def repondre(requete):
+            reponse = next(reponses)
+            if isinstance(reponse, Exception):
+                raise reponse
+            return httpx.Response(reponse)
+
+        async def scenario():
+            recues = []
+            televerseur = Televerseur("http://serveur", connexions_max=1, file_max=1, tentatives_max=3,
+                                      attente_base=0.001, transport=httpx.MockTransport(repondre))
+            async with televerseur:
+                self.assertTrue(televerseur.soumettre("/sync", recues.append, content=b"1"))
+                self.assertFalse(televerseur.soumettre("/sync", recues.append, content=b"2"))  # Déjà en file
+                while not recues:
+                    await asyncio.sleep(0.001)
+                self.assertEqual(recues[0].status_code, 200)
+                televerseur.soumettre("/sync", recues.append, content=b"3")
+                while len(recues) < 2:
+                    await asyncio.sleep(0.001)
+                self.assertIsNone(recues[1])  # Abandon : plus de réponse prévue
+            return televerseur.metriques()
+
+        metriques = asyncio.run(scenario())
+        self.assertEqual((metriques["envoyes"], metriques["reprises"], metriques["abandons"], metriques["refus"]),
+                         (5, 4, 1, 1))
+        self.assertEqual(metriques["en_cours"], 0)
+
+    def test_attente(self):
+        """L'attente double à chaque tentative, avec gigue, sans dépasser le maximum."""
+        televerseur = Televerseur(attente_base=0.5, attente_max=4)
+        for tentative, plafond in enumerate([0.5, 1, 2, 4, 4]):
+            self.assertTrue(all(0 <= televerseur.attente(tentative) <= plafond for _ in range(50)))
+
+
+if __name__ == '__main__':
+    unittest.main()
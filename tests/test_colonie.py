@@ -0,0 +1,75 @@
+"""
+Tests unitaires pour la colonie de fourmis vectorisée.
+"""
+
+import unittest
+import random
+import sys
+import os
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+from fourmi.grille import Grille
+from fourmi.fourmi import Fourmi
+from fourmi.colonie import Colonie
+from fourmi.moteur import Moteur
+
+
+class TestColonie(unittest.TestCase):
+    """Tests d'équivalence entre la colonie vectorisée et ``Fourmi.etape``."""
+
+    def test_equivalence(self):
+        """La colonie reproduit les appels successifs à ``Fourmi.etape``, cases partagées comprises."""
+        generateur = random.Random(42)
+        for nombre in (5, 40, 300):
+            positions = [(generateur.randrange(5, 15), generateur.randrange(5, 15)) for _ in range(nombre)]
+            with self.subTest(nombre=nombre):
+                reference = Grille(20, 20)
+                fourmis = [Fourmi(x, y, i) for i, (x, y) in enumerate(positions)]
+                for _ in range(300):
+                    for fourmi in fourmis:
+                        fourmi.etape(reference)
+
+                grille = Grille(20, 20)
+                colonie = Colonie([x for x, _ in positions], [y for _, y in positions])
+                colonie.simuler(grille, 300)
+                self.assertEqual(grille.grille, reference.grille)
+                self.assertEqual([(f.x, f.y, f.direction, f.ant_id) for f in colonie.vers_fourmis()],
+                                 [(f.x, f.y, f.direction, f.ant_id) for f in fourmis])
+
+    def test_meme_case(self):
+        """Cinq fourmis sur la même case : la case finit noire et les directions alternent."""
+        grille = Grille(5, 5)
+        colonie = Colonie([2] * 5, [2] * 5)
+        colonie.simuler(grille, 1)
+        self.assertEqual(grille.obtenir_couleur_case(2, 2), 1)
+        self.assertEqual(colonie.directions.tolist(), [1, 3, 1, 3, 1])
+
+    def test_ordre_des_identifiants(self):
+        """Les fourmis sont rangées par identifiant, quel que soit l'ordre de la liste."""
+        fourmis = [Fourmi(1, 1, 2), Fourmi(3, 3, 0), Fourmi(2, 2, 1)]
+        colonie = Colonie.depuis_fourmis(fourmis)
+        self.assertEqual(colonie.ids.tolist(), [0, 1, 2])
+        self.assertEqual(colonie.xs.tolist(), [3, 2, 1])
+        colonie.simuler(Grille(5, 5), 1)
+        colonie.mettre_a_jour(fourmis)
+        self.assertEqual([(f.x, f.y) for f in fourmis], [(2, 1), (4, 3), (3, 2)])
+
+    def test_moteur_vectorise(self):
+        """Le moteur utilise la colonie pour une colonie nombreuse, avec le même résultat."""
+        generateur = random.Random(7)
+        positions = [(generateur.randrange(30), generateur.randrange(30)) for _ in range(Moteur.SEUIL_COLONIE)]
+        grilles = []
+        for seuil in (Moteur.SEUIL_COLONIE, len(positions) + 1):
+            grille = Grille(30, 30)
+            fourmis = [Fourmi(x, y, i) for i, (x, y) in enumerate(positions)]
+            moteur = Moteur(jit=False)
+            moteur.SEUIL_COLONIE = seuil
+            moteur.simuler(grille, fourmis, 50)
+            grilles.append((grille.grille, [(f.x, f.y, f.direction) for f in fourmis]))
+        self.assertEqual(grilles[0], grilles[1])
+
+if __name__ == '__main__':
+    unittest.main()
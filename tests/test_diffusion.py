@@ -0,0 +1,108 @@
+"""
+Tests unitaires pour la diffusion en continu de l'état d'une session.
+"""
+
+import unittest
+import sys
+import os
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+from server import app, SECRET_KEY
+from fourmi.diffusion import Diffusion, decoder_delta
+from fourmi.grille import Grille, GrilleBits
+from fourmi.fourmi import Fourmi
+from fourmi.instantane import decoder_instantane
+from fourmi.moteur import Moteur
+from fourmi.ordonnanceur import tracer
+from fourmi.session import Session
+
+ENTETES = {"Authorization": f"Bearer {SECRET_KEY}"}
+
+
+class TestDiffusion(unittest.TestCase):
+    """Tests pour ``Diffusion`` et la route ``/stream``."""
+
+    def test_regroupement(self):
+        """Les publications manquées sont regroupées en une trame ; au-delà de l'historique, instantané."""
+        grille, fourmis, moteur = Grille(10, 10), [Fourmi(5, 5, 0)], Moteur(jit=False)
+        diffusion = Diffusion(capacite=3)
+        diffusion.abonner()
+        diffusion.suivre(grille, fourmis, 0)
+        depart = diffusion.numero
+        copie = Grille(10, 10)
+        for etape in range(1, 4):
+            diffusion.publier(diffusion.difference(grille, tracer(moteur, grille, fourmis, 1)), fourmis, etape)
+
+        etape, indices, valeurs, recues = decoder_delta(diffusion.delta(depart))
+        with self.assertRaises(ValueError):
+            decoder_delta(diffusion.delta(depart)[:-3])  # Flux zlib tronqué
+        self.assertEqual(etape, 3)
+        copie.vers_tableau().reshape(-1)[indices] = valeurs
+        self.assertEqual(copie.grille, grille.grille)
+        self.assertEqual([(f.x, f.y, f.direction) for f in recues], [(f.x, f.y, f.direction) for f in fourmis])
+
+        diffusion.publier(diffusion.difference(grille, tracer(moteur, grille, fourmis, 1)), fourmis, 4)
+        self.assertIsNone(diffusion.delta(depart))  # Sorti de l'historique
+        self.assertIsNotNone(diffusion.delta(depart + 1))
+
+        diffusion.desabonner()
+        self.assertIsNone(diffusion.difference(grille, []))  # Plus de suivi sans abonné
+
+    def test_lots_traces(self):
+        """Les lots d'une session sont relevés par le tracé, sans relire toute la grille ; un agrandissement rompt."""
+        session = Session("traces", 64, 48, nombre_de_fourmis=2, stockage='bits', moteur=Moteur(jit=False))
+        copie = Grille(64, 48)
+        session.diffusion.abonner()
+        session.diffusion.suivre(session.grille, session.fourmis, 0)
+        depart = session.diffusion.numero
+        with mock.patch.object(GrilleBits, 'vers_tableau', side_effect=AssertionError):
+            for etape in range(1, 6):
+                session.diffusion.publier(session._avancer(137), session.fourmis, etape)  # pylint: disable=protected-access
+        _, indices, valeurs, _ = decoder_delta(session.diffusion.delta(depart))
+        copie.vers_tableau().reshape(-1)[indices] = valeurs
+        self.assertEqual(copie.grille, session.grille.grille)
+
+        session.grille.topologie = 'extensible'
+        fourmi = session.fourmis[0]
+        fourmi.x = session.grille.largeur - 1
+        # Vers la droite après avoir tourné : la grille s'agrandit à la première étape
+        fourmi.direction = 2 if session.grille.obtenir_couleur_case(fourmi.x, fourmi.y) else 0
+        session.diffusion.publier(session._avancer(5), session.fourmis, 6)  # pylint: disable=protected-access
+        self.assertGreater(session.grille.largeur, 64)
+        self.assertIsNone(session.diffusion.delta(session.diffusion.numero - 1))
+
+    def test_flux(self):
+        """Un abonné reconstruit l'état de la session à partir de l'instantané et des deltas."""
+        parametres = {"nom": "flux", "largeur": 16, "hauteur": 12, "nombre_de_fourmis": 2, "etapes_par_seconde": 3000}
+        with TestClient(app) as observateur:
+            self.assertEqual(observateur.post("/sessions", json=parametres, headers=ENTETES).status_code, 201)
+            with observateur.websocket_connect(f"/stream?session=flux&intervalle=0&token={SECRET_KEY}") as flux:
+                grille, fourmis, etape = decoder_instantane(flux.receive_bytes())
+                reference, attendues = Grille(16, 12), [Fourmi(8, 6, i) for i in range(2)]
+                moteur = Moteur(jit=False)
+                moteur.simuler(reference, attendues, etape)
+                self.assertEqual(grille.grille, reference.grille)
+                for _ in range(5):
+                    suivante, indices, valeurs, fourmis = decoder_delta(flux.receive_bytes())
+                    self.assertGreater(suivante, etape)
+                    grille.vers_tableau().reshape(-1)[indices] = valeurs
+                    moteur.simuler(reference, attendues, suivante - etape)
+                    etape = suivante
+                    self.assertEqual(grille.grille, reference.grille)
+                    self.assertEqual([(f.x, f.y) for f in fourmis], [(f.x, f.y) for f in attendues])
+            self.assertEqual(observateur.delete("/sessions/flux", headers=ENTETES).status_code, 204)
+
+        with TestClient(app) as observateur:
+            with self.assertRaises(Exception):
+                with observateur.websocket_connect("/stream?token=faux") as flux:
+                    flux.receive_bytes()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Tests unitaires pour les formats d'échange et la négociation de contenu.
+"""
+
+import unittest
+import sys
+import os
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+from server import app, SECRET_KEY
+from fourmi.encodage import BINAIRE, JSON, JSON_BITS, compacter_grille, compresser, decoder_corps, deplier_grille, \
+    encoder_corps, negocier_compression, negocier_format
+from fourmi.grille import Grille
+from fourmi.fourmi import Fourmi
+from fourmi.instantane import decoder_instantane
+from fourmi.moteur import Moteur
+from fourmi.synchro import Synchronisation
+
+ENTETES = {"Authorization": f"Bearer {SECRET_KEY}"}
+
+
+class TestEncodage(unittest.TestCase):
+    """Tests pour ``fourmi.encodage`` et les routes qui l'utilisent."""
+
+    def test_negociation(self):
+        """JSON par défaut, le plus compact à préférence égale, et le poids q respecté."""
+        self.assertEqual(negocier_format(None), JSON)
+        self.assertEqual(negocier_format("*/*"), JSON)
+        self.assertEqual(negocier_format(f"{JSON}, {BINAIRE}"), BINAIRE)
+        self.assertEqual(negocier_format(f"{BINAIRE};q=0.5, {JSON_BITS}"), JSON_BITS)
+        self.assertEqual(negocier_format("text/html"), JSON)
+        self.assertEqual(negocier_compression("gzip, deflate"), "gzip")
+        self.assertIsNone(negocier_compression("identity"))
+        self.assertIsNone(negocier_compression("gzip;q=0"))
+
+    def test_grille_compactee(self):
+        """La grille compactée tient sur un bit par case et redonne les mêmes cases."""
+        tableau = (np.random.default_rng(0).random((13, 21)) < 0.5).astype(np.uint8)
+        compacte = compacter_grille(tableau, texte=False)
+        self.assertEqual(len(compacte["donnees"]), 13 * 3)
+        np.testing.assert_array_equal(deplier_grille(compacte), tableau)
+        np.testing.assert_array_equal(deplier_grille(compacter_grille(tableau)), tableau)
+        tableau[0, 0] = 3  # Plus de deux couleurs : un octet par case
+        np.testing.assert_array_equal(deplier_grille(compacter_grille(tableau)), tableau)
+        for mal_formee in ({"largeur": 21, "hauteur": 13, "bits_par_case": 1, "donnees": ""},
+                           {"largeur": "a", "hauteur": 13, "bits_par_case": 1, "donnees": ""},
+                           [["a"]], [[1.5]], [[None]], [[1, 2], [3]], [[256]]):
+            with self.subTest(grille=mal_formee):
+                with self.assertRaises(ValueError):
+                    deplier_grille(mal_formee)
+
+        corps = {"grille": tableau.tolist(), "fourmis": [{"x": 1, "y": 2, "direction": "S", "id": 0}], "etape": 4}
+        for format_ in (JSON, JSON_BITS, BINAIRE):
+            with self.subTest(format_=format_):
+                decode = decoder_corps(format_, encoder_corps(format_, corps))
+                np.testing.assert_array_equal(deplier_grille(decode["grille"]), tableau)
+                self.assertEqual((decode["fourmis"], decode["etape"]), (corps["fourmis"], 4))
+
+    def test_routes(self):
+        """``/state`` et ``/update`` répondent dans le format négocié ; ``/sync`` lit un corps compacté et compressé."""
+        grille, fourmis = Grille(30, 20), [Fourmi(15, 10, 0)]
+        Moteur(jit=False).simuler(grille, fourmis, 200)
+        synchro = Synchronisation(intervalle=0)
+        corps = synchro.preparer(grille, fourmis, 200)
+        reponse = TestClient(app).post(
+            "/sync?session=essai-encodage", content=compresser(encoder_corps(JSON_BITS, corps), "gzip"),
+            headers={**ENTETES, "Content-Type": JSON_BITS, "Content-Encoding": "gzip"})
+        self.assertEqual(reponse.json(), {"version": 200})
+
+        serveur = TestClient(app)
+        reponse = serveur.get("/state?session=essai-encodage", headers={**ENTETES, "Accept": BINAIRE})
+        self.assertEqual(reponse.headers["content-type"], BINAIRE)
+        recue, recues, etape = decoder_instantane(reponse.content)
+        self.assertEqual((recue.grille, etape, recues[0].x), (grille.grille, 200, fourmis[0].x))
+        reponse = serveur.get("/state?session=essai-encodage", headers={**ENTETES, "Accept": JSON_BITS})
+        self.assertEqual(reponse.headers["content-encoding"], "gzip")
+        self.assertEqual(deplier_grille(reponse.json()["grille"]).tolist(), grille.grille)
+        self.assertEqual(serveur.get("/state?session=essai-encodage", headers=ENTETES).json()["grille"], grille.grille)
+
+        reponse = serveur.post("/update", content=encoder_corps(BINAIRE, corps),
+                               headers={**ENTETES, "Content-Type": BINAIRE})
+        self.assertEqual(reponse.json()["grille"], grille.grille)
+        reponse = serveur.post("/update", content=b"<xml/>", headers={**ENTETES, "Content-Type": "text/xml"})
+        self.assertEqual(reponse.status_code, 415)
+        self.assertEqual(serveur.delete("/sessions/essai-encodage", headers=ENTETES).status_code, 204)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,7 +10,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Les importations des modules du projet doivent venir après la configuration du chemin
-from fourmi.grille import Grille
+from fourmi.grille import Grille, GrilleBits, creer_grille
 from fourmi.fourmi import Fourmi
 
 class TestFourmiDeLangton(unittest.TestCase):
@@ -32,6 +32,27 @@ class TestFourmiDeLangton(unittest.TestCase):
         grille.changer_couleur_case(1, 1)
         self.assertEqual(grille.obtenir_couleur_case(1, 1), 0)
 
+    def test_grille_bits(self):
+        """Test de la grille compactée à un bit par case."""
+        grille = creer_grille(13, 3, 'bits')
+        self.assertIsInstance(grille, GrilleBits)
+        grille.changer_couleur_case(9, 1)
+        self.assertEqual(grille.obtenir_couleur_case(9, 1), 1)
+        self.assertEqual(grille.obtenir_couleur_case(8, 1), 0)
+        self.assertEqual(grille.grille[1], [0] * 9 + [1] + [0] * 3)
+        self.assertEqual(grille.bits.nbytes, 3 * 2)
+
+    def test_grille_charger(self):
+        """Test du chargement d'une grille sauvegardée."""
+        for stockage in ('octets', 'bits'):
+            grille = creer_grille(3, 2, stockage)
+            grille.charger([[0, 1, 0], [1, 1, 0]])
+            self.assertEqual(grille.grille, [[0, 1, 0], [1, 1, 0]])
+            with self.assertRaises(ValueError):
+                grille.charger([[0, 1], [1, 1]])
+        with self.assertRaises(ValueError):
+            creer_grille(3, 3, 'inconnu')
+
     def test_fourmi_mouvement(self):
         """Test du mouvement de la fourmi sur la grille."""
         fourmi = Fourmi(1, 1, 0)
@@ -0,0 +1,77 @@
+"""
+Tests unitaires pour la grille creuse et son moteur à mémorisation.
+"""
+
+import unittest
+import sys
+import os
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+from fourmi.grille_creuse import GrilleCreuse, MoteurCreux
+from fourmi.fourmi import Fourmi
+
+
+class TestGrilleCreuse(unittest.TestCase):
+    """Tests pour les classes GrilleCreuse et MoteurCreux."""
+
+    def test_coordonnees_negatives(self):
+        """La grille accepte des coordonnées négatives et n'alloue que les tuiles touchées."""
+        grille = GrilleCreuse(taille_tuile=8)
+        grille.changer_couleur_case(-1, -20)
+        grille.changer_couleur_case(1000, 3)
+        self.assertEqual(grille.obtenir_couleur_case(-1, -20), 1)
+        self.assertEqual(grille.obtenir_couleur_case(-2, -20), 0)
+        self.assertEqual(len(grille.tuiles), 2)
+        self.assertEqual(grille.emprise(), (-8, -24, 1007, 7))
+        grille.changer_couleur_case(1000, 3)
+        self.assertEqual(len(grille.tuiles), 1)  # Une tuile redevenue vide est libérée
+
+    def test_partage_des_tuiles(self):
+        """Deux tuiles de même contenu sont le même objet."""
+        grille = GrilleCreuse(taille_tuile=4)
+        grille.changer_couleur_case(0, 0)
+        grille.changer_couleur_case(4, 0)
+        self.assertIs(grille.obtenir_tuile(0, 0), grille.obtenir_tuile(1, 0))
+
+    def test_fourmi_non_bornee(self):
+        """Sur une grille creuse, la fourmi n'est pas bloquée en (0, 0)."""
+        fourmi = Fourmi(0, 0, 0)
+        fourmi.etape(GrilleCreuse())
+        self.assertEqual((fourmi.x, fourmi.y), (1, 0))
+        fourmi.direction = 3
+        fourmi.avancer(None, None, bornee=False)
+        fourmi.avancer(None, None, bornee=False)
+        self.assertEqual((fourmi.x, fourmi.y), (-1, 0))
+
+    def test_moteur_creux(self):
+        """Le moteur creux donne le même résultat que ``Fourmi.etape`` et réutilise sa mémoire."""
+        for positions in ([(0, 0)], [(0, 0), (3, -2)]):
+            with self.subTest(positions=positions):
+                reference = GrilleCreuse()
+                fourmis_reference = [Fourmi(x, y, i) for i, (x, y) in enumerate(positions)]
+                for _ in range(15000):
+                    for fourmi in fourmis_reference:
+                        fourmi.etape(reference)
+
+                grille = GrilleCreuse()
+                fourmis = [Fourmi(x, y, i) for i, (x, y) in enumerate(positions)]
+                moteur = MoteurCreux()
+                moteur.simuler(grille, fourmis, 7000)
+                moteur.simuler(grille, fourmis, 8000)
+                self.assertEqual(grille.tuiles, reference.tuiles)
+                self.assertEqual([(f.x, f.y, f.direction) for f in fourmis],
+                                 [(f.x, f.y, f.direction) for f in fourmis_reference])
+        self.assertGreater(MoteurCreux().simuler(GrilleCreuse(), [Fourmi(0, 0, 0)], 1), 0)
+
+    def test_memorisation_autoroute(self):
+        """Sur l'autoroute, la plupart des étapes sont rejouées depuis la mémoire."""
+        moteur = MoteurCreux()
+        moteur.simuler(GrilleCreuse(), [Fourmi(0, 0, 0)], 200000)
+        self.assertEqual(moteur.etapes_simulees + moteur.etapes_accelerees, 200000)
+        self.assertGreater(moteur.etapes_accelerees, moteur.etapes_simulees)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Tests unitaires pour les instantanés binaires.
+"""
+
+import unittest
+import json
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+from fourmi.grille import Grille, GrilleBits
+from fourmi.fourmi import Fourmi
+from fourmi.instantane import (decoder_instantane, encoder_instantane, ecrire_instantane,
+                               lire_sauvegarde, vers_dict)
+
+
+def partie(largeur=13, hauteur=7):
+    """Crée une grille aléatoire et quelques fourmis orientées."""
+    generateur = np.random.default_rng(3)
+    grille = Grille(largeur, hauteur)
+    grille.depuis_tableau(generateur.integers(0, 2, (hauteur, largeur), dtype=np.uint8))
+    fourmis = [Fourmi(i, hauteur - 1 - i % hauteur, ant_id=10 + i) for i in range(4)]
+    for i, fourmi in enumerate(fourmis):
+        fourmi.direction = i
+    return grille, fourmis
+
+
+class TestInstantane(unittest.TestCase):
+    """Tests pour le format d'instantané."""
+
+    def verifier(self, grille, fourmis, resultat, etape):
+        grille_lue, fourmis_lues, etape_lue = resultat
+        np.testing.assert_array_equal(grille_lue.vers_tableau(), grille.vers_tableau())
+        self.assertEqual([(f.x, f.y, f.direction, f.ant_id) for f in fourmis_lues],
+                         [(f.x, f.y, f.direction, f.ant_id) for f in fourmis])
+        self.assertEqual(etape_lue, etape)
+
+    def test_aller_retour(self):
+        """Chaque compression et chaque stockage restituent la même partie."""
+        grille, fourmis = partie()
+        for compression in ('aucune', 'zlib'):
+            donnees = encoder_instantane(grille, fourmis, 12345, compression)
+            for stockage in ('octets', 'bits'):
+                self.verifier(grille, fourmis, decoder_instantane(donnees, stockage), 12345)
+
+    def test_grille_bits_et_plusieurs_couleurs(self):
+        """Une GrilleBits est écrite telle quelle, une grille à plus de deux couleurs en octets."""
+        grille, fourmis = partie()
+        bits = GrilleBits(grille.largeur, grille.hauteur)
+        bits.depuis_tableau(grille.vers_tableau())
+        self.verifier(grille, fourmis, decoder_instantane(encoder_instantane(bits, fourmis)), 0)
+        grille.cases[0, 0] = 3
+        self.verifier(grille, fourmis, decoder_instantane(encoder_instantane(grille, fourmis)), 0)
+
+    def test_taille(self):
+        """La grille est compactée à un bit par case."""
+        grille, fourmis = partie(1024, 1024)
+        self.assertLess(len(encoder_instantane(grille, fourmis, compression='aucune')), 1024 * 1024 // 8 + 100)
+
+    def test_erreurs(self):
+        """Les données invalides et les compressions inconnues sont refusées."""
+        grille, fourmis = partie()
+        with self.assertRaises(ValueError):
+            encoder_instantane(grille, fourmis, compression='bzip')
+        with self.assertRaises(ValueError):
+            decoder_instantane(b'PAS UN INSTANTANE, PAS DU TOUT')
+        with self.assertRaises(ValueError):
+            decoder_instantane(encoder_instantane(grille, fourmis)[:-5])
+        instantane = bytearray(encoder_instantane(grille, fourmis))
+        instantane[-8:] = bytes(8)  # Flux zlib corrompu
+        with self.assertRaises(ValueError):
+            decoder_instantane(bytes(instantane))
+
+    def test_fichiers(self):
+        """Écriture atomique, lecture projetée en mémoire et reprise de l'ancien format JSON."""
+        grille, fourmis = partie()
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = os.path.join(dossier, 'sauvegarde.fourmi')
+            for compression in ('aucune', 'zlib'):
+                ecrire_instantane(chemin, grille, fourmis, 7, compression)
+                self.verifier(grille, fourmis, lire_sauvegarde(chemin), 7)
+            self.assertEqual(os.listdir(dossier), ['sauvegarde.fourmi'])  # Pas de fichier temporaire
+
+            ancien = os.path.join(dossier, 'sauvegarde.json')
+            with open(ancien, 'w', encoding='utf-8') as fichier:
+                json.dump(vers_dict(grille, fourmis), fichier)
+            self.verifier(grille, fourmis, lire_sauvegarde(ancien, 'bits'), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Tests unitaires pour le journal des modifications.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+from fourmi.grille import Grille
+from fourmi.fourmi import Fourmi
+from fourmi.journal import Journal
+from fourmi.moteur import Moteur
+
+
+def partie():
+    """Crée une petite partie à trois fourmis."""
+    return Grille(20, 15), [Fourmi(10, 7, i) for i in range(3)]
+
+
+def reference(n_etapes):
+    """Rejoue la partie depuis le début jusqu'à ``n_etapes``."""
+    grille, fourmis = partie()
+    Moteur(jit=False).simuler(grille, fourmis, n_etapes)
+    return grille.grille, [(f.x, f.y, f.direction, f.ant_id) for f in fourmis]
+
+
+class TestJournal(unittest.TestCase):
+    """Tests pour le journal, ses points de reprise et le retour en arrière."""
+
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.chemin = os.path.join(self.dossier.name, 'journal.fourmi')
+
+    def tearDown(self):
+        self.dossier.cleanup()
+
+    def journaliser(self, lots, intervalle_points=100):
+        """Simule une partie en la journalisant, lot par lot."""
+        grille, fourmis = partie()
+        moteur = Moteur(jit=False)
+        with Journal(self.chemin, intervalle_points) as journal:
+            journal.point_de_reprise(grille, fourmis, 0)
+            for n_etapes in lots:
+                journal.avancer(moteur, grille, fourmis, n_etapes)
+        return grille, fourmis
+
+    def verifier(self, resultat, n_etapes):
+        grille, fourmis = resultat[:2]
+        self.assertEqual((grille.grille, [(f.x, f.y, f.direction, f.ant_id) for f in fourmis]),
+                         reference(n_etapes))
+
+    def test_etat_a(self):
+        """Toute étape passée est restituée, entre deux points de reprise ou au milieu d'un lot."""
+        self.journaliser([7] * 60)
+        with Journal(self.chemin) as journal:
+            self.assertEqual(journal.etape, 420)
+            self.assertEqual(journal.etapes_points, [0, 105, 210, 315, 420])
+            for n_etapes in (0, 1, 6, 7, 104, 105, 211, 419, 420):
+                with self.subTest(etape=n_etapes):
+                    self.verifier(journal.etat_a(n_etapes), n_etapes)
+            with self.assertRaises(ValueError):
+                journal.etat_a(421)
+
+    def test_reprise_apres_arret_brutal(self):
+        """Un enregistrement final incomplet est ignoré et supprimé, les étapes écrites sont gardées."""
+        self.journaliser([5] * 30)
+        taille = os.path.getsize(self.chemin)
+        with open(self.chemin, 'ab') as fichier:
+            fichier.write(b'D\x01\x00\x00 tronque')
+        with Journal(self.chemin) as journal:
+            self.assertEqual(os.path.getsize(self.chemin), taille)
+            resultat = journal.dernier_etat()
+            self.assertEqual(resultat[2], 150)
+            self.verifier(resultat, 150)
+
+    def test_branche(self):
+        """Reprendre la simulation depuis une étape passée remplace l'historique qui la suivait."""
+        self.journaliser([10] * 30)
+        moteur = Moteur(jit=False)
+        with Journal(self.chemin, 100) as journal:
+            grille, fourmis = journal.etat_a(155)
+            journal.point_de_reprise(grille, fourmis, 155)
+            journal.avancer(moteur, grille, fourmis, 20)
+        with Journal(self.chemin) as journal:
+            self.assertEqual(journal.etape, 175)
+            for n_etapes in (150, 155, 160, 175):
+                self.verifier(journal.etat_a(n_etapes), n_etapes)
+
+    def test_vider(self):
+        """Un journal vidé n'a plus d'historique et doit recommencer par un point de reprise."""
+        self.journaliser([10])
+        with Journal(self.chemin) as journal:
+            journal.vider()
+            self.assertIsNone(journal.dernier_etat())
+            with self.assertRaises(ValueError):
+                journal.enregistrer(*Moteur(jit=False).tracer(*partie(), 1), [])
+
+if __name__ == '__main__':
+    unittest.main()
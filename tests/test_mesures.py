@@ -0,0 +1,92 @@
+"""
+Tests unitaires pour les chronomètres, le profilage et les métriques Prometheus.
+"""
+
+import unittest
+import sys
+import os
+import pstats
+import tempfile
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+from fourmi.mesures import Chronometres, Registre, profiler
+
+
+class TestChronometres(unittest.TestCase):
+    """Tests pour ``Chronometres``."""
+
+    def test_phases(self):
+        """Chaque phase reçoit le temps écoulé depuis la précédente."""
+        chronos = Chronometres(actif=True)
+        for _ in range(3):
+            chronos.demarrer()
+            chronos.noter('simulation')
+            chronos.noter('rendu')
+        resume = chronos.resume()
+        self.assertEqual(list(resume), ['simulation', 'rendu'])
+        self.assertEqual(resume['rendu']['nombre'], 3)
+        self.assertGreaterEqual(resume['rendu']['max_ms'], resume['rendu']['moyenne_ms'])
+        self.assertIn('simulation', chronos.texte())
+
+    def test_inactif(self):
+        """Désactivés, les chronomètres ne mesurent rien."""
+        chronos = Chronometres()
+        chronos.demarrer()
+        chronos.noter('simulation')
+        self.assertEqual(chronos.resume(), {})
+
+
+class TestProfiler(unittest.TestCase):
+    """Tests pour ``profiler``."""
+
+    def test_cprofile(self):
+        """Le profil cProfile se relit avec pstats."""
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = os.path.join(dossier, 'profil.pstats')
+            with profiler(chemin):
+                sorted(range(1000), key=lambda x: -x)
+            self.assertGreater(pstats.Stats(chemin).total_calls, 0)
+
+    def test_outil_inconnu(self):
+        with self.assertRaises(ValueError):
+            with profiler('profil', 'gprof'):
+                pass
+
+
+class TestRegistre(unittest.TestCase):
+    """Tests pour le format texte de Prometheus."""
+
+    def test_exposer(self):
+        registre = Registre()
+        requetes = registre.compteur("requetes_total", "Requêtes.", ("route",))
+        etape = registre.jauge("etape", "Étape.")
+        duree = registre.histogramme("duree_secondes", "Durée.", ("route",), bornes=(0.1, 1))
+        requetes.incrementer(route='get_state')
+        requetes.incrementer(2, route='get_state')
+        etape.definir(42)
+        for valeur in (0.05, 0.1, 0.5, 3):
+            duree.observer(valeur, route='a"b')
+        lignes = registre.exposer().splitlines()
+        self.assertIn('# TYPE requetes_total counter', lignes)
+        self.assertIn('requetes_total{route="get_state"} 3', lignes)
+        self.assertIn('etape 42', lignes)
+        self.assertIn('duree_secondes_bucket{route="a\\"b",le="0.1"} 2', lignes)
+        self.assertIn('duree_secondes_bucket{route="a\\"b",le="1"} 3', lignes)
+        self.assertIn('duree_secondes_bucket{route="a\\"b",le="+Inf"} 4', lignes)
+        self.assertIn('duree_secondes_count{route="a\\"b"} 4', lignes)
+
+    def test_etiquettes_manquantes(self):
+        """Une série sans ses étiquettes, ou une métrique en double, est refusée."""
+        registre = Registre()
+        requetes = registre.compteur("requetes_total", "Requêtes.", ("route",))
+        with self.assertRaises(ValueError):
+            requetes.incrementer()
+        with self.assertRaises(ValueError):
+            registre.jauge("requetes_total", "Requêtes.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Tests unitaires pour le moteur de simulation par lots.
+"""
+
+import unittest
+import sys
+import os
+import tracemalloc
+from unittest import mock
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+from fourmi.grille import creer_grille
+from fourmi.fourmi import Fourmi
+from fourmi import moteur
+from fourmi.moteur import Moteur
+
+
+def simuler_reference(largeur, hauteur, positions, n_etapes, stockage='octets'):
+    """Simule avec ``Fourmi.etape``, fourmi par fourmi."""
+    grille = creer_grille(largeur, hauteur, stockage)
+    fourmis = [Fourmi(x, y, i) for i, (x, y) in enumerate(positions)]
+    for _ in range(n_etapes):
+        for fourmi in fourmis:
+            fourmi.etape(grille)
+    return grille.grille, [(f.x, f.y, f.direction) for f in fourmis]
+
+
+def simuler_moteur(largeur, hauteur, positions, n_etapes, jit, stockage='octets'):
+    """Simule avec le moteur, en deux lots."""
+    grille = creer_grille(largeur, hauteur, stockage)
+    fourmis = [Fourmi(x, y, i) for i, (x, y) in enumerate(positions)]
+    mot = Moteur(jit=jit)
+    mot.simuler(grille, fourmis, n_etapes // 2)
+    mot.simuler(grille, fourmis, n_etapes - n_etapes // 2)
+    return grille.grille, [(f.x, f.y, f.direction) for f in fourmis]
+
+
+class TestMoteur(unittest.TestCase):
+    """Tests d'équivalence entre le moteur et ``Fourmi.etape``."""
+
+    SCENARIOS = (
+        [(10, 10)],
+        [(10, 10)] * 5,
+        [(1, 2), (18, 3), (7, 15)],
+    )
+
+    def verifier_equivalence(self, jit):
+        """Compare le moteur à la référence sur tous les scénarios."""
+        for stockage in ('octets', 'bits'):
+            for positions in self.SCENARIOS:
+                with self.subTest(stockage=stockage, positions=positions):
+                    self.assertEqual(
+                        simuler_moteur(20, 17, positions, 2000, jit, stockage),
+                        simuler_reference(20, 17, positions, 2000, stockage))
+
+    def test_equivalence_python(self):
+        """Le noyau pur Python reproduit ``Fourmi.etape``, bords compris."""
+        self.verifier_equivalence(jit=False)
+
+    @unittest.skipIf(not moteur.JIT_DISPONIBLE, "numba n'est pas installé")
+    def test_equivalence_jit(self):
+        """Les noyaux compilés reproduisent ``Fourmi.etape``, bords compris."""
+        self.verifier_equivalence(jit=True)
+
+    def test_autoroute(self):
+        """Le saut de périodes sur l'autoroute donne le même résultat que la simulation complète."""
+        resultats = []
+        for autoroute in (False, True):
+            grille = creer_grille(500, 500)
+            grille.cases[20:60, 20:60] = 1  # Obstacle sur le trajet de l'autoroute
+            fourmis = [Fourmi(250, 250, 0)]
+            mot = Moteur(jit=False, autoroute=autoroute)
+            mot.simuler(grille, fourmis, 60000)
+            self.assertEqual(mot.etapes_simulees + mot.etapes_accelerees, 60000)
+            resultats.append((grille.grille, fourmis[0].x, fourmis[0].y, fourmis[0].direction))
+        self.assertGreater(mot.etapes_accelerees, 0)
+        self.assertEqual(resultats[0], resultats[1])
+
+    def test_tracer(self):
+        """Le tracé reproduit ``Fourmi.etape`` et relève chaque case inversée."""
+        for jit in (False, True) if moteur.JIT_DISPONIBLE else (False,):
+            with self.subTest(jit=jit):
+                positions = [(1, 2), (1, 2), (18, 3)]
+                grille = creer_grille(20, 17)
+                fourmis = [Fourmi(x, y, i) for i, (x, y) in enumerate(positions)]
+                cellules, directions = Moteur(jit=jit).tracer(grille, fourmis, 500)
+                self.assertEqual((grille.grille, [(f.x, f.y, f.direction) for f in fourmis]),
+                                 simuler_reference(20, 17, positions, 500))
+                self.assertEqual(cellules.shape, (500, 3))
+                self.assertEqual(cellules[0].tolist(), [2 * 20 + 1, 2 * 20 + 1, 3 * 20 + 18])
+                self.assertEqual(directions[0].tolist(), [0, 0, 0])
+                # La 2e fourmi lit la case déjà inversée par la 1re et tourne à gauche
+                self.assertEqual(cellules[1].tolist(), [2 * 20 + 2, 2 * 20 + 0, 3 * 20 + 19])
+                self.assertEqual(directions[1].tolist(), [1, 3, 1])
+
+    def test_sans_fourmi(self):
+        """Simuler sans fourmi ou sans étape ne fait rien."""
+        grille = creer_grille(3, 3)
+        self.assertEqual(Moteur(jit=False).simuler(grille, [], 10), 0)
+        self.assertEqual(Moteur(jit=False).simuler(grille, [Fourmi(1, 1, 0)], 0), 0)
+        self.assertEqual(grille.grille, [[0, 0, 0]] * 3)
+
+    def test_bits_sans_decompacter(self):
+        """Sur une grille compactée, le moteur ne décompacte que la région autour des fourmis."""
+        grille = creer_grille(4096, 4096, 'bits')
+        fourmis = [Fourmi(2000, 2000, 0), Fourmi(2100, 1900, 1)]
+        mot = Moteur(jit=False)
+        with mock.patch.object(type(grille), 'vers_tableau', side_effect=AssertionError), \
+                mock.patch.object(type(grille), 'depuis_tableau', side_effect=AssertionError):
+            tracemalloc.start()
+            mot.simuler(grille, fourmis, 1)
+            mot.simuler(grille, fourmis, 3000)
+            mot.tracer(grille, fourmis, 500)
+            pic = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self.assertLess(pic, 4096 * 4096 // 16)
+        self.assertEqual(mot.etapes_simulees, 2 * 3501)
+
+    def test_bits_par_regions(self):
+        """Par petites régions, la grille compactée évolue comme la grille d'octets, pour chaque topologie."""
+        for topologie in ('borne', 'tore', 'extensible'):
+            resultats = []
+            for stockage in ('octets', 'bits'):
+                grille = creer_grille(40, 30, stockage, topologie=topologie)
+                fourmis = [Fourmi(3, 4, 0), Fourmi(30, 20, 1)]
+                mot = Moteur(jit=False)
+                mot.MARGE_FENETRE = 5
+                mot.simuler(grille, fourmis, 3000)
+                cellules = mot.tracer(grille, fourmis, 400)[0]
+                resultats.append((grille.grille, cellules.tolist(), [(f.x, f.y, f.direction) for f in fourmis]))
+            with self.subTest(topologie=topologie):
+                self.assertEqual(resultats[0], resultats[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Tests unitaires pour l'ordonnancement de la simulation.
+"""
+
+import unittest
+import time
+import sys
+import os
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+from fourmi.grille import Grille, GrilleBits
+from fourmi.fourmi import Fourmi
+from fourmi.moteur import Moteur
+from fourmi.ordonnanceur import Ordonnanceur, SimulationEnFond, Zone, avancer, fusionner, recopier
+
+
+class TestOrdonnanceur(unittest.TestCase):
+    """Tests pour l'ordonnanceur et la simulation en fond."""
+
+    def test_etapes_par_seconde(self):
+        """Le nombre d'étapes suit le temps écoulé, fractions comprises."""
+        ordonnanceur = Ordonnanceur(4, retard_max=1)
+        depart = ordonnanceur._dernier  # pylint: disable=protected-access
+        self.assertEqual(ordonnanceur.etapes_a_faire(depart + 0.375), 1)
+        self.assertEqual(ordonnanceur.etapes_a_faire(depart + 0.75), 2)  # 1.5 + 0.5 reporté
+        self.assertEqual(ordonnanceur.etapes_a_faire(depart + 10), 4)  # Retard plafonné à 1 s
+
+    def test_avancer(self):
+        """Peu de cases modifiées : elles sont relevées une à une ; beaucoup : leur zone est donnée."""
+        grille = Grille(10, 10)
+        fourmis = [Fourmi(5, 5, 0)]
+        self.assertEqual(avancer(Moteur(jit=False), grille, fourmis, 2), [(5, 5), (6, 5)])
+        cases = avancer(Moteur(jit=False), grille, fourmis, 1000)
+        self.assertEqual(len(cases), 1000)
+
+        grille, fourmis = Grille(100, 100), [Fourmi(50, 50, 0), Fourmi(20, 70, 1)]
+        reference = Grille(100, 100), [Fourmi(50, 50, 0), Fourmi(20, 70, 1)]
+        cases = avancer(Moteur(jit=False), *reference, 300)
+        xs, ys = zip(*cases)
+        self.assertEqual(avancer(Moteur(jit=False), grille, fourmis, 300, cases_max=100),
+                         Zone(min(xs), min(ys), max(xs) + 1, max(ys) + 1))
+        self.assertEqual(grille.grille, reference[0].grille)
+        # Au-delà du tracé, la zone est celle que les fourmis peuvent atteindre
+        attendue = Zone(max(0, min(f.x for f in fourmis) - 30), min(f.y for f in fourmis) - 30,
+                        max(f.x for f in fourmis) + 31, max(f.y for f in fourmis) + 31)
+        self.assertEqual(avancer(Moteur(jit=False), grille, fourmis, 30, trace_max=10), attendue)
+
+    def test_fusionner_et_recopier(self):
+        """Les cases modifiées se réunissent, et seules elles sont recopiées d'une grille à l'autre."""
+        self.assertEqual(fusionner([(1, 2)], [(3, 4)]), [(1, 2), (3, 4)])
+        self.assertEqual(fusionner([(1, 2)], [(3, 4)], cases_max=1), Zone(1, 2, 4, 5))
+        self.assertEqual(fusionner(Zone(5, 5, 6, 6), []), Zone(5, 5, 6, 6))
+        self.assertIsNone(fusionner(None, [(1, 2)]))
+        for type_grille in (Grille, GrilleBits):
+            with self.subTest(type_grille.__name__):
+                source, cible = type_grille(30, 20), type_grille(30, 20)
+                for x, y in ((3, 4), (17, 9), (29, 19)):
+                    source.definir_couleur_case(x, y, 1)
+                recopier(source, cible, [(3, 4), (3, 4)])
+                self.assertEqual(cible.obtenir_couleur_case(3, 4), 1)
+                self.assertEqual(cible.obtenir_couleur_case(17, 9), 0)
+                recopier(source, cible, Zone(15, 8, 30, 20))
+                self.assertEqual(cible.grille, source.grille)
+
+    def test_simulation_en_fond(self):
+        """Le fil de simulation publie des instantanés indépendants de l'état courant, avec les cases modifiées."""
+        grille = Grille(50, 50)
+        fond = SimulationEnFond(grille, [Fourmi(25, 25, 0)], 10000, Moteur(jit=False))
+        premiere, _, _, modifiees = fond.instantane()
+        self.assertIsNone(modifiees)  # Premier instantané : toute la grille est nouvelle
+        fond.demarrer()
+        try:
+            limite = time.monotonic() + 5
+            while fond.instantane()[2] == 0 and time.monotonic() < limite:
+                time.sleep(0.01)
+        finally:
+            fond.arreter()
+        copie, fourmis, etapes, _ = fond.instantane()
+        self.assertGreater(etapes, 0)
+        self.assertIs(copie, premiere)  # La même grille, mise à jour case par case
+        self.assertIsNot(copie, grille)
+        self.assertEqual(copie.grille, grille.grille)
+        self.assertEqual(len(fourmis), 1)
+        self.assertEqual(fond.instantane()[3], [])  # Rien de publié depuis l'instantané précédent
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+"""
+Tests unitaires pour les règles à plusieurs couleurs et les turmites.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+from fourmi.grille import Grille, creer_grille
+from fourmi.fourmi import Fourmi
+from fourmi.instantane import decoder_instantane, encoder_instantane
+from fourmi.journal import Journal
+from fourmi.moteur import Moteur
+from fourmi.regles import LANGTON, Regle
+from fourmi.synchro import Synchronisation
+
+# Turmite à deux états et deux couleurs (spirale qui s'étend)
+TURMITE = [[[1, 'L', 1], [1, 'L', 1]], [[1, 'R', 1], [0, 'N', 0]]]
+
+
+def simuler_reference(regle, largeur, hauteur, positions, n_etapes):
+    """Simule avec ``Fourmi.etape``, fourmi par fourmi."""
+    regle = Regle.depuis_config(regle)
+    grille = Grille(largeur, hauteur)
+    fourmis = [Fourmi(x, y, i) for i, (x, y) in enumerate(positions)]
+    for _ in range(n_etapes):
+        for fourmi in fourmis:
+            fourmi.etape(grille, regle)
+    return grille.grille, [(f.x, f.y, f.direction, f.etat) for f in fourmis]
+
+
+def simuler_moteur(regle, largeur, hauteur, positions, n_etapes, jit, autoroute=True):
+    """Simule avec le moteur, en deux lots."""
+    grille = Grille(largeur, hauteur)
+    fourmis = [Fourmi(x, y, i) for i, (x, y) in enumerate(positions)]
+    moteur = Moteur(jit=jit, autoroute=autoroute, regle=regle)
+    moteur.simuler(grille, fourmis, n_etapes // 2)
+    moteur.simuler(grille, fourmis, n_etapes - n_etapes // 2)
+    return grille.grille, [(f.x, f.y, f.direction, f.etat) for f in fourmis]
+
+
+class TestRegle(unittest.TestCase):
+    """Tests pour la lecture des règles."""
+
+    def test_chaine(self):
+        """Une chaîne de lettres donne une règle cyclique à un état."""
+        regle = Regle.depuis_config('llrr')
+        self.assertEqual((regle.nom, regle.n_couleurs, regle.n_etats), ('LLRR', 4, 1))
+        self.assertTrue(regle.cyclique)
+        self.assertFalse(regle.langton)
+        self.assertEqual(regle.transition(3), (0, 1, 0))
+        self.assertTrue(Regle.depuis_config(None).langton)
+        self.assertEqual(Regle.depuis_config('RL'), LANGTON)
+
+    def test_turmite(self):
+        """Une table de turmite se lit en liste ou en JSON et garde son nom."""
+        regle = Regle.depuis_config(TURMITE)
+        self.assertEqual((regle.n_couleurs, regle.n_etats), (2, 2))
+        self.assertFalse(regle.cyclique)
+        self.assertEqual(regle.transition(1, 1), (0, 0, 0))
+        self.assertEqual(Regle.depuis_config(regle.nom), regle)
+
+    def test_invalide(self):
+        """Les règles mal formées sont refusées."""
+        for valeur in ('R', 'RX', '', '[[1', [], [[[1, 'L', 0]]], [[[2, 'L', 0], [0, 'R', 0]]],
+                       [[[1, 'L', 1], [0, 'R', 0]]], [[[1, 'Q', 0], [0, 'R', 0]]], [[1, 2]]):
+            with self.subTest(valeur=valeur):
+                with self.assertRaises(ValueError):
+                    Regle.depuis_config(valeur)
+
+    def test_compatible(self):
+        """Une grille à trop de couleurs ou une fourmi dans un état inconnu est refusée."""
+        grille, fourmis = Grille(4, 4), [Fourmi(1, 1, 0)]
+        grille.definir_couleur_case(2, 2, 3)
+        self.assertTrue(Regle.depuis_config('LLRR').compatible(grille, fourmis))
+        self.assertFalse(Regle.depuis_config('RLR').compatible(grille, fourmis))
+        fourmis[0].etat = 1
+        self.assertFalse(Regle.depuis_config('LLRR').compatible(grille, fourmis))
+
+    def test_grille_bits(self):
+        """Le stockage sur un bit refuse les règles à plus de deux couleurs."""
+        with self.assertRaises(ValueError):
+            creer_grille(8, 8, 'bits', n_couleurs=3)
+        with self.assertRaises(ValueError):
+            creer_grille(8, 8, 'bits').definir_couleur_case(0, 0, 2)
+
+
+class TestMoteurRegles(unittest.TestCase):
+    """Tests d'équivalence entre le moteur et ``Fourmi.etape`` pour d'autres règles."""
+
+    def test_une_fourmi(self):
+        for regle in ('LLRR', 'RLR', 'LRRRRRLLR', TURMITE):
+            for jit in (False, True):
+                with self.subTest(regle=regle, jit=jit):
+                    self.assertEqual(simuler_moteur(regle, 30, 25, [(15, 12)], 3000, jit),
+                                     simuler_reference(regle, 30, 25, [(15, 12)], 3000))
+
+    def test_plusieurs_fourmis(self):
+        positions = [(5, 5), (20, 10), (12, 18), (12, 18)]
+        for regle in ('LLRR', 'RLR', TURMITE):
+            for jit in (False, True):
+                with self.subTest(regle=regle, jit=jit):
+                    self.assertEqual(simuler_moteur(regle, 30, 25, positions, 1500, jit),
+                                     simuler_reference(regle, 30, 25, positions, 1500))
+
+    def test_colonie(self):
+        """Le chemin vectorisé des grandes colonies suit les règles cycliques."""
+        rng = np.random.default_rng(4)
+        positions = [tuple(p) for p in rng.integers(0, 24, size=(300, 2)).tolist()]
+        for regle in ('LLRR', 'RLR', TURMITE):
+            with self.subTest(regle=regle):
+                self.assertEqual(simuler_moteur(regle, 24, 24, positions, 40, False),
+                                 simuler_reference(regle, 24, 24, positions, 40))
+
+    def test_autoroute(self):
+        """Le saut des périodes d'une autoroute ne change pas le résultat."""
+        grilles = []
+        for autoroute in (True, False):
+            grille, fourmis = Grille(300, 300), [Fourmi(150, 150, 0)]
+            moteur = Moteur(jit=True, autoroute=autoroute, regle='LLR')
+            moteur.simuler(grille, fourmis, 100000)
+            grilles.append((grille.grille, [(f.x, f.y, f.direction) for f in fourmis]))
+            if autoroute:
+                self.assertGreater(moteur.etapes_accelerees, 0)
+        self.assertEqual(grilles[0], grilles[1])
+
+    def test_tracer(self):
+        """Le tracé d'une turmite relève l'état avec la direction."""
+        grille, fourmis = Grille(20, 20), [Fourmi(10, 10, 0)]
+        cellules, directions = Moteur(jit=False, regle=TURMITE).tracer(grille, fourmis, 50)
+        self.assertEqual(cellules.shape, (50, 1))
+        self.assertTrue(np.any(directions >> 2))
+
+
+class TestSauvegardeRegles(unittest.TestCase):
+    """Tests pour les sauvegardes, le journal et la synchronisation d'autres règles."""
+
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.chemin = os.path.join(self.dossier.name, 'journal.fourmi')
+
+    def tearDown(self):
+        self.dossier.cleanup()
+
+    def test_instantane(self):
+        """L'état des fourmis est gardé par les instantanés."""
+        grille, fourmis = Grille(10, 10), [Fourmi(3, 4, 0)]
+        grille.definir_couleur_case(1, 1, 7)
+        fourmis[0].direction, fourmis[0].etat = 2, 5
+        grille2, fourmis2, _ = decoder_instantane(encoder_instantane(grille, fourmis, 0))
+        self.assertEqual(grille2.grille, grille.grille)
+        self.assertEqual((fourmis2[0].direction, fourmis2[0].etat), (2, 5))
+
+    def test_journal(self):
+        """Le journal rejoue les règles cycliques et les turmites."""
+        for numero, regle in enumerate(('LLRR', TURMITE)):
+            with self.subTest(regle=regle):
+                chemin = f"{self.chemin}.{numero}"
+                moteur = Moteur(jit=False, regle=regle)
+                grille, fourmis = Grille(20, 15), [Fourmi(10, 7, i) for i in range(3)]
+                with Journal(chemin, 100, regle=moteur.regle) as journal:
+                    journal.point_de_reprise(grille, fourmis, 0)
+                    for _ in range(40):
+                        journal.avancer(moteur, grille, fourmis, 7)
+                with Journal(chemin, regle=moteur.regle) as journal:
+                    for etape in (0, 45, 99, 150, 280):
+                        grille2, fourmis2 = journal.etat_a(etape)
+                        self.assertEqual(
+                            (grille2.grille, [(f.x, f.y, f.direction, f.etat) for f in fourmis2]),
+                            simuler_reference(regle, 20, 15, [(10, 7)] * 3, etape))
+
+    def test_journal_autre_regle(self):
+        """Un journal ne se rouvre pas avec une autre règle."""
+        grille, fourmis = Grille(20, 15), [Fourmi(10, 7, 0)]
+        with Journal(self.chemin, regle='LLRR') as journal:
+            journal.avancer(Moteur(jit=False, regle='LLRR'), grille, fourmis, 10)
+        with self.assertRaises(ValueError):
+            Journal(self.chemin, regle='RL')
+
+    def test_synchro_valeurs(self):
+        """Un delta envoie la couleur actuelle de chaque case notée, au-delà de deux couleurs comprises."""
+        grille, fourmis = Grille(10, 10), [Fourmi(5, 5, 0)]
+        synchro = Synchronisation(intervalle=0)
+        synchro.preparer(grille, fourmis, 0, maintenant=0)
+        synchro.acquitter()
+        grille.definir_couleur_case(2, 2, 1)
+        grille.definir_couleur_case(3, 3, 2)
+        synchro.noter(grille, [(2, 2), (3, 3), (2, 2)])
+        delta = synchro.preparer(grille, fourmis, 1, maintenant=1)
+        self.assertEqual((delta["cellules"], delta["valeurs"]), ([22, 33], [1, 2]))
+
+if __name__ == "__main__":
+    unittest.main()
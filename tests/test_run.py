@@ -0,0 +1,105 @@
+"""
+Tests unitaires pour l'exécution sans affichage.
+"""
+
+import unittest
+import json
+import subprocess
+import sys
+import os
+import tempfile
+from unittest import mock
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+from fourmi.grille_creuse import GrilleCreuse
+from fourmi.run import etat_final, executer, main
+
+RACINE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestRun(unittest.TestCase):
+    """Tests pour ``python -m fourmi.run``."""
+
+    def test_sans_pygame_ni_httpx(self):
+        """Le module d'exécution n'importe ni pygame ni httpx."""
+        code = "import sys, fourmi.run; print(sorted({'pygame', 'httpx'} & set(sys.modules)))"
+        sortie = subprocess.run([sys.executable, "-c", code], cwd=RACINE, capture_output=True,
+                                text=True, check=True).stdout
+        self.assertEqual(sortie.strip(), "[]")
+
+    def test_importations_legeres(self):
+        """Le cœur, le balayage et le client s'importent sans secret ni dépendance lourde."""
+        code = ("import sys, fourmi.moteur, fourmi.balayage, client; "
+                "print(sorted({'numba', 'pygame', 'httpx', 'yaml'} & set(sys.modules)))")
+        environnement = {k: v for k, v in os.environ.items() if k != "SECRET_KEY"}
+        sortie = subprocess.run([sys.executable, "-c", code], cwd=RACINE, env=environnement, capture_output=True,
+                                text=True, check=True).stdout
+        self.assertEqual(sortie.strip(), "[]")
+
+    def test_execution(self):
+        """Une exécution écrit l'état final et les statistiques."""
+        for stockage in ('octets', 'creuse'):
+            with self.subTest(stockage=stockage), tempfile.TemporaryDirectory() as dossier:
+                config = os.path.join(dossier, "config.yaml")
+                with open(config, 'w', encoding='utf-8') as fichier:
+                    fichier.write(f"largeur: 20\nhauteur: 10\nnombre_de_fourmis: 2\netapes: 500\nstockage: {stockage}\n")
+                sortie = os.path.join(dossier, "etat.json")
+                stats = os.path.join(dossier, "stats.json")
+                self.assertEqual(main(["--config", config, "--etapes", "300", "--sortie", sortie,
+                                       "--stats", stats, "--sans-jit"]), 0)
+                with open(sortie, encoding='utf-8') as fichier:
+                    etat = json.load(fichier)
+                with open(stats, encoding='utf-8') as fichier:
+                    statistiques = json.load(fichier)
+                self.assertEqual(len(etat["fourmis"]), 2)
+                self.assertEqual(statistiques["etapes"], 300)
+                self.assertEqual(statistiques["etapes_simulees"], 600)
+                self.assertGreater(statistiques["cases_noires"], 0)
+
+    def test_creuse_par_tuiles(self):
+        """Une grille creuse est comptée et écrite tuile par tuile, sans tableau dense."""
+        config = {"largeur": 0, "hauteur": 0, "etapes": 3000, "stockage": "creuse"}
+        with mock.patch.object(GrilleCreuse, 'vers_tableau', side_effect=AssertionError):
+            grille, fourmis, statistiques = executer(config, jit=False)
+            etat = json.loads(json.dumps(etat_final(grille, fourmis)))
+        tableau = GrilleCreuse.vers_tableau(grille)
+        self.assertEqual(statistiques["cases_noires"], int((tableau != 0).sum()))
+        self.assertEqual(etat["origine"], list(grille.emprise()[:2]))
+        taille = etat["taille_tuile"]
+        relu = GrilleCreuse(taille)
+        for tx, ty, contenu in etat["tuiles"]:
+            relu.definir_tuile(tx, ty, bytes.fromhex(contenu))
+        self.assertEqual(relu.tuiles, grille.tuiles)
+        self.assertNotIn("grille", etat)
+
+    def test_statistiques(self):
+        """``--statistiques`` écrit la série des statistiques et ajoute leur résumé aux statistiques d'exécution."""
+        with tempfile.TemporaryDirectory() as dossier:
+            config = os.path.join(dossier, "config.yaml")
+            with open(config, 'w', encoding='utf-8') as fichier:
+                fichier.write("largeur: 200\nhauteur: 200\netapes: 12000\nintervalle_statistiques: 500\n")
+            serie, stats = os.path.join(dossier, "serie.csv"), os.path.join(dossier, "stats.json")
+            self.assertEqual(main(["--config", config, "--sortie", "-", "--stats", stats, "--sans-jit",
+                                   "--statistiques", serie]), 0)
+            with open(serie, encoding='utf-8') as fichier:
+                self.assertEqual(len(fichier.readlines()), 1 + 12000 // 500)
+            with open(stats, encoding='utf-8') as fichier:
+                analyse = json.load(fichier)["analyse"]
+            self.assertEqual((analyse["etape"], analyse["fourmis"][0]["periode"]), (12000, 104))
+
+    def test_profil(self):
+        """``--profil`` écrit un profil cProfile de la simulation."""
+        with tempfile.TemporaryDirectory() as dossier:
+            config = os.path.join(dossier, "config.yaml")
+            with open(config, 'w', encoding='utf-8') as fichier:
+                fichier.write("largeur: 20\nhauteur: 10\netapes: 100\n")
+            profil = os.path.join(dossier, "profil.pstats")
+            self.assertEqual(main(["--config", config, "--sortie", "-", "--stats", os.path.join(dossier, "stats.json"),
+                                   "--sans-jit", "--profil", profil]), 0)
+            self.assertGreater(os.path.getsize(profil), 0)
+
+if __name__ == '__main__':
+    unittest.main()
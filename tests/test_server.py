@@ -4,6 +4,11 @@ Tests unitaires pour le serveur FastAPI de la simulation de la Fourmi de Langton
 
 import sys
 import os
+import gzip
+import json
+import time
+import zlib
+import pytest
 from fastapi.testclient import TestClient
 
 # Ajouter le chemin du projet pour permettre l'importation correcte des modules
@@ -11,6 +16,9 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 # Les importations des modules du projet doivent venir après la configuration du chemin
 from server import app, SECRET_KEY
+from fourmi.grille import Grille
+from fourmi.fourmi import Fourmi
+from fourmi.moteur import Moteur
 
 client = TestClient(app)
 
@@ -40,3 +48,93 @@ def test_update_state():
     assert response.status_code == 200
     data = response.json()
     assert data == new_state
+
+def test_state_session_par_defaut():
+    """La session par défaut avance sur le serveur, et /state renvoie son étape."""
+    response = client.get("/state", headers={"Authorization": f"Bearer {SECRET_KEY}"})
+    data = response.json()
+    assert data["session"] == "defaut"
+    assert data["etape"] >= 0
+    assert sum(map(sum, data["grille"])) <= data["etape"] * len(data["fourmis"])  # Une case par fourmi et par étape
+    assert client.get("/state").status_code == 401
+
+def test_sessions():
+    """Création, avancement, pause, liste et suppression d'une session nommée."""
+    entetes = {"Authorization": f"Bearer {SECRET_KEY}"}
+    with TestClient(app) as observateur:  # Une seule boucle d'événements pour tout le test
+        parametres = {"nom": "essai", "largeur": 12, "hauteur": 9, "nombre_de_fourmis": 2, "etapes_par_seconde": 2000}
+        response = observateur.post("/sessions", json=parametres, headers=entetes)
+        assert response.status_code == 201
+        assert observateur.post("/sessions", json=parametres, headers=entetes).status_code == 409
+
+        etape = 0
+        for _ in range(100):
+            time.sleep(0.01)
+            etape = observateur.get("/state?session=essai", headers=entetes).json()["etape"]
+            if etape > 0:
+                break
+        assert etape > 0
+
+        # L'état renvoyé est celui de la simulation de référence au même nombre d'étapes
+        assert observateur.patch("/sessions/essai", json={"active": False}, headers=entetes).json()["active"] is False
+        data = observateur.get("/state?session=essai", headers=entetes).json()
+        grille = Grille(12, 9)
+        fourmis = [Fourmi(6, 4, i) for i in range(2)]
+        Moteur(jit=False).simuler(grille, fourmis, data["etape"])
+        assert data["grille"] == grille.grille
+        assert [(f["x"], f["y"]) for f in data["fourmis"]] == [(f.x, f.y) for f in fourmis]
+
+        assert "essai" in [s["session"] for s in observateur.get("/sessions", headers=entetes).json()]
+        assert observateur.delete("/sessions/essai", headers=entetes).status_code == 204
+        assert observateur.get("/state?session=essai", headers=entetes).status_code == 404
+
+def test_session_topologie():
+    """Une session peut avoir une grille torique ; une topologie inconnue est refusée."""
+    entetes = {"Authorization": f"Bearer {SECRET_KEY}"}
+    parametres = {"nom": "tore", "largeur": 8, "hauteur": 8, "topologie": "tore", "etapes_par_seconde": 1}
+    response = client.post("/sessions", json=parametres, headers=entetes)
+    assert response.status_code == 201
+    assert response.json()["topologie"] == "tore"
+    assert client.delete("/sessions/tore", headers=entetes).status_code == 204
+    parametres.update(nom="sphere", topologie="sphere")
+    assert client.post("/sessions", json=parametres, headers=entetes).status_code == 422
+
+def test_cle_secrete_au_demarrage(monkeypatch):
+    """Le serveur s'importe sans clé secrète, mais refuse de démarrer sans elle."""
+    monkeypatch.delenv("SECRET_KEY")
+    with pytest.raises(ValueError):
+        with TestClient(app):
+            pass
+
+def test_metrics():
+    """Les requêtes et les sessions sont exposées au format de Prometheus."""
+    entetes = {"Authorization": f"Bearer {SECRET_KEY}"}
+    assert client.get("/state", headers=entetes).status_code == 200
+    assert client.get("/metrics").status_code == 401
+    response = client.get("/metrics", headers=entetes)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lignes = response.text.splitlines()
+    assert 'fourmi_requetes_total{route="get_state",statut="200"}' in " ".join(lignes)
+    assert any(ligne.startswith('fourmi_reponse_octets_count{route="get_state"}') for ligne in lignes)
+    assert any(ligne.startswith('fourmi_session_etape{session="defaut"}') for ligne in lignes)
+
+def test_corps_compresse_mal_forme():
+    """Un corps compressé corrompu est refusé avec une erreur 400, pas une erreur interne."""
+    entetes = {"Authorization": f"Bearer {SECRET_KEY}", "Content-Type": "application/json", "Content-Encoding": "gzip"}
+    corps = gzip.compress(json.dumps({"grille": [[0]], "fourmis": []}).encode())
+    corrompu = corps[:10] + bytes(b ^ 0xFF for b in corps[10:20]) + corps[20:]  # En-tête gzip intact
+    for route in ("/update", "/sync"):
+        response = client.post(route, content=corrompu, headers=entetes)
+        assert response.status_code == 400
+        assert response.json()["detail"].startswith("Malformed body")
+    assert client.post("/update", content=corps[:-12], headers=entetes).status_code == 400  # Tronqué
+    assert client.post("/update", content=zlib.compress(b"{}")[:-2], headers=entetes).status_code == 400
+
+def test_grille_mal_formee():
+    """Une grille dont les cases ne sont pas des entiers est refusée avec une erreur 422."""
+    entetes = {"Authorization": f"Bearer {SECRET_KEY}"}
+    for grille in ([["a"]], [[1.5]], [[None]], {"largeur": "a", "hauteur": 1, "bits_par_case": 8, "donnees": "AA=="}):
+        assert client.post("/update", json={"grille": grille, "fourmis": []}, headers=entetes).status_code == 422
+        assert client.post("/sync?session=grille-mal-formee", json={"version": 0, "grille": grille, "fourmis": []},
+                           headers=entetes).status_code == 422
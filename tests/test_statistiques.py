@@ -0,0 +1,126 @@
+"""
+Tests unitaires pour les statistiques tenues à jour pendant l'exécution.
+"""
+
+import unittest
+import csv
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+from fourmi.fourmi import DX, DY, Fourmi
+from fourmi.grille import creer_grille
+from fourmi.journal import Journal
+from fourmi.moteur import Moteur
+from fourmi.regles import Regle
+from fourmi.statistiques import COLONNES, Statistiques, ouvrir_serie
+
+# Turmite à deux états et deux couleurs (spirale qui s'étend)
+TURMITE = [[[1, 'L', 1], [1, 'L', 1]], [[1, 'R', 1], [0, 'N', 0]]]
+
+
+def reference(regle, topologie, taille, positions, n_etapes):
+    """Simule avec ``Fourmi.etape`` en relevant la population, l'emprise, les déplacements et les longueurs."""
+    regle = Regle.depuis_config(regle)
+    grille = creer_grille(taille, taille, 'octets', regle.n_couleurs, topologie)
+    fourmis = [Fourmi(x, y, i) for i, (x, y) in enumerate(positions)]
+    visitees = []
+    deplacements = [[0, 0] for _ in fourmis]
+    longueurs = [0] * len(fourmis)
+    for _ in range(n_etapes):
+        for i, fourmi in enumerate(fourmis):
+            avant = (fourmi.x, fourmi.y)
+            visitees.append((fourmi.x + grille.origine_x, fourmi.y + grille.origine_y))
+            fourmi.etape(grille, regle)
+            if (fourmi.x, fourmi.y) != avant:
+                deplacements[i][0] += DX[fourmi.direction]
+                deplacements[i][1] += DY[fourmi.direction]
+                longueurs[i] += 1
+        grille.etendre(fourmis)
+    xs, ys = zip(*visitees)
+    return (int(np.count_nonzero(grille.vers_tableau())), (min(xs), min(ys), max(xs), max(ys)),
+            deplacements, longueurs)
+
+
+class TestStatistiques(unittest.TestCase):
+    """Tests pour ``Statistiques``."""
+
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        self.dossier.cleanup()
+
+    def test_equivalence(self):
+        """Les statistiques incrémentales sont celles d'un parcours complet, pour chaque topologie."""
+        positions = [(3, 3), (10, 12)]
+        for topologie in ('borne', 'tore', 'extensible'):
+            for regle in ('RL', 'LLRR', TURMITE):
+                with self.subTest(topologie=topologie, regle=regle):
+                    moteur = Moteur(jit=False, regle=regle)
+                    grille = creer_grille(16, 16, 'octets', moteur.regle.n_couleurs, topologie)
+                    fourmis = [Fourmi(x, y, i) for i, (x, y) in enumerate(positions)]
+                    statistiques = Statistiques(grille, fourmis, moteur.regle)
+                    for _ in range(20):
+                        statistiques.avancer(moteur, grille, fourmis, 97)
+                    resume = statistiques.resume()
+                    self.assertEqual((resume["population"], tuple(resume["emprise"]),
+                                      [f["deplacement"] for f in resume["fourmis"]],
+                                      [f["longueur"] for f in resume["fourmis"]]),
+                                     reference(regle, topologie, 16, positions, 1940))
+
+    def test_autoroute(self):
+        """L'autoroute de la fourmi de Langton est trouvée, avec l'étape de son début."""
+        moteur = Moteur(jit=False)
+        grille, fourmis = creer_grille(200, 200), [Fourmi(100, 100, 0)]
+        statistiques = Statistiques(grille, fourmis)
+        for _ in range(12):
+            statistiques.avancer(moteur, grille, fourmis, 1000)
+        self.assertEqual((statistiques.periodes.tolist(), statistiques.debuts_periodes.tolist()), ([104], [9977]))
+        self.assertEqual(statistiques.longueurs.tolist(), [12000])
+
+    def test_serie(self):
+        """La série a une ligne par fourmi toutes les ``intervalle`` étapes, même au milieu d'un lot."""
+        chemin = os.path.join(self.dossier.name, 'statistiques.csv')
+        moteur = Moteur(jit=False)
+        grille, fourmis = creer_grille(30, 30), [Fourmi(10, 10, 0), Fourmi(20, 20, 1)]
+        with ouvrir_serie(chemin, lignes_par_bloc=3) as serie:
+            statistiques = Statistiques(grille, fourmis, serie=serie, intervalle=40)
+            for _ in range(5):
+                statistiques.avancer(moteur, grille, fourmis, 70)
+        with open(chemin, encoding='utf-8', newline='') as fichier:
+            lignes = list(csv.reader(fichier))
+        self.assertEqual(tuple(lignes[0]), COLONNES)
+        self.assertEqual([(int(l[0]), int(l[1])) for l in lignes[1:]],
+                         [(etape, i) for etape in range(40, 351, 40) for i in range(2)])
+        # La population écrite à l'étape 200 est celle d'une simulation arrêtée à l'étape 200
+        grille2, fourmis2 = creer_grille(30, 30), [Fourmi(10, 10, 0), Fourmi(20, 20, 1)]
+        moteur.simuler(grille2, fourmis2, 200)
+        self.assertEqual(int(lignes[1 + 2 * 4][2]), np.count_nonzero(grille2.vers_tableau()))
+
+    def test_format_inconnu(self):
+        """Seuls les formats CSV et Parquet sont acceptés."""
+        with self.assertRaises(ValueError):
+            ouvrir_serie(os.path.join(self.dossier.name, 'statistiques.txt'))
+
+    def test_journal(self):
+        """Le journal tient les statistiques à jour avec les étapes qu'il enregistre."""
+        moteur = Moteur(jit=False)
+        grille, fourmis = creer_grille(8, 8, topologie='extensible'), [Fourmi(4, 4, 0)]
+        statistiques = Statistiques(grille, fourmis)
+        with Journal(os.path.join(self.dossier.name, 'journal.fourmi'), 500) as journal:
+            for _ in range(40):
+                journal.avancer(moteur, grille, fourmis, 31, statistiques=statistiques)
+        self.assertEqual(statistiques.etape, journal.etape)
+        self.assertEqual(statistiques.population, np.count_nonzero(grille.vers_tableau()))
+        self.assertEqual(statistiques.resume()["emprise"], list(reference('RL', 'extensible', 8, [(4, 4)], 1240)[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Tests unitaires pour le protocole de synchronisation par différences.
+"""
+
+import unittest
+import asyncio
+import threading
+from unittest import mock
+import sys
+import os
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+from server import app, SECRET_KEY
+from fourmi.grille import Grille
+from fourmi.fourmi import Fourmi
+from fourmi.moteur import Moteur
+from fourmi.ordonnanceur import Zone, avancer
+from fourmi.session import Session
+from fourmi.synchro import Synchronisation
+
+ENTETES = {"Authorization": f"Bearer {SECRET_KEY}"}
+
+
+class TestSynchronisation(unittest.TestCase):
+    """Tests pour ``Synchronisation`` et la route ``/sync``."""
+
+    def test_envois(self):
+        """Premier envoi complet, puis cases notées, un seul envoi à la fois et pas plus d'un par intervalle."""
+        grille, fourmis = Grille(8, 6), [Fourmi(4, 3, 0)]
+        moteur = Moteur(jit=False)
+        synchro = Synchronisation(intervalle=1)
+        corps = synchro.preparer(grille, fourmis, 0, maintenant=0)
+        self.assertEqual((corps["version"], len(corps["grille"])), (0, 6))
+        self.assertIsNone(synchro.preparer(grille, fourmis, 1, maintenant=5))  # Envoi en cours
+        synchro.acquitter()
+
+        synchro.noter(grille, avancer(moteur, grille, fourmis, 3))
+        self.assertIsNone(synchro.preparer(grille, fourmis, 3, maintenant=0.5))  # Intervalle non écoulé
+        corps = synchro.preparer(grille, fourmis, 3, maintenant=1)
+        self.assertEqual((corps["base"], corps["version"]), (0, 3))
+        self.assertEqual(corps["cellules"], [3 * 8 + 4, 3 * 8 + 5, 4 * 8 + 5])
+        self.assertEqual(corps["valeurs"], [1, 1, 1])
+        self.assertNotIn("grille", corps)
+
+        # Échec réseau : les mêmes cases repartent avec les suivantes
+        synchro.echouer()
+        synchro.noter(grille, avancer(moteur, grille, fourmis, 1))
+        self.assertEqual(len(synchro.preparer(grille, fourmis, 4, maintenant=2)["cellules"]), 4)
+        synchro.acquitter()
+        # Cases inconnues, ou beaucoup de cases : renvoi complet
+        synchro.noter(grille, None)
+        self.assertIn("grille", synchro.preparer(grille, fourmis, 5, maintenant=3))
+        synchro.acquitter()
+        synchro.noter(grille, Zone(0, 0, 8, 4))
+        self.assertIn("grille", synchro.preparer(grille, fourmis, 6, maintenant=4))
+        synchro.acquitter()
+        synchro.noter(grille, Zone(2, 1, 4, 3))
+        self.assertEqual(synchro.preparer(grille, fourmis, 7, maintenant=5)["cellules"], [10, 11, 18, 19])
+        # Version refusée par le serveur : renvoi complet
+        synchro.echouer(resynchroniser=True)
+        self.assertIn("grille", synchro.preparer(grille, fourmis, 7, maintenant=6))
+
+    def test_serveur(self):
+        """Le serveur applique les différences et refuse une base qui n'est pas la sienne."""
+        serveur = TestClient(app)
+        grille, fourmis = Grille(10, 7), [Fourmi(5, 3, 0), Fourmi(2, 2, 1)]
+        synchro = Synchronisation(intervalle=0)
+        moteur = Moteur(jit=False)
+
+        self.assertEqual(serveur.post("/sync?session=essai-synchro", json={"version": 1, "base": 0, "cellules": [],
+                                                                          "fourmis": []},
+                                      headers=ENTETES).status_code, 409)  # Session inconnue sans grille
+        for version in (0, 5, 9, 20):
+            synchro.noter(grille, avancer(moteur, grille, fourmis, version - (synchro.base or 0)))
+            reponse = serveur.post("/sync?session=essai-synchro", json=synchro.preparer(grille, fourmis, version),
+                                   headers=ENTETES)
+            self.assertEqual(reponse.json(), {"version": version})
+            synchro.acquitter()
+            etat = serveur.get("/state?session=essai-synchro", headers=ENTETES).json()
+            self.assertEqual((etat["etape"], etat["grille"]), (version, grille.grille))
+            self.assertEqual([(f["x"], f["y"]) for f in etat["fourmis"]], [(f.x, f.y) for f in fourmis])
+
+        reponse = serveur.post("/sync?session=essai-synchro", json={"version": 30, "base": 25, "cellules": [0],
+                                                                   "fourmis": []}, headers=ENTETES)
+        self.assertEqual((reponse.status_code, reponse.json()["detail"]), (409, {"version": 20}))
+        reponse = serveur.post("/sync?session=defaut", json=synchro.preparer(grille, fourmis, 21), headers=ENTETES)
+        self.assertEqual(reponse.status_code, 409)  # Session simulée par le serveur
+        self.assertEqual(serveur.delete("/sessions/essai-synchro", headers=ENTETES).status_code, 204)
+
+    def test_fourmis_invalides(self):
+        """Une fourmi mal formée ou hors de la grille est refusée (422) sans toucher à la session."""
+        serveur = TestClient(app)
+        grille = [[0] * 4 for _ in range(3)]
+        valide = {"x": 3, "y": 2, "id": 0, "direction": "E", "etat": 3}
+        reponse = serveur.post("/sync?session=essai-fourmis",
+                               json={"version": 1, "grille": grille, "fourmis": [valide]}, headers=ENTETES)
+        self.assertEqual(reponse.json(), {"version": 1})
+        for fourmi in ({"x": 10 ** 12}, {"x": "a"}, {"x": 4}, {"y": -1}, {"direction": "Q"}, {"etat": 64},
+                       {"id": 2 ** 40}):
+            with self.subTest(**fourmi):
+                for envoi in ({"grille": grille}, {"base": 1}):
+                    reponse = serveur.post("/sync?session=essai-fourmis",
+                                           json={"version": 2, "fourmis": [dict(valide, **fourmi)], **envoi},
+                                           headers=ENTETES)
+                    self.assertEqual(reponse.status_code, 422)
+        reponse = serveur.get("/state?session=essai-fourmis",
+                              headers={**ENTETES, "Accept": "application/octet-stream"})
+        self.assertEqual(reponse.status_code, 200)
+        etat = serveur.get("/state?session=essai-fourmis", headers=ENTETES).json()
+        self.assertEqual((etat["etape"], etat["fourmis"]), (1, [valide]))
+        self.assertEqual(serveur.delete("/sessions/essai-fourmis", headers=ENTETES).status_code, 204)
+
+    def test_synchroniser_dans_executeur(self):
+        """Les envois sont appliqués hors de la boucle d'événements, sans déplier une grille compactée."""
+        session = Session("essai-executeur", 16, 8, stockage='bits', pilotee=True)
+        fils = []
+        appliquer = session._appliquer  # pylint: disable=protected-access
+
+        def espion(*args):
+            fils.append(threading.current_thread())
+            return appliquer(*args)
+
+        async def scenario():
+            with mock.patch.object(session, "_appliquer", espion), \
+                    mock.patch.object(type(session.grille), "vers_tableau", side_effect=AssertionError):
+                await session.synchroniser(1, [], 0, [3, 17, 3, 20], valeurs=[1, 1, 0, 1])
+                await session.synchroniser(2, [], 1, [17, 21])
+            return threading.current_thread()
+
+        boucle = asyncio.run(scenario())
+        self.assertEqual(len(fils), 2)
+        self.assertNotIn(boucle, fils)
+        # La case 3, envoyée deux fois, garde sa dernière valeur ; la case 17 est inversée deux fois
+        self.assertEqual(session.grille.lire_cases(np.arange(24)).nonzero()[0].tolist(), [20, 21])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+"""
+Tests unitaires pour les topologies de grille : bornée, torique et extensible.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Ajouter le chemin du projet pour permettre l'importation correcte des modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Les importations des modules du projet doivent venir après la configuration du chemin
+from fourmi import grille as module_grille
+from fourmi.camera import Camera
+from fourmi.grille import Grille, creer_grille
+from fourmi.fourmi import Fourmi
+from fourmi.journal import Journal
+from fourmi.moteur import Moteur
+from fourmi.ordonnanceur import avancer
+from fourmi.regles import Regle
+
+# Turmite à deux états et deux couleurs (spirale qui s'étend)
+TURMITE = [[[1, 'L', 1], [1, 'L', 1]], [[1, 'R', 1], [0, 'N', 0]]]
+
+
+def etat(grille, fourmis):
+    """Retourne le contenu de la grille, son origine et l'état des fourmis."""
+    return (grille.grille, (grille.origine_x, grille.origine_y),
+            [(f.x, f.y, f.direction, f.etat) for f in fourmis])
+
+
+def simuler_reference(regle, topologie, taille, positions, n_etapes, stockage='octets'):
+    """Simule avec ``Fourmi.etape``, en agrandissant la grille après chaque étape."""
+    regle = Regle.depuis_config(regle)
+    grille = creer_grille(taille, taille, stockage, regle.n_couleurs, topologie)
+    fourmis = [Fourmi(x, y, i) for i, (x, y) in enumerate(positions)]
+    for _ in range(n_etapes):
+        for fourmi in fourmis:
+            fourmi.etape(grille, regle)
+        grille.etendre(fourmis)
+    return etat(grille, fourmis)
+
+
+def simuler_moteur(regle, topologie, taille, positions, n_etapes, jit, stockage='octets', autoroute=True):
+    """Simule avec le moteur, en deux lots."""
+    moteur = Moteur(jit=jit, autoroute=autoroute, regle=regle)
+    grille = creer_grille(taille, taille, stockage, moteur.regle.n_couleurs, topologie)
+    fourmis = [Fourmi(x, y, i) for i, (x, y) in enumerate(positions)]
+    moteur.simuler(grille, fourmis, n_etapes // 2)
+    moteur.simuler(grille, fourmis, n_etapes - n_etapes // 2)
+    return etat(grille, fourmis)
+
+
+class TestGrilleTopologie(unittest.TestCase):
+    """Tests pour la topologie des grilles et leur agrandissement."""
+
+    def test_topologie_invalide(self):
+        """Une topologie inconnue est refusée."""
+        with self.assertRaises(ValueError):
+            Grille(4, 4, 'sphere')
+        with self.assertRaises(ValueError):
+            Grille(4, 4).topologie = 'sphere'
+
+    def test_etendre(self):
+        """La grille double du côté où la fourmi est sortie, et les cases suivent."""
+        grille = Grille(4, 3, 'extensible')
+        grille.definir_couleur_case(0, 0, 1)
+        fourmis = [Fourmi(-1, 1, 0)]
+        self.assertEqual(grille.etendre(fourmis), (4, 0))
+        self.assertEqual((grille.largeur, grille.hauteur), (8, 3))
+        self.assertEqual((grille.origine_x, grille.origine_y), (-4, 0))
+        self.assertEqual((fourmis[0].x, fourmis[0].y), (3, 1))
+        self.assertEqual(grille.obtenir_couleur_case(4, 0), 1)
+
+        fourmis[0].y = 3
+        self.assertEqual(grille.etendre(fourmis), (0, 0))
+        self.assertEqual((grille.largeur, grille.hauteur), (8, 6))
+        self.assertIsNone(grille.etendre(fourmis))  # Toutes les fourmis sont dans la grille
+
+        copie = grille.copier()
+        self.assertEqual((copie.topologie, copie.origine_x, copie.grille), ('extensible', -4, grille.grille))
+
+    def test_etendre_autres_topologies(self):
+        """Seule une grille extensible s'agrandit."""
+        for topologie in ('borne', 'tore'):
+            grille = Grille(4, 4, topologie)
+            self.assertIsNone(grille.etendre([Fourmi(-1, 0, 0)]))
+            self.assertEqual((grille.largeur, grille.hauteur), (4, 4))
+
+    def test_cases_max(self):
+        """Une grille extensible ne dépasse pas ``CASES_MAX`` cases."""
+        cases_max = module_grille.CASES_MAX
+        module_grille.CASES_MAX = 100
+        try:
+            grille = Grille(8, 8, 'extensible')
+            with self.assertRaises(ValueError):
+                grille.etendre([Fourmi(8, 0, 0)])
+        finally:
+            module_grille.CASES_MAX = cases_max
+
+    def test_tore(self):
+        """Sur un tore, une fourmi qui sort d'un côté revient par l'autre."""
+        grille = Grille(5, 4, 'tore')
+        fourmi = Fourmi(0, 0, 0)
+        fourmi.direction = 3  # Ouest
+        fourmi.etape(grille)  # Case blanche : virage à droite, vers le nord
+        self.assertEqual((fourmi.x, fourmi.y), (0, 3))
+        fourmi.direction = 3
+        fourmi.avancer(5, 4, bornee=False, tore=True)
+        self.assertEqual((fourmi.x, fourmi.y), (4, 3))
+
+
+class TestMoteurTopologie(unittest.TestCase):
+    """Tests d'équivalence entre le moteur et ``Fourmi.etape`` pour chaque topologie."""
+
+    def test_une_fourmi(self):
+        for topologie in ('borne', 'tore', 'extensible'):
+            for regle in ('RL', 'LLRR', TURMITE):
+                for jit in (False, True):
+                    with self.subTest(topologie=topologie, regle=regle, jit=jit):
+                        self.assertEqual(simuler_moteur(regle, topologie, 16, [(8, 8)], 3000, jit),
+                                         simuler_reference(regle, topologie, 16, [(8, 8)], 3000))
+
+    def test_plusieurs_fourmis(self):
+        positions = [(2, 2), (12, 5), (7, 13)]
+        for topologie in ('tore', 'extensible'):
+            for regle in ('RL', 'LLRR', TURMITE):
+                for jit in (False, True):
+                    with self.subTest(topologie=topologie, regle=regle, jit=jit):
+                        self.assertEqual(simuler_moteur(regle, topologie, 16, positions, 2000, jit),
+                                         simuler_reference(regle, topologie, 16, positions, 2000))
+
+    def test_colonie(self):
+        """Le chemin vectorisé des grandes colonies suit chaque topologie."""
+        rng = np.random.default_rng(7)
+        positions = [tuple(p) for p in rng.integers(0, 16, size=(300, 2)).tolist()]
+        for topologie in ('tore', 'extensible'):
+            for regle in ('RL', 'LLRR'):
+                with self.subTest(topologie=topologie, regle=regle):
+                    self.assertEqual(simuler_moteur(regle, topologie, 16, positions, 60, False),
+                                     simuler_reference(regle, topologie, 16, positions, 60))
+
+    def test_grille_bits(self):
+        """Le stockage sur un bit s'agrandit comme le stockage sur un octet."""
+        self.assertEqual(simuler_moteur('RL', 'extensible', 8, [(4, 4)], 5000, True, stockage='bits'),
+                         simuler_reference('RL', 'extensible', 8, [(4, 4)], 5000))
+
+    def test_autoroute(self):
+        """Le saut des périodes d'une autoroute ne change pas le résultat, même quand la grille s'agrandit."""
+        for topologie in ('tore', 'extensible'):
+            with self.subTest(topologie=topologie):
+                self.assertEqual(simuler_moteur('RL', topologie, 64, [(32, 32)], 60000, True),
+                                 simuler_moteur('RL', topologie, 64, [(32, 32)], 60000, True, autoroute=False))
+
+
+class TestAgrandissement(unittest.TestCase):
+    """Tests pour le journal, l'ordonnanceur et la caméra quand la grille s'agrandit."""
+
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.chemin = os.path.join(self.dossier.name, 'journal.fourmi')
+
+    def tearDown(self):
+        self.dossier.cleanup()
+
+    def test_journal(self):
+        """Le journal rejoue les étapes d'avant et d'après chaque agrandissement."""
+        moteur = Moteur(jit=False)
+        grille, fourmis = Grille(8, 8, 'extensible'), [Fourmi(4, 4, 0)]
+        with Journal(self.chemin, 1000) as journal:
+            journal.point_de_reprise(grille, fourmis, 0)
+            for _ in range(100):
+                journal.avancer(moteur, grille, fourmis, 13)
+        self.assertGreater(grille.largeur, 8)
+        with Journal(self.chemin) as journal:
+            for etape in (0, 40, 200, 777, 1299, 1300):
+                grille2, fourmis2 = journal.etat_a(etape)
+                attendu = simuler_reference('RL', 'extensible', 8, [(4, 4)], etape)
+                self.assertEqual((grille2.grille, [(f.x, f.y, f.direction, f.etat) for f in fourmis2]),
+                                 (attendu[0], attendu[2]))
+
+    def test_ordonnanceur(self):
+        """Les cases modifiées ne sont pas relevées quand la grille s'agrandit."""
+        moteur = Moteur(jit=False)
+        grille, fourmis = Grille(4, 4, 'extensible'), [Fourmi(2, 2, 0)]
+        resultats = [avancer(moteur, grille, fourmis, 1) for _ in range(20)]
+        self.assertIn(None, resultats)
+        self.assertEqual(resultats[0], [(2, 2)])
+
+    def test_camera(self):
+        """La vue reste sur les mêmes cases quand la grille s'agrandit vers la gauche."""
+        grille = Grille(100, 100, 'extensible')
+        camera = Camera(50, 50, 100, 100, zoom=1)
+        self.assertTrue(camera.adapter(grille))
+        camera.x, camera.y = 10, 20
+        self.assertFalse(camera.adapter(grille))
+        grille.etendre([Fourmi(-1, 0, 0)])
+        self.assertTrue(camera.adapter(grille))
+        self.assertEqual((camera.largeur, camera.x, camera.y), (200, 110, 20))
+
+
+if __name__ == "__main__":
+    unittest.main()